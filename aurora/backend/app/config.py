@@ -24,6 +24,11 @@ class Settings(BaseSettings):
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
+
+    # Scheduler leader election ("db" lease row, or "file" lock for one host)
+    scheduler_lease_backend: str = "db"
+    scheduler_lock_file: str = "/tmp/aurora-scheduler.lock"
+    scheduler_lease_ttl: int = 30
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,197 @@
+"""
+📁 backend/app/core/job_runner.py
+Execution layer for scheduled jobs.
+
+Batch jobs run on a dedicated event loop in a background thread, whose
+default executor is a small job-only thread pool: their database calls
+and in-memory work never queue behind (or ahead of) request handlers on
+the API loop. Jobs that touch objects bound to the API loop (the alert
+dispatcher, the in-memory leaderboards) run there with `isolated=False`.
+
+Every job gets overlap protection (a run is skipped while the previous
+one is still going), a timeout, a concurrency limit shared by all jobs,
+and progress reporting via `report_progress()`, exposed at /health/jobs.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger("aurora.jobs")
+
+_current_run: contextvars.ContextVar[Optional["JobRun"]] = contextvars.ContextVar(
+    "aurora_job_run", default=None
+)
+
+
+def report_progress(**fields: Any) -> None:
+    """Update the progress of the job running in this context (no-op outside jobs)."""
+    run = _current_run.get()
+    if run is not None:
+        run.progress.update(fields)
+
+
+class JobRun:
+    __slots__ = ("job", "started_at", "finished_at", "status", "progress", "error", "_t0")
+
+    def __init__(self, job: str):
+        self.job = job
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.status = "running"
+        self.progress: dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self._t0 = time.monotonic()
+
+    def as_dict(self) -> dict:
+        return {
+            "job": self.job,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "seconds": round(time.monotonic() - self._t0, 2) if self.status == "running"
+            else round((self.finished_at - self.started_at).total_seconds(), 2),
+            "progress": dict(self.progress),
+            "error": self.error,
+        }
+
+
+class JobRunner:
+    """Runs scheduler jobs off the request loop with bounded concurrency."""
+
+    def __init__(self, max_concurrent: int = 2, pool_size: int = 4,
+                 default_timeout: float = 1800.0, history: int = 50):
+        self.max_concurrent = max_concurrent
+        self.pool_size = pool_size
+        self.default_timeout = default_timeout
+        self._running: dict[str, JobRun] = {}
+        self._history: deque[JobRun] = deque(maxlen=history)
+        self._slots: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._skipped = 0
+        self._timeouts = 0
+
+    # -- Lifecycle ---------------------------------------------------
+
+    def start(self) -> None:
+        """Start the job loop thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._pool = ThreadPoolExecutor(self.pool_size, thread_name_prefix="aurora-job")
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(self._pool)
+        ready = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(self._loop)
+            self._loop.call_soon(ready.set)
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run_loop, name="aurora-job-loop", daemon=True)
+        self._thread.start()
+        ready.wait()
+        logger.info("🧵 Job runner started (%d slots, %d pool threads)", self.max_concurrent, self.pool_size)
+
+    def stop(self) -> None:
+        """Cancel running isolated jobs and stop the job loop."""
+        if self._thread is None:
+            return
+        loop = self._loop
+
+        def shutdown():
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+            loop.stop()
+
+        loop.call_soon_threadsafe(shutdown)
+        self._thread.join(timeout=5)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._slots.pop(loop, None)
+        self._loop = self._thread = self._pool = None
+        logger.info("🛑 Job runner stopped")
+
+    # -- Running -----------------------------------------------------
+
+    def job(self, name: str, fn: Callable[[], Awaitable[Any]],
+            timeout: Optional[float] = None, isolated: bool = True) -> Callable[[], Awaitable[Any]]:
+        """Wrap a job coroutine function for APScheduler."""
+        async def run_job():
+            return await self.run(name, fn, timeout=timeout, isolated=isolated)
+
+        run_job.__name__ = getattr(fn, "__name__", name)
+        run_job.__doc__ = fn.__doc__
+        return run_job
+
+    async def run(self, name: str, fn: Callable[[], Awaitable[Any]],
+                  timeout: Optional[float] = None, isolated: bool = True) -> Any:
+        """
+        Run one job to completion (or timeout). Returns the job's result,
+        or None if skipped because the previous run is still going.
+        """
+        if name in self._running:
+            self._skipped += 1
+            logger.warning("⏭️ Job %s skipped: previous run still in progress", name)
+            return None
+        run = JobRun(name)
+        self._running[name] = run
+        try:
+            coro = self._guarded(run, fn, timeout or self.default_timeout)
+            if isolated and self._loop is not None:
+                future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+                result = await asyncio.wrap_future(future)
+            else:
+                result = await coro
+            run.status = "ok"
+            return result
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            run.status, run.error = "timeout", f"exceeded {timeout or self.default_timeout:g}s"
+            raise
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            raise
+        except Exception as e:
+            run.status, run.error = "failed", str(e)
+            raise
+        finally:
+            run.finished_at = datetime.now(timezone.utc)
+            self._running.pop(name, None)
+            self._history.append(run)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores bind to a loop: one per loop, each with the full budget
+        loop = asyncio.get_running_loop()
+        if loop not in self._slots:
+            self._slots[loop] = asyncio.Semaphore(self.max_concurrent)
+        return self._slots[loop]
+
+    async def _guarded(self, run: JobRun, fn: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        async with self._semaphore():
+            token = _current_run.set(run)
+            try:
+                return await asyncio.wait_for(fn(), timeout)
+            finally:
+                _current_run.reset(token)
+
+    # -- Introspection -----------------------------------------------
+
+    def status(self) -> dict:
+        return {
+            "running": self._thread is not None,
+            "active": [r.as_dict() for r in self._running.values()],
+            "recent": [r.as_dict() for r in reversed(self._history)][:10],
+            "skipped_overlaps": self._skipped,
+            "timeouts": self._timeouts,
+        }
+
+
+# Global instance
+job_runner = JobRunner()
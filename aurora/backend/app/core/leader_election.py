@@ -0,0 +1,222 @@
+"""
+📁 backend/app/core/leader_election.py
+Leader election for the scheduler across uvicorn workers / replicas.
+
+Every worker configures the scheduler paused and runs a small lease loop.
+Whoever holds the lease resumes the scheduler; everyone else stays paused
+and keeps trying, so a follower takes over within one TTL of the leader
+dying. A leader that cannot renew before its lease expires pauses itself,
+so two workers never run jobs at once.
+
+Backends:
+  db   — a `scheduler_leases` row with an expiry, taken and renewed
+         atomically by the `acquire_lease` RPC (works across hosts)
+  file — a non-blocking flock on a local file (single host; the OS
+         releases it when the holder dies)
+
+The leader publishes its last job runs with each renewal, so any worker
+can report them at /health/scheduler.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+logger = logging.getLogger("aurora.scheduler")
+
+LEASE_NAME = "scheduler"
+
+
+def _holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _parse_ts(value) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+# ── Backends ────────────────────────────────────────────────────
+
+class DBLease:
+    """Lease row with expiry; acquire and renew are the same atomic RPC."""
+
+    backend = "db"
+
+    def __init__(self, supabase_factory: Callable, name: str = LEASE_NAME):
+        self._supabase = supabase_factory
+        self.name = name
+
+    async def acquire(self, holder: str, ttl: float, meta: dict) -> dict:
+        """Take or renew the lease. Returns { leader, expires_at, meta }."""
+        result = await asyncio.to_thread(
+            self._supabase().rpc("acquire_lease", {
+                "name_param": self.name,
+                "holder_param": holder,
+                "ttl_seconds_param": int(ttl),
+                "meta_param": meta,
+            }).execute
+        )
+        row = (result.data or [{}])[0]
+        return {
+            "leader": row.get("holder"),
+            "expires_at": _parse_ts(row.get("expires_at")),
+            "meta": row.get("meta") or {},
+        }
+
+    async def release(self, holder: str) -> None:
+        await asyncio.to_thread(
+            self._supabase().rpc("release_lease", {
+                "name_param": self.name, "holder_param": holder,
+            }).execute
+        )
+
+
+class FileLease:
+    """flock on a local file; the lock file body names the holder."""
+
+    backend = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.loads(f.read() or "{}")
+        except (OSError, ValueError):
+            return {}
+
+    def _acquire(self, holder: str, ttl: float, meta: dict) -> dict:
+        import fcntl
+
+        if self._fd is None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                body = self._read()
+                return {"leader": body.get("holder"), "expires_at": None, "meta": body.get("meta") or {}}
+            self._fd = fd
+
+        body = json.dumps({"holder": holder, "meta": meta}, default=str).encode()
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, body, 0)
+        # flock is held until release or process death; no wall-clock expiry
+        return {"leader": holder, "expires_at": None, "meta": meta}
+
+    async def acquire(self, holder: str, ttl: float, meta: dict) -> dict:
+        return await asyncio.to_thread(self._acquire, holder, ttl, meta)
+
+    async def release(self, holder: str) -> None:
+        if self._fd is not None:
+            import fcntl
+
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+# ── Elector ─────────────────────────────────────────────────────
+
+class LeaderElector:
+    """Keeps trying to hold the lease; calls on_elected / on_demoted on changes."""
+
+    def __init__(self, lease, on_elected: Callable[[], None], on_demoted: Callable[[], None],
+                 ttl: float = 30.0, renew_every: float = 10.0,
+                 meta_fn: Optional[Callable[[], dict]] = None):
+        self.lease = lease
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.ttl = ttl
+        self.renew_every = renew_every
+        self.meta_fn = meta_fn or dict
+        self.holder = _holder_id()
+        self.is_leader = False
+        self.leader: Optional[str] = None
+        self.leader_meta: dict = {}
+        self.expires_at: Optional[datetime] = None
+        self._valid_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._elections = 0
+        self._errors = 0
+
+    async def tick(self) -> None:
+        """One acquire/renew attempt; safe to call directly (tests, startup)."""
+        now = datetime.now(timezone.utc)
+        try:
+            state = await self.lease.acquire(
+                self.holder, self.ttl, self.meta_fn() if self.is_leader else {}
+            )
+        except Exception as e:
+            self._errors += 1
+            logger.warning("⚠️  Scheduler lease check failed: %s", e)
+            # Can't prove we still hold it: step down once our lease would lapse
+            if self.is_leader and (self._valid_until is None or now >= self._valid_until):
+                self._set_leader(False)
+            return
+
+        self.leader = state["leader"]
+        self.leader_meta = state["meta"]
+        self.expires_at = state["expires_at"]
+        won = state["leader"] == self.holder
+        if won:
+            # Count validity from before the call, never trusting the DB clock
+            self._valid_until = now + timedelta(seconds=self.ttl)
+        self._set_leader(won)
+
+    def _set_leader(self, leader: bool) -> None:
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        if leader:
+            self._elections += 1
+            logger.info("👑 This worker (%s) is now the scheduler leader", self.holder)
+            self.on_elected()
+        else:
+            self._valid_until = None
+            logger.info("🪑 This worker (%s) is no longer the scheduler leader", self.holder)
+            self.on_demoted()
+
+    async def _loop(self) -> None:
+        while True:
+            await self.tick()
+            await asyncio.sleep(self.renew_every)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop campaigning and hand the lease back if we hold it."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.is_leader:
+            self._set_leader(False)
+            try:
+                await self.lease.release(self.holder)
+            except Exception as e:
+                logger.warning("⚠️  Scheduler lease release failed: %s", e)
+
+    def status(self) -> dict:
+        return {
+            "backend": self.lease.backend,
+            "worker": self.holder,
+            "is_leader": self.is_leader,
+            "leader": self.leader,
+            "lease_expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "elections_won": self._elections,
+            "lease_errors": self._errors,
+            "leader_jobs": self.leader_meta.get("jobs", []),
+        }
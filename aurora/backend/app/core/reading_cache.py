@@ -0,0 +1,231 @@
+"""
+📁 backend/app/core/reading_cache.py
+Last-N sensor readings per grow, in memory.
+
+Each grow gets a fixed-size ring buffer of compact `Reading` records,
+filled by ingestion and warmed lazily from the database on a miss.
+Grows are evicted LRU, so memory is bounded by `max_grows * size`.
+A buffer is trusted for `ttl` seconds after it was last warmed or fed
+by ingestion in this process; after that the next read re-syncs it, so
+readings ingested by other workers show up within the TTL.
+
+Readers: GET /sensors/latest, the chat grow context and the proactive
+analyzer (all of which used to query "most recent reading of grow X").
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from cachetools import LRUCache
+from supabase import Client
+
+from app.utils.downsample import METRICS
+
+logger = logging.getLogger("aurora.readings")
+
+
+def _epoch(raw) -> Optional[float]:
+    if not raw:
+        return None
+    dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+# ── Records ─────────────────────────────────────────────────────
+
+class Reading:
+    """One sensor reading, without the per-row dict overhead."""
+
+    __slots__ = ("ts", "id", "grow_id", "user_id", "created_at") + METRICS
+
+    def __init__(self, row: dict, ts: float):
+        self.ts = ts
+        self.id = row.get("id")
+        self.grow_id = row.get("grow_id")
+        self.user_id = row.get("user_id")
+        self.created_at = row.get("created_at") or row.get("recorded_at")
+        for metric in METRICS:
+            value = row.get(metric)
+            setattr(self, metric, None if value is None else float(value))
+
+    @classmethod
+    def from_row(cls, row: dict) -> "Reading":
+        ts = _epoch(row.get("created_at") or row.get("recorded_at"))
+        if ts is None:
+            ts = datetime.now(timezone.utc).timestamp()
+        return cls(row, ts)
+
+    def to_dict(self) -> dict:
+        out = {
+            key: getattr(self, key)
+            for key in ("id", "grow_id", "user_id", "created_at") + METRICS
+        }
+        return {k: v for k, v in out.items() if v is not None}
+
+
+class RingBuffer:
+    """Fixed-size, array-backed buffer of readings in time order."""
+
+    __slots__ = ("_items", "_head", "_size", "warmed", "synced_at")
+
+    def __init__(self, capacity: int):
+        self._items: list[Optional[Reading]] = [None] * capacity
+        self._head = 0          # index of the next write
+        self._size = 0
+        self.warmed = False     # holds everything the database had at warm-up
+        self.synced_at = -float("inf")  # last warm-up or local ingest (cache timer)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _ordered(self) -> list[Reading]:
+        cap = len(self._items)
+        start = (self._head - self._size) % cap
+        return [self._items[(start + i) % cap] for i in range(self._size)]
+
+    def latest(self) -> Optional[Reading]:
+        if not self._size:
+            return None
+        return self._items[(self._head - 1) % len(self._items)]
+
+    def last(self, n: int) -> list[Reading]:
+        """Up to n most recent readings, oldest first."""
+        return self._ordered()[-n:] if n > 0 else []
+
+    def push(self, reading: Reading) -> bool:
+        """Add a reading; returns True if it is now the newest one."""
+        newest = self.latest()
+        if newest is not None and reading.ts < newest.ts:
+            # Late reading: rebuild in order (rare; keeps the N newest)
+            if reading.id is not None and any(r.id == reading.id for r in self._ordered()):
+                return False
+            items = sorted(self._ordered() + [reading], key=lambda r: r.ts)
+            self._reset(items[-len(self._items):])
+            return False
+        if newest is not None and reading.id is not None and reading.id == newest.id:
+            return False
+        self._items[self._head] = reading
+        self._head = (self._head + 1) % len(self._items)
+        self._size = min(self._size + 1, len(self._items))
+        return True
+
+    def _reset(self, readings: list[Reading]) -> None:
+        cap = len(self._items)
+        self._items = [None] * cap
+        self._head = self._size = 0
+        for r in readings[-cap:]:
+            self._items[self._head] = r
+            self._head = (self._head + 1) % cap
+            self._size += 1
+
+
+# ── Cache ───────────────────────────────────────────────────────
+
+class ReadingCache:
+    """grow_id → RingBuffer, LRU-bounded, each trusted for `ttl` seconds."""
+
+    def __init__(self, size: int = 8, max_grows: int = 20_000, ttl: float = 30.0, timer=time.monotonic):
+        self.size = size
+        self.ttl = ttl
+        self._timer = timer
+        self._buffers: LRUCache = LRUCache(maxsize=max_grows)
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "warm_errors": 0}
+
+    def _buffer(self, grow_id: str) -> RingBuffer:
+        buf = self._buffers.get(grow_id)
+        if buf is None:
+            buf = self._buffers[grow_id] = RingBuffer(self.size)
+        return buf
+
+    def add(self, rows: list[dict]) -> dict[str, Reading]:
+        """Fold stored rows in. Returns the readings that became newest per grow."""
+        newest: dict[str, Reading] = {}
+        for row in rows:
+            grow_id = row.get("grow_id")
+            if not grow_id:
+                continue
+            reading = Reading.from_row(row)
+            buf = self._buffer(grow_id)
+            buf.synced_at = self._timer()
+            if buf.push(reading):
+                newest[grow_id] = reading
+        return newest
+
+    def peek(self, grow_id: str, n: int = 1) -> list[Reading]:
+        """What memory holds for a grow, oldest first — never touches the database."""
+        buf = self._buffers.get(grow_id)
+        return buf.last(n) if buf is not None else []
+
+    def latest(self, grow_id: str) -> Optional[Reading]:
+        buf = self._buffers.get(grow_id)
+        return buf.latest() if buf is not None else None
+
+    async def recent(self, supabase: Client, grow_id: str, n: int = 1) -> list[Reading]:
+        """Up to n most recent readings (oldest first), warming from the database on a miss."""
+        buf = self._buffers.get(grow_id)
+        if buf is not None and (buf.warmed or len(buf) >= n):
+            if self._timer() - buf.synced_at < self.ttl:
+                self._stats["hits"] += 1
+                return buf.last(n)
+            self._stats["stale"] += 1
+        self._stats["misses"] += 1
+        await self.warm(supabase, grow_id)
+        return self.peek(grow_id, n)
+
+    async def warm(self, supabase: Client, grow_id: str) -> None:
+        """
+        Load the newest readings from `sensor_readings`, falling back to
+        `grow_snapshots` for grows that only have snapshots. Grows with no
+        data are remembered as warmed too, so they aren't queried per call.
+        """
+        try:
+            result = await asyncio.to_thread(
+                supabase.table("sensor_readings")
+                .select("*")
+                .eq("grow_id", grow_id)
+                .order("created_at", desc=True)
+                .limit(self.size)
+                .execute
+            )
+            rows = result.data or []
+            if not rows:
+                result = await asyncio.to_thread(
+                    supabase.table("grow_snapshots")
+                    .select("*")
+                    .eq("grow_id", grow_id)
+                    .order("recorded_at", desc=True)
+                    .limit(self.size)
+                    .execute
+                )
+                rows = result.data or []
+            readings = [Reading.from_row(row) for row in reversed(rows)]
+        except Exception as e:
+            self._stats["warm_errors"] += 1
+            logger.warning("Failed to warm readings for grow %s: %s", grow_id, e)
+            return
+
+        buf = self._buffer(grow_id)
+        for reading in readings:
+            buf.push(reading)
+        buf.warmed = True
+        buf.synced_at = self._timer()
+
+    def forget(self, grow_id: str) -> None:
+        self._buffers.pop(grow_id, None)
+
+    def clear(self) -> None:
+        self._buffers.clear()
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["cached_grows"] = len(self._buffers)
+        return s
+
+
+# Global instance
+reading_cache = ReadingCache()
@@ -3,17 +3,35 @@
 APScheduler integration for Aurora backend.
 Runs periodic scheduled jobs:
   1. daily_tasks_generator — generates daily tasks at 00:00 UTC
-  2. anomaly_checker — checks sensor anomalies every 6 hours
+  2. anomaly_checker — safety net for streaming anomaly detection every 6 hours
+  3. weekly_xp_reconciler — reconciles levels and weekly bonuses on Sundays
+  4. community_stats_refresher — refreshes community aggregates every 15 minutes
+  5. sensor_rollup_backfill — recomputes recent sensor rollups every hour
+  6. sensor_retention — purges raw sensor readings past retention daily
+  7. leaderboard_snapshot — rebuilds the leaderboards and publishes them every
+     10 minutes (other workers load that snapshot, see leaderboard_service)
+
+Jobs run through the job runner (app/core/job_runner.py): off the request
+loop where possible, one run at a time per job, with a timeout each. Job
+bodies log and re-raise failures, so the runner records them as failed.
+
+Every worker sets the scheduler up paused; only the worker holding the
+scheduler lease (app/core/leader_election.py) resumes it, so each job
+runs once per deployment however many workers there are.
 """
 
 import asyncio
 import logging
 from datetime import datetime
+from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
 
+from app.config import settings
+from app.core.job_runner import job_runner
+from app.core.leader_election import DBLease, FileLease, LeaderElector
 from app.dependencies import get_supabase_client, get_current_user_id
 
 logger = logging.getLogger("aurora.scheduler")
@@ -21,258 +39,208 @@ logger = logging.getLogger("aurora.scheduler")
 
 # ── Job Functions ──────────────────────────────────────────────
 
+# PostgREST caps responses at 1000 rows; sweeps page with .range()
+PAGE_SIZE = 1000
+SWEEP_CHUNK = 200
+
+
+async def _paged(query_fn) -> list[dict]:
+    rows, start = [], 0
+    while True:
+        result = await asyncio.to_thread(query_fn().range(start, start + PAGE_SIZE - 1).execute)
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
 async def generate_all_daily_tasks():
     """
-    Generate daily tasks for ALL users with active grows.
+    Generate daily tasks for ALL users with active grows, in a handful of
+    bulk statements (see task_generation_service).
     Runs at 00:00 UTC each day.
     """
     logger.info("🕛 [CRON] Starting daily task generation...")
     sb = get_supabase_client()
 
     try:
-        # Get all users with active grows
-        active_grows = sb.table("grows").select(
-            "user_id"
-        ).eq("status", "active").execute()
-
-        if not active_grows.data:
-            logger.info("   No active grows found. Skipping task generation.")
-            return
-
-        # Deduplicate user IDs
-        user_ids = list({g["user_id"] for g in active_grows.data})
-        logger.info("   Found %d users with active grows", len(user_ids))
-
         from datetime import date
-        today = date.today().isoformat()
-        total_tasks = 0
-
-        for user_id in user_ids:
-            try:
-                # Check if tasks already exist for today
-                existing = sb.table("daily_tasks").select(
-                    "id", count="exact"
-                ).eq("user_id", user_id).eq("task_date", today).execute()
-
-                if (existing.count or 0) > 0:
-                    logger.info("   ⏭️  User %s already has tasks for today", user_id[:8])
-                    continue
-
-                # Get user's active grows
-                user_grows = sb.table("grows").select(
-                    "id, strain_name, current_phase"
-                ).eq("user_id", user_id).eq("status", "active").execute()
-
-                for grow in user_grows.data:
-                    grow_id = grow["id"]
-                    phase = grow.get("current_phase", "vegetative")
-
-                    # Generate tasks based on growth phase
-                    tasks = _generate_tasks_for_phase(
-                        user_id=user_id,
-                        grow_id=grow_id,
-                        phase=phase,
-                        today=today,
-                    )
-
-                    if tasks:
-                        sb.table("daily_tasks").insert(tasks).execute()
-                        total_tasks += len(tasks)
+        from app.services.task_generation_service import generate_daily_tasks
 
-            except Exception as e:
-                logger.error("   Error generating tasks for user %s: %s", user_id[:8], e)
-                continue
-
-        logger.info("✅ [CRON] Daily tasks generated: %d tasks for %d users", total_tasks, len(user_ids))
+        summary = await generate_daily_tasks(sb, date.today().isoformat())
+        logger.info(
+            "✅ [CRON] Daily tasks generated: %d tasks for %d users",
+            summary["tasks"], summary["users"],
+        )
 
     except Exception as e:
         logger.error("❌ [CRON] Daily task generation failed: %s", e)
-
-
-def _generate_tasks_for_phase(
-    user_id: str,
-    grow_id: str,
-    phase: str,
-    today: str,
-) -> list[dict]:
-    """Generate appropriate daily tasks based on current growth phase."""
-    base_tasks = [
-        {
-            "user_id": user_id,
-            "grow_id": grow_id,
-            "title": "Check plant health",
-            "description": "Inspect leaves for discoloration, pests, or stress signs",
-            "scheduled_time": "08:00",
-            "is_critical": False,
-            "is_completed": False,
-            "task_date": today,
-        },
-        {
-            "user_id": user_id,
-            "grow_id": grow_id,
-            "title": "Log environmental data",
-            "description": "Record temperature, humidity, and VPD readings",
-            "scheduled_time": "09:00",
-            "is_critical": True,
-            "is_completed": False,
-            "task_date": today,
-        },
-        {
-            "user_id": user_id,
-            "grow_id": grow_id,
-            "title": "Check water / moisture",
-            "description": "Check soil moisture or reservoir levels, water if needed",
-            "scheduled_time": "10:00",
-            "is_critical": False,
-            "is_completed": False,
-            "task_date": today,
-        },
-        {
-            "user_id": user_id,
-            "grow_id": grow_id,
-            "title": "Take daily photo",
-            "description": "Document plant growth with a photo for the grow gallery",
-            "scheduled_time": "12:00",
-            "is_critical": False,
-            "is_completed": False,
-            "task_date": today,
-        },
-    ]
-
-    # Phase-specific tasks
-    if phase in ("vegetative", "veg"):
-        base_tasks.append({
-            "user_id": user_id,
-            "grow_id": grow_id,
-            "title": "Training check",
-            "description": "Adjust LST ties, check SCROG screen, or plan next topping",
-            "scheduled_time": "11:00",
-            "is_critical": False,
-            "is_completed": False,
-            "task_date": today,
-        })
-    elif phase in ("flowering", "flower", "bloom"):
-        base_tasks.append({
-            "user_id": user_id,
-            "grow_id": grow_id,
-            "title": "Check trichomes",
-            "description": "Use magnifier to check trichome color (clear → cloudy → amber)",
-            "scheduled_time": "11:00",
-            "is_critical": False,
-            "is_completed": False,
-            "task_date": today,
-        })
-        base_tasks.append({
-            "user_id": user_id,
-            "grow_id": grow_id,
-            "title": "Inspect for mold",
-            "description": "Check dense buds for signs of botrytis or powdery mildew",
-            "scheduled_time": "14:00",
-            "is_critical": True,
-            "is_completed": False,
-            "task_date": today,
-        })
-    elif phase in ("drying", "curing"):
-        base_tasks = [
-            {
-                "user_id": user_id,
-                "grow_id": grow_id,
-                "title": "Check drying conditions",
-                "description": "Verify 18-20°C and 55-65% humidity in drying area",
-                "scheduled_time": "09:00",
-                "is_critical": True,
-                "is_completed": False,
-                "task_date": today,
-            },
-            {
-                "user_id": user_id,
-                "grow_id": grow_id,
-                "title": "Burp curing jars",
-                "description": "Open jars for 10-15 minutes to exchange air",
-                "scheduled_time": "12:00",
-                "is_critical": False,
-                "is_completed": False,
-                "task_date": today,
-            },
-        ]
-
-    return base_tasks
+        raise
 
 
 async def check_sensor_anomalies():
     """
-    Check recent sensor readings for anomalies across all active grows.
-    Runs every 6 hours.
+    Safety net for the streaming anomaly detector: flags grows whose hourly
+    rollup means have stayed out of range and that have no active alert
+    (e.g. readings ingested while the detector was restarting).
+    Runs every 6 hours and reads hourly rollups only, never raw readings.
     """
-    logger.info("🔍 [CRON] Starting sensor anomaly check...")
+    logger.info("🔍 [CRON] Starting sensor anomaly safety-net check...")
     sb = get_supabase_client()
 
     try:
         from app.services.alert_service import AlertService
+        from app.services.anomaly_detector import anomaly_detector
+        from app.services.threshold_service import GROW_COLUMNS, METRICS, threshold_cache
         from datetime import timedelta
 
-        # Get readings from the last 6 hours
-        since = (datetime.utcnow() - timedelta(hours=6)).isoformat()
-
-        result = sb.table("sensor_readings").select(
-            "*, grows!sensor_readings_grow_id_fkey(user_id, strain_name)"
-        ).gte("created_at", since).execute()
-
-        if not result.data:
-            logger.info("   No recent sensor readings found.")
+        grows = await _paged(
+            lambda: sb.table("grows").select(f"{GROW_COLUMNS}, user_id").eq("status", "active").order("id")
+        )
+        owners = {g["id"]: g["user_id"] for g in grows if g.get("user_id")}
+        tables = {g["id"]: threshold_cache.for_grow(g) for g in grows}
+        if not owners:
+            logger.info("   No active grows found.")
             return
 
-        logger.info("   Checking %d readings for anomalies...", len(result.data))
-        alerts_created = 0
-
-        for reading in result.data:
-            grow_info = reading.pop("grows", {}) or {}
-            user_id = grow_info.get("user_id")
-
-            if not user_id:
-                continue
-
-            alerts = await AlertService.check_sensor_reading(
-                grow_id=reading["grow_id"],
-                user_id=user_id,
-                reading=reading,
+        since = (datetime.utcnow() - timedelta(hours=6)).isoformat()
+        grow_ids = list(owners)
+        series: dict[str, dict[str, list[float]]] = {}
+        # Chunked so the grow filter stays within URL limits
+        for i in range(0, len(grow_ids), SWEEP_CHUNK):
+            chunk = grow_ids[i:i + SWEEP_CHUNK]
+            rows = await _paged(
+                lambda: sb.table("sensor_rollups")
+                .select("grow_id, metric, bucket_start, sum, count")
+                .eq("granularity", "1h")
+                .in_("grow_id", chunk)
+                .in_("metric", list(METRICS))
+                .gte("bucket_start", since)
+                .order("bucket_start", desc=False)
+                .order("grow_id", desc=False)
+                .order("metric", desc=False)
             )
+            for row in rows:
+                if row.get("count"):
+                    series.setdefault(row["grow_id"], {}).setdefault(row["metric"], []).append(
+                        row["sum"] / row["count"]
+                    )
+
+        # Alerts raised by other workers (or before a restart) are active too
+        await anomaly_detector.warm(sb, list(series), refresh=True)
+        alerts: list[dict] = []
+        for grow_id, metrics in series.items():
+            alerts.extend(anomaly_detector.sweep(
+                grow_id, owners[grow_id], metrics, tables[grow_id].limits
+            ))
 
-            if alerts:
-                alerts_created += len(alerts)
+        await AlertService.save_and_notify(alerts)
 
         logger.info(
-            "✅ [CRON] Anomaly check complete: %d alerts from %d readings",
-            alerts_created, len(result.data),
+            "✅ [CRON] Anomaly safety net complete: %d alerts across %d grows",
+            len(alerts), len(series),
         )
 
     except Exception as e:
         logger.error("❌ [CRON] Anomaly check failed: %s", e)
+        raise
 
 
 async def weekly_xp_reconciliation():
     """
-    Reconcile all user levels and award weekly bonuses based on activity.
+    Award weekly consistency bonuses and reconcile levels with total XP,
+    set-based and resumable (see weekly_xp_job).
     Runs every Sunday at 00:00 UTC.
     """
     logger.info("📊 [CRON] Starting weekly XP reconciliation...")
     sb = get_supabase_client()
 
     try:
-        from app.services.gamification_service import (
-            award_weekly_bonuses, reconcile_all_levels
-        )
-        
-        # 1. Award bonuses based on this week's activity
-        await award_weekly_bonuses(sb)
-        
-        # 2. Ensure all levels are correctly synchronized with total XP
-        await reconcile_all_levels(sb)
-        
-        logger.info("✅ [CRON] Weekly XP reconciliation complete")
+        from app.services.weekly_xp_job import weekly_xp_job
+
+        progress = await weekly_xp_job.run(sb)
+        logger.info("✅ [CRON] Weekly XP reconciliation complete: %s", progress)
 
     except Exception as e:
         logger.error("❌ [CRON] Weekly XP reconciliation failed: %s", e)
+        raise
+
+
+async def refresh_community_stats():
+    """
+    Refresh the precomputed community aggregates and histograms.
+    Runs every 15 minutes.
+    """
+    sb = get_supabase_client()
+
+    try:
+        from app.services.community_stats_service import refresh_community_stats as refresh
+
+        await refresh(sb)
+        logger.info("✅ [CRON] Community stats refreshed")
+
+    except Exception as e:
+        logger.error("❌ [CRON] Community stats refresh failed: %s", e)
+        raise
+
+
+async def backfill_sensor_rollups():
+    """
+    Recompute the last two hours of sensor rollups from raw readings,
+    repairing any incremental update that failed at ingest.
+    Runs every hour.
+    """
+    sb = get_supabase_client()
+
+    try:
+        from datetime import timedelta, timezone
+        from app.services import rollup_service
+
+        until = datetime.now(timezone.utc)
+        rows = await rollup_service.backfill(sb, until - timedelta(hours=2), until)
+        logger.info("✅ [CRON] Sensor rollups backfilled: %d rows", rows)
+
+    except Exception as e:
+        logger.error("❌ [CRON] Sensor rollup backfill failed: %s", e)
+        raise
+
+
+async def purge_old_sensor_readings():
+    """
+    Drop raw sensor readings past retention (rollups are kept).
+    Runs daily at 03:30 UTC.
+    """
+    sb = get_supabase_client()
+
+    try:
+        from app.services import rollup_service
+
+        deleted = await rollup_service.purge_raw(sb)
+        logger.info("✅ [CRON] Purged %d raw sensor readings", deleted)
+
+    except Exception as e:
+        logger.error("❌ [CRON] Sensor retention purge failed: %s", e)
+        raise
+
+
+async def snapshot_leaderboards():
+    """
+    Rebuild the leaderboards from the database and publish them. Only the
+    leader reads the base tables; other workers load this snapshot.
+    Runs every 10 minutes.
+    """
+    sb = get_supabase_client()
+
+    try:
+        from app.services.leaderboard_service import leaderboards
+
+        await leaderboards.snapshot(sb)
+        logger.info("✅ [CRON] Leaderboards snapshotted")
+
+    except Exception as e:
+        logger.error("❌ [CRON] Leaderboard snapshot failed: %s", e)
+        raise
 
 
 # ── Scheduler Setup ───────────────────────────────────────────
@@ -297,7 +265,7 @@ def setup_scheduler():
     """Configure and register all scheduled jobs."""
     # Job 1: Generate daily tasks at 00:00 UTC
     scheduler.add_job(
-        generate_all_daily_tasks,
+        job_runner.job("daily_tasks_generator", generate_all_daily_tasks, timeout=1800),
         trigger=CronTrigger(hour=0, minute=0),
         id="daily_tasks_generator",
         name="Daily Tasks Generator",
@@ -307,7 +275,7 @@ def setup_scheduler():
 
     # Job 2: Check sensor anomalies every 6 hours
     scheduler.add_job(
-        check_sensor_anomalies,
+        job_runner.job("anomaly_checker", check_sensor_anomalies, timeout=900, isolated=False),
         trigger=CronTrigger(hour="0,6,12,18", minute=0),
         id="anomaly_checker",
         name="Sensor Anomaly Checker",
@@ -317,7 +285,7 @@ def setup_scheduler():
 
     # Job 3: Weekly XP reconciliation (Sunday 00:00 UTC)
     scheduler.add_job(
-        weekly_xp_reconciliation,
+        job_runner.job("weekly_xp_reconciler", weekly_xp_reconciliation, timeout=3600),
         trigger=CronTrigger(day_of_week="sun", hour=0, minute=0),
         id="weekly_xp_reconciler",
         name="Weekly XP Reconciler",
@@ -325,23 +293,110 @@ def setup_scheduler():
         misfire_grace_time=86400,  # Allow up to 1 day late
     )
 
+    # Job 4: Community stats refresh (every 15 minutes)
+    scheduler.add_job(
+        job_runner.job("community_stats_refresher", refresh_community_stats, timeout=300),
+        trigger=CronTrigger(minute="*/15"),
+        id="community_stats_refresher",
+        name="Community Stats Refresher",
+        replace_existing=True,
+        misfire_grace_time=600,
+    )
+
+    # Job 5: Sensor rollup repair (hourly, after the hour closes)
+    scheduler.add_job(
+        job_runner.job("sensor_rollup_backfill", backfill_sensor_rollups, timeout=1200),
+        trigger=CronTrigger(minute=5),
+        id="sensor_rollup_backfill",
+        name="Sensor Rollup Backfill",
+        replace_existing=True,
+        misfire_grace_time=1800,
+    )
+
+    # Job 6: Raw sensor retention (daily 03:30 UTC)
+    scheduler.add_job(
+        job_runner.job("sensor_retention", purge_old_sensor_readings, timeout=1800),
+        trigger=CronTrigger(hour=3, minute=30),
+        id="sensor_retention",
+        name="Sensor Retention Purge",
+        replace_existing=True,
+        misfire_grace_time=3600,
+    )
+
+    # Job 7: Leaderboard snapshot (every 10 minutes)
+    scheduler.add_job(
+        job_runner.job("leaderboard_snapshot", snapshot_leaderboards, timeout=300, isolated=False),
+        trigger=CronTrigger(minute="*/10"),
+        id="leaderboard_snapshot",
+        name="Leaderboard Snapshot",
+        replace_existing=True,
+        misfire_grace_time=300,
+    )
+
     # Listen for job events
     scheduler.add_listener(_job_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
 
     logger.info("📅 Scheduler configured with %d jobs:", len(scheduler.get_jobs()))
     for job in scheduler.get_jobs():
-        logger.info("   • %s (%s) → next run: %s", job.name, job.id, job.next_run_time)
+        logger.info("   • %s (%s)", job.name, job.id)
 
 
-def start_scheduler():
-    """Start the scheduler (call from FastAPI startup)."""
-    setup_scheduler()
-    scheduler.start()
-    logger.info("🚀 Scheduler started")
+def _leader_meta() -> dict:
+    """What the leader publishes with each lease renewal."""
+    return {"jobs": job_runner.status()["recent"]}
 
 
-def stop_scheduler():
-    """Gracefully shut down the scheduler (call from FastAPI shutdown)."""
+def _make_elector() -> LeaderElector:
+    if settings.scheduler_lease_backend == "file":
+        lease = FileLease(settings.scheduler_lock_file)
+    else:
+        lease = DBLease(get_supabase_client)
+    ttl = settings.scheduler_lease_ttl
+    return LeaderElector(
+        lease,
+        on_elected=scheduler.resume,
+        on_demoted=scheduler.pause,
+        ttl=ttl,
+        renew_every=max(1.0, ttl / 3),
+        meta_fn=_leader_meta,
+    )
+
+
+elector: Optional[LeaderElector] = None
+
+
+def start_scheduler():
+    """
+    Start the scheduler paused and campaign for leadership
+    (call from FastAPI startup, inside the running event loop).
+    """
+    global elector
+    job_runner.start()
+    setup_scheduler()
+    scheduler.start(paused=True)
+    elector = _make_elector()
+    elector.start()
+    logger.info("🚀 Scheduler started (paused until this worker holds the lease)")
+
+
+async def stop_scheduler():
+    """Gracefully shut down the scheduler and release the lease (call from FastAPI shutdown)."""
+    global elector
+    if elector is not None:
+        await elector.stop()
+        elector = None
     if scheduler.running:
         scheduler.shutdown(wait=False)
         logger.info("🛑 Scheduler stopped")
+    job_runner.stop()
+
+
+def scheduler_status() -> dict:
+    """Leader, lease and job stats for this worker (and the leader's last runs)."""
+    status = elector.status() if elector else {"is_leader": False, "leader": None}
+    status["jobs"] = [
+        {"id": job.id, "next_run": job.next_run_time.isoformat() if getattr(job, "next_run_time", None) else None}
+        for job in scheduler.get_jobs()
+    ]
+    status["local_runs"] = job_runner.status()
+    return status
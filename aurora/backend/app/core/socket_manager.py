@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Set
 from fastapi import WebSocket
 import logging
 
@@ -10,6 +10,8 @@ class SocketManager:
     def __init__(self):
         # user_id -> list of active websockets
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        # channel (e.g. "grow:<id>") -> subscribed websockets
+        self.channels: Dict[str, Set[WebSocket]] = {}
 
     async def connect(self, websocket: WebSocket, user_id: str):
         await websocket.accept()
@@ -19,6 +21,8 @@ class SocketManager:
         logger.info(f"User {user_id} connected via WebSocket")
 
     def disconnect(self, websocket: WebSocket, user_id: str):
+        for channel in [c for c, sockets in self.channels.items() if websocket in sockets]:
+            self.unsubscribe(websocket, channel)
         if user_id in self.active_connections:
             self.active_connections[user_id].remove(websocket)
             if not self.active_connections[user_id]:
@@ -34,6 +38,27 @@ class SocketManager:
                 except Exception as e:
                     logger.error(f"Error sending WS message: {e}")
 
+    def subscribe(self, websocket: WebSocket, channel: str):
+        self.channels.setdefault(channel, set()).add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, channel: str):
+        sockets = self.channels.get(channel)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del self.channels[channel]
+
+    def has_subscribers(self, channel: str) -> bool:
+        return bool(self.channels.get(channel))
+
+    async def publish(self, channel: str, message: dict):
+        """Send a message to every socket subscribed to a channel."""
+        for connection in list(self.channels.get(channel, ())):
+            try:
+                await connection.send_json(message)
+            except Exception as e:
+                logger.error(f"Error publishing WS message to {channel}: {e}")
+
     async def broadcast(self, message: dict):
         """Broadcast message to all connected users."""
         for user_id in self.active_connections:
@@ -6,15 +6,20 @@ Registers all routers, configures CORS, logging middleware,
 global exception handling, and startup health checks.
 """
 
+import asyncio
+import json
 import logging
 import time
 from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI, Request, status, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, status, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.core.socket_manager import socket_manager
+from app.core.reading_cache import reading_cache
+from app.services.sensor_fanout import grow_channel
 
 from app.config import settings
 from app.dependencies import get_supabase_client, get_groq_client, verify_jwt
@@ -52,6 +57,30 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("⚠️  Scheduler start failed: %s", e)
 
+    # Start XP ledger (XP/karma awards → coalesced atomic increments)
+    from app.services.xp_ledger import xp_ledger
+    xp_ledger.start(get_supabase_client())
+
+    # Load leaderboards from the leader's snapshot, then poll for newer ones
+    from app.services.leaderboard_service import leaderboards
+    try:
+        await leaderboards.load(get_supabase_client())
+    except Exception as e:
+        logger.warning("⚠️  Leaderboard load failed: %s", e)
+    leaderboards.start(get_supabase_client())
+
+    # Start alert dispatcher (cooldown, bulk inserts, merged pushes)
+    from app.services.alert_dispatcher import alert_dispatcher
+    alert_dispatcher.start(get_supabase_client())
+
+    # Start moderation pipeline (batched LLM toxicity checks)
+    from app.services.moderation_service import moderation_pipeline
+    try:
+        from app.services.ai_service import AIService
+        moderation_pipeline.start(AIService(get_groq_client()), get_supabase_client())
+    except Exception as e:
+        logger.warning("⚠️  Moderation pipeline start failed (submissions are backlogged): %s", e)
+
     # Verify Supabase connection
     try:
         sb = get_supabase_client()
@@ -70,10 +99,20 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await moderation_pipeline.stop()
+    await alert_dispatcher.stop()
+    await leaderboards.stop()
+
+    # Flush pending XP/karma before exit
+    try:
+        await xp_ledger.stop()
+    except Exception as e:
+        logger.warning("⚠️  XP ledger flush on shutdown failed: %s", e)
+
     # Stop scheduler
     try:
         from app.core.scheduler import stop_scheduler
-        stop_scheduler()
+        await stop_scheduler()
     except Exception:
         pass
 
@@ -195,6 +234,13 @@ try:
 except ImportError:
     logger.info("⏳ Sensors router not yet available")
 
+try:
+    from app.routers import leaderboard
+    app.include_router(leaderboard.router)
+    logger.info("✅ Leaderboard router loaded")
+except ImportError:
+    logger.info("⏳ Leaderboard router not yet available")
+
 try:
     from app.routers import media
     app.include_router(media.router)
@@ -248,16 +294,79 @@ async def test_token(request: Request):
         return {"error": str(e), "token_preview": token[:50] + "..."}
 
 
+async def _handle_socket_message(websocket: WebSocket, user_id: str, message: str) -> None:
+    """Handle grow channel (un)subscriptions; anything else is a keep-alive."""
+    try:
+        payload = json.loads(message)
+    except ValueError:
+        return
+    if not isinstance(payload, dict) or not payload.get("grow_id"):
+        return
+
+    grow_id = str(payload["grow_id"])
+    action = payload.get("action")
+    if action == "unsubscribe":
+        socket_manager.unsubscribe(websocket, grow_channel(grow_id))
+        return
+    if action != "subscribe":
+        return
+
+    sb = get_supabase_client()
+    owned = await asyncio.to_thread(
+        sb.table("grows").select("id").eq("id", grow_id).eq("user_id", user_id).limit(1).execute
+    )
+    if not owned.data:
+        await websocket.send_json({"type": "error", "error": "grow not found", "grow_id": grow_id})
+        return
+
+    socket_manager.subscribe(websocket, grow_channel(grow_id))
+    latest = await reading_cache.recent(sb, grow_id, 1)
+    await websocket.send_json({
+        "type": "subscribed",
+        "grow_id": grow_id,
+        "reading": latest[-1].to_dict() if latest else None,
+    })
+
+
+async def _socket_user_id(websocket: WebSocket) -> Optional[str]:
+    """User id from the socket's Supabase JWT (?token=... or a Bearer header), or None."""
+    token = websocket.query_params.get("token")
+    auth_header = websocket.headers.get("Authorization") or ""
+    if not token and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ", 1)[1]
+    if not token:
+        return None
+    try:
+        payload = await verify_jwt(token)
+    except HTTPException:
+        return None
+    return payload.get("sub")
+
+
 @app.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
     """
     WebSocket endpoint for real-time notifications and updates.
+
+    The socket must carry the user's Supabase JWT, as a `token` query
+    parameter or a Bearer Authorization header; it is closed (1008) when
+    the token is missing, invalid or belongs to another user.
+
+    Clients may send {"action": "subscribe" | "unsubscribe", "grow_id": ...}
+    to receive a grow's live sensor readings and alerts.
     """
+    token_user_id = await _socket_user_id(websocket)
+    if token_user_id is None or token_user_id != user_id:
+        logger.warning("WebSocket rejected for user %s: missing or mismatched token", user_id)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    user_id = token_user_id
+
     await socket_manager.connect(websocket, user_id)
     try:
         while True:
-            # Keep connection alive
-            await websocket.receive_text()
+            message = await websocket.receive_text()
+            await _handle_socket_message(websocket, user_id, message)
     except WebSocketDisconnect:
         socket_manager.disconnect(websocket, user_id)
     except Exception as e:
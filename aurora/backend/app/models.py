@@ -4,8 +4,9 @@ Schemas for API requests and responses.
 """
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
+from uuid import UUID
 
 
 class SeedType(str, Enum):
@@ -201,6 +202,34 @@ class GeneratePlanResponse(BaseModel):
     grow_id: Optional[str] = Field(default=None, description="Saved grow ID in database")
 
 
+# ============================================
+# Sensor Models
+# ============================================
+
+class SensorReading(BaseModel):
+    """A single sensor sample for a grow."""
+    grow_id: str
+    temperature: Optional[float] = None
+    humidity: Optional[float] = None
+    ph: Optional[float] = None
+    ec: Optional[float] = None
+    light_intensity: Optional[float] = None
+    co2_ppm: Optional[float] = None
+    soil_moisture: Optional[float] = None
+    recorded_at: Optional[datetime] = Field(
+        default=None, description="Sample time; defaults to insert time"
+    )
+
+    @field_validator('grow_id')
+    @classmethod
+    def validate_grow_id(cls, v: str) -> str:
+        """Grow ids are UUIDs; a malformed one would fail the whole ownership query."""
+        try:
+            return str(UUID(v))
+        except ValueError:
+            raise ValueError("must be a UUID")
+
+
 # ============================================
 # Error Models
 # ============================================
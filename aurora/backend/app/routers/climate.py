@@ -4,12 +4,15 @@ Climate & Environment Endpoints — VPD, temperature, humidity guidance
 """
 
 import logging
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import APIRouter, Query, HTTPException, status
 from pydantic import BaseModel, Field
 
-from app.utils.vpd import vpd_kpa, saturation_vapor_pressure_kpa, actual_vapor_pressure_kpa
+from app.utils.vpd import vpd_components, vpd_kpa
+from app.utils.vpd_grid import RH_MAX, RH_MIN, TEMP_MAX, TEMP_MIN, get_grid
 
 logger = logging.getLogger("aurora.climate")
 
@@ -27,6 +30,7 @@ class VPDResponse(BaseModel):
     """VPD calculation response with growth stage recommendations."""
     temperature_c: float
     relative_humidity_percent: float
+    leaf_temperature_offset_c: float = 0.0
     vpd_kpa: float
     saturation_vapor_pressure_kpa: float
     actual_vapor_pressure_kpa: float
@@ -36,6 +40,30 @@ class VPDResponse(BaseModel):
     warning: Optional[str] = None
 
 
+class ClimateSetpoint(BaseModel):
+    """A temperature/humidity pair and the VPD it produces."""
+    temperature_c: float
+    relative_humidity_percent: float
+    vpd_kpa: float
+
+
+class HumidityWindow(BaseModel):
+    """Humidity range that keeps VPD in the target band at one temperature."""
+    temperature_c: float
+    rh_min: float
+    rh_max: float
+
+
+class OptimalSettingsResponse(BaseModel):
+    """Suggested climate for a target VPD band."""
+    stage: Optional[str] = None
+    vpd_min_kpa: float
+    vpd_max_kpa: float
+    setpoint: Optional[ClimateSetpoint] = None
+    humidity_windows: list[HumidityWindow] = Field(default_factory=list)
+    feasible_points: int = 0
+
+
 class VPDHistoricalData(BaseModel):
     """Historical VPD data point."""
     timestamp: str
@@ -50,9 +78,11 @@ class VPDHistoricalData(BaseModel):
 async def get_vpd(
     temp: float = Query(..., ge=-50, le=50, description="Temperature in °C"),
     humidity: float = Query(..., ge=0, le=100, description="Relative humidity in %"),
+    leaf_offset: float = Query(0.0, ge=-10, le=10, description="Leaf minus air temperature in °C"),
 ):
     """
     Calculate Vapor Pressure Deficit (VPD) for current climate conditions.
+    Pass `leaf_offset` (e.g. -2) for leaf VPD instead of air VPD.
 
     VPD is crucial for cannabis cultivation:
     - Helps optimize plant transpiration
@@ -72,10 +102,11 @@ async def get_vpd(
     - Late Flower (6-8 weeks): 0.8-1.2 kPa
     """
     try:
-        # Calculate VPD and components
-        vpd = vpd_kpa(temp, humidity)
-        es = saturation_vapor_pressure_kpa(temp)
-        ea = actual_vapor_pressure_kpa(temp, humidity)
+        # Calculate VPD and components in one pass
+        components = vpd_components(temp, humidity, leaf_offset)
+        vpd = float(components.vpd)
+        es = float(components.es)
+        ea = float(components.ea)
 
         # Determine growth stage recommendations
         growth_stage, acceptable_stages, recommendations = _get_vpd_recommendations(vpd, temp, humidity)
@@ -86,6 +117,7 @@ async def get_vpd(
         return VPDResponse(
             temperature_c=temp,
             relative_humidity_percent=humidity,
+            leaf_temperature_offset_c=leaf_offset,
             vpd_kpa=round(vpd, 3),
             saturation_vapor_pressure_kpa=round(es, 3),
             actual_vapor_pressure_kpa=round(ea, 3),
@@ -107,66 +139,152 @@ async def get_vpd(
         )
 
 
+# ── Optimal Settings Endpoint ───────────────────────────────────
+
+# Target VPD bands (kPa) by growth stage, as documented on GET /vpd
+STAGE_VPD_BANDS = {
+    "seedling": (0.5, 1.0),
+    "vegetative": (1.0, 1.3),
+    "early_flower": (1.2, 1.5),
+    "peak_flower": (1.0, 1.5),
+    "late_flower": (0.8, 1.2),
+}
+
+
+@lru_cache(maxsize=1024)
+def _optimal_settings(
+    vpd_min: float,
+    vpd_max: float,
+    temp_range: tuple[float, float],
+    rh_range: tuple[float, float],
+) -> tuple:
+    return get_grid().optimal(vpd_min, vpd_max, temp_range, rh_range)
+
+
+@router.get("/optimal-settings", response_model=OptimalSettingsResponse, status_code=status.HTTP_200_OK)
+async def get_optimal_settings(
+    stage: Optional[str] = Query(None, description=f"One of: {', '.join(STAGE_VPD_BANDS)}"),
+    vpd_min: Optional[float] = Query(None, ge=0, le=5, description="Target VPD lower bound (kPa)"),
+    vpd_max: Optional[float] = Query(None, ge=0, le=5, description="Target VPD upper bound (kPa)"),
+    temp_min: float = Query(TEMP_MIN, ge=TEMP_MIN, le=TEMP_MAX, description="Lowest acceptable °C"),
+    temp_max: float = Query(TEMP_MAX, ge=TEMP_MIN, le=TEMP_MAX, description="Highest acceptable °C"),
+    rh_min: float = Query(RH_MIN, ge=RH_MIN, le=RH_MAX, description="Lowest acceptable RH %"),
+    rh_max: float = Query(RH_MAX, ge=RH_MIN, le=RH_MAX, description="Highest acceptable RH %"),
+):
+    """
+    Suggest temperature/humidity combinations for a target VPD band.
+
+    Give either a growth `stage` or an explicit `vpd_min`/`vpd_max` band,
+    optionally limited to the temperatures and humidities the room can
+    hold. Answered from a precomputed 0.1 °C × 0.5 % RH grid: returns the
+    best single setpoint plus the humidity window at each whole degree.
+    """
+    if stage is not None:
+        band = STAGE_VPD_BANDS.get(stage.lower())
+        if band is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "error": "Unknown growth stage",
+                    "detail": f"stage must be one of: {', '.join(STAGE_VPD_BANDS)}",
+                    "code": "CLIMATE_INVALID_STAGE",
+                },
+            )
+        vpd_min = band[0] if vpd_min is None else vpd_min
+        vpd_max = band[1] if vpd_max is None else vpd_max
+
+    if vpd_min is None or vpd_max is None or vpd_min > vpd_max or temp_min > temp_max or rh_min > rh_max:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Invalid target",
+                "detail": "Pass a stage or vpd_min <= vpd_max, with min <= max for each range",
+                "code": "CLIMATE_INVALID_TARGET",
+            },
+        )
+
+    setpoint, windows, feasible = _optimal_settings(
+        round(vpd_min, 3), round(vpd_max, 3),
+        (round(temp_min, 1), round(temp_max, 1)),
+        (round(rh_min, 1), round(rh_max, 1)),
+    )
+    return OptimalSettingsResponse(
+        stage=stage,
+        vpd_min_kpa=vpd_min,
+        vpd_max_kpa=vpd_max,
+        setpoint=ClimateSetpoint(**setpoint._asdict()) if setpoint else None,
+        humidity_windows=[HumidityWindow(**w._asdict()) for w in windows],
+        feasible_points=feasible,
+    )
+
+
 # ── Helper Functions ────────────────────────────────────────────
 
+# Band edges used by the stage and recommendation ladders below; every VPD
+# in the same (stage band, advice band) pair gets the same bundle.
+_STAGE_EDGES = (0.5, 1.0, 1.3, 1.5, 1.8)
+_ADVICE_EDGES = (0.4, 0.8, 1.2, 1.5, 1.8)
+
+_STAGES = (
+    ("High Humidity Conditions", "Seedling, Early Propagation"),
+    ("Seedling / Early Vegetative", "Seedling (0-2 weeks)"),
+    ("Vegetative Growth", "Vegetative (2-8 weeks)"),
+    ("Early Flowering", "Early Flower (0-2 weeks), Peak Flower (weeks 2-6)"),
+    ("Peak Flowering", "Peak Flower (2-6 weeks)"),
+    ("Late Flowering / Stress", "Late Flower (6-8 weeks)"),
+)
+
+_ADVICE = (
+    (
+        "VPD is very low - increase air circulation or lower humidity",
+        "Consider adding a small fan or reducing watering frequency",
+        "Watch for fungal issues due to high humidity",
+    ),
+    (
+        "VPD is good for seedlings and early propagation",
+        "Maintain current conditions or adjust gradually if transitioning",
+    ),
+    (
+        "VPD is ideal for vegetative growth",
+        "Plants should show strong transpiration",
+        "Maintain consistent light and ventilation",
+    ),
+    (
+        "VPD is optimal for flowering",
+        "Focus on maintaining stable temperature and humidity",
+        "Ensure adequate CO2 levels for photosynthesis",
+    ),
+    (
+        "VPD is high but acceptable for peak flowering",
+        "Monitor plants for stress (wilting, discoloration)",
+        "Ensure sufficient water availability",
+    ),
+    (
+        "⚠️  VPD is very high - plants may be stressed",
+        "Increase humidity by reducing temperature or adding moisture",
+        "Improve air circulation to prevent localized dry pockets",
+        "Monitor for calcium and magnesium deficiencies",
+    ),
+)
+
+
+@lru_cache(maxsize=None)
+def _vpd_band_bundle(stage_band: int, advice_band: int) -> tuple[str, str, tuple[str, ...]]:
+    """Stage, acceptable stages and VPD advice for one band pair (built once)."""
+    optimal_stage, acceptable = _STAGES[stage_band]
+    return optimal_stage, acceptable, _ADVICE[advice_band]
+
+
 def _get_vpd_recommendations(vpd: float, temp: float, humidity: float) -> tuple[Optional[str], Optional[str], list[str]]:
     """
     Get growth stage recommendations based on VPD.
 
     Returns: (optimal_stage, acceptable_stages, recommendations)
     """
-    recommendations = []
-
-    # Optimal stage determination
-    if vpd < 0.5:
-        optimal_stage = "High Humidity Conditions"
-        acceptable = "Seedling, Early Propagation"
-    elif vpd < 1.0:
-        optimal_stage = "Seedling / Early Vegetative"
-        acceptable = "Seedling (0-2 weeks)"
-    elif vpd < 1.3:
-        optimal_stage = "Vegetative Growth"
-        acceptable = "Vegetative (2-8 weeks)"
-    elif vpd < 1.5:
-        optimal_stage = "Early Flowering"
-        acceptable = "Early Flower (0-2 weeks), Peak Flower (weeks 2-6)"
-    elif vpd < 1.8:
-        optimal_stage = "Peak Flowering"
-        acceptable = "Peak Flower (2-6 weeks)"
-    else:
-        optimal_stage = "Late Flowering / Stress"
-        acceptable = "Late Flower (6-8 weeks)"
-
-    # Generate recommendations
-    if vpd < 0.4:
-        recommendations.append("VPD is very low - increase air circulation or lower humidity")
-        recommendations.append("Consider adding a small fan or reducing watering frequency")
-        recommendations.append("Watch for fungal issues due to high humidity")
-
-    elif vpd < 0.8:
-        recommendations.append("VPD is good for seedlings and early propagation")
-        recommendations.append("Maintain current conditions or adjust gradually if transitioning")
-
-    elif vpd < 1.2:
-        recommendations.append("VPD is ideal for vegetative growth")
-        recommendations.append("Plants should show strong transpiration")
-        recommendations.append("Maintain consistent light and ventilation")
-
-    elif vpd < 1.5:
-        recommendations.append("VPD is optimal for flowering")
-        recommendations.append("Focus on maintaining stable temperature and humidity")
-        recommendations.append("Ensure adequate CO2 levels for photosynthesis")
-
-    elif vpd < 1.8:
-        recommendations.append("VPD is high but acceptable for peak flowering")
-        recommendations.append("Monitor plants for stress (wilting, discoloration)")
-        recommendations.append("Ensure sufficient water availability")
-
-    else:
-        recommendations.append("⚠️  VPD is very high - plants may be stressed")
-        recommendations.append("Increase humidity by reducing temperature or adding moisture")
-        recommendations.append("Improve air circulation to prevent localized dry pockets")
-        recommendations.append("Monitor for calcium and magnesium deficiencies")
+    optimal_stage, acceptable, advice = _vpd_band_bundle(
+        bisect_right(_STAGE_EDGES, vpd), bisect_right(_ADVICE_EDGES, vpd)
+    )
+    recommendations = list(advice)
 
     # Temperature recommendations
     if temp < 15:
@@ -205,7 +323,6 @@ def _check_vpd_warnings(vpd: float, temp: float, humidity: float) -> Optional[st
 # GET /climate/recommendation - Get climate recommendations for specific phase
 # GET /climate/history - Historical VPD data for grow cycle
 # POST /climate/alert - Set alerts for VPD thresholds
-# GET /climate/optimal-settings - Suggest optimal temp/humidity combinations
 
 
 if __name__ == "__main__":
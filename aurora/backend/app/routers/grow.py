@@ -17,6 +17,7 @@ from app.dependencies import get_supabase, get_groq, get_current_user_id
 from app.models import (
     GrowPlanRequest, GeneratePlanResponse, ErrorResponse, RateLimitError
 )
+from app.services.leaderboard_service import leaderboards
 from app.services.rag_service import RAGService
 from app.services.ai_service import AIService, AIServiceError
 
@@ -191,6 +192,7 @@ async def _save_grow_to_database(
 
         if result.data:
             grow_id = result.data[0]["id"]
+            leaderboards.join_strain(user_id, request.strain_name)
             logger.info("Saved grow to database: %s", grow_id)
             return grow_id
 
@@ -31,3 +31,58 @@ async def database_health(supabase: Client = Depends(get_supabase)):
             "database": "disconnected",
             "error": str(e),
         }
+
+
+@router.get("/health/moderation")
+async def moderation_health():
+    """Moderation pipeline throughput and outcome counters."""
+    from app.services.moderation_service import moderation_pipeline
+    metrics = moderation_pipeline.metrics()
+    return {
+        "status": "healthy" if metrics["running"] else "stopped",
+        "moderation": metrics,
+    }
+
+
+@router.get("/health/alerts")
+async def alerts_health():
+    """Alert dispatcher volume: received, suppressed, inserted and pushed."""
+    from app.services.alert_dispatcher import alert_dispatcher
+    metrics = alert_dispatcher.metrics()
+    return {
+        "status": "healthy" if metrics["running"] else "stopped",
+        "alerts": metrics,
+    }
+
+
+@router.get("/health/xp-ledger")
+async def xp_ledger_health():
+    """XP ledger throughput: awards queued, batches applied, level-ups."""
+    from app.services.xp_ledger import xp_ledger
+    metrics = xp_ledger.metrics()
+    return {
+        "status": "healthy" if metrics["running"] else "stopped",
+        "xp_ledger": metrics,
+    }
+
+
+@router.get("/health/jobs")
+async def jobs_health():
+    """Scheduled jobs: running ones with progress, recent outcomes, overlaps."""
+    from app.core.job_runner import job_runner
+    status = job_runner.status()
+    return {
+        "status": "healthy" if status["running"] else "stopped",
+        "jobs": status,
+    }
+
+
+@router.get("/health/scheduler")
+async def scheduler_health():
+    """Scheduler leadership: which worker holds the lease and its last job runs."""
+    from app.core.scheduler import scheduler_status
+    status = scheduler_status()
+    return {
+        "status": "healthy" if status.get("leader") else "no_leader",
+        "scheduler": status,
+    }
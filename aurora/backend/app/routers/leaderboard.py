@@ -0,0 +1,94 @@
+"""
+📁 backend/app/routers/leaderboard.py
+Leaderboards — global XP/karma, weekly XP and per-strain communities.
+All rankings are served from the in-memory leaderboard service.
+"""
+
+import asyncio
+import logging
+from typing import Literal, Optional
+
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.dependencies import get_supabase_client, get_current_user_id
+from app.services.leaderboard_service import RankIndex, leaderboards
+
+logger = logging.getLogger("aurora.leaderboard")
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+
+Board = Literal["xp", "karma", "weekly", "strain"]
+
+# user_id → { display_name, avatar_url, level }
+_profile_cards: TTLCache = TTLCache(maxsize=20_000, ttl=300)
+
+
+async def _with_profiles(entries: list[dict]) -> list[dict]:
+    """Attach display name / avatar / level, fetching only uncached users."""
+    missing = [e["user_id"] for e in entries if e["user_id"] not in _profile_cards]
+    if missing:
+        sb = get_supabase_client()
+        try:
+            result = await asyncio.to_thread(
+                sb.table("profiles")
+                .select("id, display_name, avatar_url, level")
+                .in_("id", missing)
+                .execute
+            )
+            for p in (result.data or []):
+                _profile_cards[p["id"]] = {
+                    "display_name": p.get("display_name"),
+                    "avatar_url": p.get("avatar_url"),
+                    "level": p.get("level") or 1,
+                }
+        except Exception as e:
+            logger.warning("Leaderboard profile lookup failed: %s", e)
+    return [{**e, **_profile_cards.get(e["user_id"], {})} for e in entries]
+
+
+def _board(board: str, strain: Optional[str]) -> RankIndex:
+    if board == "strain" and not strain:
+        raise HTTPException(400, detail={"error": "strain is required for the strain board"})
+    index = leaderboards.board(board, strain)
+    if index is None:
+        # A strain nobody grows yet is an empty board, not an error
+        return RankIndex()
+    return index
+
+
+@router.get("/{board}")
+async def get_leaderboard(
+    board: Board,
+    strain: Optional[str] = Query(None, max_length=100),
+    limit: int = Query(25, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Top of a board. `strain` selects the community for board=strain."""
+    index = _board(board, strain)
+    return {
+        "board": board,
+        "strain": strain if board == "strain" else None,
+        "total": len(index),
+        "entries": await _with_profiles(index.top(limit, offset)),
+    }
+
+
+@router.get("/{board}/me")
+async def get_my_rank(
+    board: Board,
+    strain: Optional[str] = Query(None, max_length=100),
+    radius: int = Query(5, ge=0, le=25),
+    user_id: str = Depends(get_current_user_id),
+):
+    """The caller's rank with `radius` neighbours above and below."""
+    index = _board(board, strain)
+    return {
+        "board": board,
+        "strain": strain if board == "strain" else None,
+        "total": len(index),
+        "rank": index.rank(user_id),
+        "score": index.score(user_id),
+        "neighbors": await _with_profiles(index.around(user_id, radius)),
+    }
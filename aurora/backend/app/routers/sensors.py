@@ -8,28 +8,29 @@ import logging
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
+from app.core.reading_cache import reading_cache
 from app.dependencies import get_supabase_client, get_current_user_id
+from app.models import SensorReading
+from app.services import rollup_service, sensor_ingest_service
+from app.services.achievement_engine import achievement_engine
 from app.services.alert_service import AlertService
+from app.services.sensor_fanout import sensor_fanout
+from app.utils.downsample import (
+    METRICS,
+    RESOLUTIONS,
+    auto_resolution,
+    bucket_aggregate,
+    lttb_rows,
+)
 
 logger = logging.getLogger("aurora.sensors")
 
 router = APIRouter(prefix="/sensors", tags=["Sensors"])
 
-
-# ── Pydantic Models ─────────────────────────────────────────────
-
-class SensorReading(BaseModel):
-    grow_id: str
-    temperature: Optional[float] = None
-    humidity: Optional[float] = None
-    ph: Optional[float] = None
-    ec: Optional[float] = None
-    light_intensity: Optional[float] = None
-    co2_ppm: Optional[float] = None
-    soil_moisture: Optional[float] = None
+# PostgREST caps a response at 1000 rows; history reads page past it
+PAGE_SIZE = 1000
 
 
 # ── Submit Reading ──────────────────────────────────────────────
@@ -43,8 +44,14 @@ async def submit_reading(
     sb = get_supabase_client()
 
     try:
-        reading_data = body.model_dump(exclude_none=True)
+        # Only store readings for grows the caller owns
+        if not await sensor_ingest_service.owned_grow_ids(sb, user_id, {body.grow_id}):
+            raise HTTPException(404, detail={"error": "Grow not found"})
+
+        reading_data = body.model_dump(exclude_none=True, exclude={"recorded_at"})
         reading_data["user_id"] = user_id
+        if body.recorded_at is not None:
+            reading_data["created_at"] = body.recorded_at.isoformat()
 
         # Calculate VPD if temperature and humidity are present
         if body.temperature is not None and body.humidity is not None:
@@ -55,6 +62,9 @@ async def submit_reading(
         result = await asyncio.to_thread(
             sb.table("sensor_readings").insert(reading_data).execute
         )
+        await rollup_service.record(sb, result.data or [reading_data])
+        sensor_fanout.publish_readings(result.data or [reading_data])
+        achievement_engine.emit(sb, user_id, "sensor_readings")
 
         # Check for alerts in background
         alerts = await AlertService.check_sensor_reading(
@@ -68,70 +78,179 @@ async def submit_reading(
             "alerts": alerts,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Submit reading error: %s", e)
         raise HTTPException(500, detail={"error": str(e)})
 
 
-# ── Get Latest Readings ────────────────────────────────────────
+# ── Submit Batch ────────────────────────────────────────────────
 
-@router.get("/latest/{grow_id}")
-async def get_latest_readings(
-    grow_id: str,
+@router.post("/readings/batch")
+async def submit_readings_batch(
+    request: Request,
     user_id: str = Depends(get_current_user_id),
 ):
-    """Get the most recent sensor readings for a grow."""
-    sb = get_supabase_client()
-
+    """
+    Submit many readings (any grows, any timestamps) in one request.
+
+    Body: a JSON array of readings, {"readings": [...]}, or NDJSON
+    (Content-Type: application/x-ndjson). Each reading may carry
+    `recorded_at`. Returns one result per item; invalid items are
+    rejected individually without failing the batch.
+    """
     try:
-        result = await asyncio.to_thread(
-            sb.table("sensor_readings")
-            .select("*")
-            .eq("grow_id", grow_id)
-            .order("created_at", desc=True)
-            .limit(1)
-            .execute
+        items = sensor_ingest_service.parse_batch(
+            await request.body(), request.headers.get("content-type", "")
+        )
+    except (sensor_ingest_service.BatchFormatError, UnicodeDecodeError) as e:
+        raise HTTPException(400, detail={"error": str(e)})
+
+    if not items:
+        raise HTTPException(400, detail={"error": "Batch is empty"})
+    if len(items) > sensor_ingest_service.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail={"error": f"Batch exceeds {sensor_ingest_service.MAX_BATCH_SIZE} readings"},
         )
 
-        if not result.data:
-            return {"reading": None}
+    sb = get_supabase_client()
 
-        return {"reading": result.data[0]}
+    try:
+        return await sensor_ingest_service.ingest_batch(sb, user_id, items)
 
     except Exception as e:
-        logger.error("Get latest readings error: %s", e)
+        logger.error("Submit batch error: %s", e)
         raise HTTPException(500, detail={"error": str(e)})
 
 
+# ── Get Latest Readings ────────────────────────────────────────
+
+@router.get("/latest/{grow_id}")
+async def get_latest_readings(
+    grow_id: str,
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Get the most recent sensor reading for a grow. Served from the
+    in-memory reading cache; a miss warms it from the database.
+    """
+    sb = get_supabase_client()
+    latest = await reading_cache.recent(sb, grow_id, 1)
+    if not latest or latest[-1].user_id != user_id:
+        return {"reading": None}
+    return {"reading": latest[-1].to_dict()}
+
+
 # ── Get History ─────────────────────────────────────────────────
 
 @router.get("/history/{grow_id}")
 async def get_sensor_history(
     grow_id: str,
     hours: int = Query(24, ge=1, le=168),
+    resolution: str = Query(
+        "raw",
+        pattern="^(raw|auto|1m|5m|15m|1h|6h|1d)$",
+        description="raw rows, a bucket width, or auto (fits max_points)",
+    ),
+    method: str = Query("buckets", pattern="^(buckets|lttb)$"),
+    max_points: int = Query(500, ge=10, le=5000),
+    metrics: Optional[str] = Query(
+        None, description="comma-separated metrics to aggregate (default: all)",
+    ),
     user_id: str = Depends(get_current_user_id),
 ):
-    """Get sensor reading history for a grow over the specified hours."""
+    """
+    Get sensor reading history for a grow over the specified hours.
+
+    - resolution=raw: every reading (default, unchanged behaviour)
+    - method=buckets: fixed time buckets with min/max/mean/last per metric
+    - method=lttb: raw readings decimated to at most max_points rows
+    - metrics: limit the aggregated series (and the rows read) to these
+
+    Bucketed history is served from the 1m/1h/1d rollups when they cover
+    the requested width, and from raw readings otherwise.
+    """
+    selected = METRICS
+    if metrics:
+        selected = tuple(m.strip() for m in metrics.split(",") if m.strip())
+        unknown = sorted(set(selected) - set(METRICS))
+        if unknown or not selected:
+            raise HTTPException(422, detail={"error": f"Unknown metrics: {', '.join(unknown)}"})
+
     sb = get_supabase_client()
 
     try:
+        if resolution == "auto":
+            resolution = auto_resolution(hours * 3600, max_points)
+
+        if resolution != "raw" and method == "buckets":
+            buckets = await rollup_service.history_buckets(
+                sb, grow_id, RESOLUTIONS[resolution], hours, selected
+            )
+            if buckets is not None:
+                return {
+                    "buckets": buckets,
+                    "hours": hours,
+                    "method": "buckets",
+                    "resolution": resolution,
+                    "source": "rollups",
+                }
+
         from datetime import timedelta
         since = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
 
+        columns = "*" if resolution == "raw" else ", ".join(("created_at", *selected))
+        rows = await _history_rows(sb, grow_id, since, columns)
+
+        if resolution == "raw":
+            return {"readings": rows, "hours": hours}
+
+        if method == "lttb":
+            readings = lttb_rows(rows, max_points, selected)
+            return {
+                "readings": readings,
+                "hours": hours,
+                "method": "lttb",
+                "source_points": len(rows),
+            }
+
+        buckets = bucket_aggregate(rows, RESOLUTIONS[resolution], selected)
+        return {
+            "buckets": buckets,
+            "hours": hours,
+            "method": "buckets",
+            "resolution": resolution,
+            "source": "raw",
+            "source_points": len(rows),
+        }
+
+    except Exception as e:
+        logger.error("Get sensor history error: %s", e)
+        raise HTTPException(500, detail={"error": str(e)})
+
+
+async def _history_rows(sb, grow_id: str, since: str, columns: str) -> list[dict]:
+    """Read a grow's readings since `since`, oldest first, paging past the row cap."""
+    rows: list[dict] = []
+    start = 0
+    while True:
         result = await asyncio.to_thread(
             sb.table("sensor_readings")
-            .select("*")
+            .select(columns)
             .eq("grow_id", grow_id)
             .gte("created_at", since)
             .order("created_at", desc=False)
+            .order("id", desc=False)
+            .range(start, start + PAGE_SIZE - 1)
             .execute
         )
-
-        return {"readings": result.data, "hours": hours}
-
-    except Exception as e:
-        logger.error("Get sensor history error: %s", e)
-        raise HTTPException(500, detail={"error": str(e)})
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
 
 
 # ── Get Alerts ──────────────────────────────────────────────────
@@ -13,8 +13,11 @@ from pydantic import BaseModel, Field
 
 from cachetools import TTLCache
 
-from app.dependencies import get_supabase_client, get_current_user_id, get_groq_client
-from app.services.ai_service import AIService
+from app.dependencies import get_supabase_client, get_current_user_id
+from app.services import community_stats_service, like_service
+from app.services.comment_cache import comment_cache
+from app.services.moderation_service import ModerationItem, moderation_pipeline
+from app.services.toxicity_classifier import toxicity_classifier
 
 logger = logging.getLogger("aurora.social")
 
@@ -198,9 +201,10 @@ async def create_post(
         )
 
     try:
-        # Toxicity check
-        ai_service = AIService(get_groq_client())
-        is_toxic = await ai_service.check_toxicity(body.content)
+        # Local pre-classifier: clear benign text, hold likely-toxic text,
+        # escalate the rest to the moderation pipeline
+        verdict = toxicity_classifier.classify(body.content)
+        held = verdict.label == "toxic"
 
         result = await asyncio.to_thread(
             sb.table("posts").insert({
@@ -212,24 +216,31 @@ async def create_post(
                 "day_number": body.day_number,
                 "likes_count": 0,
                 "comments_count": 0,
-                "is_toxic": is_toxic,
-                "is_hidden": is_toxic,  # Hide immediately if toxic
+                "is_toxic": held and verdict.final,
+                "is_hidden": held,
             }).execute
         )
+        post = result.data[0]
 
-        if is_toxic:
-            logger.warning("Post from %s flagged as toxic", user_id)
+        if not verdict.final:
+            moderation_pipeline.submit(ModerationItem(
+                kind="post", id=post["id"], user_id=user_id,
+                text=body.content, held=held,
+            ))
 
-        # Gamification: award XP for creating a post (only if not toxic)
-        if not is_toxic:
+        if held:
+            logger.warning("Post from %s held by moderation pre-classifier", user_id)
+
+        # Gamification: award XP for creating a post (only if not held)
+        if not held:
             try:
-                from app.services.gamification_service import award_xp, check_achievements
-                await award_xp(sb, user_id, 10, "create_post")
-                await check_achievements(sb, user_id)
+                from app.services.gamification_service import check_achievements, queue_xp
+                queue_xp(user_id, 10, "create_post")
+                await check_achievements(sb, user_id, "posts_created")
             except Exception:
                 pass  # Non-critical
 
-        return result.data[0]
+        return post
 
     except Exception as e:
         logger.error("Create post error: %s", e)
@@ -238,6 +249,41 @@ async def create_post(
 
 # ── Get Post Detail ─────────────────────────────────────────────
 
+async def _fetch_post(sb, post_id: str, user_id: str) -> dict:
+    """Post with author fields; raises 404 if missing or hidden from this user."""
+    result = await asyncio.to_thread(
+        sb.table("posts")
+        .select("*, profiles!posts_user_id_fkey(display_name, avatar_url)")
+        .eq("id", post_id)
+        .limit(1)
+        .execute
+    )
+    if not result.data:
+        raise HTTPException(404, detail="Post not found")
+
+    post = result.data[0]
+    if post.get("is_hidden") and post.get("user_id") != user_id:
+        raise HTTPException(404, detail="Post not found")
+
+    profile = post.pop("profiles", {}) or {}
+    return {
+        **post,
+        "author_username": profile.get("display_name"),
+        "author_avatar": profile.get("avatar_url"),
+    }
+
+
+async def _fetch_is_liked(sb, post_id: str, user_id: str) -> bool:
+    result = await asyncio.to_thread(
+        sb.table("post_likes")
+        .select("id")
+        .eq("post_id", post_id)
+        .eq("user_id", user_id)
+        .execute
+    )
+    return len(result.data) > 0
+
+
 @router.get("/posts/{post_id}")
 async def get_post(
     post_id: str,
@@ -247,40 +293,48 @@ async def get_post(
     sb = get_supabase_client()
 
     try:
-        result = await asyncio.to_thread(
-            sb.table("posts")
-            .select("*, profiles!posts_user_id_fkey(display_name, avatar_url)")
-            .eq("id", post_id)
-            .single()
-            .execute
+        post, is_liked = await asyncio.gather(
+            _fetch_post(sb, post_id, user_id),
+            _fetch_is_liked(sb, post_id, user_id),
         )
+        return {**post, "is_liked": is_liked}
 
-        post = result.data
-        if post.get("is_hidden") and post.get("user_id") != user_id:
-             raise HTTPException(404, detail="Post not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Get post error: %s", e)
+        raise HTTPException(404, detail={"error": "Post not found"})
 
-        profile = post.pop("profiles", {}) or {}
 
-        # Check if user liked it
-        like_result = await asyncio.to_thread(
-            sb.table("post_likes")
-            .select("id")
-            .eq("post_id", post_id)
-            .eq("user_id", user_id)
-            .execute
-        )
+@router.get("/posts/{post_id}/detail")
+async def get_post_detail(
+    post_id: str,
+    limit: int = Query(20, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Post, like state and the first comment page in one call.
+    The three reads run concurrently; the comment page is served
+    from the per-post comment cache when warm.
+    """
+    sb = get_supabase_client()
 
+    try:
+        post, is_liked, comments = await asyncio.gather(
+            _fetch_post(sb, post_id, user_id),
+            _fetch_is_liked(sb, post_id, user_id),
+            comment_cache.get_page(sb, post_id, 1, limit),
+        )
         return {
-            **post,
-            "author_username": profile.get("display_name"),
-            "author_avatar": profile.get("avatar_url"),
-            "is_liked": len(like_result.data) > 0,
+            "post": {**post, "is_liked": is_liked},
+            "comments": comments,
+            "page": 1,
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error("Get post error: %s", e)
+        logger.error("Get post detail error: %s", e)
         raise HTTPException(404, detail={"error": "Post not found"})
 
 
@@ -291,57 +345,14 @@ async def toggle_like(
     post_id: str,
     user_id: str = Depends(get_current_user_id),
 ):
-    """Toggle like on a post."""
+    """Toggle like on a post (single atomic RPC; karma is batched)."""
     sb = get_supabase_client()
 
     try:
-        # Check existing like
-        existing = await asyncio.to_thread(
-            sb.table("post_likes")
-            .select("id")
-            .eq("post_id", post_id)
-            .eq("user_id", user_id)
-            .execute
-        )
-
-        if existing.data:
-            # Unlike
-            await asyncio.to_thread(
-                sb.table("post_likes")
-                .delete()
-                .eq("post_id", post_id)
-                .eq("user_id", user_id)
-                .execute
-            )
-            await asyncio.to_thread(
-                sb.rpc("decrement_likes", {"post_id_param": post_id}).execute
-            )
-            return {"liked": False}
-        else:
-            # Like
-            await asyncio.to_thread(
-                sb.table("post_likes")
-                .insert({"post_id": post_id, "user_id": user_id})
-                .execute
-            )
-            await asyncio.to_thread(
-                sb.rpc("increment_likes", {"post_id_param": post_id}).execute
-            )
-
-            # Gamification: award karma to post author
-            try:
-                from app.services.gamification_service import award_karma
-                post_data = await asyncio.to_thread(
-                    sb.table("posts").select("user_id").eq("id", post_id).single().execute
-                )
-                post_author = post_data.data.get("user_id")
-                if post_author and post_author != user_id:
-                    await award_karma(sb, post_author, 2, "receive_like")
-            except Exception:
-                pass  # Non-critical
-
-            return {"liked": True}
+        return await like_service.toggle_like(sb, post_id, user_id)
 
+    except like_service.PostNotFoundError:
+        raise HTTPException(404, detail={"error": "Post not found"})
     except Exception as e:
         logger.error("Like error: %s", e)
         raise HTTPException(500, detail={"error": str(e)})
@@ -356,32 +367,11 @@ async def get_comments(
     limit: int = Query(20, ge=1, le=50),
     user_id: str = Depends(get_current_user_id),
 ):
-    """Get comments for a post."""
+    """Get comments for a post (served from the per-post comment cache)."""
     sb = get_supabase_client()
-    offset = (page - 1) * limit
 
     try:
-        result = await asyncio.to_thread(
-            sb.table("post_comments")
-            .select("*, profiles!post_comments_user_id_fkey(display_name, avatar_url)")
-            .eq("post_id", post_id)
-            .eq("is_hidden", False)
-            .order("created_at", desc=False)
-            .range(offset, offset + limit - 1)
-            .execute
-        )
-
-        comments = []
-        for c in result.data:
-            profile = c.pop("profiles", {}) or {}
-            comments.append({
-                **c,
-                "author_username": profile.get("display_name"),
-                "author_avatar": profile.get("avatar_url"),
-                "is_hidden": c.get("is_hidden", False),
-                "is_flagged": c.get("is_flagged", False),
-            })
-
+        comments = await comment_cache.get_page(sb, post_id, page, limit)
         return {"comments": comments, "page": page}
 
     except Exception as e:
@@ -402,38 +392,47 @@ async def create_comment(
         raise HTTPException(status.HTTP_429_TOO_MANY_REQUESTS, detail="Rate limit exceeded")
 
     try:
-        # Toxicity check
-        ai_service = AIService(get_groq_client())
-        is_toxic = await ai_service.check_toxicity(body.content)
+        # Local pre-classifier: clear benign text, hold likely-toxic text,
+        # escalate the rest to the moderation pipeline
+        verdict = toxicity_classifier.classify(body.content)
+        held = verdict.label == "toxic"
 
         result = await asyncio.to_thread(
             sb.table("post_comments").insert({
                 "post_id": post_id,
                 "user_id": user_id,
                 "content": body.content,
-                "is_toxic": is_toxic,
-                "is_hidden": is_toxic,
+                "is_toxic": held and verdict.final,
+                "is_hidden": held,
             }).execute
         )
+        comment = result.data[0]
 
-        if is_toxic:
-            logger.warning("Comment from %s flagged as toxic", user_id)
+        if not verdict.final:
+            moderation_pipeline.submit(ModerationItem(
+                kind="comment", id=comment["id"], user_id=user_id,
+                text=body.content, held=held, post_id=post_id,
+            ))
 
-        # Increment comments count (only if not toxic or hidden)
-        if not is_toxic:
+        if held:
+            logger.warning("Comment from %s held by moderation pre-classifier", user_id)
+
+        # Increment comments count (held comments are counted on release)
+        if not held:
+            comment_cache.invalidate(post_id)
             await asyncio.to_thread(
                 sb.rpc("increment_comments", {"post_id_param": post_id}).execute
             )
 
-        # Gamification: award XP for commenting (only if not toxic)
-        if not is_toxic:
+        # Gamification: award XP for commenting (only if not held)
+        if not held:
             try:
-                from app.services.gamification_service import award_xp
-                await award_xp(sb, user_id, 5, "create_comment")
+                from app.services.gamification_service import queue_xp
+                queue_xp(user_id, 5, "create_comment")
             except Exception:
                 pass  # Non-critical
 
-        return result.data[0]
+        return comment
 
     except Exception as e:
         logger.error("Create comment error: %s", e)
@@ -476,71 +475,37 @@ async def competitive_analysis(
     """
     Get competitive analysis — compare user's stats against
     community averages and show percentile ranking.
+
+    Answers from precomputed counters (`user_stats`) and the cached
+    community row (`community_stats`), fetched concurrently.
     """
     sb = get_supabase_client()
 
     try:
-        # User's stats
-        user_posts = await asyncio.to_thread(
-            sb.table("posts").select("id", count="exact")
-            .eq("user_id", user_id).execute
-        )
-        user_grows = await asyncio.to_thread(
-            sb.table("grows").select("id, yield_grams", count="exact")
-            .eq("user_id", user_id).eq("status", "completed").execute
-        )
-        user_tasks = await asyncio.to_thread(
-            sb.table("daily_tasks").select("id, is_completed", count="exact")
-            .eq("user_id", user_id).execute
-        )
-        user_profile = await asyncio.to_thread(
-            sb.table("profiles").select("total_xp, karma, level")
-            .eq("id", user_id).single().execute
-        )
-
-        # Community totals
-        total_users = await asyncio.to_thread(
-            sb.table("profiles").select("id", count="exact").execute
-        )
-        community_posts = await asyncio.to_thread(
-            sb.table("posts").select("id", count="exact").execute
-        )
-        community_grows = await asyncio.to_thread(
-            sb.table("grows").select("id", count="exact")
-            .eq("status", "completed").execute
+        user, community = await asyncio.gather(
+            community_stats_service.get_user_stats(sb, user_id),
+            community_stats_service.get_community_stats(sb),
         )
 
-        num_users = max(total_users.count or 1, 1)
+        num_users = max(community.total_users, 1)
 
         # Calculate user metrics
-        user_yield_data = user_grows.data or []
-        user_avg_yield = (
-            sum(g.get("yield_grams", 0) or 0 for g in user_yield_data)
-            / max(len(user_yield_data), 1)
-        )
-        user_completed_tasks = sum(
-            1 for t in (user_tasks.data or []) if t.get("is_completed")
-        )
-        user_total_tasks = user_tasks.count or 0
-        user_task_rate = (
-            user_completed_tasks / max(user_total_tasks, 1) * 100
-        )
+        user_avg_yield = user["yield_grams_total"] / max(user["completed_grows"], 1)
+        user_task_rate = user["tasks_completed"] / max(user["tasks_total"], 1) * 100
 
         # Community averages
-        avg_posts = (community_posts.count or 0) / num_users
-        avg_grows = (community_grows.count or 0) / num_users
-
-        profile = user_profile.data or {}
+        avg_posts = community.total_posts / num_users
+        avg_grows = community.completed_grows / num_users
 
         return {
             "user_stats": {
-                "posts_count": user_posts.count or 0,
-                "completed_grows": user_grows.count or 0,
+                "posts_count": user["posts_count"],
+                "completed_grows": user["completed_grows"],
                 "avg_yield_grams": round(user_avg_yield, 1),
                 "task_completion_rate": round(user_task_rate, 1),
-                "total_xp": profile.get("total_xp", 0),
-                "karma": profile.get("karma", 0),
-                "level": profile.get("level", 1),
+                "total_xp": user["total_xp"],
+                "karma": user["karma"],
+                "level": user["level"],
             },
             "community_averages": {
                 "avg_posts_per_user": round(avg_posts, 1),
@@ -549,14 +514,19 @@ async def competitive_analysis(
             },
             "comparison": {
                 "posts_vs_avg": round(
-                    ((user_posts.count or 0) / max(avg_posts, 0.1) - 1) * 100,
+                    (user["posts_count"] / max(avg_posts, 0.1) - 1) * 100,
                     1,
                 ),
                 "grows_vs_avg": round(
-                    ((user_grows.count or 0) / max(avg_grows, 0.1) - 1) * 100,
+                    (user["completed_grows"] / max(avg_grows, 0.1) - 1) * 100,
                     1,
                 ),
             },
+            "percentiles": {
+                "xp": community.xp_histogram.percentile(user["total_xp"]),
+                "posts": community.posts_histogram.percentile(user["posts_count"]),
+            },
+            "stats_refreshed_at": community.refreshed_at,
         }
 
     except Exception as e:
@@ -75,7 +75,11 @@ async def toggle_task(
     body: ToggleTaskRequest,
     user_id: str = Depends(get_current_user_id),
 ):
-    """Toggle a task's completion status."""
+    """
+    Toggle a task's completion status. The update only matches a task in
+    the opposite state, so repeating a toggle changes nothing and never
+    counts the completion twice.
+    """
     sb = get_supabase_client()
 
     try:
@@ -87,20 +91,34 @@ async def toggle_task(
             })
             .eq("id", task_id)
             .eq("user_id", user_id)
+            .eq("is_completed", not body.is_completed)
             .execute
         )
 
         if not result.data:
-            raise HTTPException(404, detail={"error": "Task not found"})
+            # Already in the requested state, or not the user's task
+            current = await asyncio.to_thread(
+                sb.table("daily_tasks")
+                .select("*")
+                .eq("id", task_id)
+                .eq("user_id", user_id)
+                .limit(1)
+                .execute
+            )
+            if not current.data:
+                raise HTTPException(404, detail={"error": "Task not found"})
+            return current.data[0]
 
         # Gamification: award XP when task is completed
-        if body.is_completed:
-            try:
-                from app.services.gamification_service import award_xp, check_achievements
-                await award_xp(sb, user_id, 15, "complete_task")
-                await check_achievements(sb, user_id)
-            except Exception:
-                pass  # Non-critical
+        try:
+            from app.services.gamification_service import check_achievements, queue_xp
+            if body.is_completed:
+                queue_xp(user_id, 15, "complete_task")
+            await check_achievements(
+                sb, user_id, "tasks_completed", 1 if body.is_completed else -1,
+            )
+        except Exception:
+            pass  # Non-critical
 
         return result.data[0]
 
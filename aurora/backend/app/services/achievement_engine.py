@@ -0,0 +1,289 @@
+"""
+📁 backend/app/services/achievement_engine.py
+Event-driven achievement unlocking.
+
+The achievement catalog is cached in memory and indexed by metric: for
+each (metric, operator) pair the conditions are sorted by threshold, so
+"what does posts_created = 25 satisfy?" is a bisect, not a scan.
+
+Each user's metric counters and unlocked set are loaded once (profile +
+`user_stats` counters + `user_achievements`) and then moved by events.
+An event evaluates only the achievements that depend on the metrics it
+changed — no count queries. Users expire from memory after `user_ttl`,
+so changes made elsewhere (likes, other workers) are picked up on reload.
+
+Events are reported after the write they describe, so a freshly loaded
+user already includes it.
+"""
+
+import asyncio
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from cachetools import TTLCache
+from supabase import Client
+
+logger = logging.getLogger("aurora.achievements")
+
+METRICS = (
+    "total_xp", "karma", "level",
+    "posts_created", "tasks_completed", "sensor_readings", "grows_completed",
+)
+
+# get_user_stats() key behind each metric
+_STAT_KEYS = {
+    "total_xp": "total_xp",
+    "karma": "karma",
+    "level": "level",
+    "posts_created": "posts_count",
+    "tasks_completed": "tasks_completed",
+    "sensor_readings": "sensor_readings",
+    "grows_completed": "completed_grows",
+}
+
+OPERATORS = (">=", ">", "==", "<=")
+
+_CATALOG_KEY = "catalog"
+
+
+# ── Catalog Index ───────────────────────────────────────────────
+
+class AchievementIndex:
+    """Achievement catalog indexed by (metric, operator), sorted by threshold."""
+
+    def __init__(self, achievements: list[dict]):
+        self.by_id = {a["id"]: a for a in achievements}
+        grouped: dict[tuple[str, str], list[tuple[float, str]]] = defaultdict(list)
+        for a in achievements:
+            condition = a.get("condition") or {}
+            metric = condition.get("metric")
+            operator = condition.get("operator", ">=")
+            if not metric or operator not in OPERATORS:
+                continue
+            grouped[(metric, operator)].append((condition.get("threshold", 0), a["id"]))
+
+        self._index: dict[tuple[str, str], tuple[list, list]] = {}
+        for key, items in grouped.items():
+            items.sort(key=lambda t: t[0])
+            self._index[key] = ([t for t, _ in items], [a_id for _, a_id in items])
+        self.metrics = frozenset(metric for metric, _ in self._index)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def satisfied(self, metric: str, value: float) -> list[str]:
+        """Ids of every achievement whose condition on `metric` holds for `value`."""
+        out: list[str] = []
+        for operator in OPERATORS:
+            entry = self._index.get((metric, operator))
+            if entry is None:
+                continue
+            thresholds, ids = entry
+            if operator == ">=":
+                out.extend(ids[:bisect_right(thresholds, value)])
+            elif operator == ">":
+                out.extend(ids[:bisect_left(thresholds, value)])
+            elif operator == "<=":
+                out.extend(ids[bisect_left(thresholds, value):])
+            else:
+                out.extend(ids[bisect_left(thresholds, value):bisect_right(thresholds, value)])
+        return out
+
+
+class UserProgress:
+    """A user's metric counters, unlocked achievements and metrics awaiting evaluation."""
+
+    __slots__ = ("metrics", "unlocked", "dirty")
+
+    def __init__(self, metrics: dict, unlocked: set):
+        self.metrics = metrics
+        self.unlocked = unlocked
+        self.dirty: set[str] = set()
+
+
+# ── Engine ──────────────────────────────────────────────────────
+
+class AchievementEngine:
+    """Catalog cache + per-user counters; unlocks achievements on events."""
+
+    def __init__(self, catalog_ttl: int = 600, user_ttl: int = 900, max_users: int = 50_000):
+        self._catalog: TTLCache = TTLCache(maxsize=1, ttl=catalog_ttl)
+        self._users: TTLCache = TTLCache(maxsize=max_users, ttl=user_ttl)
+        self._tasks: set[asyncio.Task] = set()
+        self._stats = {
+            "events": 0, "evaluated": 0, "unlocked": 0,
+            "catalog_loads": 0, "user_loads": 0, "errors": 0,
+        }
+
+    async def catalog(self, supabase: Client) -> AchievementIndex:
+        index = self._catalog.get(_CATALOG_KEY)
+        if index is None:
+            result = await asyncio.to_thread(
+                supabase.table("achievements").select("*").execute
+            )
+            index = self._catalog[_CATALOG_KEY] = AchievementIndex(result.data or [])
+            self._stats["catalog_loads"] += 1
+        return index
+
+    async def _load_user(self, supabase: Client, user_id: str) -> UserProgress:
+        from app.services.community_stats_service import get_user_stats
+
+        stats, unlocked = await asyncio.gather(
+            get_user_stats(supabase, user_id),
+            asyncio.to_thread(
+                supabase.table("user_achievements")
+                .select("achievement_id")
+                .eq("user_id", user_id)
+                .execute
+            ),
+        )
+        progress = self._users.get(user_id)
+        if progress is None:
+            progress = self._users[user_id] = UserProgress(
+                {metric: stats.get(key) or 0 for metric, key in _STAT_KEYS.items()},
+                {row["achievement_id"] for row in (unlocked.data or [])},
+            )
+            self._stats["user_loads"] += 1
+        return progress
+
+    def observe(self, user_id: str, **values) -> None:
+        """
+        Absolute metric values written elsewhere (e.g. total_xp after an
+        XP award). Only cached users are touched; they are evaluated on
+        their next event.
+        """
+        progress = self._users.get(user_id)
+        if progress is None:
+            return
+        for metric, value in values.items():
+            if progress.metrics.get(metric) != value:
+                progress.metrics[metric] = value
+                progress.dirty.add(metric)
+
+    async def record(
+        self, supabase: Client, user_id: str, metric: str, delta: int = 1,
+    ) -> list[dict]:
+        """Apply a counter change and unlock what it earns. Returns the new achievements."""
+        self._stats["events"] += 1
+        try:
+            index = await self.catalog(supabase)
+            progress = self._users.get(user_id)
+            if progress is None:
+                progress = await self._load_user(supabase, user_id)
+                changed = set(index.metrics)
+            else:
+                progress.metrics[metric] = progress.metrics.get(metric, 0) + delta
+                changed = {metric}
+            return await self._evaluate(supabase, user_id, index, progress, changed)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error("Achievement event %s failed for %s: %s", metric, user_id[:8], e)
+            return []
+
+    async def evaluate(self, supabase: Client, user_id: str) -> list[dict]:
+        """Evaluate every metric for a user (no event). Returns the new achievements."""
+        try:
+            index = await self.catalog(supabase)
+            progress = self._users.get(user_id) or await self._load_user(supabase, user_id)
+            return await self._evaluate(supabase, user_id, index, progress, set(index.metrics))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error("Achievement check error for %s: %s", user_id[:8], e)
+            return []
+
+    def emit(self, supabase: Client, user_id: str, metric: str, delta: int = 1) -> None:
+        """Fire-and-forget `record`, for hot paths such as sensor ingest."""
+        task = asyncio.create_task(self.record(supabase, user_id, metric, delta))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _evaluate(
+        self,
+        supabase: Client,
+        user_id: str,
+        index: AchievementIndex,
+        progress: UserProgress,
+        changed: set[str],
+    ) -> list[dict]:
+        newly_unlocked = []
+        pending = changed | progress.dirty
+        while pending:
+            progress.dirty.clear()
+            for achievement in self._due(index, progress, pending):
+                if await self._unlock(supabase, user_id, progress, achievement):
+                    newly_unlocked.append(achievement)
+            # Rewards move total_xp / karma / level, which may unlock more
+            pending = set(progress.dirty)
+        return newly_unlocked
+
+    def _due(self, index: AchievementIndex, progress: UserProgress, metrics: set[str]) -> list[dict]:
+        """
+        Achievements newly satisfied by `metrics`. They are marked unlocked
+        here, before any await, so concurrent events cannot both claim one.
+        """
+        due = []
+        for metric in metrics & index.metrics:
+            for a_id in index.satisfied(metric, progress.metrics.get(metric, 0)):
+                self._stats["evaluated"] += 1
+                if a_id not in progress.unlocked:
+                    progress.unlocked.add(a_id)
+                    due.append(index.by_id[a_id])
+        return due
+
+    async def _unlock(
+        self, supabase: Client, user_id: str, progress: UserProgress, achievement: dict,
+    ) -> bool:
+        from app.services.gamification_service import award_karma, award_xp
+
+        try:
+            result = await asyncio.to_thread(
+                supabase.table("user_achievements")
+                .upsert(
+                    {"user_id": user_id, "achievement_id": achievement["id"]},
+                    on_conflict="user_id,achievement_id",
+                    ignore_duplicates=True,
+                )
+                .execute
+            )
+        except Exception:
+            progress.unlocked.discard(achievement["id"])
+            raise
+        if not result.data:
+            return False    # another worker unlocked it first
+
+        reward_xp = achievement.get("reward_xp", 0) or 0
+        reward_karma = achievement.get("reward_karma", 0) or 0
+        reason = f"achievement:{achievement['name']}"
+        if reward_xp > 0:
+            await award_xp(supabase, user_id, reward_xp, reason)
+        if reward_karma > 0:
+            await award_karma(supabase, user_id, reward_karma, reason)
+
+        self._stats["unlocked"] += 1
+        logger.info(
+            "🏆 Achievement unlocked: user=%s achievement=%s",
+            user_id[:8], achievement["name"],
+        )
+        return True
+
+    def invalidate_catalog(self) -> None:
+        self._catalog.pop(_CATALOG_KEY, None)
+
+    def forget(self, user_id: str) -> None:
+        self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._catalog.clear()
+        self._users.clear()
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        index = self._catalog.get(_CATALOG_KEY)
+        s["catalog_size"] = len(index) if index is not None else 0
+        s["cached_users"] = len(self._users)
+        return s
+
+
+# Global instance
+achievement_engine = AchievementEngine()
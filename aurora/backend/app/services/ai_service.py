@@ -6,7 +6,7 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from groq import Groq
 from tenacity import retry, stop_after_attempt, wait_exponential
@@ -356,7 +356,48 @@ Respond with valid JSON only:
             logger.error("Toxicity check failed: %s", e)
             return False
 
-    def _call_groq_simple(self, prompt: str) -> str:
+    async def check_toxicity_batch(self, texts: List[str]) -> List[bool]:
+        """
+        Check several texts for toxicity with a single Groq call.
+
+        Texts are sent as a JSON array and the model answers with one
+        verdict per index. Missing or malformed verdicts count as
+        non-toxic, matching check_toxicity's fail-open behaviour.
+
+        Raises:
+            AIServiceError: If the Groq call or JSON parsing fails, so the
+                caller can decide whether to retry the batch.
+        """
+        if not texts:
+            return []
+
+        prompt = f"""Analyze each of the following texts for toxicity, hate speech, or harassment.
+The texts are given as a JSON array; refer to them by their 0-based index.
+
+{json.dumps(texts, ensure_ascii=False)}
+
+Respond with valid JSON only:
+{{"results": [{{"index": 0, "is_toxic": true/false}}, ...]}}"""
+
+        try:
+            content = await asyncio.to_thread(
+                self._call_groq_simple, prompt, 40 + 20 * len(texts)
+            )
+            data = json.loads(content)
+        except Exception as e:
+            raise AIServiceError(f"Batch toxicity check failed: {e}") from e
+
+        verdicts = [False] * len(texts)
+        for item in data.get("results", []):
+            try:
+                index = int(item.get("index"))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < len(texts):
+                verdicts[index] = bool(item.get("is_toxic", False))
+        return verdicts
+
+    def _call_groq_simple(self, prompt: str, max_tokens: int = 100) -> str:
         """Simplified sync Groq call for moderation."""
         response = self.client.chat.completions.create(
             model=self.MODEL,
@@ -364,7 +405,7 @@ Respond with valid JSON only:
                 {"role": "user", "content": prompt},
             ],
             temperature=0.1,  # Low temperature for consistency
-            max_tokens=100,
+            max_tokens=max_tokens,
             response_format={"type": "json_object"},
         )
         return response.choices[0].message.content
@@ -0,0 +1,257 @@
+"""
+📁 backend/app/services/alert_dispatcher.py
+Alert dispatcher — the single way alerts reach the database and the user.
+
+  * cooldown per (grow, parameter, severity): a repeat inside the window
+    is suppressed, so a stuck sensor can't produce a row per reading. The
+    window starts only once an alert is queued or written, and is lifted
+    again if its insert fails
+  * a bounded queue drained by one worker: alerts raised close together
+    are written with one bulk insert
+  * one push per (user, grow) per flush, merging all its parameters,
+    sent concurrently instead of one awaited call after another; a flush
+    whose insert fails sends none
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from cachetools import TTLCache
+from supabase import Client
+
+logger = logging.getLogger("aurora.alerts")
+
+
+class AlertDispatcher:
+    """
+    Filters, batches and delivers alert rows. Without a running worker
+    (tests, scripts) `dispatch` writes inline, with the same cooldown,
+    bulk insert and push merging. `timer` drives the cooldown clock, so
+    replays can run on simulated time.
+
+    The cooldown is per process. Across workers and restarts, repeats
+    are prevented upstream: the anomaly detector seeds its active alerts
+    from the `alerts` table.
+    """
+
+    def __init__(
+        self,
+        cooldown_seconds: float = 1800.0,
+        flush_interval: float = 1.0,
+        max_batch: int = 500,
+        queue_size: int = 5000,
+        push_concurrency: int = 10,
+        timer=time.monotonic,
+    ):
+        self.cooldown_seconds = cooldown_seconds
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue_size = queue_size
+        self.push_concurrency = push_concurrency
+        # Presence of a key means it was dispatched within the cooldown
+        self._recent: TTLCache = TTLCache(maxsize=200_000, ttl=cooldown_seconds, timer=timer)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._supabase: Optional[Client] = None
+        self._metrics = {
+            "received": 0,
+            "suppressed": 0,
+            "dropped": 0,
+            "inserted": 0,
+            "insert_calls": 0,
+            "insert_errors": 0,
+            "pushes": 0,
+            "push_errors": 0,
+        }
+
+    # -- Lifecycle --------------------------------------------------
+
+    def start(self, supabase: Optional[Client] = None) -> None:
+        """Start the background worker (call from FastAPI startup)."""
+        if self._task is not None:
+            return
+        self._supabase = supabase
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker and deliver whatever is still queued."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._queue = None
+        if pending:
+            await self.deliver(pending, self._supabase)
+
+    # -- Submission -------------------------------------------------
+
+    @staticmethod
+    def _key(alert: dict) -> tuple:
+        return (alert["grow_id"], alert.get("parameter"), alert.get("severity"))
+
+    def _filter(self, alerts: list[dict]) -> list[dict]:
+        """Drop alerts still inside their cooldown (and repeats within the call)."""
+        fresh, seen = [], set()
+        for alert in alerts:
+            key = self._key(alert)
+            if key in self._recent or key in seen:
+                self._metrics["suppressed"] += 1
+                continue
+            seen.add(key)
+            fresh.append(alert)
+        return fresh
+
+    def _remember(self, alerts: list[dict]) -> None:
+        for alert in alerts:
+            self._recent[self._key(alert)] = True
+
+    def _forget(self, alerts: list[dict]) -> None:
+        for alert in alerts:
+            self._recent.pop(self._key(alert), None)
+
+    async def dispatch(self, alerts: list[dict], supabase: Optional[Client] = None) -> list[dict]:
+        """
+        Apply the cooldown and hand the remaining alerts to the worker
+        (or deliver them inline when it isn't running). Never blocks on a
+        full queue: overflow is dropped and counted, and starts no cooldown.
+
+        Returns the alerts that passed the cooldown and were accepted.
+        """
+        self._metrics["received"] += len(alerts)
+        fresh = self._filter(alerts)
+        if not fresh:
+            return []
+
+        if self._queue is None:
+            self._remember(fresh)
+            await self.deliver(fresh, supabase)
+            return fresh
+
+        accepted = []
+        for alert in fresh:
+            try:
+                self._queue.put_nowait(alert)
+                accepted.append(alert)
+            except asyncio.QueueFull:
+                self._metrics["dropped"] += 1
+                logger.warning("Alert queue full — %s alert for grow %s dropped",
+                               alert.get("parameter"), alert["grow_id"])
+        self._remember(accepted)
+        return accepted
+
+    # -- Worker -----------------------------------------------------
+
+    async def _next_batch(self) -> list[dict]:
+        """Wait for one alert, then gather more until the batch is full or the interval passes."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self.deliver(batch, self._supabase)
+            except Exception as e:
+                logger.error("Alert delivery failed (%d alerts): %s", len(batch), e)
+
+    # -- Delivery ---------------------------------------------------
+
+    async def deliver(self, alerts: list[dict], supabase: Optional[Client] = None) -> None:
+        """Insert alerts with one call, then send one merged push per (user, grow)."""
+        if not alerts:
+            return
+
+        try:
+            if supabase is None:
+                from app.dependencies import get_supabase_client
+                supabase = get_supabase_client()
+            self._metrics["insert_calls"] += 1
+            await asyncio.to_thread(supabase.table("alerts").insert(alerts).execute)
+            self._metrics["inserted"] += len(alerts)
+            logger.info("Created %d alerts", len(alerts))
+        except Exception as e:
+            self._metrics["insert_errors"] += 1
+            # Not recorded: let the next occurrence try again
+            self._forget(alerts)
+            logger.error("Failed to save alerts: %s", e)
+            # Only persisted alerts are pushed
+            return
+
+        by_grow: dict[tuple[str, str], list[dict]] = {}
+        for alert in alerts:
+            by_grow.setdefault((alert["user_id"], alert["grow_id"]), []).append(alert)
+
+        try:
+            from app.services.push_service import send_push_notification
+        except Exception as e:
+            logger.error("Push service unavailable: %s", e)
+            return
+
+        semaphore = asyncio.Semaphore(self.push_concurrency)
+
+        async def push(user_id: str, grow_id: str, grow_alerts: list[dict]) -> None:
+            title, body = self._summary(grow_alerts)
+            async with semaphore:
+                try:
+                    await send_push_notification(
+                        user_id=user_id,
+                        title=title,
+                        body=body,
+                        data={"type": "alert", "grow_id": grow_id},
+                    )
+                    self._metrics["pushes"] += 1
+                except Exception as e:
+                    self._metrics["push_errors"] += 1
+                    logger.error("Failed to send push for grow %s: %s", grow_id, e)
+
+        await asyncio.gather(*(push(u, g, a) for (u, g), a in by_grow.items()))
+
+    @staticmethod
+    def _summary(alerts: list[dict]) -> tuple[str, str]:
+        """Title and body for one notification covering all of a grow's alerts."""
+        rank = {"critical": 0, "warning": 1, "info": 2}
+        alerts = sorted(alerts, key=lambda a: rank.get(a.get("severity"), 3))
+        parameters = list(dict.fromkeys(str(a.get("parameter", "sensor")).title() for a in alerts))
+        if len(parameters) == 1:
+            title = f"⚠️ {parameters[0]} Alert"
+        else:
+            title = f"⚠️ {len(parameters)} Alerts: {', '.join(parameters)}"
+        body = alerts[0]["message"]
+        if len(alerts) > 1:
+            body += f" (+{len(alerts) - 1} more)"
+        return title, body
+
+    # -- Metrics ----------------------------------------------------
+
+    def reset(self) -> None:
+        self._recent.clear()
+
+    def metrics(self) -> dict:
+        m = dict(self._metrics)
+        m["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        m["cooldown_keys"] = len(self._recent)
+        m["running"] = self._task is not None
+        return m
+
+
+# Global instance
+alert_dispatcher = AlertDispatcher()
@@ -1,7 +1,7 @@
 """
 📁 backend/app/services/alert_service.py
 Alert service — monitors sensor readings and triggers alerts
-for out-of-range conditions.
+for out-of-range conditions (via the streaming anomaly detector).
 """
 
 import logging
@@ -9,24 +9,26 @@ from datetime import datetime
 from typing import Optional
 
 from app.dependencies import get_supabase_client
+from app.services.alert_dispatcher import alert_dispatcher
+from app.services.anomaly_detector import anomaly_detector
+from app.services.sensor_fanout import sensor_fanout
+from app.services.threshold_service import DEFAULT_THRESHOLDS, threshold_cache
+from app.utils.vpd import vpd_kpa
 
 logger = logging.getLogger("aurora.alerts")
 
 
 # ── Thresholds ──────────────────────────────────────────────────
 
-THRESHOLDS = {
-    "temperature": {"min": 18.0, "max": 30.0, "unit": "°C"},
-    "humidity": {"min": 40.0, "max": 70.0, "unit": "%"},
-    "ph": {"min": 5.8, "max": 6.8, "unit": ""},
-    "vpd": {"min": 0.4, "max": 1.6, "unit": "kPa"},
-}
+# Fallback for grows without a plan; per-grow tables come from threshold_service
+THRESHOLDS = DEFAULT_THRESHOLDS
 
 
 class AlertType:
     SENSOR_HIGH = "sensor_high"
     SENSOR_LOW = "sensor_low"
     SENSOR_CRITICAL = "sensor_critical"
+    SENSOR_ANOMALY = "sensor_anomaly"
     TASK_OVERDUE = "task_overdue"
     PHASE_TRANSITION = "phase_transition"
 
@@ -36,6 +38,19 @@ class AlertType:
 class AlertService:
     """Monitors grow conditions and creates alerts."""
 
+    @staticmethod
+    async def save_and_notify(alerts: list[dict]) -> list[dict]:
+        """
+        Hand alerts to the dispatcher (cooldown, bulk insert, one merged
+        push per grow) and publish the survivors to the grows' WebSocket
+        channels. Returns the alerts that weren't suppressed.
+        """
+        if not alerts:
+            return []
+        kept = await alert_dispatcher.dispatch(alerts, get_supabase_client())
+        sensor_fanout.publish_alerts(kept)
+        return kept
+
     @staticmethod
     async def check_sensor_reading(
         grow_id: str,
@@ -43,73 +58,43 @@ class AlertService:
         reading: dict,
     ) -> list[dict]:
         """
-        Check a sensor reading against thresholds and create alerts
-        for any out-of-range values.
+        Feed a sensor reading to the streaming anomaly detector and create
+        whatever alerts it raises (deduplicated across readings), using
+        the grow's thresholds for its current phase.
         """
-        alerts: list[dict] = []
-
-        for param, limits in THRESHOLDS.items():
-            value = reading.get(param)
-            if value is None:
-                continue
-
-            alert = None
-            if value < limits["min"]:
-                severity = "critical" if value < limits["min"] * 0.8 else "warning"
-                alert = {
-                    "grow_id": grow_id,
-                    "user_id": user_id,
-                    "alert_type": AlertType.SENSOR_LOW if severity == "warning" else AlertType.SENSOR_CRITICAL,
-                    "severity": severity,
-                    "parameter": param,
-                    "value": value,
-                    "threshold_min": limits["min"],
-                    "threshold_max": limits["max"],
-                    "message": f"{param.title()} is low: {value}{limits['unit']} (min: {limits['min']}{limits['unit']})",
-                    "is_read": False,
-                }
-            elif value > limits["max"]:
-                severity = "critical" if value > limits["max"] * 1.2 else "warning"
-                alert = {
-                    "grow_id": grow_id,
-                    "user_id": user_id,
-                    "alert_type": AlertType.SENSOR_HIGH if severity == "warning" else AlertType.SENSOR_CRITICAL,
-                    "severity": severity,
-                    "parameter": param,
-                    "value": value,
-                    "threshold_min": limits["min"],
-                    "threshold_max": limits["max"],
-                    "message": f"{param.title()} is high: {value}{limits['unit']} (max: {limits['max']}{limits['unit']})",
-                    "is_read": False,
-                }
-
-            if alert:
-                alerts.append(alert)
-
-        # Save alerts to database
-        if alerts:
-            try:
-                sb = get_supabase_client()
-                sb.table("alerts").insert(alerts).execute()
-                logger.info("Created %d alerts for grow %s", len(alerts), grow_id)
-            except Exception as e:
-                logger.error("Failed to save alerts: %s", e)
-
-            # Send push notification for each alert
-            try:
-                from app.services.push_service import send_push_notification
-
-                for alert in alerts:
-                    await send_push_notification(
-                        user_id=user_id,
-                        title=f"⚠️ {alert['parameter'].title()} Alert",
-                        body=alert["message"],
-                        data={"type": "alert", "grow_id": grow_id},
-                    )
-            except Exception as e:
-                logger.error("Failed to send push for alerts: %s", e)
-
-        return alerts
+        sb = get_supabase_client()
+        table = await threshold_cache.get(sb, grow_id)
+        await anomaly_detector.warm(sb, [grow_id])
+        alerts = anomaly_detector.observe(grow_id, user_id, reading, table.limits)
+        return await AlertService.save_and_notify(alerts)
+
+    @staticmethod
+    async def check_sensor_readings_batch(
+        user_id: str,
+        readings: list[dict],
+    ) -> list[list[dict]]:
+        """
+        Feed a batch to the detector in time order, then hand all raised
+        alerts to the dispatcher at once.
+
+        Returns the alerts raised by each reading (minus those suppressed
+        by the cooldown), in input order.
+        """
+        per_reading: list[list[dict]] = [[] for _ in readings]
+        sb = get_supabase_client()
+        grow_ids = [r["grow_id"] for r in readings]
+        tables = await threshold_cache.get_many(sb, grow_ids)
+        await anomaly_detector.warm(sb, grow_ids)
+        order = sorted(range(len(readings)), key=lambda i: readings[i].get("created_at") or "")
+        for i in order:
+            r = readings[i]
+            per_reading[i] = anomaly_detector.observe(
+                r["grow_id"], user_id, r, tables[r["grow_id"]].limits
+            )
+
+        kept = await AlertService.save_and_notify([a for group in per_reading for a in group])
+        kept_ids = {id(a) for a in kept}
+        return [[a for a in group if id(a) in kept_ids] for group in per_reading]
 
     @staticmethod
     async def get_unread_alerts(user_id: str, limit: int = 20) -> list:
@@ -144,7 +129,4 @@ class AlertService:
     @staticmethod
     async def calculate_vpd(temperature: float, humidity: float) -> float:
         """Calculate VPD (Vapor Pressure Deficit) from temperature and humidity."""
-        import math
-        svp = 0.6108 * math.exp((17.27 * temperature) / (temperature + 237.3))
-        vpd = svp * (1 - humidity / 100)
-        return round(vpd, 2)
+        return round(vpd_kpa(temperature, humidity), 2)
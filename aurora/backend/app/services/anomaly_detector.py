@@ -0,0 +1,331 @@
+"""
+📁 backend/app/services/anomaly_detector.py
+Streaming anomaly detection for sensor readings.
+
+Readings are evaluated as they arrive against per-grow rolling state:
+  * out-of-range alerts fire once a value stays out of range for a
+    sustained window (immediately when critical), and re-arm only after
+    the value comes back inside a hysteresis band
+  * EWMA mean/variance give a z-score that flags sudden spikes that are
+    still inside the absolute thresholds
+
+Which alerts are active is also recorded in the `alerts` table: the first
+time a process sees a grow it loads the grow's open alerts (raised within
+OPEN_ALERT_HOURS, by any worker or before a restart) and treats them as
+active, so they aren't raised again.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from cachetools import LRUCache
+from supabase import Client
+
+logger = logging.getLogger("aurora.anomalies")
+
+# Out-of-range alerts newer than this count as active when seeding state
+OPEN_ALERT_HOURS = 24
+OPEN_ALERT_TYPES = ("sensor_high", "sensor_low", "sensor_critical")
+SEED_CHUNK = 200
+
+
+class MetricState:
+    """Rolling state for one metric of one grow."""
+
+    __slots__ = (
+        "n", "mean", "var",
+        "out_direction", "out_since",
+        "active", "active_severity",
+        "last_spike_at",
+    )
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.out_direction: Optional[str] = None   # "low" | "high" while out of range
+        self.out_since: Optional[float] = None
+        self.active: Optional[str] = None          # direction of the raised alert
+        self.active_severity: Optional[str] = None
+        self.last_spike_at = -math.inf
+
+    def update(self, value: float, alpha: float, min_samples: int) -> Optional[float]:
+        """Fold in a value; returns its z-score against the prior state."""
+        z = None
+        if self.n >= min_samples and self.var > 1e-12:
+            z = (value - self.mean) / math.sqrt(self.var)
+
+        if self.n == 0:
+            self.mean = value
+        else:
+            delta = value - self.mean
+            self.mean += alpha * delta
+            self.var = (1 - alpha) * (self.var + alpha * delta * delta)
+        self.n += 1
+        return z
+
+
+class AnomalyDetector:
+    """
+    Online detector keyed by grow. Rolling statistics are in-process and
+    bounded by an LRU; after a restart the first readings re-warm them.
+    Active alerts are seeded from the database by `warm`.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        z_threshold: float = 4.0,
+        min_samples: int = 10,
+        sustain_seconds: float = 300.0,
+        hysteresis: float = 0.05,
+        spike_cooldown_seconds: float = 1800.0,
+        max_grows: int = 50_000,
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_samples = min_samples
+        self.sustain_seconds = sustain_seconds
+        self.hysteresis = hysteresis
+        self.spike_cooldown_seconds = spike_cooldown_seconds
+        self._grows: LRUCache = LRUCache(maxsize=max_grows)
+        self._stats = {"observed": 0, "alerts": 0, "spikes": 0, "cleared": 0, "seeded": 0}
+
+    def _state(self, grow_id: str, metric: str) -> MetricState:
+        metrics = self._grows.get(grow_id)
+        if metrics is None:
+            metrics = {}
+            self._grows[grow_id] = metrics
+        state = metrics.get(metric)
+        if state is None:
+            state = metrics[metric] = MetricState()
+        return state
+
+    # -- Persisted state --------------------------------------------
+
+    def seed(self, grow_ids: Iterable[str], open_alerts: list[dict]) -> None:
+        """
+        Start tracking `grow_ids` and mark their open alerts (rows from the
+        `alerts` table) as active, unless this process already knows better.
+        """
+        for grow_id in grow_ids:
+            if grow_id not in self._grows:
+                self._grows[grow_id] = {}
+        for alert in sorted(open_alerts, key=lambda a: a.get("created_at") or ""):
+            param, value = alert.get("parameter"), alert.get("value")
+            if alert.get("alert_type") == "sensor_low":
+                direction = "low"
+            elif alert.get("alert_type") == "sensor_high":
+                direction = "high"
+            elif value is not None and alert.get("threshold_min") is not None:
+                direction = "low" if value < alert["threshold_min"] else "high"
+            else:
+                continue
+            state = self._state(alert["grow_id"], param)
+            if state.active is None:
+                state.active, state.active_severity = direction, alert.get("severity")
+                self._stats["seeded"] += 1
+
+    async def warm(self, supabase: Client, grow_ids: Iterable[str], refresh: bool = False) -> None:
+        """
+        Seed active alerts for grows this process hasn't tracked yet (all
+        of them with `refresh`). Failures are logged; the grows stay
+        unseeded and are retried on their next reading.
+        """
+        ids = [g for g in dict.fromkeys(grow_ids) if refresh or g not in self._grows]
+        if not ids:
+            return
+        since = (datetime.now(timezone.utc) - timedelta(hours=OPEN_ALERT_HOURS)).isoformat()
+        try:
+            for i in range(0, len(ids), SEED_CHUNK):
+                chunk = ids[i:i + SEED_CHUNK]
+                result = await asyncio.to_thread(
+                    supabase.table("alerts")
+                    .select("grow_id, parameter, alert_type, severity, value, threshold_min, created_at")
+                    .in_("grow_id", chunk)
+                    .in_("alert_type", list(OPEN_ALERT_TYPES))
+                    .gte("created_at", since)
+                    .execute
+                )
+                self.seed(chunk, result.data or [])
+        except Exception as e:
+            logger.warning("Failed to load open alerts for %d grows: %s", len(ids), e)
+
+    @staticmethod
+    def _timestamp(reading: dict) -> float:
+        raw = reading.get("created_at")
+        if not raw:
+            return time.time()
+        dt = datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+
+    def observe(
+        self,
+        grow_id: str,
+        user_id: str,
+        reading: dict,
+        thresholds: dict,
+    ) -> list[dict]:
+        """
+        Evaluate one reading (in time order per grow) and return the
+        alert rows that should be raised for it — usually none.
+        """
+        from app.services.alert_service import AlertType
+
+        self._stats["observed"] += 1
+        ts = self._timestamp(reading)
+        alerts: list[dict] = []
+
+        for param, limits in thresholds.items():
+            value = reading.get(param)
+            if value is None:
+                continue
+            value = float(value)
+            lo, hi = limits["min"], limits["max"]
+            unit = limits.get("unit", "")
+            state = self._state(grow_id, param)
+            z = state.update(value, self.alpha, self.min_samples)
+
+            if value < lo:
+                direction = "low"
+                severity = "critical" if value < lo * 0.8 else "warning"
+            elif value > hi:
+                direction = "high"
+                severity = "critical" if value > hi * 1.2 else "warning"
+            else:
+                direction = None
+                severity = None
+
+            base = {
+                "grow_id": grow_id,
+                "user_id": user_id,
+                "parameter": param,
+                "value": value,
+                "threshold_min": lo,
+                "threshold_max": hi,
+                "is_read": False,
+            }
+
+            if direction is None:
+                state.out_direction = state.out_since = None
+                margin = (hi - lo) * self.hysteresis
+                if state.active and lo + margin <= value <= hi - margin:
+                    state.active = state.active_severity = None
+                    self._stats["cleared"] += 1
+
+                if (
+                    z is not None
+                    and abs(z) >= self.z_threshold
+                    and ts - state.last_spike_at >= self.spike_cooldown_seconds
+                ):
+                    state.last_spike_at = ts
+                    self._stats["spikes"] += 1
+                    alerts.append({
+                        **base,
+                        "alert_type": AlertType.SENSOR_ANOMALY,
+                        "severity": "info",
+                        "message": (
+                            f"{param.title()} changed abruptly: {value}{unit} "
+                            f"(recent average {state.mean:.2f}{unit})"
+                        ),
+                    })
+                continue
+
+            if state.out_direction != direction:
+                state.out_direction, state.out_since = direction, ts
+            sustained = ts - state.out_since >= self.sustain_seconds
+
+            escalate = state.active == direction and severity == "critical" and state.active_severity != "critical"
+            if (state.active != direction and (sustained or severity == "critical")) or escalate:
+                state.active, state.active_severity = direction, severity
+                self._stats["alerts"] += 1
+                bound = "min" if direction == "low" else "max"
+                limit = lo if direction == "low" else hi
+                alerts.append({
+                    **base,
+                    "alert_type": (
+                        AlertType.SENSOR_CRITICAL if severity == "critical"
+                        else AlertType.SENSOR_LOW if direction == "low"
+                        else AlertType.SENSOR_HIGH
+                    ),
+                    "severity": severity,
+                    "message": f"{param.title()} is {direction}: {value}{unit} ({bound}: {limit}{unit})",
+                })
+
+        return alerts
+
+    def sweep(
+        self,
+        grow_id: str,
+        user_id: str,
+        series: dict[str, list[float]],
+        thresholds: dict,
+        min_buckets: int = 2,
+    ) -> list[dict]:
+        """
+        Safety net over coarse history (e.g. hourly rollup means, oldest
+        first): raise an alert when the last `min_buckets` values are all
+        out of range on the same side and no alert is already active for
+        it. Raised alerts are marked active here and are recorded in the
+        `alerts` table, which other processes seed from (see `warm`).
+        """
+        from app.services.alert_service import AlertType
+
+        alerts: list[dict] = []
+        for param, values in series.items():
+            limits = thresholds.get(param)
+            if limits is None or len(values) < min_buckets:
+                continue
+            lo, hi = limits["min"], limits["max"]
+            recent = values[-min_buckets:]
+            if all(v < lo for v in recent):
+                direction = "low"
+            elif all(v > hi for v in recent):
+                direction = "high"
+            else:
+                continue
+
+            state = self._state(grow_id, param)
+            if state.active == direction:
+                continue
+
+            value = round(recent[-1], 2)
+            unit = limits.get("unit", "")
+            bound = "min" if direction == "low" else "max"
+            limit = lo if direction == "low" else hi
+            state.active, state.active_severity = direction, "warning"
+            self._stats["alerts"] += 1
+            alerts.append({
+                "grow_id": grow_id,
+                "user_id": user_id,
+                "alert_type": AlertType.SENSOR_LOW if direction == "low" else AlertType.SENSOR_HIGH,
+                "severity": "warning",
+                "parameter": param,
+                "value": value,
+                "threshold_min": lo,
+                "threshold_max": hi,
+                "message": (
+                    f"{param.title()} has been {direction} for {min_buckets}h: "
+                    f"{value}{unit} average ({bound}: {limit}{unit})"
+                ),
+                "is_read": False,
+            })
+        return alerts
+
+    def reset(self) -> None:
+        self._grows.clear()
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["tracked_grows"] = len(self._grows)
+        return s
+
+
+# Global instance
+anomaly_detector = AnomalyDetector()
@@ -16,6 +16,8 @@ from groq import Groq, AsyncGroq
 from supabase import Client
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from app.core.reading_cache import Reading, reading_cache
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -27,6 +29,7 @@ MODEL = "llama-3.1-8b-instant"
 MAX_TOKENS = 4096
 TEMPERATURE = 0.7
 MAX_CONTEXT_TOKENS = 6000  # token budget for context window
+RECENT_READINGS = 3  # sensor readings included in the grow context
 
 EMERGENCY_KEYWORDS = [
     "dying", "dead", "emergency", "urgent", "help me",
@@ -55,6 +58,10 @@ INTENT_PATTERNS: Dict[str, list] = {
 }
 
 
+def _fmt(value: Optional[float]) -> str:
+    return "?" if value is None else f"{value:g}"
+
+
 # ---------------------------------------------------------------------------
 # Token counting (lightweight fallback when tiktoken unavailable)
 # ---------------------------------------------------------------------------
@@ -171,7 +178,10 @@ class ChatService:
                 grow_info = await self._get_active_grow_info(user_id)
 
             if grow_info:
-                grow_ctx = self._format_grow_context(grow_info, grow_info["id"])
+                readings = await reading_cache.recent(
+                    self.supabase, grow_info["id"], RECENT_READINGS
+                )
+                grow_ctx = self._format_grow_context(grow_info, grow_info["id"], readings)
                 context_parts.append(grow_ctx)
                 context_sources.append("active_grow")
 
@@ -378,8 +388,16 @@ class ChatService:
             logger.warning("Failed to load active grow info: %s", e)
             return None
 
-    def _format_grow_context(self, grow: dict, grow_id: str) -> str:
-        """Format grow data + recent snapshots into context string."""
+    def _format_grow_context(
+        self,
+        grow: dict,
+        grow_id: str,
+        readings: Optional[List[Reading]] = None,
+    ) -> str:
+        """
+        Format grow data + recent readings into context string. Without
+        `readings`, whatever the reading cache holds for the grow is used.
+        """
         parts = [
             f"## Active Grow: {grow.get('name', 'Unknown')}",
             f"- **Strain**: {grow.get('strain_name', 'Unknown')}",
@@ -427,30 +445,18 @@ class ChatService:
                     )
                     break
 
-        # Load recent snapshots (sync, will be called in context)
-        try:
-            snap_result = (
-                self.supabase.table("grow_snapshots")
-                .select("*")
-                .eq("grow_id", grow_id)
-                .order("recorded_at", desc=True)
-                .limit(3)
-                .execute()
-            )
-
-            if snap_result.data:
-                parts.append("\n### Recent Sensor Readings")
-                for snap in reversed(snap_result.data):
-                    ts = snap.get("recorded_at", "?")
-                    parts.append(
-                        f"- [{ts}] Temp: {snap.get('temperature', '?')}°C | "
-                        f"Humidity: {snap.get('humidity', '?')}% | "
-                        f"pH: {snap.get('ph', '?')} | "
-                        f"EC: {snap.get('ec', '?')} | "
-                        f"VPD: {snap.get('vpd', '?')} kPa"
-                    )
-        except Exception as e:
-            logger.warning("Failed to load snapshots: %s", e)
+        if readings is None:
+            readings = reading_cache.peek(grow_id, RECENT_READINGS)
+        if readings:
+            parts.append("\n### Recent Sensor Readings")
+            for r in readings:
+                parts.append(
+                    f"- [{r.created_at or '?'}] Temp: {_fmt(r.temperature)}°C | "
+                    f"Humidity: {_fmt(r.humidity)}% | "
+                    f"pH: {_fmt(r.ph)} | "
+                    f"EC: {_fmt(r.ec)} | "
+                    f"VPD: {_fmt(r.vpd)} kPa"
+                )
 
         return "\n".join(parts)
 
@@ -735,7 +741,10 @@ class ChatService:
             grow_info = await self._get_grow_info(user_id, grow_id) if grow_id else await self._get_active_grow_info(user_id)
             context = ""
             if grow_info:
-                context = self._format_grow_context(grow_info, grow_info["id"])
+                readings = await reading_cache.recent(
+                    self.supabase, grow_info["id"], RECENT_READINGS
+                )
+                context = self._format_grow_context(grow_info, grow_info["id"], readings)
 
             system_content = DR_AURORA_SYSTEM_PROMPT
             if context:
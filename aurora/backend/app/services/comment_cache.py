@@ -0,0 +1,90 @@
+"""
+📁 backend/app/services/comment_cache.py
+Per-post comment page cache.
+
+Comment lists on popular posts are read far more often than written, so
+visible comment pages are cached per post and dropped as a whole whenever
+that post's visible comments change (new comment, moderation takedown or
+release). The TTL bounds staleness across worker processes.
+"""
+
+import asyncio
+import logging
+
+from cachetools import LRUCache, TTLCache
+from supabase import Client
+
+logger = logging.getLogger("aurora.comment_cache")
+
+
+def _format_comment(c: dict) -> dict:
+    profile = c.pop("profiles", {}) or {}
+    return {
+        **c,
+        "author_username": profile.get("display_name"),
+        "author_avatar": profile.get("avatar_url"),
+        "is_hidden": c.get("is_hidden", False),
+        "is_flagged": c.get("is_flagged", False),
+    }
+
+
+class CommentPageCache:
+    """post_id → {(page, limit): [comment, ...]} with per-post invalidation."""
+
+    def __init__(self, maxsize: int = 2000, ttl: float = 120):
+        self._posts: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Bumped on invalidation so a fetch that raced a write isn't cached
+        self._versions: LRUCache = LRUCache(maxsize=maxsize * 2)
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def get_page(
+        self, supabase: Client, post_id: str, page: int = 1, limit: int = 20
+    ) -> list[dict]:
+        """Visible comments for one page, oldest first (cache-through)."""
+        pages = self._posts.get(post_id)
+        if pages is not None and (page, limit) in pages:
+            self._stats["hits"] += 1
+            return pages[(page, limit)]
+
+        self._stats["misses"] += 1
+        version = self._versions.get(post_id, 0)
+        offset = (page - 1) * limit
+        result = await asyncio.to_thread(
+            supabase.table("post_comments")
+            .select("*, profiles!post_comments_user_id_fkey(display_name, avatar_url)")
+            .eq("post_id", post_id)
+            .eq("is_hidden", False)
+            .order("created_at", desc=False)
+            .range(offset, offset + limit - 1)
+            .execute
+        )
+        comments = [_format_comment(c) for c in result.data or []]
+
+        if self._versions.get(post_id, 0) != version:
+            return comments
+
+        pages = self._posts.get(post_id)
+        if pages is None:
+            pages = {}
+            self._posts[post_id] = pages
+        pages[(page, limit)] = comments
+        return comments
+
+    def invalidate(self, post_id: str) -> None:
+        """Drop every cached page of a post."""
+        self._versions[post_id] = self._versions.get(post_id, 0) + 1
+        if self._posts.pop(post_id, None) is not None:
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        self._posts.clear()
+        self._versions.clear()
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["cached_posts"] = len(self._posts)
+        return s
+
+
+# Global instance
+comment_cache = CommentPageCache()
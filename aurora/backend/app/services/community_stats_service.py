@@ -0,0 +1,141 @@
+"""
+📁 backend/app/services/community_stats_service.py
+Community statistics — answers competitive analysis from precomputed values.
+
+Per-user counters live in `user_stats` (kept current by triggers); community
+totals and histograms live in the single `community_stats` row, refreshed
+periodically by the `refresh_community_stats` RPC and cached in-process.
+"""
+
+import asyncio
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Optional
+
+from cachetools import TTLCache
+from supabase import Client
+
+logger = logging.getLogger("aurora.community_stats")
+
+_COMMUNITY_KEY = "community"
+_community_cache: TTLCache = TTLCache(maxsize=1, ttl=300)
+
+
+# ── Histograms ─────────────────────────────────────────────────
+
+@dataclass
+class Histogram:
+    """Bucket counts over ascending lower edges; the last bucket is open-ended."""
+
+    edges: list[float]
+    counts: list[int]
+    _cumulative: list[int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._cumulative = [0, *accumulate(self.counts)]
+
+    @property
+    def total(self) -> int:
+        return self._cumulative[-1]
+
+    def percentile(self, value: float) -> float:
+        """
+        Share of the community strictly below `value`, in percent.
+        Interpolates linearly inside the bucket `value` falls into.
+        """
+        if not self.edges or self.total == 0:
+            return 0.0
+
+        i = max(bisect_right(self.edges, value) - 1, 0)
+        below = self._cumulative[i]
+        if i + 1 < len(self.edges):
+            width = self.edges[i + 1] - self.edges[i]
+            frac = min(max((value - self.edges[i]) / width, 0.0), 1.0) if width else 0.0
+        else:
+            frac = 0.5 if value > self.edges[i] else 0.0
+        return round((below + self.counts[i] * frac) / self.total * 100, 1)
+
+    @classmethod
+    def from_json(cls, data: Optional[dict]) -> "Histogram":
+        data = data or {}
+        return cls(
+            edges=[float(e) for e in data.get("edges") or []],
+            counts=[int(c) for c in data.get("counts") or []],
+        )
+
+
+# ── Community Aggregates ───────────────────────────────────────
+
+@dataclass
+class CommunityStats:
+    total_users: int
+    total_posts: int
+    completed_grows: int
+    xp_histogram: Histogram
+    posts_histogram: Histogram
+    refreshed_at: Optional[str] = None
+
+
+async def get_community_stats(supabase: Client) -> CommunityStats:
+    """Community totals and histograms (cached for a few minutes)."""
+    cached = _community_cache.get(_COMMUNITY_KEY)
+    if cached is not None:
+        return cached
+
+    result = await asyncio.to_thread(
+        supabase.table("community_stats").select("*").eq("id", 1).limit(1).execute
+    )
+    row = result.data[0] if result.data else {}
+
+    stats = CommunityStats(
+        total_users=row.get("total_users") or 0,
+        total_posts=row.get("total_posts") or 0,
+        completed_grows=row.get("completed_grows") or 0,
+        xp_histogram=Histogram.from_json(row.get("xp_histogram")),
+        posts_histogram=Histogram.from_json(row.get("posts_histogram")),
+        refreshed_at=row.get("refreshed_at"),
+    )
+    _community_cache[_COMMUNITY_KEY] = stats
+    return stats
+
+
+async def refresh_community_stats(supabase: Client) -> None:
+    """Recompute the community row in the database and drop the local cache."""
+    await asyncio.to_thread(supabase.rpc("refresh_community_stats", {}).execute)
+    _community_cache.pop(_COMMUNITY_KEY, None)
+
+
+# ── Per-user Stats ─────────────────────────────────────────────
+
+async def get_user_stats(supabase: Client, user_id: str) -> dict:
+    """
+    Profile totals plus the user's `user_stats` counters in one read.
+
+    Returns: { total_xp, karma, level, posts_count, completed_grows,
+               yield_grams_total, tasks_total, tasks_completed,
+               sensor_readings }
+    """
+    result = await asyncio.to_thread(
+        supabase.table("profiles")
+        .select("total_xp, karma, level, user_stats(*)")
+        .eq("id", user_id).limit(1).execute
+    )
+    profile = result.data[0] if result.data else {}
+
+    counters = profile.get("user_stats") or {}
+    if isinstance(counters, list):
+        counters = counters[0] if counters else {}
+
+    return {
+        "total_xp": profile.get("total_xp") or 0,
+        "karma": profile.get("karma") or 0,
+        "level": profile.get("level") or 1,
+        "posts_count": counters.get("posts_count") or 0,
+        "completed_grows": counters.get("completed_grows") or 0,
+        "yield_grams_total": float(counters.get("yield_grams_total") or 0),
+        "tasks_total": counters.get("tasks_total") or 0,
+        "tasks_completed": counters.get("tasks_completed") or 0,
+        "sensor_readings": counters.get("sensor_readings") or 0,
+    }
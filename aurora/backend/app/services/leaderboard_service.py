@@ -0,0 +1,334 @@
+"""
+📁 backend/app/services/leaderboard_service.py
+Leaderboards — global (XP, karma), weekly XP and per-strain community XP.
+
+Each board is a `RankIndex`: a sorted array of (-score, user_id) keys plus
+a score map. Rank, top-N and "me ± neighbours" are bisects and slices
+over memory; updates move one key. Only the scheduler leader rebuilds
+the boards from the database: every 10 minutes it reloads them and
+publishes each board (top entries plus every score) to
+`leaderboard_snapshots`. Every other worker polls that table on its own
+timer and loads a newer snapshot with one small read instead of paging
+profiles, grows and xp_events. The XP ledger moves the local boards in
+between as awards are applied.
+"""
+
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Optional
+
+from supabase import Client
+
+from app.utils.weeks import week_start
+
+logger = logging.getLogger("aurora.leaderboard")
+
+PAGE_SIZE = 1000
+SNAPSHOT_TOP = 100
+SNAPSHOT_POLL_SECONDS = 60
+
+
+def strain_key(strain: Optional[str]) -> Optional[str]:
+    strain = (strain or "").strip().lower()
+    return strain or None
+
+
+# ── Rank Index ──────────────────────────────────────────────────
+
+class RankIndex:
+    """Order-statistics over user scores: sorted keys + bisect."""
+
+    def __init__(self):
+        self._keys: list[tuple[int, str]] = []     # (-score, user_id), ascending
+        self._scores: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._scores
+
+    def load(self, scores: dict[str, int]) -> None:
+        """Replace the whole board (one sort)."""
+        self._scores = dict(scores)
+        self._keys = sorted((-s, uid) for uid, s in self._scores.items())
+
+    def score(self, user_id: str) -> Optional[int]:
+        return self._scores.get(user_id)
+
+    def scores(self) -> dict[str, int]:
+        return dict(self._scores)
+
+    def set(self, user_id: str, score: int) -> None:
+        old = self._scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            i = bisect_left(self._keys, (-old, user_id))
+            del self._keys[i]
+        self._scores[user_id] = score
+        insort(self._keys, (-score, user_id))
+
+    def add(self, user_id: str, delta: int) -> None:
+        self.set(user_id, self._scores.get(user_id, 0) + delta)
+
+    def remove(self, user_id: str) -> None:
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based rank; tied scores share a rank."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        return bisect_left(self._keys, (-score,)) + 1
+
+    def _entries(self, start: int, stop: int) -> list[dict]:
+        out = []
+        for neg, uid in self._keys[start:stop]:
+            out.append({"rank": bisect_left(self._keys, (neg,)) + 1, "user_id": uid, "score": -neg})
+        return out
+
+    def top(self, limit: int = 10, offset: int = 0) -> list[dict]:
+        return self._entries(offset, offset + limit)
+
+    def around(self, user_id: str, radius: int = 5) -> list[dict]:
+        """The user's entry with up to `radius` neighbours on each side."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return []
+        i = bisect_left(self._keys, (-score, user_id))
+        return self._entries(max(0, i - radius), i + radius + 1)
+
+
+# ── Boards ──────────────────────────────────────────────────────
+
+class Leaderboards:
+    """All boards for this process, kept in step with XP/karma awards."""
+
+    def __init__(self):
+        self.xp = RankIndex()
+        self.karma = RankIndex()
+        self.weekly = RankIndex()
+        self.strains: dict[str, RankIndex] = {}
+        self._user_strains: dict[str, set[str]] = {}
+        self._week: datetime = week_start()
+        self.built_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def board(self, name: str, strain: Optional[str] = None) -> Optional[RankIndex]:
+        if name == "xp":
+            return self.xp
+        if name == "karma":
+            return self.karma
+        if name == "weekly":
+            self._roll_week()
+            return self.weekly
+        if name == "strain":
+            return self.strains.get(strain_key(strain))
+        return None
+
+    def _roll_week(self) -> None:
+        current = week_start()
+        if current != self._week:
+            self._week = current
+            self.weekly = RankIndex()
+
+    # -- Incremental updates (from the XP ledger) --------------------
+
+    def record(self, user_id: str, total_xp: int, karma: int, xp_gained: int = 0) -> None:
+        """Apply one user's new totals after an award batch."""
+        self.xp.set(user_id, total_xp)
+        self.karma.set(user_id, karma)
+        if xp_gained:
+            self._roll_week()
+            self.weekly.add(user_id, xp_gained)
+        for strain in self._user_strains.get(user_id, ()):
+            self.strains[strain].set(user_id, total_xp)
+
+    def join_strain(self, user_id: str, strain: Optional[str]) -> None:
+        """Add a grower to a strain community (e.g. on grow creation)."""
+        key = strain_key(strain)
+        if key is None:
+            return
+        self._user_strains.setdefault(user_id, set()).add(key)
+        self.strains.setdefault(key, RankIndex()).set(user_id, self.xp.score(user_id) or 0)
+
+    # -- Rebuild / snapshot -----------------------------------------
+
+    async def _paged(self, query_fn) -> list[dict]:
+        rows, start = [], 0
+        while True:
+            result = await asyncio.to_thread(query_fn().range(start, start + PAGE_SIZE - 1).execute)
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    async def rebuild(self, supabase: Client) -> None:
+        """Reload every board from the database."""
+        async with self._lock:
+            week = week_start()
+            profiles, growers, weekly = await asyncio.gather(
+                self._paged(lambda: supabase.table("profiles").select("id, total_xp, karma").order("id")),
+                self._paged(lambda: supabase.table("grows").select("user_id, strain_name").order("id")),
+                self._paged(lambda: supabase.rpc("weekly_xp_totals", {"since_param": week.isoformat()})),
+            )
+
+            user_strains: dict[str, set[str]] = {}
+            for g in growers:
+                key = strain_key(g.get("strain_name"))
+                if key is not None and g.get("user_id"):
+                    user_strains.setdefault(g["user_id"], set()).add(key)
+
+            self._load(
+                xp={p["id"]: p.get("total_xp") or 0 for p in profiles},
+                karma={p["id"]: p.get("karma") or 0 for p in profiles},
+                week=week,
+                weekly={r["user_id"]: r["xp"] for r in weekly if r.get("xp")},
+                user_strains=user_strains,
+                built_at=datetime.now(timezone.utc),
+            )
+            logger.info(
+                "🏅 Leaderboards rebuilt: %d users, %d weekly, %d strain boards",
+                len(self.xp), len(self.weekly), len(self.strains),
+            )
+
+    def _load(
+        self,
+        xp: dict[str, int],
+        karma: dict[str, int],
+        week: datetime,
+        weekly: dict[str, int],
+        user_strains: dict[str, set[str]],
+        built_at: datetime,
+    ) -> None:
+        self.xp.load(xp)
+        self.karma.load(karma)
+        self._week = week
+        self.weekly.load(weekly)
+
+        members: dict[str, dict[str, int]] = {}
+        for uid, keys in user_strains.items():
+            if uid not in xp:
+                continue
+            for key in keys:
+                members.setdefault(key, {})[uid] = xp[uid]
+        self._user_strains = {uid: keys for uid, keys in user_strains.items() if uid in xp}
+        self.strains = {}
+        for key, scores in members.items():
+            self.strains[key] = RankIndex()
+            self.strains[key].load(scores)
+        self.built_at = built_at
+
+    async def snapshot(self, supabase: Client) -> None:
+        """Rebuild from the database and publish every board (scheduler leader only)."""
+        await self.rebuild(supabase)
+        taken_at = self.built_at.isoformat()
+        rows = [
+            {
+                "board": name, "period": period, "entries": board.top(SNAPSHOT_TOP),
+                "state": board.scores(), "taken_at": taken_at,
+            }
+            for name, period, board in (
+                ("xp", "all", self.xp),
+                ("karma", "all", self.karma),
+                ("weekly", self._week.date().isoformat(), self.weekly),
+            )
+        ]
+        rows.append({
+            "board": "strains", "period": "all", "entries": [],
+            "state": {uid: sorted(keys) for uid, keys in self._user_strains.items()},
+            "taken_at": taken_at,
+        })
+        await asyncio.to_thread(
+            supabase.table("leaderboard_snapshots").upsert(rows, on_conflict="board,period").execute
+        )
+
+    async def load_snapshot(self, supabase: Client) -> bool:
+        """
+        Load the leader's latest snapshot if it is newer than these boards.
+        Returns False when there is nothing newer (or no snapshot yet).
+        """
+        result = await asyncio.to_thread(
+            supabase.table("leaderboard_snapshots")
+            .select("taken_at")
+            .eq("board", "xp")
+            .eq("period", "all")
+            .limit(1)
+            .execute
+        )
+        if not result.data:
+            return False
+        taken_at = datetime.fromisoformat(result.data[0]["taken_at"])
+        if self.built_at is not None and taken_at <= self.built_at:
+            return False
+
+        week = week_start()
+        result = await asyncio.to_thread(
+            supabase.table("leaderboard_snapshots")
+            .select("board, period, state")
+            .in_("period", ["all", week.date().isoformat()])
+            .execute
+        )
+        state = {r["board"]: r.get("state") or {} for r in result.data or []}
+        async with self._lock:
+            self._load(
+                xp=state.get("xp", {}),
+                karma=state.get("karma", {}),
+                week=week,
+                weekly=state.get("weekly", {}),       # absent right after the week rolls
+                user_strains={uid: set(keys) for uid, keys in state.get("strains", {}).items()},
+                built_at=taken_at,
+            )
+        logger.info("🏅 Leaderboards loaded from snapshot (%s): %d users", taken_at.isoformat(), len(self.xp))
+        return True
+
+    async def load(self, supabase: Client) -> None:
+        """Startup: load the leader's snapshot, or rebuild if none exists yet."""
+        if not await self.load_snapshot(supabase):
+            await self.rebuild(supabase)
+
+    # -- Snapshot polling ---------------------------------------------
+
+    def start(self, supabase: Client, interval: float = SNAPSHOT_POLL_SECONDS) -> None:
+        """Poll for newer snapshots every `interval` seconds (call from FastAPI startup)."""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._refresh(supabase, interval))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _refresh(self, supabase: Client, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load_snapshot(supabase)
+            except Exception as e:
+                logger.error("Leaderboard snapshot load failed: %s", e)
+
+    def stats(self) -> dict:
+        return {
+            "refreshing": self._task is not None,
+            "users": len(self.xp),
+            "weekly_users": len(self.weekly),
+            "strain_boards": len(self.strains),
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+        }
+
+
+# Global instance
+leaderboards = Leaderboards()
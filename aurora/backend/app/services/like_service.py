@@ -0,0 +1,54 @@
+"""
+📁 backend/app/services/like_service.py
+Like engine — atomic like toggling via a single RPC. Karma for liked
+posts goes through the XP ledger, which coalesces it per author.
+"""
+
+import asyncio
+import logging
+
+from supabase import Client
+
+from app.services.gamification_service import KARMA_REWARDS
+from app.services.xp_ledger import xp_ledger
+
+logger = logging.getLogger("aurora.likes")
+
+
+class PostNotFoundError(Exception):
+    """Raised when a like targets a post that does not exist."""
+
+
+# ── Toggle ─────────────────────────────────────────────────────
+
+async def toggle_like(supabase: Client, post_id: str, user_id: str) -> dict:
+    """
+    Toggle a like in one round trip using the `toggle_post_like` RPC.
+
+    The database function flips the like, adjusts `posts.likes_count` and
+    returns the new state together with the post author. Karma for the
+    author is queued on the XP ledger instead of written inline.
+
+    Returns: { liked, likes_count }
+    """
+    result = await asyncio.to_thread(
+        supabase.rpc(
+            "toggle_post_like",
+            {"post_id_param": post_id, "user_id_param": user_id},
+        ).execute
+    )
+
+    row = result.data[0] if isinstance(result.data, list) and result.data else result.data
+    if not row or not row.get("author_id"):
+        raise PostNotFoundError(post_id)
+
+    liked = bool(row.get("is_liked"))
+    author_id = row["author_id"]
+
+    if liked and author_id != user_id:
+        xp_ledger.add(author_id, karma=KARMA_REWARDS["receive_like"], reason="receive_like")
+
+    return {
+        "liked": liked,
+        "likes_count": row.get("new_likes_count") or 0,
+    }
@@ -0,0 +1,326 @@
+"""
+📁 backend/app/services/moderation_service.py
+Moderation pipeline — posts and comments the local pre-classifier can't
+clear are published provisionally (or held, if it scores them toxic) and
+moderated asynchronously in batched LLM calls. Takedowns are written back
+as is_toxic/is_hidden and pushed to the author over the WebSocket manager.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from supabase import Client
+
+from app.core.socket_manager import socket_manager
+from app.services.comment_cache import comment_cache
+from app.services.ai_service import AIService
+from app.services.toxicity_classifier import toxicity_classifier
+
+logger = logging.getLogger("aurora.moderation")
+
+
+# ── Queue Items ────────────────────────────────────────────────
+
+TABLES = {"post": "posts", "comment": "post_comments"}
+
+
+@dataclass
+class ModerationItem:
+    """A post or comment waiting for an LLM verdict."""
+
+    kind: str                       # "post" | "comment"
+    id: str
+    user_id: str
+    text: str
+    held: bool = False              # hidden by the pre-classifier at insert time
+    post_id: Optional[str] = None   # parent post, for comments
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+# ── Pipeline ───────────────────────────────────────────────────
+
+class ModerationPipeline:
+    """
+    Collects moderation items into batches and classifies each batch with a
+    single Groq call via AIService.check_toxicity_batch.
+
+    Outcomes:
+      - provisional + toxic → hide, decrement counters, notify author
+      - held + toxic        → mark toxic (stays hidden), notify author
+      - held + clean        → unhide and count the comment
+      - provisional + clean → nothing to write
+
+    A failed LLM call is retried with backoff; if every attempt fails,
+    provisional items stay up (fail open) while held items stay hidden and
+    go back to the backlog until a verdict comes back. Items that don't
+    fit the queue wait in a backlog instead of being dropped, and whatever
+    is queued at shutdown is drained before the worker exits.
+    """
+
+    BATCH_SIZE = 8
+    MAX_WAIT_SECONDS = 1.5
+    QUEUE_SIZE = 1000
+    BACKLOG_SIZE = 50_000
+    MAX_ATTEMPTS = 3
+    RETRY_DELAY_SECONDS = 2.0
+    DRAIN_TIMEOUT_SECONDS = 10.0
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._backlog: deque[ModerationItem] = deque()
+        self._inflight: list[ModerationItem] = []
+        self._task: Optional[asyncio.Task] = None
+        self._ai: Optional[AIService] = None
+        self._supabase: Optional[Client] = None
+        self._started_at = time.monotonic()
+        self._metrics = {
+            "enqueued": 0,
+            "dropped": 0,
+            "held": 0,
+            "processed": 0,
+            "flagged": 0,
+            "released": 0,
+            "requeued": 0,
+            "backlogged": 0,
+            "batches": 0,
+            "llm_calls": 0,
+            "llm_errors": 0,
+        }
+        self._latency_total = 0.0
+
+    # -- Lifecycle --------------------------------------------------
+
+    def start(self, ai_service: AIService, supabase: Client) -> None:
+        """Start the background worker (call from FastAPI startup)."""
+        if self._task is not None:
+            return
+        self._ai = ai_service
+        self._supabase = supabase
+        self._queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._started_at = time.monotonic()
+        self._refill()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker after moderating what is still queued (bounded by DRAIN_TIMEOUT)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending = list(self._inflight)
+        self._inflight = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        pending.extend(self._backlog)
+        self._backlog.clear()
+        if not pending or self._ai is None:
+            return
+
+        async def drain():
+            while pending:
+                batch = pending[:self.BATCH_SIZE]
+                await self.process_batch(batch)
+                del pending[:len(batch)]
+
+        try:
+            await asyncio.wait_for(drain(), timeout=self.DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Moderation drain timed out — %d items left unmoderated", len(pending))
+        except Exception as e:
+            logger.error("Moderation drain failed — %d items left unmoderated: %s", len(pending), e)
+
+    # -- Submission -------------------------------------------------
+
+    def submit(self, item: ModerationItem) -> bool:
+        """Queue an item for moderation. Never blocks the request."""
+        if item.held:
+            self._metrics["held"] += 1
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(item)
+                self._metrics["enqueued"] += 1
+                return True
+            except asyncio.QueueFull:
+                pass
+        if len(self._backlog) >= self.BACKLOG_SIZE:
+            self._metrics["dropped"] += 1
+            logger.warning("Moderation backlog full — %s %s not queued", item.kind, item.id)
+            return False
+        self._backlog.append(item)
+        self._metrics["backlogged"] += 1
+        return True
+
+    def _requeue(self, items: list[ModerationItem]) -> None:
+        """Put held items without a verdict back in the backlog; they stay hidden meanwhile."""
+        for item in items:
+            if len(self._backlog) >= self.BACKLOG_SIZE:
+                self._metrics["dropped"] += 1
+                logger.error("Moderation backlog full — held %s %s stays hidden unreviewed", item.kind, item.id)
+                continue
+            self._backlog.append(item)
+            self._metrics["requeued"] += 1
+        if items:
+            logger.warning("Re-queued %d held items without an LLM verdict", len(items))
+
+    def _refill(self) -> None:
+        """Move backlogged items into the queue while it has room."""
+        while self._backlog and not self._queue.full():
+            self._queue.put_nowait(self._backlog.popleft())
+            self._metrics["enqueued"] += 1
+
+    # -- Worker -----------------------------------------------------
+
+    async def _next_batch(self) -> list[ModerationItem]:
+        """Wait for one item, then gather more until the batch is full or MAX_WAIT passes."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.MAX_WAIT_SECONDS
+        while len(batch) < self.BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            self._refill()
+            batch = await self._next_batch()
+            self._inflight = batch
+            try:
+                await self.process_batch(batch)
+            except Exception as e:
+                logger.error("Moderation batch failed (%d items): %s", len(batch), e)
+            self._inflight = []
+
+    async def process_batch(self, batch: list[ModerationItem]) -> None:
+        """Classify a batch with one LLM call and apply the verdicts."""
+        self._metrics["batches"] += 1
+        verdicts = await self._classify(batch)
+        if verdicts is None:
+            # Provisional items stay up (fail open); held items stay hidden
+            # and are retried, so an LLM outage never publishes them.
+            self._requeue([item for item in batch if item.held])
+            return
+
+        now = time.monotonic()
+        takedowns: list[ModerationItem] = []
+        releases: list[ModerationItem] = []
+        for item, is_toxic in zip(batch, verdicts):
+            self._metrics["processed"] += 1
+            self._latency_total += now - item.enqueued_at
+            toxicity_classifier.remember(item.text, is_toxic)
+            if is_toxic:
+                takedowns.append(item)
+            elif item.held:
+                releases.append(item)
+
+        try:
+            await self._take_down(takedowns)
+        except Exception as e:
+            logger.error("Failed to apply %d takedowns: %s", len(takedowns), e)
+        try:
+            await self._release(releases)
+        except Exception as e:
+            logger.error("Failed to release %d held items: %s", len(releases), e)
+
+    async def _classify(self, batch: list[ModerationItem]) -> Optional[list[bool]]:
+        """One LLM call for the batch, retried with backoff. None if every attempt failed."""
+        texts = [item.text for item in batch]
+        for attempt in range(self.MAX_ATTEMPTS):
+            self._metrics["llm_calls"] += 1
+            try:
+                return await self._ai.check_toxicity_batch(texts)
+            except Exception as e:
+                self._metrics["llm_errors"] += 1
+                logger.error("Moderation LLM call failed (attempt %d/%d): %s", attempt + 1, self.MAX_ATTEMPTS, e)
+                if attempt + 1 < self.MAX_ATTEMPTS:
+                    await asyncio.sleep(self.RETRY_DELAY_SECONDS * 2 ** attempt)
+        return None
+
+    # -- Write-back -------------------------------------------------
+
+    async def _bulk_update(self, items: list[ModerationItem], values: dict) -> None:
+        """One UPDATE per table for all items in the batch."""
+        for kind, table in TABLES.items():
+            ids = [item.id for item in items if item.kind == kind]
+            if ids:
+                await asyncio.to_thread(
+                    self._supabase.table(table).update(values).in_("id", ids).execute
+                )
+
+    @staticmethod
+    def _invalidate_comment_pages(items: list[ModerationItem]) -> None:
+        for post_id in {item.post_id for item in items if item.kind == "comment" and item.post_id}:
+            comment_cache.invalidate(post_id)
+
+    async def _adjust_comment_counts(self, items: list[ModerationItem], rpc_name: str) -> None:
+        for item in items:
+            if item.kind == "comment" and item.post_id:
+                await asyncio.to_thread(
+                    self._supabase.rpc(rpc_name, {"post_id_param": item.post_id}).execute
+                )
+
+    async def _take_down(self, items: list[ModerationItem]) -> None:
+        if not items:
+            return
+        self._metrics["flagged"] += len(items)
+        await self._bulk_update(items, {"is_toxic": True, "is_hidden": True})
+        self._invalidate_comment_pages(items)
+
+        # Held comments were never counted, so only provisional ones are decremented
+        await self._adjust_comment_counts(
+            [item for item in items if not item.held], "decrement_comments"
+        )
+
+        for item in items:
+            logger.warning("%s %s from %s taken down as toxic", item.kind.title(), item.id, item.user_id)
+            await socket_manager.send_personal_message(
+                {
+                    "type": "moderation_takedown",
+                    "kind": item.kind,
+                    "id": item.id,
+                    "post_id": item.post_id if item.kind == "comment" else item.id,
+                },
+                item.user_id,
+            )
+
+    async def _release(self, items: list[ModerationItem]) -> None:
+        if not items:
+            return
+        self._metrics["released"] += len(items)
+        await self._bulk_update(items, {"is_hidden": False})
+        self._invalidate_comment_pages(items)
+        await self._adjust_comment_counts(items, "increment_comments")
+
+    # -- Metrics ----------------------------------------------------
+
+    def metrics(self) -> dict:
+        """Throughput and outcome counters for the health endpoint."""
+        m = dict(self._metrics)
+        uptime = max(time.monotonic() - self._started_at, 1e-9)
+        m["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        m["backlog_depth"] = len(self._backlog)
+        m["avg_batch_size"] = round(m["processed"] / m["batches"], 2) if m["batches"] else 0.0
+        m["avg_latency_ms"] = (
+            round(self._latency_total / m["processed"] * 1000, 1) if m["processed"] else 0.0
+        )
+        m["items_per_second"] = round(m["processed"] / uptime, 3)
+        m["running"] = self._task is not None
+        m["classifier"] = toxicity_classifier.stats()
+        m["comment_cache"] = comment_cache.stats()
+        return m
+
+
+# Global instance
+moderation_pipeline = ModerationPipeline()
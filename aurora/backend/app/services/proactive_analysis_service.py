@@ -1,11 +1,26 @@
 """
 Aurora Proactive Analysis Service
-Runs as a cron job every 24 hours. Reads grow_snapshots,
+Runs as a cron job every 24 hours. Reads the latest readings,
 compares against AI plan optimal ranges, and generates
 proactive Dr. Aurora messages when anomalies are detected.
+
+A run works in stages over the whole shard rather than grow by grow:
+  1. page the shard's active grows (`proactive_grows`, keyset-paged)
+  2. fetch every grow's latest reading at once (reading cache first,
+     then `latest_grow_readings` for the rest)
+  3. detect anomalies for all grows in one vectorized comparison
+  4. render messages from templates keyed by anomaly signature; the LLM
+     is only asked for a template when a signature is new (see
+     proactive_templates), concurrently, bounded by a semaphore and a
+     requests-per-minute limiter
+  5. bulk-insert chat messages and notifications
+
+Shards split grows by a hash of their id, so N cron workers started
+with --shard 0..N-1 --shards N cover every grow exactly once.
 """
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 from uuid import uuid4
@@ -14,12 +29,40 @@ from groq import Groq
 from supabase import Client
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from app.core.reading_cache import reading_cache
+from app.services.proactive_templates import (
+    anomaly_signature, proactive_templates, render, template_prompt, validate_template,
+)
+from app.services.threshold_service import LABELS, UNITS, GrowThresholds, check_many, threshold_cache
+
 logger = logging.getLogger(__name__)
 
 MODEL = "llama-3.1-8b-instant"
 MAX_TOKENS = 1024
 TEMPERATURE = 0.5
 
+PAGE_SIZE = 500
+INSERT_CHUNK = 500
+
+
+class _RateLimiter:
+    """Spaces calls evenly so at most `per_minute` start in any minute."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
 
 class ProactiveAnalysisService:
     """
@@ -27,73 +70,133 @@ class ProactiveAnalysisService:
     against optimal ranges and generating Dr. Aurora alerts.
     """
 
-    def __init__(self, groq_client: Groq, supabase_client: Client):
+    def __init__(
+        self,
+        groq_client: Groq,
+        supabase_client: Client,
+        llm_concurrency: int = 8,
+        llm_per_minute: float = 60,
+    ):
         self.groq = groq_client
         self.supabase = supabase_client
+        self.llm_concurrency = llm_concurrency
+        self.llm_per_minute = llm_per_minute
 
-    async def run_analysis(self) -> Dict[str, Any]:
+    async def run_analysis(self, shard: int = 0, shards: int = 1) -> Dict[str, Any]:
         """
-        Main entry point. Scans all active grows and checks for anomalies.
+        Main entry point. Scans the shard's active grows and checks for anomalies.
         Returns a summary dict with counts.
         """
-        processed = 0
-        alerts_sent = 0
+        started = time.monotonic()
         errors = 0
 
-        # 1. Get all active grows
-        active_grows = await self._get_active_grows()
-        logger.info("Found %d active grows to analyze", len(active_grows))
+        # 1. Active grows of this shard, with compiled plan ranges
+        active_grows = await self._get_active_grows(shard, shards)
+        logger.info("Found %d active grows to analyze (shard %d/%d)", len(active_grows), shard, shards)
 
+        planned = []
         for grow in active_grows:
-            try:
-                grow_id = grow["id"]
-                user_id = grow["user_id"]
-
-                # 2. Get latest snapshot
-                snapshot = await self._get_latest_snapshot(grow_id)
-                if not snapshot:
-                    logger.debug("No snapshot for grow %s, skipping", grow_id)
-                    continue
-
-                # 3. Extract optimal ranges from AI plan
-                optimal = self._extract_optimal_ranges(grow)
-                if not optimal:
-                    logger.debug("No AI plan for grow %s, skipping", grow_id)
-                    continue
-
-                # 4. Compare and detect anomalies
-                anomalies = self._detect_anomalies(snapshot, optimal)
-
-                if anomalies:
-                    # 5. Generate proactive message
-                    message = await self._generate_proactive_message(
-                        grow, snapshot, optimal, anomalies,
-                    )
-
-                    # 6. Save as system chat message
-                    await self._save_system_message(user_id, message)
-
-                    # 7. Create notification
-                    await self._create_notification(
-                        user_id, grow, anomalies, message,
-                    )
-
-                    alerts_sent += 1
-                    logger.info(
-                        "Proactive alert for grow %s: %d anomalies",
-                        grow_id, len(anomalies),
-                    )
-
-                processed += 1
+            optimal = self._extract_optimal_ranges(grow)
+            if optimal is None:
+                logger.debug("No AI plan for grow %s, skipping", grow["id"])
+                continue
+            planned.append((grow, optimal))
 
-            except Exception as e:
-                logger.error("Error analyzing grow %s: %s", grow.get("id"), e)
+        # 2. Latest snapshot of every planned grow
+        snapshots = await self._get_latest_snapshots([g["id"] for g, _ in planned])
+        checked = [(g, snapshots[g["id"]], optimal) for g, optimal in planned if g["id"] in snapshots]
+
+        # 3. Compare and detect anomalies, all grows at once
+        found = self._detect_anomalies_many(
+            [snapshot for _, snapshot, _ in checked],
+            [optimal for _, _, optimal in checked],
+        )
+        anomalous = [(g, s, o, a) for (g, s, o), a in zip(checked, found) if a]
+
+        # 4. Messages from templates; the LLM only sees new anomaly patterns
+        semaphore = asyncio.Semaphore(self.llm_concurrency)
+        limiter = _RateLimiter(self.llm_per_minute)
+        llm_calls = 0
+
+        async def limited(coro_fn, *args):
+            nonlocal llm_calls
+            async with semaphore:
+                await limiter.wait()
+                llm_calls += 1
+                return await coro_fn(*args)
+
+        signatures = [anomaly_signature(grow, anomalies) for grow, _, _, anomalies in anomalous]
+        templates = await proactive_templates.get_many(self.supabase, signatures)
+        # A stored template that no longer renders is dropped and regenerated
+        broken = [
+            sig for sig, (_, _, _, anomalies) in dict(zip(signatures, anomalous)).items()
+            if sig in templates and not validate_template(templates[sig], anomalies)
+        ]
+        if broken:
+            logger.warning("Discarding %d proactive templates that fail to render", len(broken))
+            await proactive_templates.discard(self.supabase, broken)
+            for sig in broken:
+                del templates[sig]
+        template_hits = sum(1 for sig in signatures if sig in templates)
+
+        novel: Dict[str, tuple] = {}
+        for sig, item in zip(signatures, anomalous):
+            if sig not in templates:
+                novel.setdefault(sig, item)
+        generated = await asyncio.gather(
+            *(limited(self._generate_template, item[0], item[3]) for item in novel.values()),
+            return_exceptions=True,
+        )
+        failed: Dict[str, BaseException] = {}
+        created: Dict[str, str] = {}
+        for (sig, (grow, _, _, anomalies)), template in zip(novel.items(), generated):
+            if isinstance(template, BaseException):
+                failed[sig] = template
+            elif validate_template(template, anomalies):
+                created[sig] = template
+            else:
+                logger.warning("Unusable template for %s; writing those messages per grow", sig)
+        await proactive_templates.save(self.supabase, created, model=MODEL)
+        templates.update(created)
+
+        async def message_for(sig, grow, snapshot, optimal, anomalies) -> str:
+            if sig in failed:
+                raise failed[sig]
+            if sig in templates:
+                return render(templates[sig], grow, anomalies)
+            return await limited(self._generate_proactive_message, grow, snapshot, optimal, anomalies)
+
+        results = await asyncio.gather(
+            *(message_for(sig, *item) for sig, item in zip(signatures, anomalous)),
+            return_exceptions=True,
+        )
+
+        messages, notifications = [], []
+        for (grow, _, _, anomalies), message in zip(anomalous, results):
+            if isinstance(message, BaseException):
+                logger.error("Error analyzing grow %s: %s", grow.get("id"), message)
                 errors += 1
+                continue
+            messages.append(self._system_message_row(grow["user_id"], message))
+            notifications.append(self._notification_row(grow["user_id"], grow, anomalies))
+            logger.info(
+                "Proactive alert for grow %s: %d anomalies", grow["id"], len(anomalies),
+            )
+
+        # 5. Save system chat messages and notifications in bulk
+        insert_errors = await self._insert_many("chat_messages", messages)
+        insert_errors += await self._insert_many("notifications", notifications)
 
         summary = {
-            "processed": processed,
-            "alerts_sent": alerts_sent,
+            "processed": len(checked),
+            "alerts_sent": len(messages),
             "errors": errors,
+            "insert_errors": insert_errors,
+            "llm_calls": llm_calls,
+            "template_hits": template_hits,
+            "templates_created": len(created),
+            "shard": f"{shard}/{shards}",
+            "seconds": round(time.monotonic() - started, 1),
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
         logger.info("Proactive analysis complete: %s", summary)
@@ -103,40 +206,51 @@ class ProactiveAnalysisService:
     # Data loading
     # ------------------------------------------------------------------
 
-    async def _get_active_grows(self) -> List[Dict[str, Any]]:
-        """Fetch all active grows with their AI plans."""
+    async def _get_active_grows(self, shard: int = 0, shards: int = 1) -> List[Dict[str, Any]]:
+        """Fetch the shard's active grows with their AI plans, a page at a time."""
+        grows: List[Dict[str, Any]] = []
+        after = None
         try:
-            result = await asyncio.to_thread(
-                lambda: self.supabase.table("grows")
-                .select(
-                    "id, user_id, name, strain_name, current_phase, "
-                    "medium, light_type, light_wattage, ai_plan, start_date"
+            while True:
+                result = await asyncio.to_thread(
+                    self.supabase.rpc("proactive_grows", {
+                        "shard_param": shard,
+                        "shard_count_param": shards,
+                        "after_id_param": after,
+                        "page_size_param": PAGE_SIZE,
+                    }).execute
                 )
-                .eq("status", "active")
-                .execute()
-            )
-            return result.data or []
+                page = result.data or []
+                grows.extend(page)
+                if len(page) < PAGE_SIZE:
+                    return grows
+                after = page[-1]["id"]
         except Exception as e:
             logger.error("Failed to fetch active grows: %s", e)
-            return []
-
-    async def _get_latest_snapshot(
-        self, grow_id: str,
-    ) -> Optional[Dict[str, Any]]:
-        """Get the most recent grow snapshot."""
-        try:
-            result = await asyncio.to_thread(
-                lambda: self.supabase.table("grow_snapshots")
-                .select("*")
-                .eq("grow_id", grow_id)
-                .order("recorded_at", desc=True)
-                .limit(1)
-                .execute()
-            )
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.warning("Failed to get snapshot for grow %s: %s", grow_id, e)
-            return None
+            return grows
+
+    async def _get_latest_snapshots(self, grow_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Most recent reading per grow: reading cache first, one RPC per page for the rest."""
+        snapshots: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for grow_id in grow_ids:
+            cached = reading_cache.latest(grow_id)
+            if cached is not None:
+                snapshots[grow_id] = cached.to_dict()
+            else:
+                missing.append(grow_id)
+
+        for i in range(0, len(missing), PAGE_SIZE):
+            chunk = missing[i:i + PAGE_SIZE]
+            try:
+                result = await asyncio.to_thread(
+                    self.supabase.rpc("latest_grow_readings", {"grow_ids_param": chunk}).execute
+                )
+                for row in result.data or []:
+                    snapshots[row["grow_id"]] = row["reading"]
+            except Exception as e:
+                logger.error("Failed to fetch latest readings for %d grows: %s", len(chunk), e)
+        return snapshots
 
     # ------------------------------------------------------------------
     # Range extraction & comparison
@@ -144,85 +258,39 @@ class ProactiveAnalysisService:
 
     def _extract_optimal_ranges(
         self, grow: Dict[str, Any],
-    ) -> Optional[Dict[str, Any]]:
-        """Extract optimal environmental ranges from the grow's AI plan."""
-        ai_plan = grow.get("ai_plan")
-        if not ai_plan or not isinstance(ai_plan, dict):
-            return None
-
-        current_phase = grow.get("current_phase", "vegetative")
-        phases = ai_plan.get("phases", [])
-
-        for phase_data in phases:
-            if phase_data.get("phase") == current_phase:
-                env = phase_data.get("environment", {})
-                nutr = phase_data.get("nutrients", {})
-                return {
-                    "temp_day_min": env.get("temperature_day_c", 24) - 3,
-                    "temp_day_max": env.get("temperature_day_c", 26) + 3,
-                    "temp_night_min": env.get("temperature_night_c", 18) - 3,
-                    "temp_night_max": env.get("temperature_night_c", 22) + 3,
-                    "humidity_min": max(20, env.get("humidity_percent", 60) - 15),
-                    "humidity_max": min(90, env.get("humidity_percent", 60) + 15),
-                    "vpd_min": env.get("vpd_min", 0.8),
-                    "vpd_max": env.get("vpd_max", 1.2),
-                    "ph_min": nutr.get("ph_min", 5.8),
-                    "ph_max": nutr.get("ph_max", 6.5),
-                    "ec_min": nutr.get("ec_min", 0.8),
-                    "ec_max": nutr.get("ec_max", 2.0),
-                }
-
-        return None
+    ) -> Optional[GrowThresholds]:
+        """Compiled thresholds for the grow's current phase, or None without an AI plan."""
+        table = threshold_cache.for_grow(grow)
+        return table if table.source == "plan" else None
+
+    @staticmethod
+    def _anomaly(v: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "metric": v["metric"],
+            "parameter": LABELS[v["metric"]],
+            "current": v["value"],
+            "expected_min": v["min"],
+            "expected_max": v["max"],
+            "unit": UNITS[v["metric"]],
+            "direction": v["direction"],
+            "severity": v["severity"],
+        }
 
     def _detect_anomalies(
         self,
         snapshot: Dict[str, Any],
-        optimal: Dict[str, Any],
+        optimal: GrowThresholds,
     ) -> List[Dict[str, Any]]:
-        """Compare snapshot values against optimal ranges."""
-        anomalies: List[Dict[str, Any]] = []
-
-        checks = [
-            ("temperature", "temp_day_min", "temp_day_max", "Temperature", "°C"),
-            ("humidity", "humidity_min", "humidity_max", "Humidity", "%"),
-            ("vpd", "vpd_min", "vpd_max", "VPD", "kPa"),
-            ("ph", "ph_min", "ph_max", "pH", ""),
-            ("ec", "ec_min", "ec_max", "EC", "mS/cm"),
-        ]
-
-        for field, min_key, max_key, label, unit in checks:
-            value = snapshot.get(field)
-            if value is None:
-                continue
+        """Compare snapshot values against the compiled ranges."""
+        return [self._anomaly(v) for v in optimal.check(snapshot)]
 
-            value = float(value)
-            range_min = float(optimal.get(min_key, 0))
-            range_max = float(optimal.get(max_key, 999))
-
-            if value < range_min:
-                severity = "critical" if value < range_min * 0.8 else "warning"
-                anomalies.append({
-                    "parameter": label,
-                    "current": value,
-                    "expected_min": range_min,
-                    "expected_max": range_max,
-                    "unit": unit,
-                    "direction": "low",
-                    "severity": severity,
-                })
-            elif value > range_max:
-                severity = "critical" if value > range_max * 1.2 else "warning"
-                anomalies.append({
-                    "parameter": label,
-                    "current": value,
-                    "expected_min": range_min,
-                    "expected_max": range_max,
-                    "unit": unit,
-                    "direction": "high",
-                    "severity": severity,
-                })
-
-        return anomalies
+    def _detect_anomalies_many(
+        self,
+        snapshots: List[Dict[str, Any]],
+        optimals: List[GrowThresholds],
+    ) -> List[List[Dict[str, Any]]]:
+        """`_detect_anomalies` for many grows in one vectorized pass."""
+        return [[self._anomaly(v) for v in found] for found in check_many(snapshots, optimals)]
 
     # ------------------------------------------------------------------
     # Message generation
@@ -232,7 +300,7 @@ class ProactiveAnalysisService:
         self,
         grow: Dict[str, Any],
         snapshot: Dict[str, Any],
-        optimal: Dict[str, Any],
+        optimal: GrowThresholds,
         anomalies: List[Dict[str, Any]],
     ) -> str:
         """Use Groq to generate a helpful proactive alert message."""
@@ -269,6 +337,18 @@ class ProactiveAnalysisService:
             self._call_groq_with_retry, messages,
         )
 
+    async def _generate_template(
+        self,
+        grow: Dict[str, Any],
+        anomalies: List[Dict[str, Any]],
+    ) -> str:
+        """Use Groq to write a reusable message template for an anomaly pattern."""
+        messages = [
+            {"role": "system", "content": "You are Dr. Aurora, a cannabis cultivation expert. Be concise and actionable."},
+            {"role": "user", "content": template_prompt(grow, anomalies)},
+        ]
+        return await asyncio.to_thread(self._call_groq_with_retry, messages)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -289,71 +369,59 @@ class ProactiveAnalysisService:
     # Persistence
     # ------------------------------------------------------------------
 
-    async def _save_system_message(
-        self, user_id: str, content: str,
-    ) -> None:
-        """Save a proactive message as a system chat message."""
-        try:
-            await asyncio.to_thread(
-                lambda: self.supabase.table("chat_messages")
-                .insert({
-                    "id": str(uuid4()),
-                    "user_id": user_id,
-                    "role": "system",
-                    "content": content,
-                    "metadata": {
-                        "type": "proactive_analysis",
-                        "generated_at": datetime.now(timezone.utc).isoformat(),
-                    },
-                })
-                .execute()
-            )
-        except Exception as e:
-            logger.error("Failed to save system message: %s", e)
+    @staticmethod
+    def _system_message_row(user_id: str, content: str) -> Dict[str, Any]:
+        """A proactive message as a system chat message row."""
+        return {
+            "id": str(uuid4()),
+            "user_id": user_id,
+            "role": "system",
+            "content": content,
+            "metadata": {
+                "type": "proactive_analysis",
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+            },
+        }
 
-    async def _create_notification(
-        self,
+    @staticmethod
+    def _notification_row(
         user_id: str,
         grow: Dict[str, Any],
         anomalies: List[Dict[str, Any]],
-        message: str,
-    ) -> None:
-        """Create a notification for the anomaly alert."""
-        try:
-            severity_list = [a["severity"] for a in anomalies]
-            is_critical = "critical" in severity_list
-            params = ", ".join(a["parameter"] for a in anomalies)
-
-            title = (
-                "🚨 Critical Alert" if is_critical
-                else "⚠️ Environment Alert"
-            ) + f" — {grow.get('name', 'Grow')}"
-
-            body = (
-                f"{params} out of optimal range. "
-                f"Check Dr. Aurora chat for details."
-            )
-
-            await asyncio.to_thread(
-                lambda: self.supabase.table("notifications")
-                .insert({
-                    "user_id": user_id,
-                    "type": "alert",
-                    "title": title,
-                    "body": body,
-                    "data": {
-                        "type": "proactive_alert",
-                        "grow_id": grow.get("id"),
-                        "anomalies": anomalies,
-                    },
-                    "is_read": False,
-                })
-                .execute()
-            )
-
-            # Placeholder: In production, send actual push notification
-            # via Firebase Cloud Messaging using the user's
-            # notification_token from the profiles table.
+    ) -> Dict[str, Any]:
+        """A notification row for the anomaly alert."""
+        is_critical = any(a["severity"] == "critical" for a in anomalies)
+        params = ", ".join(a["parameter"] for a in anomalies)
+
+        title = (
+            "🚨 Critical Alert" if is_critical
+            else "⚠️ Environment Alert"
+        ) + f" — {grow.get('name', 'Grow')}"
+
+        # Placeholder: In production, send actual push notification
+        # via Firebase Cloud Messaging using the user's
+        # notification_token from the profiles table.
+        return {
+            "user_id": user_id,
+            "type": "alert",
+            "title": title,
+            "body": f"{params} out of optimal range. Check Dr. Aurora chat for details.",
+            "data": {
+                "type": "proactive_alert",
+                "grow_id": grow.get("id"),
+                "anomalies": anomalies,
+            },
+            "is_read": False,
+        }
 
-        except Exception as e:
-            logger.error("Failed to create proactive notification: %s", e)
+    async def _insert_many(self, table: str, rows: List[Dict[str, Any]]) -> int:
+        """Bulk insert in chunks. Returns the number of rows that failed."""
+        failed = 0
+        for i in range(0, len(rows), INSERT_CHUNK):
+            chunk = rows[i:i + INSERT_CHUNK]
+            try:
+                await asyncio.to_thread(self.supabase.table(table).insert(chunk).execute)
+            except Exception as e:
+                failed += len(chunk)
+                logger.error("Failed to insert %d %s rows: %s", len(chunk), table, e)
+        return failed
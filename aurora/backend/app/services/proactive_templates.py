@@ -0,0 +1,186 @@
+"""
+📁 backend/app/services/proactive_templates.py
+Message templates for proactive Dr. Aurora alerts, keyed by anomaly signature.
+
+Most anomalous grows repeat a handful of patterns ("humidity high, VPD
+low in flowering, soil"). A signature canonicalizes a grow's anomalies to
+(phase, medium, [(metric, direction, severity)...]); the LLM writes one
+template per signature with placeholders such as {humidity_current}, and
+each grow's numbers are filled in locally. Templates are kept in memory
+and persisted in `proactive_message_templates`, so later runs (and other
+shards) reuse them.
+"""
+
+import asyncio
+import logging
+import string
+from typing import Any, Optional
+
+from cachetools import TTLCache
+from supabase import Client
+
+from app.services.threshold_service import LABELS, UNITS
+
+logger = logging.getLogger("aurora.proactive")
+
+TABLE = "proactive_message_templates"
+
+GROW_FIELDS = ("grow_name", "strain")
+VALUE_FIELDS = ("current", "min", "max")
+
+
+def anomaly_signature(grow: dict, anomalies: list[dict]) -> str:
+    """Canonical key for a grow's anomaly pattern; independent of order and values."""
+    phase = (grow.get("current_phase") or "vegetative").strip().lower()
+    medium = (grow.get("medium") or "unknown").strip().lower()
+    parts = sorted(f"{a['metric']}:{a['direction']}:{a['severity']}" for a in anomalies)
+    return f"{phase}|{medium}|{';'.join(parts)}"
+
+
+def allowed_fields(anomalies: list[dict]) -> set[str]:
+    return set(GROW_FIELDS) | {f"{a['metric']}_{f}" for a in anomalies for f in VALUE_FIELDS}
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def template_values(grow: dict, anomalies: list[dict]) -> dict[str, str]:
+    values = {
+        "grow_name": grow.get("name") or "your grow",
+        "strain": grow.get("strain_name") or "your strain",
+    }
+    for a in anomalies:
+        values[f"{a['metric']}_current"] = _fmt(a["current"])
+        values[f"{a['metric']}_min"] = _fmt(a["expected_min"])
+        values[f"{a['metric']}_max"] = _fmt(a["expected_max"])
+    return values
+
+
+def validate_template(template: str, anomalies: list[dict]) -> bool:
+    """
+    True if the template parses, uses only placeholders we can fill, with
+    no format spec or conversion (values are strings), and renders.
+    """
+    if not template or not template.strip():
+        return False
+    try:
+        fields = list(string.Formatter().parse(template))
+    except ValueError:
+        return False
+    for _, name, spec, conversion in fields:
+        if name is not None and (spec or conversion):
+            return False
+    if not {name for _, name, _, _ in fields if name is not None} <= allowed_fields(anomalies):
+        return False
+    try:
+        render(template, {}, anomalies)
+    except (KeyError, IndexError, ValueError):
+        return False
+    return True
+
+
+def render(template: str, grow: dict, anomalies: list[dict]) -> str:
+    return template.format_map(template_values(grow, anomalies))
+
+
+def template_prompt(grow: dict, anomalies: list[dict]) -> str:
+    """Prompt asking the LLM for a reusable template for this anomaly pattern."""
+    lines = []
+    for a in anomalies:
+        m = a["metric"]
+        lines.append(
+            f"- {LABELS[m]}: {'too low' if a['direction'] == 'low' else 'too high'}, "
+            f"severity {a['severity']}. Current value {{{m}_current}}{UNITS[m]}, "
+            f"optimal range {{{m}_min}}-{{{m}_max}}{UNITS[m]}"
+        )
+    return (
+        f"You are Dr. Aurora, a cannabis cultivation AI doctor.\n"
+        f"Write a reusable proactive alert template for growers whose plants show this pattern.\n\n"
+        f"Phase: {grow.get('current_phase', 'Unknown')}\n"
+        f"Medium: {grow.get('medium', 'Unknown')}\n\n"
+        f"Anomalies detected:\n" + "\n".join(lines) + "\n\n"
+        f"Write a warm but urgent message that:\n"
+        f"1. Lists what's wrong\n"
+        f"2. Explains the potential impact on the plants\n"
+        f"3. Gives 2-3 specific corrective actions\n"
+        f"4. Ends with encouragement\n\n"
+        f"Keep it under 200 words. Use emoji sparingly.\n"
+        f"Refer to the grow as {{grow_name}} and the strain as {{strain}}. Write every "
+        f"number with the placeholders above, exactly as shown in braces; use no other "
+        f"braces and no other numbers for the readings."
+    )
+
+
+class TemplateStore:
+    """signature → template, in memory, backed by `proactive_message_templates`."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 86_400):
+        self._templates: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stats = {"hits": 0, "loaded": 0, "saved": 0, "discarded": 0}
+
+    async def get_many(self, supabase: Client, signatures: list[str]) -> dict[str, str]:
+        """Templates for the given signatures; misses are loaded with one query."""
+        found: dict[str, str] = {}
+        missing = []
+        for sig in dict.fromkeys(signatures):
+            cached = self._templates.get(sig)
+            if cached is not None:
+                self._stats["hits"] += 1
+                found[sig] = cached
+            else:
+                missing.append(sig)
+
+        if missing:
+            try:
+                result = await asyncio.to_thread(
+                    supabase.table(TABLE).select("signature, template").in_("signature", missing).execute
+                )
+                for row in result.data or []:
+                    self._templates[row["signature"]] = found[row["signature"]] = row["template"]
+                    self._stats["loaded"] += 1
+            except Exception as e:
+                logger.warning("Failed to load %d proactive templates: %s", len(missing), e)
+        return found
+
+    async def save(self, supabase: Client, templates: dict[str, str], model: Optional[str] = None) -> None:
+        """Remember new templates locally and persist them (first writer wins)."""
+        if not templates:
+            return
+        self._templates.update(templates)
+        rows: list[dict[str, Any]] = [
+            {"signature": sig, "template": tpl, "model": model} for sig, tpl in templates.items()
+        ]
+        try:
+            await asyncio.to_thread(
+                supabase.table(TABLE).upsert(rows, on_conflict="signature", ignore_duplicates=True).execute
+            )
+            self._stats["saved"] += len(rows)
+        except Exception as e:
+            logger.warning("Failed to persist %d proactive templates: %s", len(rows), e)
+
+    async def discard(self, supabase: Client, signatures: list[str]) -> None:
+        """Forget templates that no longer render and delete them, so they get regenerated."""
+        if not signatures:
+            return
+        for sig in signatures:
+            self._templates.pop(sig, None)
+        self._stats["discarded"] += len(signatures)
+        try:
+            await asyncio.to_thread(
+                supabase.table(TABLE).delete().in_("signature", signatures).execute
+            )
+        except Exception as e:
+            logger.warning("Failed to delete %d proactive templates: %s", len(signatures), e)
+
+    def clear(self) -> None:
+        self._templates.clear()
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["cached"] = len(self._templates)
+        return s
+
+
+# Global instance
+proactive_templates = TemplateStore()
@@ -0,0 +1,263 @@
+"""
+📁 backend/app/services/rollup_service.py
+Sensor rollups — per-grow, per-metric aggregates at 1m / 1h / 1d.
+
+Ingest paths pre-aggregate each batch in memory and merge it with one
+`apply_sensor_rollups` RPC. A periodic backfill recomputes recent buckets
+from raw data (repairing anything an ingest missed), and history queries
+read rollups instead of scanning raw `sensor_readings`.
+"""
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from supabase import Client
+
+from app.utils.downsample import METRICS, parse_timestamps
+
+logger = logging.getLogger("aurora.rollups")
+
+GRANULARITIES = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# Raw readings older than this are purged; rollups are kept.
+RAW_RETENTION_DAYS = 30
+MINUTE_ROLLUP_RETENTION_DAYS = 14
+
+# PostgREST caps responses at 1000 rows; reads page through with .range()
+PAGE_SIZE = 1000
+
+
+def _bucket_iso(epoch: float, width: int) -> str:
+    return datetime.fromtimestamp(epoch // width * width, tz=timezone.utc).isoformat()
+
+
+# ── Incremental Updates ────────────────────────────────────────
+
+def compute_deltas(rows: list[dict], now: Optional[datetime] = None) -> list[dict]:
+    """
+    Pre-aggregate readings into rollup deltas, one per
+    (grow, granularity, metric, bucket). Rows without `created_at`
+    are stamped with `now`.
+    """
+    if not rows:
+        return []
+
+    stamp = (now or datetime.now(timezone.utc)).isoformat()
+    times = parse_timestamps([r.get("created_at") or stamp for r in rows])
+
+    deltas: dict[tuple, dict] = {}
+    for row, ts in zip(rows, times):
+        grow_id = row.get("grow_id")
+        if not grow_id:
+            continue
+        for metric in METRICS:
+            value = row.get(metric)
+            if value is None:
+                continue
+            value = float(value)
+            for name, width in GRANULARITIES.items():
+                key = (grow_id, name, metric, ts // width)
+                d = deltas.get(key)
+                if d is None:
+                    deltas[key] = {
+                        "grow_id": grow_id,
+                        "granularity": name,
+                        "metric": metric,
+                        "bucket_start": _bucket_iso(ts, width),
+                        "count": 1,
+                        "sum": value,
+                        "sum_sq": value * value,
+                        "min": value,
+                        "max": value,
+                        "last": value,
+                        "_last_ts": ts,
+                    }
+                    continue
+                d["count"] += 1
+                d["sum"] += value
+                d["sum_sq"] += value * value
+                d["min"] = min(d["min"], value)
+                d["max"] = max(d["max"], value)
+                if ts >= d["_last_ts"]:
+                    d["last"], d["_last_ts"] = value, ts
+
+    out = []
+    for d in deltas.values():
+        last_ts = d.pop("_last_ts")
+        d["last_at"] = datetime.fromtimestamp(last_ts, tz=timezone.utc).isoformat()
+        out.append(d)
+    return out
+
+
+async def record(supabase: Client, rows: list[dict]) -> int:
+    """
+    Fold freshly inserted readings into the rollups with one RPC.
+    Failures are logged, not raised: the backfill job repairs them.
+    Returns the number of rollup rows touched.
+    """
+    deltas = compute_deltas(rows)
+    if not deltas:
+        return 0
+    try:
+        await asyncio.to_thread(
+            supabase.rpc("apply_sensor_rollups", {"deltas": deltas}).execute
+        )
+        return len(deltas)
+    except Exception as e:
+        logger.error("Rollup update failed (%d deltas): %s", len(deltas), e)
+        return 0
+
+
+# ── Backfill & Retention ───────────────────────────────────────
+
+async def backfill(supabase: Client, since: datetime, until: datetime) -> int:
+    """Recompute every bucket overlapping [since, until] from raw readings."""
+    result = await asyncio.to_thread(
+        supabase.rpc(
+            "backfill_sensor_rollups",
+            {"since": since.isoformat(), "until": until.isoformat()},
+        ).execute
+    )
+    return int(result.data or 0)
+
+
+async def purge_raw(
+    supabase: Client,
+    raw_days: int = RAW_RETENTION_DAYS,
+    minute_rollup_days: int = MINUTE_ROLLUP_RETENTION_DAYS,
+) -> int:
+    """Drop raw readings past retention. Returns the number deleted."""
+    result = await asyncio.to_thread(
+        supabase.rpc(
+            "purge_sensor_readings",
+            {"raw_days": raw_days, "minute_rollup_days": minute_rollup_days},
+        ).execute
+    )
+    return int(result.data or 0)
+
+
+# ── Reads ──────────────────────────────────────────────────────
+
+def source_granularity(bucket_seconds: int) -> Optional[str]:
+    """Coarsest rollup granularity that evenly divides the requested width."""
+    best = None
+    for name, width in GRANULARITIES.items():
+        if width <= bucket_seconds and bucket_seconds % width == 0:
+            best = name
+    return best
+
+
+async def fetch(
+    supabase: Client,
+    grow_id: str,
+    granularity: str,
+    since: datetime,
+    metrics: tuple[str, ...] = METRICS,
+) -> list[dict]:
+    """Rollup rows for a grow and the given metrics, oldest bucket first."""
+    rows: list[dict] = []
+    start = 0
+    while True:
+        result = await asyncio.to_thread(
+            supabase.table("sensor_rollups")
+            .select("metric, bucket_start, count, sum, sum_sq, min, max, last, last_at")
+            .eq("grow_id", grow_id)
+            .eq("granularity", granularity)
+            .in_("metric", list(metrics))
+            .gte("bucket_start", since.isoformat())
+            .order("bucket_start", desc=False)
+            .order("metric", desc=False)
+            .range(start, start + PAGE_SIZE - 1)
+            .execute
+        )
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def to_buckets(
+    rollups: list[dict],
+    bucket_seconds: int,
+    metrics: tuple[str, ...] = METRICS,
+) -> list[dict]:
+    """
+    Merge rollup rows into `bucket_seconds`-wide buckets, in the same shape
+    as `downsample.bucket_aggregate` (plus a per-metric `std`).
+    """
+    if not rollups:
+        return []
+
+    starts = parse_timestamps([r["bucket_start"] for r in rollups])
+    merged: dict[int, dict[str, dict]] = {}
+    for row, ts in zip(rollups, starts):
+        b = int(ts // bucket_seconds)
+        acc = merged.setdefault(b, {}).get(row["metric"])
+        last_at = row.get("last_at") or row["bucket_start"]
+        if acc is None:
+            merged[b][row["metric"]] = {
+                "count": row["count"], "sum": row["sum"], "sum_sq": row.get("sum_sq") or 0.0,
+                "min": row["min"], "max": row["max"], "last": row["last"], "last_at": last_at,
+            }
+            continue
+        acc["count"] += row["count"]
+        acc["sum"] += row["sum"]
+        acc["sum_sq"] += row.get("sum_sq") or 0.0
+        acc["min"] = min(acc["min"], row["min"])
+        acc["max"] = max(acc["max"], row["max"])
+        if last_at >= acc["last_at"]:
+            acc["last"], acc["last_at"] = row["last"], last_at
+
+    buckets = []
+    for b in sorted(merged):
+        per_metric = merged[b]
+        bucket = {
+            "bucket_start": datetime.fromtimestamp(b * bucket_seconds, tz=timezone.utc).isoformat(),
+            "count": max(acc["count"] for acc in per_metric.values()),
+        }
+        for metric in metrics:
+            acc = per_metric.get(metric)
+            if acc is None or not acc["count"]:
+                bucket[metric] = None
+                continue
+            mean = acc["sum"] / acc["count"]
+            var = max(acc["sum_sq"] / acc["count"] - mean * mean, 0.0)
+            bucket[metric] = {
+                "min": round(acc["min"], 3),
+                "max": round(acc["max"], 3),
+                "mean": round(mean, 3),
+                "last": round(acc["last"], 3),
+                "std": round(math.sqrt(var), 3),
+            }
+        buckets.append(bucket)
+    return buckets
+
+
+async def history_buckets(
+    supabase: Client,
+    grow_id: str,
+    bucket_seconds: int,
+    hours: int,
+    metrics: tuple[str, ...] = METRICS,
+) -> Optional[list[dict]]:
+    """
+    Serve bucketed history from rollups. Returns None when no rollup
+    granularity fits the width or no rollups exist yet (caller falls back
+    to raw rows).
+    """
+    granularity = source_granularity(bucket_seconds)
+    if granularity is None:
+        return None
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    # Include the partially covered first bucket
+    since = datetime.fromtimestamp(
+        since.timestamp() // bucket_seconds * bucket_seconds, tz=timezone.utc
+    )
+    rollups = await fetch(supabase, grow_id, granularity, since, metrics)
+    if not rollups:
+        return None
+    return to_buckets(rollups, bucket_seconds, metrics)
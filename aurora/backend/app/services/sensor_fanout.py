@@ -0,0 +1,112 @@
+"""
+📁 backend/app/services/sensor_fanout.py
+Real-time sensor fan-out over the WebSocket manager.
+
+Ingestion hands every stored reading and raised alert to this service:
+  * readings are folded into the per-grow reading cache
+    (app/core/reading_cache.py), which serves GET /sensors/latest
+  * readings are published on the grow's channel ("grow:<id>"), coalesced
+    so a fast sensor pushes at most `max_updates_per_second` per grow —
+    intermediate readings are replaced by the newest one
+  * alerts are published immediately (the dispatcher already deduplicates)
+
+Sends run as background tasks, so a slow socket never delays ingestion.
+"""
+
+import asyncio
+import logging
+import time
+
+from cachetools import LRUCache
+
+from app.core.reading_cache import reading_cache
+from app.core.socket_manager import socket_manager
+
+logger = logging.getLogger("aurora.sockets")
+
+
+def grow_channel(grow_id: str) -> str:
+    return f"grow:{grow_id}"
+
+
+class SensorFanout:
+    """Coalesced per-grow publishing of readings and alerts."""
+
+    def __init__(self, max_updates_per_second: float = 2.0, max_grows: int = 50_000):
+        self.min_interval = 1.0 / max_updates_per_second
+        self._last_sent: LRUCache = LRUCache(maxsize=max_grows)
+        self._pending: dict[str, dict] = {}
+        self._timers: dict[str, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._stats = {"readings": 0, "published": 0, "coalesced": 0, "alerts_published": 0}
+
+    # -- Publishing -------------------------------------------------
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, grow_id: str, row: dict) -> None:
+        self._last_sent[grow_id] = time.monotonic()
+        self._stats["published"] += 1
+        await socket_manager.publish(
+            grow_channel(grow_id),
+            {"type": "sensor_reading", "grow_id": grow_id, "reading": row},
+        )
+
+    async def _flush_later(self, grow_id: str, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+            row = self._pending.pop(grow_id, None)
+            if row is not None:
+                await self._send(grow_id, row)
+        finally:
+            self._timers.pop(grow_id, None)
+
+    def publish_readings(self, rows: list[dict]) -> None:
+        """Cache stored readings and publish the newest per grow to its subscribers."""
+        self._stats["readings"] += len(rows)
+        for grow_id, reading in reading_cache.add(rows).items():
+            row = reading.to_dict()
+            if not socket_manager.has_subscribers(grow_channel(grow_id)):
+                continue
+
+            if grow_id in self._timers:
+                # A send is already scheduled: replace what it will send
+                if grow_id in self._pending:
+                    self._stats["coalesced"] += 1
+                self._pending[grow_id] = row
+                continue
+
+            wait = self._last_sent.get(grow_id, -float("inf")) + self.min_interval - time.monotonic()
+            if wait <= 0:
+                self._last_sent[grow_id] = time.monotonic()
+                self._spawn(self._send(grow_id, row))
+            else:
+                self._pending[grow_id] = row
+                task = asyncio.create_task(self._flush_later(grow_id, wait))
+                self._timers[grow_id] = task
+
+    def publish_alerts(self, alerts: list[dict]) -> None:
+        """Publish alerts to their grows' subscribers, one message per grow."""
+        by_grow: dict[str, list[dict]] = {}
+        for alert in alerts:
+            by_grow.setdefault(alert["grow_id"], []).append(alert)
+        for grow_id, grow_alerts in by_grow.items():
+            channel = grow_channel(grow_id)
+            if not socket_manager.has_subscribers(channel):
+                continue
+            self._stats["alerts_published"] += len(grow_alerts)
+            self._spawn(socket_manager.publish(
+                channel, {"type": "sensor_alerts", "grow_id": grow_id, "alerts": grow_alerts},
+            ))
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["channels"] = len(socket_manager.channels)
+        return s
+
+
+# Global instance
+sensor_fanout = SensorFanout()
@@ -0,0 +1,175 @@
+"""
+📁 backend/app/services/sensor_ingest_service.py
+Batch sensor ingestion — many readings, grows and timestamps per request.
+
+A batch is validated item by item, VPD is computed for the whole batch in
+one vectorized pass, accepted rows go to Supabase in a single insert (and
+into the rollups with one RPC) and alerts are evaluated for the batch at once.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+
+import numpy as np
+from pydantic import ValidationError
+from supabase import Client
+
+from app.models import SensorReading
+from app.services import rollup_service
+from app.services.achievement_engine import achievement_engine
+from app.services.alert_service import AlertService
+from app.services.sensor_fanout import sensor_fanout
+from app.services.threshold_service import threshold_cache
+from app.utils.vpd import vpd_kpa_array
+
+logger = logging.getLogger("aurora.sensors.ingest")
+
+MAX_BATCH_SIZE = 1000
+
+
+class BatchFormatError(ValueError):
+    """Raised when a batch body cannot be parsed."""
+
+
+# ── Parsing ────────────────────────────────────────────────────
+
+def parse_batch(body: bytes, content_type: str = "") -> list[Any]:
+    """
+    Accepts a JSON array, an object with a "readings" array, or NDJSON
+    (one JSON object per line). Returns the raw, unvalidated items.
+    """
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        return _parse_ndjson(text)
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # Controllers don't always set the NDJSON content type
+        return _parse_ndjson(text)
+
+    if isinstance(data, dict):
+        data = data.get("readings")
+    if not isinstance(data, list):
+        raise BatchFormatError('Expected a JSON array, {"readings": [...]} or NDJSON')
+    return data
+
+
+def _parse_ndjson(text: str) -> list[Any]:
+    items = []
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise BatchFormatError(f"Invalid JSON on line {lineno}: {e.msg}")
+    return items
+
+
+# ── Ingestion ──────────────────────────────────────────────────
+
+def _validation_message(e: ValidationError) -> str:
+    err = e.errors()[0]
+    loc = ".".join(str(part) for part in err.get("loc", ()))
+    return f"{loc}: {err.get('msg')}" if loc else err.get("msg", "invalid reading")
+
+
+async def owned_grow_ids(supabase: Client, user_id: str, grow_ids: set[str]) -> set[str]:
+    """Return the subset of grow_ids that belong to user_id."""
+    if not grow_ids:
+        return set()
+    result = await asyncio.to_thread(
+        supabase.table("grows").select("id, current_phase, updated_at")
+        .eq("user_id", user_id).in_("id", sorted(grow_ids)).execute
+    )
+    # Phase or plan changes since the thresholds were compiled drop them here
+    threshold_cache.validate(result.data or [])
+    return {g["id"] for g in result.data or []}
+
+
+async def ingest_batch(supabase: Client, user_id: str, items: list[Any]) -> dict:
+    """
+    Validate, enrich and store a batch of readings.
+
+    Returns: { accepted, rejected, alerts, results: [{ index, ok, ... }] }
+    with one result per input item, in input order.
+    """
+    results: list[Optional[dict]] = [None] * len(items)
+    rows: list[dict] = []
+    row_index: list[int] = []
+
+    for i, raw in enumerate(items):
+        try:
+            reading = SensorReading.model_validate(raw)
+        except ValidationError as e:
+            results[i] = {"index": i, "ok": False, "error": _validation_message(e)}
+            continue
+
+        row = reading.model_dump(exclude_none=True, exclude={"recorded_at"})
+        row["user_id"] = user_id
+        if reading.recorded_at is not None:
+            row["created_at"] = reading.recorded_at.isoformat()
+        rows.append(row)
+        row_index.append(i)
+
+    # Only store readings for grows the caller owns
+    owned = await owned_grow_ids(supabase, user_id, {r["grow_id"] for r in rows})
+    kept_rows, kept_index = [], []
+    for row, i in zip(rows, row_index):
+        if row["grow_id"] in owned:
+            kept_rows.append(row)
+            kept_index.append(i)
+        else:
+            results[i] = {"index": i, "ok": False, "error": "grow_id: grow not found"}
+    rows, row_index = kept_rows, kept_index
+
+    # One vectorized VPD pass for the batch
+    if rows:
+        temps = np.array([r.get("temperature", np.nan) for r in rows], dtype=np.float64)
+        hums = np.array([r.get("humidity", np.nan) for r in rows], dtype=np.float64)
+        vpds = np.round(vpd_kpa_array(temps, hums), 2)
+        for row, vpd in zip(rows, vpds):
+            if not np.isnan(vpd):
+                row["vpd"] = float(vpd)
+
+    alerts_by_row: list[list[dict]] = [[] for _ in rows]
+    if rows:
+        result = await asyncio.to_thread(
+            supabase.table("sensor_readings").insert(rows).execute
+        )
+        stored = result.data or rows
+        await rollup_service.record(supabase, stored)
+        sensor_fanout.publish_readings(stored)
+        achievement_engine.emit(supabase, user_id, "sensor_readings", len(rows))
+
+        alerts_by_row = await AlertService.check_sensor_readings_batch(user_id, rows)
+
+        for n, i in enumerate(row_index):
+            saved = stored[n] if n < len(stored) else rows[n]
+            results[i] = {
+                "index": i,
+                "ok": True,
+                "id": saved.get("id"),
+                "grow_id": saved.get("grow_id"),
+                "vpd": saved.get("vpd"),
+                "alerts": len(alerts_by_row[n]),
+            }
+
+    accepted = len(rows)
+    logger.info(
+        "📥 Batch ingest for %s: %d accepted, %d rejected",
+        user_id[:8], accepted, len(items) - accepted,
+    )
+    return {
+        "accepted": accepted,
+        "rejected": len(items) - accepted,
+        "alerts": sum(len(a) for a in alerts_by_row),
+        "results": results,
+    }
@@ -0,0 +1,144 @@
+"""
+📁 backend/app/services/task_generation_service.py
+Daily task generation for every user with an active grow, set-based.
+
+One paged read of active grows, one query for the users that already
+have tasks on the date, task rows built in memory from phase templates,
+then paged bulk upserts. The (grow_id, task_date, title) unique index
+makes reruns and overlapping runs idempotent.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from supabase import Client
+
+from app.core.job_runner import report_progress
+
+logger = logging.getLogger("aurora.tasks")
+
+PAGE_SIZE = 1000
+INSERT_CONCURRENCY = 4
+
+# (title, description, scheduled_time, is_critical)
+BASE_TASKS = (
+    ("Check plant health", "Inspect leaves for discoloration, pests, or stress signs", "08:00", False),
+    ("Log environmental data", "Record temperature, humidity, and VPD readings", "09:00", True),
+    ("Check water / moisture", "Check soil moisture or reservoir levels, water if needed", "10:00", False),
+    ("Take daily photo", "Document plant growth with a photo for the grow gallery", "12:00", False),
+)
+
+PHASE_TEMPLATES = {
+    "vegetative": BASE_TASKS + (
+        ("Training check", "Adjust LST ties, check SCROG screen, or plan next topping", "11:00", False),
+    ),
+    "flowering": BASE_TASKS + (
+        ("Check trichomes", "Use magnifier to check trichome color (clear → cloudy → amber)", "11:00", False),
+        ("Inspect for mold", "Check dense buds for signs of botrytis or powdery mildew", "14:00", True),
+    ),
+    "drying": (
+        ("Check drying conditions", "Verify 18-20°C and 55-65% humidity in drying area", "09:00", True),
+        ("Burp curing jars", "Open jars for 10-15 minutes to exchange air", "12:00", False),
+    ),
+}
+
+PHASE_ALIASES = {
+    "veg": "vegetative",
+    "flower": "flowering",
+    "bloom": "flowering",
+    "curing": "drying",
+}
+
+
+def templates_for_phase(phase: Optional[str]) -> tuple:
+    phase = PHASE_ALIASES.get(phase, phase)
+    return PHASE_TEMPLATES.get(phase, BASE_TASKS)
+
+
+def build_tasks(user_id: str, grow_id: str, phase: Optional[str], today: str) -> list[dict]:
+    """Task rows for one grow on one day."""
+    return [
+        {
+            "user_id": user_id,
+            "grow_id": grow_id,
+            "title": title,
+            "description": description,
+            "scheduled_time": scheduled_time,
+            "is_critical": is_critical,
+            "is_completed": False,
+            "task_date": today,
+        }
+        for title, description, scheduled_time, is_critical in templates_for_phase(phase)
+    ]
+
+
+async def _paged(query_fn) -> list[dict]:
+    rows, start = [], 0
+    while True:
+        result = await asyncio.to_thread(query_fn().range(start, start + PAGE_SIZE - 1).execute)
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+async def _active_grows(supabase: Client) -> list[dict]:
+    return await _paged(
+        lambda: supabase.table("grows").select("id, user_id, current_phase").eq("status", "active").order("id")
+    )
+
+
+async def generate_daily_tasks(supabase: Client, today: str) -> dict:
+    """
+    Create `today`'s tasks for every user with active grows who has none yet.
+    Returns: { users, skipped_users, grows, tasks, pages }
+    """
+    grows = await _active_grows(supabase)
+    if not grows:
+        return {"users": 0, "skipped_users": 0, "grows": 0, "tasks": 0, "pages": 0}
+
+    existing = await _paged(lambda: supabase.rpc("users_with_tasks_on", {"task_date_param": today}))
+    done = {row["user_id"] for row in existing}
+
+    users: set[str] = set()
+    rows: list[dict] = []
+    for grow in grows:
+        user_id = grow.get("user_id")
+        if not user_id or user_id in done:
+            continue
+        users.add(user_id)
+        rows.extend(build_tasks(user_id, grow["id"], grow.get("current_phase"), today))
+
+    semaphore = asyncio.Semaphore(INSERT_CONCURRENCY)
+
+    pages = [rows[i:i + PAGE_SIZE] for i in range(0, len(rows), PAGE_SIZE)]
+    written = 0
+
+    async def insert(page: list[dict]) -> int:
+        nonlocal written
+        async with semaphore:
+            result = await asyncio.to_thread(
+                supabase.table("daily_tasks")
+                .upsert(page, on_conflict="grow_id,task_date,title", ignore_duplicates=True)
+                .execute
+            )
+            written += 1
+            report_progress(pages_written=written, pages=len(pages))
+            return len(result.data or [])
+
+    created = await asyncio.gather(*(insert(page) for page in pages))
+
+    summary = {
+        "users": len(users),
+        "skipped_users": len({g.get("user_id") for g in grows} & done),
+        "grows": len(grows),
+        "tasks": sum(created),
+        "pages": len(pages),
+    }
+    logger.info(
+        "📋 Daily tasks for %s: %d tasks for %d users (%d already had tasks)",
+        today, summary["tasks"], summary["users"], summary["skipped_users"],
+    )
+    return summary
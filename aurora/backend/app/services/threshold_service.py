@@ -0,0 +1,243 @@
+"""
+📁 backend/app/services/threshold_service.py
+Per-grow alert thresholds compiled from the AI plan's current phase.
+
+The plan JSON is walked once per (grow, phase, plan revision) and turned
+into NumPy bound arrays. Real-time alerts and the proactive analyzer share
+the compiled tables through an in-memory cache that is invalidated when a
+grow's phase or plan changes (tracked by `grows.updated_at`).
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+from cachetools import TTLCache
+from supabase import Client
+
+logger = logging.getLogger("aurora.thresholds")
+
+
+# ── Defaults ────────────────────────────────────────────────────
+
+# Used for grows without an AI plan (or without the current phase in it)
+DEFAULT_THRESHOLDS = {
+    "temperature": {"min": 18.0, "max": 30.0, "unit": "°C"},
+    "humidity": {"min": 40.0, "max": 70.0, "unit": "%"},
+    "ph": {"min": 5.8, "max": 6.8, "unit": ""},
+    "vpd": {"min": 0.4, "max": 1.6, "unit": "kPa"},
+}
+
+METRICS = ("temperature", "humidity", "vpd", "ph", "ec")
+UNITS = {"temperature": "°C", "humidity": "%", "vpd": "kPa", "ph": "", "ec": "mS/cm"}
+LABELS = {"temperature": "Temperature", "humidity": "Humidity", "vpd": "VPD", "ph": "pH", "ec": "EC"}
+
+GROW_COLUMNS = "id, current_phase, ai_plan, updated_at"
+
+
+# ── Compiled Table ──────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class GrowThresholds:
+    """
+    Bounds for one grow in its current phase. Metrics without a bound
+    hold -inf/+inf, so comparisons never need special cases.
+    """
+
+    grow_id: Optional[str]
+    phase: Optional[str]
+    signature: tuple
+    lo: np.ndarray
+    hi: np.ndarray
+    source: str                     # "plan" | "default"
+    limits: dict = field(compare=False)
+
+    def check(self, reading: dict) -> list[dict]:
+        """Out-of-range metrics in `reading`, via one vectorized comparison."""
+        values = np.array(
+            [np.nan if reading.get(m) is None else float(reading[m]) for m in METRICS],
+            dtype=np.float64,
+        )
+        low = values < self.lo
+        high = values > self.hi
+        out = []
+        for i in np.flatnonzero(low | high):
+            value, lo, hi = float(values[i]), float(self.lo[i]), float(self.hi[i])
+            is_low = bool(low[i])
+            out.append({
+                "metric": METRICS[i],
+                "value": value,
+                "min": lo,
+                "max": hi,
+                "direction": "low" if is_low else "high",
+                "severity": (
+                    "critical" if (value < lo * 0.8 if is_low else value > hi * 1.2)
+                    else "warning"
+                ),
+            })
+        return out
+
+
+def check_many(readings: list[dict], tables: list[GrowThresholds]) -> list[list[dict]]:
+    """
+    `tables[i].check(readings[i])` for every i, as one comparison over
+    (readings × metrics) matrices instead of a loop of small ones.
+    """
+    if not readings:
+        return []
+    values = np.array(
+        [[np.nan if r.get(m) is None else float(r[m]) for m in METRICS] for r in readings],
+        dtype=np.float64,
+    )
+    lo = np.stack([t.lo for t in tables])
+    hi = np.stack([t.hi for t in tables])
+    low = values < lo
+    high = values > hi
+    critical = np.where(low, values < lo * 0.8, values > hi * 1.2)
+
+    out: list[list[dict]] = [[] for _ in readings]
+    for row, col in zip(*np.nonzero(low | high)):
+        is_low = bool(low[row, col])
+        out[row].append({
+            "metric": METRICS[col],
+            "value": float(values[row, col]),
+            "min": float(lo[row, col]),
+            "max": float(hi[row, col]),
+            "direction": "low" if is_low else "high",
+            "severity": "critical" if critical[row, col] else "warning",
+        })
+    return out
+
+
+def _table(grow_id, phase, signature, bounds: dict, source: str) -> GrowThresholds:
+    lo = np.full(len(METRICS), -np.inf)
+    hi = np.full(len(METRICS), np.inf)
+    limits = {}
+    for i, metric in enumerate(METRICS):
+        if metric in bounds:
+            lo[i], hi[i] = bounds[metric]
+            limits[metric] = {"min": lo[i].item(), "max": hi[i].item(), "unit": UNITS[metric]}
+    return GrowThresholds(grow_id, phase, signature, lo, hi, source, limits)
+
+
+DEFAULT_TABLE = _table(
+    None, None, (), {m: (v["min"], v["max"]) for m, v in DEFAULT_THRESHOLDS.items()}, "default",
+)
+
+
+def _signature(grow: dict) -> tuple:
+    return (grow.get("current_phase"), grow.get("updated_at"))
+
+
+def compile_thresholds(grow: dict) -> GrowThresholds:
+    """Walk the AI plan once and compile bounds for the grow's current phase."""
+    grow_id = grow.get("id")
+    phase = grow.get("current_phase") or "vegetative"
+    ai_plan = grow.get("ai_plan")
+
+    phase_data = None
+    if isinstance(ai_plan, dict):
+        phase_data = next(
+            (p for p in ai_plan.get("phases", []) if p.get("phase") == phase), None
+        )
+    if phase_data is None:
+        return GrowThresholds(
+            grow_id, phase, _signature(grow), DEFAULT_TABLE.lo, DEFAULT_TABLE.hi,
+            "default", DEFAULT_TABLE.limits,
+        )
+
+    env: dict[str, Any] = phase_data.get("environment", {}) or {}
+    nutr: dict[str, Any] = phase_data.get("nutrients", {}) or {}
+    day = env.get("temperature_day_c", 26)
+    night = env.get("temperature_night_c", day)
+    humidity = env.get("humidity_percent", 60)
+
+    bounds = {
+        # Night temperatures are legitimately lower than day ones
+        "temperature": (min(day, night) - 3, max(day, night) + 3),
+        "humidity": (max(20, humidity - 15), min(90, humidity + 15)),
+        "vpd": (env.get("vpd_min", 0.8), env.get("vpd_max", 1.2)),
+        "ph": (nutr.get("ph_min", 5.8), nutr.get("ph_max", 6.5)),
+        "ec": (nutr.get("ec_min", 0.8), nutr.get("ec_max", 2.0)),
+    }
+    return _table(grow_id, phase, _signature(grow), bounds, "plan")
+
+
+# ── Cache ───────────────────────────────────────────────────────
+
+class ThresholdCache:
+    """
+    grow_id → GrowThresholds. Entries are replaced when a grow row with a
+    different (current_phase, updated_at) signature is seen, dropped by
+    `invalidate`, and expire after `ttl` as a backstop for changes made
+    outside the backend.
+    """
+
+    def __init__(self, maxsize: int = 20_000, ttl: float = 600):
+        self._tables: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stats = {"hits": 0, "compiled": 0, "invalidations": 0}
+
+    def for_grow(self, grow: dict) -> GrowThresholds:
+        """Table for a grow row the caller already has (must include ai_plan)."""
+        cached = self._tables.get(grow["id"])
+        if cached is not None and cached.signature == _signature(grow):
+            self._stats["hits"] += 1
+            return cached
+        table = compile_thresholds(grow)
+        self._stats["compiled"] += 1
+        self._tables[grow["id"]] = table
+        return table
+
+    def validate(self, grows: list[dict]) -> None:
+        """Drop entries whose phase/plan changed, given rows with the signature columns."""
+        for grow in grows:
+            cached = self._tables.get(grow.get("id"))
+            if cached is not None and cached.signature != _signature(grow):
+                self.invalidate(grow["id"])
+
+    async def get_many(self, supabase: Client, grow_ids: list[str]) -> dict[str, GrowThresholds]:
+        """Tables for many grows; misses are loaded with a single query."""
+        tables: dict[str, GrowThresholds] = {}
+        missing = []
+        for grow_id in dict.fromkeys(grow_ids):
+            cached = self._tables.get(grow_id)
+            if cached is not None:
+                self._stats["hits"] += 1
+                tables[grow_id] = cached
+            else:
+                missing.append(grow_id)
+
+        if missing:
+            try:
+                result = await asyncio.to_thread(
+                    supabase.table("grows").select(GROW_COLUMNS).in_("id", missing).execute
+                )
+                for grow in result.data or []:
+                    tables[grow["id"]] = self.for_grow(grow)
+            except Exception as e:
+                logger.error("Failed to load thresholds for %d grows: %s", len(missing), e)
+
+        for grow_id in missing:
+            tables.setdefault(grow_id, DEFAULT_TABLE)
+        return tables
+
+    async def get(self, supabase: Client, grow_id: str) -> GrowThresholds:
+        return (await self.get_many(supabase, [grow_id]))[grow_id]
+
+    def invalidate(self, grow_id: str) -> None:
+        if self._tables.pop(grow_id, None) is not None:
+            self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        self._tables.clear()
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["cached_grows"] = len(self._tables)
+        return s
+
+
+# Global instance
+threshold_cache = ThresholdCache()
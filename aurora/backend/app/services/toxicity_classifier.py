@@ -0,0 +1,195 @@
+"""
+📁 backend/app/services/toxicity_classifier.py
+Local fast-path toxicity pre-classifier.
+
+Scores text in microseconds with a compiled lexicon matcher plus a small
+linear model over hashed word n-grams, so only uncertain texts are
+escalated to the LLM. Final verdicts are cached by content hash, which
+makes reposts and copy-pasted comments free.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import zlib
+from dataclasses import dataclass
+
+from cachetools import LRUCache
+
+logger = logging.getLogger("aurora.toxicity")
+
+
+# ── Lexicon ────────────────────────────────────────────────────
+
+# Obvious abuse: held immediately, confirmed by the LLM.
+_BLOCKLIST = re.compile(
+    r"\b(kill\s+yourself|kys|go\s+die|retard(ed)?|f[a@]gg?[o0]ts?|n[i1]gg(er|a)s?)\b",
+    re.IGNORECASE,
+)
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+# ── Linear Model ───────────────────────────────────────────────
+
+N_FEATURES = 1 << 18
+BIAS = -1.0
+
+# Hand-weighted seed n-grams. Positive weights push towards toxic,
+# negative weights towards benign grow talk.
+SEED_WEIGHTS: dict[str, float] = {
+    # insults / harassment
+    "idiot": 2.5, "stupid": 2.0, "moron": 2.5, "dumb": 1.5, "loser": 2.0,
+    "pathetic": 1.5, "trash": 1.2, "garbage": 1.0, "clown": 1.2, "scum": 2.5,
+    "hate": 1.0, "shut up": 2.0, "screw you": 3.0, "fuck you": 4.0,
+    "fuck": 1.5, "fucking": 1.5, "shit": 0.8, "bitch": 2.5, "bastard": 2.0,
+    "you idiot": 2.0, "you suck": 3.0, "you're stupid": 2.0, "die": 1.0,
+    "ugly": 1.0, "disgusting": 1.0, "worthless": 2.0, "kill": 1.0,
+    # spam / scams
+    "dm me": 1.5, "telegram": 1.5, "whatsapp": 1.5, "cashapp": 2.0,
+    "crypto": 1.2, "free money": 2.5,
+    # grow vocabulary
+    "day": -0.6, "week": -0.6, "flower": -0.8, "flowering": -0.9,
+    "veg": -0.8, "vegetative": -0.9, "seedling": -0.9, "harvest": -0.9,
+    "trichomes": -1.2, "buds": -0.8, "bud": -0.6, "strain": -0.7,
+    "vpd": -1.2, "ph": -0.9, "ec": -0.8, "ppm": -0.8, "humidity": -0.9,
+    "temp": -0.7, "temperature": -0.7, "nutrients": -1.0, "feeding": -0.8,
+    "watering": -0.8, "soil": -0.8, "coco": -0.9, "hydro": -0.9,
+    "led": -0.7, "light": -0.5, "lights": -0.5, "tent": -0.7,
+    "autoflower": -1.0, "auto": -0.5, "clone": -0.7, "clones": -0.7,
+    "lst": -1.0, "topping": -0.9, "defoliation": -1.0, "scrog": -1.0,
+    "cure": -0.8, "curing": -0.9, "drying": -0.8, "yield": -0.8,
+    "leaves": -0.7, "roots": -0.7, "plant": -0.6, "plants": -0.6,
+    "grow": -0.5, "growing": -0.5, "germination": -0.9,
+    # friendly community talk
+    "thanks": -1.0, "thank you": -1.2, "great": -0.6, "nice": -0.6,
+    "awesome": -0.6, "beautiful": -0.6, "looks good": -1.0, "good luck": -1.0,
+    "congrats": -1.0, "love": -0.3, "help": -0.4, "question": -0.5,
+}
+
+BENIGN_MAX = 0.15   # at or below: publish without LLM review
+TOXIC_MIN = 0.9     # at or above: hold and escalate
+
+
+def _hash(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8")) % N_FEATURES
+
+
+def _features(text: str) -> list[int]:
+    """Hashed unigram + bigram feature indices."""
+    tokens = _TOKEN.findall(text.lower())
+    feats = [_hash(t) for t in tokens]
+    feats.extend(_hash(f"{a} {b}") for a, b in zip(tokens, tokens[1:]))
+    return feats
+
+
+_WEIGHTS: dict[int, float] = {_hash(k): w for k, w in SEED_WEIGHTS.items()}
+
+
+def _sigmoid(toxic: float, benign: float) -> float:
+    z = BIAS + (toxic if toxic > 0 else benign)
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+# ── Verdicts ───────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Verdict:
+    """
+    label: "benign" | "toxic" | "uncertain"
+    final: True when no LLM review is needed (cached verdict or confident benign)
+    """
+
+    label: str
+    score: float
+    final: bool
+    source: str  # "cache" | "lexicon" | "model"
+
+
+def content_hash(text: str) -> str:
+    """Hash of whitespace/case-normalised text, used as the cache key."""
+    normalised = " ".join(text.lower().split())
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+class ToxicityClassifier:
+    """Three-way local classifier with a content-hash verdict cache."""
+
+    def __init__(self, cache_size: int = 20_000):
+        self._cache: LRUCache = LRUCache(maxsize=cache_size)
+        self._stats = {
+            "classified": 0,
+            "cache_hits": 0,
+            "lexicon_hits": 0,
+            "fast_path_benign": 0,
+            "escalated": 0,
+        }
+
+    @staticmethod
+    def _weights(text: str) -> tuple[float, float]:
+        """(sum of toxic weights, sum of benign weights) over the text's features."""
+        toxic = benign = 0.0
+        for f in _features(text):
+            w = _WEIGHTS.get(f, 0.0)
+            if w > 0:
+                toxic += w
+            else:
+                benign += w
+        return toxic, benign
+
+    def score(self, text: str) -> float:
+        """
+        Probability-like toxicity score from the hashed n-gram model.
+        Benign (negative) weights only count when no toxic feature fires,
+        so grow vocabulary can't dilute an insult.
+        """
+        return _sigmoid(*self._weights(text))
+
+    def classify(self, text: str) -> Verdict:
+        """Classify text locally. Uncertain verdicts should go to the LLM."""
+        self._stats["classified"] += 1
+
+        cached = self._cache.get(content_hash(text))
+        if cached is not None:
+            self._stats["cache_hits"] += 1
+            return cached
+
+        if _BLOCKLIST.search(text):
+            self._stats["lexicon_hits"] += 1
+            self._stats["escalated"] += 1
+            return Verdict("toxic", 1.0, final=False, source="lexicon")
+
+        toxic, benign = self._weights(text)
+        s = _sigmoid(toxic, benign)
+        # Only a text with no toxic feature at all can be cleared locally
+        if toxic == 0 and s <= BENIGN_MAX:
+            self._stats["fast_path_benign"] += 1
+            verdict = Verdict("benign", s, final=True, source="model")
+            self._cache[content_hash(text)] = verdict
+            return verdict
+
+        self._stats["escalated"] += 1
+        label = "toxic" if s >= TOXIC_MIN else "uncertain"
+        return Verdict(label, s, final=False, source="model")
+
+    def remember(self, text: str, is_toxic: bool) -> None:
+        """Cache an authoritative (LLM) verdict for this content."""
+        self._cache[content_hash(text)] = Verdict(
+            "toxic" if is_toxic else "benign",
+            1.0 if is_toxic else 0.0,
+            final=True,
+            source="cache",
+        )
+
+    def stats(self) -> dict:
+        s = dict(self._stats)
+        s["cache_size"] = len(self._cache)
+        s["llm_escalation_rate"] = (
+            round(s["escalated"] / s["classified"], 3) if s["classified"] else 0.0
+        )
+        return s
+
+
+# Global instance
+toxicity_classifier = ToxicityClassifier()
@@ -0,0 +1,228 @@
+"""
+📁 backend/app/services/weekly_xp_job.py
+Weekly XP job — consistency bonuses and level reconciliation, set-based.
+
+Two stages, each a loop of keyset pages:
+
+  1. bonuses: `stage_weekly_bonus_candidates` counts the week's completed
+     tasks per user once, in the database, keeping users at or above the
+     minimum; each `apply_weekly_bonus_page` then takes a page of those
+     candidates and records the award, increments XP/karma and logs
+     xp_events in one call. Awards are keyed by (user, week), so reruns
+     never pay twice.
+  2. levels: `profiles_changed_since` returns only profiles whose XP moved
+     since the last finished run, paged by (xp_changed_at, id) to follow
+     its index; levels are recomputed in one vectorized pass per page and
+     drifted ones written with one `apply_profile_levels`.
+
+Progress (stage, cursor, counters) is saved to `job_runs` after every
+page, so a crashed or redeployed run resumes where it stopped, and a
+finished period is skipped.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+from supabase import Client
+
+from app.core.job_runner import report_progress
+from app.utils.levels import levels_from_xp
+from app.utils.weeks import previous_week_start
+
+logger = logging.getLogger("aurora.gamification")
+
+JOB_NAME = "weekly_xp"
+STAGES = ("bonuses", "levels")
+
+
+class WeeklyXPJob:
+    """Resumable, paged weekly bonus + level reconciliation job."""
+
+    def __init__(
+        self,
+        min_tasks: int = 5,
+        bonus_xp: int = 100,
+        bonus_karma: int = 10,
+        page_size: int = 1000,
+    ):
+        self.min_tasks = min_tasks
+        self.bonus_xp = bonus_xp
+        self.bonus_karma = bonus_karma
+        self.page_size = page_size
+        self._progress: dict = {"running": False}
+
+    @staticmethod
+    def period_for(now: datetime) -> str:
+        """
+        First day of the last complete week before `now` (see utils.weeks,
+        shared with the weekly leaderboard). Anchored to the calendar, so a
+        run delayed past midnight (misfire grace) still covers, and is keyed
+        by, the same week.
+        """
+        return previous_week_start(now).date().isoformat()
+
+    # -- State ------------------------------------------------------
+
+    async def _load_state(self, supabase: Client, period: str) -> Optional[dict]:
+        result = await asyncio.to_thread(
+            supabase.table("job_runs")
+            .select("*")
+            .eq("job", JOB_NAME)
+            .eq("period", period)
+            .limit(1)
+            .execute
+        )
+        return result.data[0] if result.data else None
+
+    async def _last_finished_start(self, supabase: Client, period: str) -> Optional[str]:
+        result = await asyncio.to_thread(
+            supabase.table("job_runs")
+            .select("started_at")
+            .eq("job", JOB_NAME)
+            .neq("period", period)
+            .not_.is_("finished_at", "null")
+            .order("started_at", desc=True)
+            .limit(1)
+            .execute
+        )
+        return result.data[0]["started_at"] if result.data else None
+
+    async def _save_state(self, supabase: Client, state: dict) -> None:
+        state["updated_at"] = datetime.now(timezone.utc).isoformat()
+        state["progress"] = {
+            k: v for k, v in self._progress.items() if k not in ("running", "stage")
+        }
+        report_progress(stage=state.get("stage"), **state["progress"])
+        await asyncio.to_thread(
+            supabase.table("job_runs").upsert(state, on_conflict="job,period").execute
+        )
+
+    # -- Run --------------------------------------------------------
+
+    async def run(self, supabase: Client, now: Optional[datetime] = None) -> dict:
+        """Run (or resume) this week's job. Returns the progress counters."""
+        now = now or datetime.now(timezone.utc)
+        period = self.period_for(now)
+
+        state = await self._load_state(supabase, period)
+        if state and state.get("finished_at"):
+            logger.info("📅 [GAMIFICATION] Weekly job for %s already finished", period)
+            return dict(state.get("progress") or {})
+
+        if state is None:
+            state = {
+                "job": JOB_NAME, "period": period, "stage": STAGES[0], "cursor": None,
+                "started_at": now.isoformat(), "progress": {},
+            }
+        elif state.get("cursor") or state.get("stage") != STAGES[0]:
+            logger.info(
+                "📅 [GAMIFICATION] Resuming weekly job %s at %s (cursor=%s)",
+                period, state["stage"], state.get("cursor"),
+            )
+
+        self._progress = {
+            "period": period, "pages": 0,
+            "bonus_candidates": 0, "bonus_users": 0, "bonuses_awarded": 0,
+            "profiles_checked": 0, "levels_fixed": 0,
+            **(state.get("progress") or {}),
+            "running": True,
+        }
+        try:
+            if state["stage"] == "bonuses":
+                await self._bonuses(supabase, state)
+                state["stage"], state["cursor"] = "levels", None
+                await self._save_state(supabase, state)
+            if state["stage"] == "levels":
+                await self._levels(supabase, state)
+
+            state["finished_at"] = datetime.now(timezone.utc).isoformat()
+            await self._save_state(supabase, state)
+        finally:
+            self._progress["running"] = False
+
+        logger.info(
+            "✅ [GAMIFICATION] Weekly job %s: %d bonuses, %d/%d levels fixed, %d pages",
+            period, self._progress["bonuses_awarded"], self._progress["levels_fixed"],
+            self._progress["profiles_checked"], self._progress["pages"],
+        )
+        return self.progress()
+
+    async def _bonuses(self, supabase: Client, state: dict) -> None:
+        self._progress["stage"] = "bonuses"
+        if state.get("cursor") is None:
+            # Count the week once; a rerun re-stages idempotently
+            result = await asyncio.to_thread(
+                supabase.rpc("stage_weekly_bonus_candidates", {
+                    "week_start_param": state["period"],
+                    "min_tasks_param": self.min_tasks,
+                }).execute
+            )
+            self._progress["bonus_candidates"] = result.data or 0
+        while True:
+            result = await asyncio.to_thread(
+                supabase.rpc("apply_weekly_bonus_page", {
+                    "week_start_param": state["period"],
+                    "bonus_xp_param": self.bonus_xp,
+                    "bonus_karma_param": self.bonus_karma,
+                    "after_user_param": state.get("cursor"),
+                    "page_size_param": self.page_size,
+                }).execute
+            )
+            rows = result.data or []
+            if not rows:
+                return
+
+            self._progress["pages"] += 1
+            self._progress["bonus_users"] += len(rows)
+            self._progress["bonuses_awarded"] += sum(1 for r in rows if r.get("awarded"))
+            state["cursor"] = rows[-1]["user_id"]
+            await self._save_state(supabase, state)
+            if len(rows) < self.page_size:
+                return
+
+    async def _levels(self, supabase: Client, state: dict) -> None:
+        self._progress["stage"] = "levels"
+        since = await self._last_finished_start(supabase, state["period"])
+        while True:
+            # The cursor is "<xp_changed_at>|<id>" of the last profile seen
+            after_changed_at, _, after_id = (state.get("cursor") or "").partition("|")
+            result = await asyncio.to_thread(
+                supabase.rpc("profiles_changed_since", {
+                    "since_param": since,
+                    "after_changed_at_param": after_changed_at or None,
+                    "after_id_param": after_id or None,
+                    "page_size_param": self.page_size,
+                }).execute
+            )
+            rows = result.data or []
+            if not rows:
+                return
+
+            xp = np.array([r["total_xp"] for r in rows], dtype=np.int64)
+            stored = np.array([r["level"] for r in rows], dtype=np.int64)
+            correct = levels_from_xp(xp)
+            drifted = np.flatnonzero(correct != stored)
+            if len(drifted):
+                await asyncio.to_thread(
+                    supabase.rpc("apply_profile_levels", {"levels": [
+                        {"user_id": rows[i]["id"], "level": int(correct[i])} for i in drifted
+                    ]}).execute
+                )
+
+            self._progress["pages"] += 1
+            self._progress["profiles_checked"] += len(rows)
+            self._progress["levels_fixed"] += len(drifted)
+            state["cursor"] = f'{rows[-1]["xp_changed_at"]}|{rows[-1]["id"]}'
+            await self._save_state(supabase, state)
+            if len(rows) < self.page_size:
+                return
+
+    def progress(self) -> dict:
+        return dict(self._progress)
+
+
+# Global instance
+weekly_xp_job = WeeklyXPJob()
@@ -0,0 +1,249 @@
+"""
+📁 backend/app/services/xp_ledger.py
+XP / karma ledger — queued awards applied atomically in per-user batches.
+
+Awards are appended to an in-memory queue and coalesced per user. Each
+flush applies every pending user with one `apply_xp_ledger` RPC, which
+increments `profiles.total_xp` / `karma` in place (no read-modify-write),
+appends one `xp_events` row per XP award and returns the new totals.
+Levels are computed from those totals; the few users who level up get
+their new level in one `set_profile_levels` call. The totals also move
+the in-memory leaderboards.
+
+`award()` waits for the flush that applies it (one short window when the
+worker runs, inline otherwise) and returns the same shape `award_xp` did.
+A failed flush keeps its awards queued: the worker retries them and their
+waiters resolve once the retry lands, while an inline flush (no worker
+to retry) raises its error to them. `add()` is fire-and-forget, for likes.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from supabase import Client
+
+from app.services.achievement_engine import achievement_engine
+from app.services.leaderboard_service import leaderboards
+from app.utils.levels import level_from_xp, xp_for_level
+
+logger = logging.getLogger("aurora.xp_ledger")
+
+
+class _Pending:
+    """One user's queued awards, in arrival order."""
+
+    __slots__ = ("xp", "karma", "events", "waiters")
+
+    def __init__(self):
+        self.xp = 0
+        self.karma = 0
+        self.events: list[dict] = []                        # XP awards, for xp_events
+        # (future, xp, karma, queued xp so far, queued karma so far)
+        self.waiters: list[tuple[asyncio.Future, int, int, int, int]] = []
+
+    def merge(self, other: "_Pending") -> None:
+        """Put `other`'s (older) awards ahead of this entry's."""
+        self.waiters = other.waiters + [
+            (future, xp, karma, xp_queued + other.xp, karma_queued + other.karma)
+            for future, xp, karma, xp_queued, karma_queued in self.waiters
+        ]
+        self.xp += other.xp
+        self.karma += other.karma
+        self.events = other.events + self.events
+
+
+class XPLedger:
+    """Coalesces XP/karma awards per user and applies them in atomic batches."""
+
+    def __init__(self, flush_interval: float = 0.25, max_pending: int = 500):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: dict[str, _Pending] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._supabase: Optional[Client] = None
+        self._metrics = {
+            "awards": 0, "flushes": 0, "users_applied": 0,
+            "level_ups": 0, "errors": 0,
+        }
+
+    @property
+    def pending(self) -> dict[str, dict]:
+        """Snapshot of queued totals per user."""
+        return {uid: {"xp": p.xp, "karma": p.karma} for uid, p in self._pending.items()}
+
+    def _queue(self, user_id: str, xp: int, karma: int, reason: str) -> _Pending:
+        entry = self._pending.get(user_id)
+        if entry is None:
+            entry = self._pending[user_id] = _Pending()
+        entry.xp += xp
+        entry.karma += karma
+        if xp:
+            entry.events.append({"amount": xp, "reason": reason})
+        self._metrics["awards"] += 1
+        if len(self._pending) >= self.max_pending and self._wakeup is not None:
+            self._wakeup.set()
+        return entry
+
+    def add(self, user_id: str, xp: int = 0, karma: int = 0, reason: str = "") -> None:
+        """Queue an award without waiting for it. Never touches the database."""
+        self._queue(user_id, xp, karma, reason)
+
+    async def award(
+        self,
+        user_id: str,
+        xp: int = 0,
+        karma: int = 0,
+        reason: str = "",
+        supabase: Optional[Client] = None,
+    ) -> dict:
+        """
+        Queue an award and wait until it is applied.
+        Returns: { xp_before, xp_after, xp_gained, level_before, level_after,
+                   leveled_up, xp_to_next, karma_before, karma_after,
+                   karma_gained }, or {} for an unknown user.
+        Raises the flush error if applied inline and the flush fails.
+        """
+        future = asyncio.get_running_loop().create_future()
+        entry = self._queue(user_id, xp, karma, reason)
+        entry.waiters.append((future, xp, karma, entry.xp, entry.karma))
+        if self._task is None:
+            await self.flush(supabase)
+        return await future
+
+    async def flush(self, supabase: Optional[Client] = None) -> int:
+        """Apply everything pending. Returns the number of users updated."""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        entries = [
+            {"user_id": uid, "xp": p.xp, "karma": p.karma, "events": p.events}
+            for uid, p in batch.items()
+        ]
+        self._metrics["flushes"] += 1
+
+        try:
+            sb = supabase or self._supabase
+            if sb is None:
+                from app.dependencies import get_supabase_client
+                sb = get_supabase_client()
+            result = await asyncio.to_thread(
+                sb.rpc("apply_xp_ledger", {"entries": entries}).execute
+            )
+        except Exception as e:
+            # Put the deltas (and their waiters) back so the next flush
+            # retries them. Without a worker nothing retries, so inline
+            # waiters get the error instead of waiting forever.
+            self._metrics["errors"] += 1
+            for uid, p in batch.items():
+                if self._task is None:
+                    for future, *_ in p.waiters:
+                        if not future.done():
+                            future.set_exception(e)
+                    p.waiters = []
+                retry = self._pending.get(uid)
+                if retry is None:
+                    self._pending[uid] = p
+                else:
+                    retry.merge(p)
+            logger.error("XP ledger flush failed (%d users): %s", len(batch), e)
+            return 0
+
+        totals = {row["user_id"]: row for row in (result.data or [])}
+        await self._apply_levels(sb, batch, totals)
+        self._metrics["users_applied"] += len(totals)
+        logger.debug("🧾 XP ledger applied: %d users", len(totals))
+        return len(totals)
+
+    async def _apply_levels(self, supabase: Client, batch: dict[str, _Pending], totals: dict) -> None:
+        level_ups = []
+        for uid, p in batch.items():
+            row = totals.get(uid)
+            if row is None:
+                for future, *_ in p.waiters:       # no such profile
+                    if not future.done():
+                        future.set_result({})
+                continue
+
+            total_xp = row.get("total_xp") or 0
+            karma = row.get("karma") or 0
+            level_before = level_from_xp(total_xp - p.xp)
+            level_after = level_from_xp(total_xp)
+            if level_after > level_before:
+                level_ups.append({"user_id": uid, "level": level_after})
+                logger.info(
+                    "🎉 User %s leveled up: %d → %d (XP: %d)",
+                    uid[:8], level_before, level_after, total_xp,
+                )
+            achievement_engine.observe(uid, total_xp=total_xp, level=level_after, karma=karma)
+            leaderboards.record(uid, total_xp, karma, xp_gained=p.xp)
+
+            # Each waiter sees the totals right after its own award
+            xp_base, karma_base = total_xp - p.xp, karma - p.karma
+            for future, xp, k, xp_queued, karma_queued in p.waiters:
+                xp_after, karma_after = xp_base + xp_queued, karma_base + karma_queued
+                xp_before = xp_after - xp
+                lvl_before, lvl_after = level_from_xp(xp_before), level_from_xp(xp_after)
+                if not future.done():
+                    future.set_result({
+                        "xp_before": xp_before,
+                        "xp_after": xp_after,
+                        "xp_gained": xp,
+                        "level_before": lvl_before,
+                        "level_after": lvl_after,
+                        "leveled_up": lvl_after > lvl_before,
+                        "xp_to_next": xp_for_level(lvl_after + 1) - xp_after,
+                        "karma_before": karma_after - k,
+                        "karma_after": karma_after,
+                        "karma_gained": k,
+                    })
+
+        if level_ups:
+            self._metrics["level_ups"] += len(level_ups)
+            try:
+                await asyncio.to_thread(
+                    supabase.rpc("set_profile_levels", {"levels": level_ups}).execute
+                )
+            except Exception as e:
+                # Totals are already applied; weekly reconciliation fixes levels
+                logger.error("Failed to store %d level-ups: %s", len(level_ups), e)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self, supabase: Optional[Client] = None) -> None:
+        """Start the background flush loop (call from FastAPI startup)."""
+        if self._task is not None:
+            return
+        self._supabase = supabase
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and apply whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def metrics(self) -> dict:
+        m = dict(self._metrics)
+        m["pending_users"] = len(self._pending)
+        m["running"] = self._task is not None
+        return m
+
+
+# Global instance
+xp_ledger = XPLedger()
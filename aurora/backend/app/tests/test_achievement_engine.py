@@ -0,0 +1,137 @@
+"""
+Aurora Achievement Engine Tests
+Tests for the threshold index and event-driven unlocking.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services import gamification_service
+from app.services.achievement_engine import AchievementEngine, AchievementIndex
+
+
+CATALOG = [
+    {"id": "a1", "name": "First Sprout", "reward_xp": 0, "reward_karma": 0,
+     "condition": {"metric": "posts_created", "operator": ">=", "threshold": 1}},
+    {"id": "a2", "name": "Social Butterfly", "reward_xp": 150, "reward_karma": 0,
+     "condition": {"metric": "posts_created", "operator": ">=", "threshold": 25}},
+    {"id": "a3", "name": "Task Master", "reward_xp": 0, "reward_karma": 0,
+     "condition": {"metric": "tasks_completed", "operator": ">=", "threshold": 10}},
+    {"id": "a4", "name": "Rising Star", "reward_xp": 0, "reward_karma": 0,
+     "condition": {"metric": "total_xp", "operator": ">=", "threshold": 1000}},
+]
+
+
+def _supabase(user_stats=None, unlocked=(), catalog=CATALOG):
+    """Supabase mock: catalog, one user's stats/unlocks; upserts always insert."""
+    sb = MagicMock()
+    tables = {name: MagicMock() for name in ("achievements", "profiles", "user_achievements")}
+    tables["achievements"].select.return_value.execute.return_value = MagicMock(data=list(catalog))
+    profile = {"total_xp": 0, "karma": 0, "level": 1, "user_stats": user_stats or {}}
+    tables["profiles"].select.return_value.eq.return_value.limit.return_value.execute.return_value = (
+        MagicMock(data=[profile])
+    )
+    ua = tables["user_achievements"]
+    ua.select.return_value.eq.return_value.execute.return_value = MagicMock(
+        data=[{"achievement_id": a} for a in unlocked]
+    )
+    ua.upsert.side_effect = lambda row, **kw: MagicMock(execute=MagicMock(return_value=MagicMock(data=[row])))
+    sb.table.side_effect = lambda name: tables[name]
+    return sb, tables
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = AchievementEngine()
+    monkeypatch.setattr(gamification_service, "achievement_engine", engine)
+    return engine
+
+
+class TestAchievementIndex:
+    """Tests for threshold lookups."""
+
+    def test_operators_match_condition_semantics(self):
+        index = AchievementIndex([
+            {"id": op, "condition": {"metric": "karma", "operator": op, "threshold": 100}}
+            for op in (">=", ">", "==", "<=")
+        ])
+
+        assert sorted(index.satisfied("karma", 100)) == ["<=", "==", ">="]
+        assert sorted(index.satisfied("karma", 101)) == [">", ">="]
+        assert index.satisfied("karma", 99) == ["<="]
+
+    def test_lookup_only_touches_the_metric(self):
+        index = AchievementIndex(CATALOG)
+        assert index.satisfied("posts_created", 30) == ["a1", "a2"]
+        assert index.satisfied("sensor_readings", 10_000) == []
+        assert index.metrics == {"posts_created", "tasks_completed", "total_xp"}
+
+
+class TestAchievementEngine:
+    """Tests for event-driven unlocking."""
+
+    @pytest.mark.asyncio
+    async def test_first_event_loads_user_once_without_counts(self, engine):
+        sb, tables = _supabase(user_stats={"posts_count": 1})
+
+        unlocked = await engine.record(sb, "u1", "posts_created")
+        again = await engine.record(sb, "u1", "posts_created")
+
+        assert [a["name"] for a in unlocked] == ["First Sprout"]
+        assert again == []
+        assert tables["profiles"].select.call_count == 1
+        assert tables["achievements"].select.call_count == 1
+        assert {c.args[0] for c in sb.table.call_args_list} == {
+            "achievements", "profiles", "user_achievements",
+        }
+
+    @pytest.mark.asyncio
+    async def test_event_evaluates_only_its_metric(self, engine):
+        sb, tables = _supabase(user_stats={"posts_count": 24, "tasks_completed": 9})
+        await engine.record(sb, "u1", "posts_created", 0)
+        engine._users["u1"].metrics["tasks_completed"] = 50   # changed out of band
+
+        unlocked = await engine.record(sb, "u1", "posts_created")
+
+        assert [a["id"] for a in unlocked] == ["a2"]
+
+    @pytest.mark.asyncio
+    async def test_already_unlocked_is_skipped(self, engine):
+        sb, tables = _supabase(user_stats={"posts_count": 3}, unlocked=["a1"])
+
+        assert await engine.record(sb, "u1", "posts_created") == []
+        tables["user_achievements"].upsert.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reward_xp_cascades_into_xp_achievements(self, engine, monkeypatch):
+        sb, _ = _supabase(user_stats={"posts_count": 24})
+        await engine.record(sb, "u1", "posts_created", 0)
+        engine._users["u1"].metrics["total_xp"] = 900
+
+        async def fake_award_xp(supabase, user_id, amount, reason):
+            engine.observe(user_id, total_xp=900 + amount)
+            return {}
+
+        monkeypatch.setattr(gamification_service, "award_xp", fake_award_xp)
+
+        unlocked = await engine.record(sb, "u1", "posts_created")
+
+        assert [a["id"] for a in unlocked] == ["a2", "a4"]
+
+    @pytest.mark.asyncio
+    async def test_lost_race_is_not_rewarded(self, engine):
+        sb, tables = _supabase(user_stats={"posts_count": 1})
+        tables["user_achievements"].upsert.side_effect = (
+            lambda row, **kw: MagicMock(execute=MagicMock(return_value=MagicMock(data=[])))
+        )
+
+        assert await engine.record(sb, "u1", "posts_created") == []
+
+    @pytest.mark.asyncio
+    async def test_check_achievements_delegates(self, engine):
+        sb, _ = _supabase(user_stats={"tasks_completed": 10})
+
+        unlocked = await gamification_service.check_achievements(sb, "u1", "tasks_completed")
+
+        assert [a["id"] for a in unlocked] == ["a3"]
+        assert engine.stats()["events"] == 1
@@ -0,0 +1,146 @@
+"""
+Aurora Alert Dispatcher Tests
+Tests for cooldowns, bulk inserts, merged pushes and the worker queue.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from app.services.alert_dispatcher import AlertDispatcher
+
+
+def _alert(grow_id="g1", parameter="temperature", severity="warning", user_id="u1"):
+    return {
+        "grow_id": grow_id,
+        "user_id": user_id,
+        "parameter": parameter,
+        "severity": severity,
+        "message": f"{parameter} is off",
+    }
+
+
+@pytest.fixture
+def push():
+    mock = AsyncMock(return_value=True)
+    with patch.dict("sys.modules", {"app.services.push_service": Mock(send_push_notification=mock)}):
+        yield mock
+
+
+class TestCooldown:
+    """Tests for per-(grow, parameter, severity) suppression."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_inside_window_is_suppressed(self, push):
+        dispatcher = AlertDispatcher()
+        sb = MagicMock()
+
+        first = await dispatcher.dispatch([_alert()], sb)
+        second = await dispatcher.dispatch([_alert()], sb)
+
+        assert len(first) == 1 and second == []
+        assert sb.table.return_value.insert.call_count == 1
+        assert dispatcher.metrics()["suppressed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_escalation_and_other_grows_pass(self, push):
+        dispatcher = AlertDispatcher()
+        sb = MagicMock()
+        await dispatcher.dispatch([_alert()], sb)
+
+        passed = await dispatcher.dispatch(
+            [_alert(severity="critical"), _alert(grow_id="g2"), _alert(parameter="ph")], sb,
+        )
+
+        assert len(passed) == 3
+
+    @pytest.mark.asyncio
+    async def test_duplicates_within_one_call_collapse(self, push):
+        dispatcher = AlertDispatcher()
+        passed = await dispatcher.dispatch([_alert(), _alert()], MagicMock())
+        assert len(passed) == 1
+
+
+class TestDelivery:
+    """Tests for bulk insert and merged pushes."""
+
+    @pytest.mark.asyncio
+    async def test_one_insert_and_one_push_per_grow(self, push):
+        dispatcher = AlertDispatcher()
+        sb = MagicMock()
+        alerts = [
+            _alert(parameter="temperature"),
+            _alert(parameter="humidity", severity="critical"),
+            _alert(grow_id="g2", parameter="ph"),
+        ]
+
+        await dispatcher.deliver(alerts, sb)
+
+        sb.table.return_value.insert.assert_called_once_with(alerts)
+        assert push.await_count == 2
+        g1 = next(c.kwargs for c in push.await_args_list if c.kwargs["data"]["grow_id"] == "g1")
+        assert g1["title"] == "⚠️ 2 Alerts: Humidity, Temperature"
+        assert g1["body"] == "humidity is off (+1 more)"
+
+    @pytest.mark.asyncio
+    async def test_insert_failure_skips_the_push(self, push):
+        dispatcher = AlertDispatcher()
+        sb = MagicMock()
+        sb.table.return_value.insert.return_value.execute.side_effect = RuntimeError("down")
+
+        await dispatcher.deliver([_alert()], sb)
+
+        push.assert_not_awaited()
+        assert dispatcher.metrics()["insert_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_insert_lifts_the_cooldown(self, push):
+        dispatcher = AlertDispatcher()
+        sb = MagicMock()
+        sb.table.return_value.insert.return_value.execute.side_effect = [RuntimeError("down"), Mock()]
+
+        await dispatcher.dispatch([_alert()], sb)
+        retried = await dispatcher.dispatch([_alert()], sb)
+
+        assert len(retried) == 1
+        assert dispatcher.metrics()["inserted"] == 1
+
+
+class TestWorker:
+    """Tests for the queued path."""
+
+    @pytest.mark.asyncio
+    async def test_worker_batches_queued_alerts(self, push):
+        dispatcher = AlertDispatcher(flush_interval=0.05)
+        sb = MagicMock()
+        dispatcher.start(sb)
+        try:
+            for grow in ("g1", "g2", "g3"):
+                await dispatcher.dispatch([_alert(grow_id=grow)])
+            await asyncio.sleep(0.15)
+        finally:
+            await dispatcher.stop()
+
+        sb.table.return_value.insert.assert_called_once()
+        assert len(sb.table.return_value.insert.call_args.args[0]) == 3
+        assert dispatcher.metrics()["inserted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_instead_of_blocking(self, push):
+        dispatcher = AlertDispatcher(queue_size=1)
+        dispatcher._queue = asyncio.Queue(maxsize=1)
+
+        await dispatcher.dispatch([_alert(grow_id="g1"), _alert(grow_id="g2")])
+
+        assert dispatcher.metrics()["dropped"] == 1
+        assert dispatcher.metrics()["queue_depth"] == 1
+        assert dispatcher.metrics()["cooldown_keys"] == 1     # only the queued one
+
+    @pytest.mark.asyncio
+    async def test_dropped_alert_does_not_silence_the_grow(self, push):
+        dispatcher = AlertDispatcher(queue_size=1)
+        dispatcher._queue = asyncio.Queue(maxsize=1)
+        await dispatcher.dispatch([_alert(grow_id="g1"), _alert(grow_id="g2")])
+        dispatcher._queue.get_nowait()
+
+        assert await dispatcher.dispatch([_alert(grow_id="g2")]) == [_alert(grow_id="g2")]
@@ -0,0 +1,182 @@
+"""
+Aurora Anomaly Detector Tests
+Tests for sustained-window alerts, hysteresis, spikes and the safety net.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.alert_service import THRESHOLDS
+from app.services.anomaly_detector import AnomalyDetector
+
+T0 = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+TEMP = {"temperature": THRESHOLDS["temperature"]}  # 18-30 °C
+
+
+def _at(minutes: float, **values) -> dict:
+    return {"created_at": (T0 + timedelta(minutes=minutes)).isoformat(), **values}
+
+
+@pytest.fixture
+def detector():
+    return AnomalyDetector(sustain_seconds=300)
+
+
+class TestOutOfRange:
+    """Tests for sustained windows and deduplication."""
+
+    def test_brief_excursion_does_not_alert(self, detector):
+        assert detector.observe("g1", "u1", _at(0, temperature=31.0), TEMP) == []
+        assert detector.observe("g1", "u1", _at(2, temperature=25.0), TEMP) == []
+
+    def test_sustained_excursion_alerts_once(self, detector):
+        raised = []
+        for minute in range(0, 30):
+            raised += detector.observe("g1", "u1", _at(minute, temperature=31.0), TEMP)
+
+        assert len(raised) == 1
+        assert raised[0]["alert_type"] == "sensor_high"
+        assert raised[0]["severity"] == "warning"
+
+    def test_critical_alerts_immediately_and_escalates_once(self, detector):
+        for minute in range(0, 6):
+            detector.observe("g1", "u1", _at(minute, temperature=31.0), TEMP)
+
+        escalated = detector.observe("g1", "u1", _at(7, temperature=40.0), TEMP)
+        again = detector.observe("g1", "u1", _at(8, temperature=41.0), TEMP)
+
+        assert [a["severity"] for a in escalated] == ["critical"]
+        assert again == []
+
+    def test_hysteresis_requires_clear_band_before_rearming(self, detector):
+        for minute in range(0, 6):
+            detector.observe("g1", "u1", _at(minute, temperature=31.0), TEMP)
+
+        # Back in range but inside the margin near the bound: stays armed-off
+        detector.observe("g1", "u1", _at(7, temperature=29.8), TEMP)
+        flapping = []
+        for minute in range(8, 14):
+            flapping += detector.observe("g1", "u1", _at(minute, temperature=31.0), TEMP)
+        assert flapping == []
+
+        # Well inside the range: the next sustained excursion alerts again
+        detector.observe("g1", "u1", _at(15, temperature=24.0), TEMP)
+        raised = []
+        for minute in range(16, 22):
+            raised += detector.observe("g1", "u1", _at(minute, temperature=31.0), TEMP)
+        assert len(raised) == 1
+
+    def test_grows_are_independent(self, detector):
+        detector.observe("g1", "u1", _at(0, temperature=10.0), TEMP)
+        assert len(detector.observe("g2", "u2", _at(0, temperature=10.0), TEMP)) == 1
+
+
+class TestSpikes:
+
+    def test_z_score_spike_inside_range(self, detector):
+        for minute in range(30):
+            detector.observe("g1", "u1", _at(minute, temperature=22.0 + 0.1 * (minute % 3)), TEMP)
+
+        spike = detector.observe("g1", "u1", _at(31, temperature=28.5), TEMP)
+
+        assert [a["alert_type"] for a in spike] == ["sensor_anomaly"]
+        assert detector.observe("g1", "u1", _at(32, temperature=22.0), TEMP) == []
+
+
+class TestSweep:
+    """Tests for the rollup-based safety net."""
+
+    def test_sustained_hourly_means_alert(self, detector):
+        alerts = detector.sweep("g1", "u1", {"temperature": [25.0, 31.5, 32.0]}, TEMP)
+        assert len(alerts) == 1
+        assert alerts[0]["alert_type"] == "sensor_high"
+
+    def test_skips_when_streaming_alert_is_active(self, detector):
+        detector.observe("g1", "u1", _at(0, temperature=40.0), TEMP)  # critical → active
+
+        assert detector.sweep("g1", "u1", {"temperature": [31.5, 32.0]}, TEMP) == []
+
+    def test_single_bucket_is_not_enough(self, detector):
+        assert detector.sweep("g1", "u1", {"temperature": [25.0, 32.0]}, TEMP) == []
+
+
+class TestPersistedState:
+    """Tests for seeding active alerts from the alerts table."""
+
+    OPEN = [{"grow_id": "g1", "parameter": "temperature", "alert_type": "sensor_critical",
+             "severity": "critical", "value": 40.0, "threshold_min": 18.0, "created_at": "2026-10-19T11:00:00"}]
+
+    def _client(self, rows):
+        from unittest.mock import MagicMock
+        sb = MagicMock()
+        query = sb.table.return_value.select.return_value.in_.return_value.in_.return_value.gte.return_value
+        query.execute.return_value = MagicMock(data=rows)
+        return sb
+
+    @pytest.mark.asyncio
+    async def test_alert_raised_elsewhere_is_not_repeated(self, detector):
+        await detector.warm(self._client(self.OPEN), ["g1", "g2"])
+
+        assert detector.observe("g1", "u1", _at(0, temperature=41.0), TEMP) == []
+        assert detector.sweep("g1", "u1", {"temperature": [31.5, 32.0]}, TEMP) == []
+        assert len(detector.observe("g2", "u2", _at(0, temperature=41.0), TEMP)) == 1
+
+    @pytest.mark.asyncio
+    async def test_grows_are_loaded_once(self, detector):
+        sb = self._client([])
+
+        await detector.warm(sb, ["g1"])
+        await detector.warm(sb, ["g1"])
+
+        assert sb.table.call_count == 1
+
+
+class TestSafetyNetJob:
+    """Tests for the scheduled sweep's reads."""
+
+    @pytest.mark.asyncio
+    async def test_pages_grows_and_rollups_in_chunks(self, monkeypatch):
+        from unittest.mock import AsyncMock, MagicMock
+        from app.core import scheduler
+
+        monkeypatch.setattr(scheduler, "PAGE_SIZE", 100)
+        monkeypatch.setattr(scheduler, "SWEEP_CHUNK", 200)
+        grows = [{"id": f"g{i:04d}", "user_id": f"u{i}", "current_phase": "vegetative",
+                  "ai_plan": None, "updated_at": None} for i in range(450)]
+        # two hot hourly means per grow: every grow should alert
+        rollups = [{"grow_id": g["id"], "metric": "temperature", "bucket_start": f"T{h}", "sum": 35.0, "count": 1}
+                   for g in grows for h in range(2)]
+        in_sizes = []
+
+        def table(name):
+            source = grows if name == "grows" else rollups
+            q, filters = MagicMock(), {}
+            for method in ("select", "eq", "gte", "order"):
+                getattr(q, method).return_value = q
+
+            def in_(col, values):
+                if col == "grow_id":
+                    in_sizes.append(len(values))
+                    filters["ids"] = set(values)
+                return q
+
+            def range_(lo, hi):
+                rows = [r for r in source if "ids" not in filters or r["grow_id"] in filters["ids"]]
+                return MagicMock(execute=lambda: MagicMock(data=rows[lo:hi + 1]))
+
+            q.in_.side_effect = in_
+            q.range.side_effect = range_
+            return q
+
+        sb = MagicMock()
+        sb.table.side_effect = table
+        save = AsyncMock()
+        detector = AnomalyDetector()
+        monkeypatch.setattr(scheduler, "get_supabase_client", lambda: sb)
+        monkeypatch.setattr("app.services.anomaly_detector.anomaly_detector", detector)
+        monkeypatch.setattr("app.services.alert_service.AlertService.save_and_notify", save)
+
+        await scheduler.check_sensor_anomalies()
+
+        assert max(in_sizes) <= 200
+        assert len(save.await_args.args[0]) == 450
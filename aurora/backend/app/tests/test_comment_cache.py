@@ -0,0 +1,87 @@
+"""
+Aurora Comment Cache Tests
+Tests for per-post comment page caching and invalidation.
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.comment_cache import CommentPageCache
+from app.services.moderation_service import ModerationItem, ModerationPipeline
+
+
+def _comments_client(rows):
+    """Supabase mock whose comment query returns `rows`."""
+    sb = Mock()
+    query = sb.table.return_value.select.return_value.eq.return_value.eq.return_value
+    query.order.return_value.range.return_value.execute.return_value = Mock(data=rows)
+    return sb
+
+
+ROWS = [{"id": "c1", "content": "nice", "profiles": {"display_name": "ana", "avatar_url": None}}]
+
+
+class TestCommentPageCache:
+    """Tests for cache-through reads and invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_second_read_is_served_from_cache(self):
+        cache = CommentPageCache()
+        sb = _comments_client([dict(r) for r in ROWS])
+
+        first = await cache.get_page(sb, "p1", 1, 20)
+        second = await cache.get_page(sb, "p1", 1, 20)
+
+        assert first == second
+        assert first[0]["author_username"] == "ana"
+        assert "profiles" not in first[0]
+        sb.table.assert_called_once_with("post_comments")
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_all_pages_of_post(self):
+        cache = CommentPageCache()
+        sb = _comments_client([])
+        await cache.get_page(sb, "p1", 1, 20)
+        await cache.get_page(sb, "p1", 2, 20)
+        await cache.get_page(sb, "p2", 1, 20)
+
+        cache.invalidate("p1")
+        await cache.get_page(sb, "p1", 1, 20)
+        await cache.get_page(sb, "p2", 1, 20)
+
+        assert sb.table.call_count == 4
+        assert cache.stats()["invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_read_racing_a_write_is_not_cached(self):
+        cache = CommentPageCache()
+        sb = Mock()
+        query = sb.table.return_value.select.return_value.eq.return_value.eq.return_value
+
+        def execute():
+            cache.invalidate("p1")  # a comment lands mid-query
+            return Mock(data=[])
+
+        query.order.return_value.range.return_value.execute = execute
+
+        await cache.get_page(sb, "p1", 1, 20)
+
+        assert cache.stats()["cached_posts"] == 0
+
+
+class TestModerationInvalidation:
+    """Moderation outcomes must drop the parent post's comment pages."""
+
+    @pytest.mark.asyncio
+    async def test_takedown_invalidates_parent_post(self):
+        pipeline = ModerationPipeline()
+        pipeline._ai = Mock()
+        pipeline._ai.check_toxicity_batch = AsyncMock(return_value=[True])
+        pipeline._supabase = Mock()
+
+        with patch("app.services.moderation_service.comment_cache") as cache, \
+                patch("app.services.moderation_service.socket_manager") as sockets:
+            sockets.send_personal_message = AsyncMock()
+            await pipeline.process_batch([ModerationItem("comment", "c1", "u1", "bad", post_id="p1")])
+
+        cache.invalidate.assert_called_once_with("p1")
@@ -0,0 +1,110 @@
+"""
+Aurora Community Stats Tests
+Tests for histogram percentiles and the cached community row.
+"""
+import pytest
+from unittest.mock import Mock
+
+from app.services import community_stats_service
+from app.services.community_stats_service import Histogram
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    community_stats_service._community_cache.clear()
+    yield
+    community_stats_service._community_cache.clear()
+
+
+def _table_client(rows):
+    """Supabase mock whose table(...)...execute() returns `rows`."""
+    sb = Mock()
+    query = sb.table.return_value.select.return_value
+    query.eq.return_value.limit.return_value.execute.return_value = Mock(data=rows)
+    return sb
+
+
+class TestHistogram:
+    """Tests for percentile ranking."""
+
+    def test_percentile_interpolates_within_bucket(self):
+        hist = Histogram(edges=[0, 100, 200], counts=[50, 30, 20])
+
+        assert hist.percentile(0) == 0.0
+        assert hist.percentile(100) == 50.0
+        assert hist.percentile(150) == 65.0
+
+    def test_open_ended_last_bucket(self):
+        hist = Histogram(edges=[0, 100], counts=[90, 10])
+        assert hist.percentile(10_000) == 95.0
+
+    def test_empty_histogram(self):
+        assert Histogram(edges=[], counts=[]).percentile(500) == 0.0
+
+    def test_matches_exact_rank_on_bucket_edges(self):
+        values = [0, 10, 10, 20, 50, 50, 50, 100, 250, 400]
+        edges = [0, 10, 20, 50, 100, 250]
+        counts = [sum(1 for v in values if lo <= v < hi) for lo, hi in zip(edges, edges[1:] + [float("inf")])]
+        hist = Histogram(edges=edges, counts=counts)
+
+        for edge in edges:
+            exact = sum(1 for v in values if v < edge) / len(values) * 100
+            assert hist.percentile(edge) == pytest.approx(exact)
+
+
+class TestCommunityStats:
+    """Tests for the cached community row and per-user counters."""
+
+    @pytest.mark.asyncio
+    async def test_community_row_is_cached(self):
+        sb = _table_client([{
+            "total_users": 10,
+            "total_posts": 40,
+            "completed_grows": 5,
+            "xp_histogram": {"edges": [0, 100], "counts": [6, 4]},
+            "posts_histogram": {"edges": [0, 5], "counts": [7, 3]},
+        }])
+
+        first = await community_stats_service.get_community_stats(sb)
+        second = await community_stats_service.get_community_stats(sb)
+
+        assert first is second
+        assert first.total_posts == 40
+        assert first.xp_histogram.total == 10
+        sb.table.assert_called_once_with("community_stats")
+
+    @pytest.mark.asyncio
+    async def test_refresh_drops_cache(self):
+        sb = _table_client([])
+        await community_stats_service.get_community_stats(sb)
+
+        await community_stats_service.refresh_community_stats(sb)
+        await community_stats_service.get_community_stats(sb)
+
+        sb.rpc.assert_called_once_with("refresh_community_stats", {})
+        assert sb.table.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_user_stats_from_counters(self):
+        sb = _table_client([{
+            "total_xp": 1200, "karma": 45, "level": 4,
+            "user_stats": {"posts_count": 15, "completed_grows": 2,
+                           "yield_grams_total": 251, "tasks_total": 20,
+                           "tasks_completed": 17},
+        }])
+
+        stats = await community_stats_service.get_user_stats(sb, "user-1")
+
+        assert stats["posts_count"] == 15
+        assert stats["yield_grams_total"] == 251.0
+        assert stats["tasks_completed"] == 17
+        sb.table.assert_called_once_with("profiles")
+
+    @pytest.mark.asyncio
+    async def test_user_without_counters_defaults_to_zero(self):
+        sb = _table_client([{"total_xp": 0, "karma": 0, "level": 1, "user_stats": []}])
+
+        stats = await community_stats_service.get_user_stats(sb, "new-user")
+
+        assert stats["posts_count"] == 0
+        assert stats["tasks_total"] == 0
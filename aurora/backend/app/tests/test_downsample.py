@@ -0,0 +1,118 @@
+"""
+Aurora Downsampling Tests
+Tests for time-bucket aggregation and LTTB decimation.
+"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.utils.downsample import (
+    METRICS,
+    auto_resolution,
+    bucket_aggregate,
+    lttb_indices,
+    lttb_rows,
+)
+
+T0 = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def _rows(n, step_s=60, **series):
+    rows = []
+    for i in range(n):
+        row = {"created_at": (T0 + timedelta(seconds=i * step_s)).isoformat()}
+        for key, fn in series.items():
+            row[key] = fn(i)
+        rows.append(row)
+    return rows
+
+
+class TestBucketAggregate:
+    """Tests for fixed time buckets."""
+
+    def test_min_max_mean_last_per_bucket(self):
+        rows = _rows(10, temperature=lambda i: 20.0 + i)  # 10 minutes
+
+        buckets = bucket_aggregate(rows, 300, metrics=("temperature",))
+
+        assert [b["count"] for b in buckets] == [5, 5]
+        assert buckets[0]["bucket_start"] == T0.isoformat()
+        assert buckets[0]["temperature"] == {"min": 20.0, "max": 24.0, "mean": 22.0, "last": 24.0}
+        assert buckets[1]["temperature"]["last"] == 29.0
+
+    def test_missing_values_are_skipped(self):
+        rows = _rows(4, humidity=lambda i: None if i % 2 else 50.0 + i)
+
+        buckets = bucket_aggregate(rows, 3600, metrics=("humidity", "ph"))
+
+        assert buckets[0]["humidity"] == {"min": 50.0, "max": 52.0, "mean": 51.0, "last": 52.0}
+        assert buckets[0]["ph"] is None
+
+    def test_unsorted_input(self):
+        rows = _rows(3, temperature=lambda i: float(i))[::-1]
+        assert bucket_aggregate(rows, 3600, metrics=("temperature",))[0]["temperature"]["last"] == 2.0
+
+    def test_empty(self):
+        assert bucket_aggregate([], 60) == []
+
+
+class TestAutoResolution:
+
+    def test_picks_smallest_fitting_width(self):
+        assert auto_resolution(24 * 3600, 500) == "5m"
+        assert auto_resolution(168 * 3600, 500) == "1h"
+        assert auto_resolution(3600, 500) == "1m"
+
+
+class TestLttb:
+    """Tests for LTTB decimation."""
+
+    def test_keeps_endpoints_and_threshold(self):
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 50)
+
+        idx = lttb_indices(x, y, 100)
+
+        assert len(idx) == 100
+        assert idx[0] == 0 and idx[-1] == 999
+        assert np.all(np.diff(idx) > 0)
+
+    def test_keeps_spike(self):
+        x = np.arange(1000, dtype=float)
+        y = np.zeros(1000)
+        y[537] = 10.0
+
+        assert 537 in lttb_indices(x, y, 50)
+
+    def test_small_input_is_untouched(self):
+        rows = _rows(5, temperature=lambda i: float(i))
+        assert lttb_rows(rows, 10) == rows
+
+    def test_rows_union_across_metrics(self):
+        rows = _rows(2000, temperature=lambda i: 20 + np.sin(i / 40), humidity=lambda i: 50 + np.cos(i / 70))
+
+        reduced = lttb_rows(rows, 200, metrics=("temperature", "humidity"))
+
+        assert 100 <= len(reduced) <= 200
+        times = [r["created_at"] for r in reduced]
+        assert times == sorted(times)
+
+    def test_rows_never_exceed_max_points(self):
+        rows = _rows(3000, **{m: (lambda k: lambda i: float((i * k) % 97))(k) for k, m in enumerate(METRICS, 1)})
+
+        assert len(lttb_rows(rows, 200)) <= 200
+        assert len(lttb_rows(rows, 10)) <= 10
+
+
+class TestLatency:
+
+    def test_week_of_minutes_is_fast(self):
+        import time
+        rows = _rows(10_080, temperature=lambda i: 20.0 + (i % 30), humidity=lambda i: 55.0)
+
+        start = time.perf_counter()
+        buckets = bucket_aggregate(rows, 3600)
+        elapsed = time.perf_counter() - start
+
+        assert len(buckets) == 168
+        assert elapsed < 1.0
@@ -0,0 +1,105 @@
+"""
+Aurora Job Runner Tests
+Tests for loop isolation, overlap protection, timeouts and progress.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.job_runner import JobRunner, report_progress
+
+
+@pytest.fixture
+def runner():
+    runner = JobRunner(max_concurrent=1, pool_size=2)
+    runner.start()
+    yield runner
+    runner.stop()
+
+
+class TestJobRunner:
+    """Tests for running scheduler jobs off the request loop."""
+
+    @pytest.mark.asyncio
+    async def test_blocking_job_does_not_stall_request_loop(self, runner):
+        async def blocking_job():
+            time.sleep(0.3)         # sync client call made without to_thread
+            return threading.current_thread().name
+
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        thread = await runner.run("blocking", blocking_job)
+        beat.cancel()
+
+        assert thread == "aurora-job-loop"
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_pool_threads_are_dedicated(self, runner):
+        async def job():
+            return await asyncio.to_thread(lambda: threading.current_thread().name)
+
+        assert (await runner.run("pool", job)).startswith("aurora-job")
+
+    @pytest.mark.asyncio
+    async def test_overlapping_run_is_skipped(self, runner):
+        release = threading.Event()
+
+        async def slow():
+            await asyncio.to_thread(release.wait, 2)
+            return "done"
+
+        first = asyncio.create_task(runner.run("slow", slow))
+        await asyncio.sleep(0.05)
+        second = await runner.run("slow", slow)
+        release.set()
+
+        assert second is None
+        assert await first == "done"
+        assert runner.status()["skipped_overlaps"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_progress_are_reported(self, runner):
+        async def stuck():
+            report_progress(pages=3)
+            await asyncio.sleep(5)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await runner.run("stuck", stuck, timeout=0.05)
+
+        last = runner.status()["recent"][0]
+        assert (last["job"], last["status"]) == ("stuck", "timeout")
+        assert last["progress"] == {"pages": 3}
+        assert runner.status()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_non_isolated_job_runs_on_caller_loop(self, runner):
+        async def job():
+            return asyncio.get_running_loop()
+
+        assert await runner.run("local", job, isolated=False) is asyncio.get_running_loop()
+
+    @pytest.mark.asyncio
+    async def test_failing_scheduler_job_is_recorded_as_failed(self, runner, monkeypatch):
+        from app.core import scheduler
+
+        async def broken(sb):
+            raise RuntimeError("db down")
+
+        monkeypatch.setattr(scheduler, "get_supabase_client", lambda: None)
+        monkeypatch.setattr("app.services.community_stats_service.refresh_community_stats", broken)
+
+        with pytest.raises(RuntimeError):
+            await runner.run("community_stats_refresher", scheduler.refresh_community_stats)
+
+        last = runner.status()["recent"][0]
+        assert (last["status"], last["error"]) == ("failed", "db down")
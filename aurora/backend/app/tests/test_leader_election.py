@@ -0,0 +1,138 @@
+"""
+Aurora Leader Election Tests
+Tests for single-leader scheduling, takeover and stepping down.
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.leader_election import DBLease, FileLease, LeaderElector
+
+
+class FakeLeaseDB:
+    """In-memory acquire_lease / release_lease with a controllable clock."""
+
+    def __init__(self):
+        self.row = None
+        self.now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+        self.down = False
+
+    def rpc(self, name, params):
+        if self.down:
+            raise ConnectionError("db unreachable")
+        if name == "release_lease":
+            if self.row and self.row["holder"] == params["holder_param"]:
+                self.row["expires_at"] = self.now
+            return MagicMock(execute=lambda: MagicMock(data=None))
+
+        holder = params["holder_param"]
+        if self.row is None or self.row["holder"] == holder or self.row["expires_at"] < self.now:
+            meta = params["meta_param"] or (self.row or {}).get("meta", {})
+            self.row = {
+                "holder": holder,
+                "expires_at": self.now + timedelta(seconds=params["ttl_seconds_param"]),
+                "meta": meta,
+            }
+        row = {**self.row, "expires_at": self.row["expires_at"].isoformat()}
+        return MagicMock(execute=lambda: MagicMock(data=[row]))
+
+
+def _worker(lease, **kwargs):
+    events = []
+    elector = LeaderElector(
+        lease,
+        on_elected=lambda: events.append("resume"),
+        on_demoted=lambda: events.append("pause"),
+        **kwargs,
+    )
+    return elector, events
+
+
+class TestDBLease:
+    """Tests for the lease-row backend."""
+
+    @pytest.mark.asyncio
+    async def test_exactly_one_of_four_workers_leads(self):
+        db = FakeLeaseDB()
+        workers = [_worker(DBLease(lambda: db)) for _ in range(4)]
+
+        for elector, _ in workers:
+            await elector.tick()
+        for elector, _ in workers:
+            await elector.tick()
+
+        leaders = [e for e, _ in workers if e.is_leader]
+        assert len(leaders) == 1
+        assert all(e.leader == leaders[0].holder for e, _ in workers)
+        assert [ev for _, ev in workers].count(["resume"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_follower_takes_over_after_expiry(self):
+        db = FakeLeaseDB()
+        (a, a_events), (b, b_events) = _worker(DBLease(lambda: db)), _worker(DBLease(lambda: db))
+        await a.tick()
+        await b.tick()
+        assert a.is_leader and not b.is_leader
+
+        db.now += timedelta(seconds=31)     # leader died without renewing
+        await b.tick()
+
+        assert b.is_leader and b_events == ["resume"]
+
+    @pytest.mark.asyncio
+    async def test_leader_publishes_job_stats_to_followers(self):
+        db = FakeLeaseDB()
+        a, _ = _worker(DBLease(lambda: db), meta_fn=lambda: {"jobs": [{"job": "daily", "status": "ok"}]})
+        b, _ = _worker(DBLease(lambda: db))
+        await a.tick()
+        await a.tick()      # renewal carries the leader's meta
+
+        await b.tick()
+
+        assert b.status()["leader_jobs"] == [{"job": "daily", "status": "ok"}]
+
+    @pytest.mark.asyncio
+    async def test_leader_steps_down_when_it_cannot_renew(self):
+        db = FakeLeaseDB()
+        a, events = _worker(DBLease(lambda: db), ttl=30)
+        await a.tick()
+
+        db.down = True
+        await a.tick()
+        assert a.is_leader      # lease still valid
+
+        a._valid_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await a.tick()
+        assert not a.is_leader and events == ["resume", "pause"]
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_the_lease(self):
+        db = FakeLeaseDB()
+        (a, _), (b, _) = _worker(DBLease(lambda: db)), _worker(DBLease(lambda: db))
+        await a.tick()
+
+        await a.stop()
+        db.now += timedelta(microseconds=1)
+        await b.tick()
+
+        assert b.is_leader
+
+
+class TestFileLease:
+    """Tests for the single-host file lock backend."""
+
+    @pytest.mark.asyncio
+    async def test_lock_is_exclusive_and_released(self, tmp_path):
+        path = str(tmp_path / "scheduler.lock")
+        (a, _), (b, _) = _worker(FileLease(path)), _worker(FileLease(path))
+
+        await a.tick()
+        await b.tick()
+        assert a.is_leader and not b.is_leader
+        assert b.leader == a.holder
+
+        await a.stop()
+        await b.tick()
+        assert b.is_leader
+        await b.stop()
@@ -0,0 +1,213 @@
+"""
+Aurora Leaderboard Tests
+Tests for the rank index, incremental board updates and the endpoints.
+"""
+import asyncio
+import random
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.dependencies import get_current_user_id
+from app.routers import leaderboard as leaderboard_router
+from app.services.leaderboard_service import Leaderboards, RankIndex
+
+
+def _brute_rank(scores, user_id):
+    return 1 + sum(1 for s in scores.values() if s > scores[user_id])
+
+
+class TestRankIndex:
+    """Tests for order statistics against a brute-force ranking."""
+
+    def test_random_updates_match_brute_force(self):
+        rng = random.Random(3)
+        index, scores = RankIndex(), {}
+        for _ in range(2000):
+            uid = f"u{rng.randrange(200)}"
+            if rng.random() < 0.1 and uid in scores:
+                index.remove(uid)
+                del scores[uid]
+            else:
+                scores[uid] = rng.randrange(50)
+                index.set(uid, scores[uid])
+
+        assert len(index) == len(scores)
+        for uid in scores:
+            assert index.rank(uid) == _brute_rank(scores, uid)
+        top = index.top(len(scores))
+        assert [e["score"] for e in top] == sorted(scores.values(), reverse=True)
+
+    def test_ties_share_a_rank(self):
+        index = RankIndex()
+        index.load({"a": 10, "b": 30, "c": 30, "d": 5})
+
+        assert [(e["user_id"], e["rank"]) for e in index.top(4)] == [
+            ("b", 1), ("c", 1), ("a", 3), ("d", 4),
+        ]
+
+    def test_around_is_clipped_at_the_edges(self):
+        index = RankIndex()
+        index.load({f"u{i}": i for i in range(10)})
+
+        assert [e["score"] for e in index.around("u5", 2)] == [7, 6, 5, 4, 3]
+        assert [e["score"] for e in index.around("u9", 2)] == [9, 8, 7]
+        assert index.around("ghost") == []
+
+
+class TestLeaderboards:
+    """Tests for incremental updates from awards."""
+
+    def test_record_moves_all_boards(self):
+        boards = Leaderboards()
+        boards.xp.load({"a": 100, "b": 200})
+        boards.join_strain("a", "Northern Lights")
+
+        boards.record("a", total_xp=300, karma=12, xp_gained=200)
+
+        assert boards.xp.rank("a") == 1
+        assert boards.karma.score("a") == 12
+        assert boards.weekly.score("a") == 200
+        assert boards.board("strain", " northern lights ").score("a") == 300
+
+    @pytest.mark.asyncio
+    async def test_rebuild_from_database(self):
+        sb = MagicMock()
+        tables = {"profiles": MagicMock(), "grows": MagicMock()}
+        tables["profiles"].select.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=[{"id": "a", "total_xp": 50, "karma": 3}, {"id": "b", "total_xp": 80, "karma": 1}]
+        )
+        tables["grows"].select.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            data=[{"user_id": "a", "strain_name": "OG Kush"}, {"user_id": "b", "strain_name": None}]
+        )
+        sb.table.side_effect = lambda name: tables[name]
+        sb.rpc.return_value.range.return_value.execute.return_value = MagicMock(data=[{"user_id": "b", "xp": 40}])
+        boards = Leaderboards()
+
+        await boards.rebuild(sb)
+
+        assert boards.xp.rank("b") == 1 and boards.karma.rank("a") == 1
+        assert boards.weekly.score("b") == 40
+        assert len(boards.board("strain", "og kush")) == 1
+
+    @pytest.mark.asyncio
+    async def test_weekly_totals_are_paged(self, monkeypatch):
+        from app.services import leaderboard_service
+        monkeypatch.setattr(leaderboard_service, "PAGE_SIZE", 2)
+        weekly = [{"user_id": f"u{i}", "xp": i + 1} for i in range(5)]
+        sb = MagicMock()
+        sb.table.return_value.select.return_value.order.return_value.range.return_value.execute.return_value = (
+            MagicMock(data=[])
+        )
+        sb.rpc.return_value.range.side_effect = (
+            lambda lo, hi: MagicMock(execute=lambda: MagicMock(data=weekly[lo:hi + 1]))
+        )
+        boards = Leaderboards()
+
+        await boards.rebuild(sb)
+
+        assert len(boards.weekly) == 5
+
+    @pytest.mark.asyncio
+    async def test_workers_poll_for_snapshots_on_their_own_timer(self, monkeypatch):
+        boards = Leaderboards()
+        polls = []
+
+        async def load_snapshot(sb):
+            polls.append(sb)
+            return False
+
+        monkeypatch.setattr(boards, "load_snapshot", load_snapshot)
+        boards.start("sb", interval=0.01)
+        await asyncio.sleep(0.05)
+        await boards.stop()
+
+        assert len(polls) >= 2 and not boards.stats()["refreshing"]
+
+    @pytest.mark.asyncio
+    async def test_followers_load_the_leaders_snapshot(self, monkeypatch):
+        leader = Leaderboards()
+
+        async def rebuild(sb):
+            leader.built_at = datetime.now(timezone.utc)
+
+        monkeypatch.setattr(leader, "rebuild", rebuild)
+        leader.record("a", total_xp=300, karma=12, xp_gained=20)
+        leader.record("b", total_xp=500, karma=3)
+        leader.join_strain("b", "Blue Dream")
+        sb = MagicMock()
+        await leader.snapshot(sb)
+        rows = sb.table.return_value.upsert.call_args.args[0]
+        assert [r["board"] for r in rows] == ["xp", "karma", "weekly", "strains"]
+        assert rows[0]["entries"][0]["user_id"] == "b"
+
+        follower = Leaderboards()
+        query = sb.table.return_value.select.return_value
+        query.eq.return_value.eq.return_value.limit.return_value.execute.return_value = (
+            MagicMock(data=[{"taken_at": rows[0]["taken_at"]}])
+        )
+        query.in_.return_value.execute.return_value = MagicMock(data=rows)
+
+        assert await follower.load_snapshot(sb) is True
+        assert follower.xp.rank("a") == 2 and follower.karma.rank("a") == 1
+        assert follower.weekly.score("a") == 20
+        assert follower.board("strain", "blue dream").score("b") == 500
+        # nothing newer: no second read
+        query.in_.reset_mock()
+        assert await follower.load_snapshot(sb) is False
+        query.in_.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_startup_rebuilds_when_no_snapshot_exists(self, monkeypatch):
+        boards = Leaderboards()
+        monkeypatch.setattr(boards, "rebuild", AsyncMock())
+        sb = MagicMock()
+        sb.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value \
+            .execute.return_value = MagicMock(data=[])
+
+        await boards.load(sb)
+
+        boards.rebuild.assert_awaited_once_with(sb)
+
+
+class TestEndpoints:
+    """Tests for the leaderboard router."""
+
+    @pytest.fixture
+    def boards(self, monkeypatch):
+        boards = Leaderboards()
+        boards.xp.load({f"u{i}": i * 10 for i in range(30)})
+        monkeypatch.setattr(leaderboard_router, "leaderboards", boards)
+        leaderboard_router._profile_cards.clear()
+        return boards
+
+    @pytest.mark.asyncio
+    async def test_top_and_my_rank(self, boards):
+        with patch("app.routers.leaderboard.get_supabase_client") as get_client:
+            get_client.return_value.table.return_value.select.return_value.in_.return_value.execute.return_value = (
+                MagicMock(data=[{"id": "u29", "display_name": "Top", "level": 9}])
+            )
+            top = await leaderboard_router.get_leaderboard("xp", strain=None, limit=3, offset=0, user_id="u1")
+            me = await leaderboard_router.get_my_rank("xp", strain=None, radius=1, user_id="u10")
+
+        assert top["total"] == 30
+        assert [e["user_id"] for e in top["entries"]] == ["u29", "u28", "u27"]
+        assert top["entries"][0]["display_name"] == "Top"
+        assert me["rank"] == 20
+        assert [e["user_id"] for e in me["neighbors"]] == ["u11", "u10", "u9"]
+
+    @pytest.mark.asyncio
+    async def test_strain_board_requires_strain(self, boards):
+        with pytest.raises(HTTPException) as e:
+            await leaderboard_router.get_leaderboard("strain", strain=None, limit=10, offset=0, user_id="u1")
+        assert e.value.status_code == 400
+
+        empty = await leaderboard_router.get_leaderboard("strain", strain="Unknown", limit=10, offset=0, user_id="u1")
+        assert empty["total"] == 0
+
+    def test_every_board_endpoint_requires_auth(self):
+        for route in leaderboard_router.router.routes:
+            calls = [d.call for d in route.dependant.dependencies]
+            assert get_current_user_id in calls, route.path
@@ -0,0 +1,64 @@
+"""
+Aurora Level Curve Tests
+Property tests for the level table against the original loop.
+"""
+import numpy as np
+import pytest
+
+from app.utils.levels import (
+    TABLE_MAX_LEVEL,
+    level_from_xp,
+    levels_from_xp,
+    xp_for_level,
+)
+
+
+def _loop_level(total_xp: int) -> int:
+    """The original implementation: walk up from level 1."""
+    level = 1
+    while xp_for_level(level + 1) <= total_xp:
+        level += 1
+    return level
+
+
+class TestLevelFromXp:
+    """level_from_xp must agree with the loop everywhere."""
+
+    def test_exhaustive_low_range(self):
+        xp = np.arange(-10, 200_000)
+        expected, level = [], 1
+        for v in xp.tolist():       # incremental loop: same answers, linear time
+            while xp_for_level(level + 1) <= v:
+                level += 1
+            expected.append(level)
+
+        assert [level_from_xp(v) for v in xp.tolist()] == expected
+        assert levels_from_xp(xp).tolist() == expected
+
+    def test_every_threshold_and_neighbours(self):
+        for level in range(2, 600):
+            edge = xp_for_level(level)
+            for v in (edge - 1, edge, edge + 1):
+                assert level_from_xp(v) == _loop_level(v)
+
+    @pytest.mark.parametrize("level", [TABLE_MAX_LEVEL - 1, TABLE_MAX_LEVEL, TABLE_MAX_LEVEL + 1, 50_000])
+    def test_table_boundary_and_beyond(self, level):
+        edge = xp_for_level(level)
+        for v in (edge - 1, edge, edge + 1):
+            expected = level - 1 if v < edge else level
+            assert level_from_xp(v) == expected
+            assert levels_from_xp([v])[0] == expected
+
+    def test_random_totals(self):
+        rng = np.random.default_rng(7)
+        xp = np.concatenate([
+            rng.integers(0, 5_000_000, 500),
+            rng.integers(0, 2**31 - 1, 50),
+        ])
+
+        vector = levels_from_xp(xp)
+
+        for v, lv in zip(xp.tolist(), vector.tolist()):
+            assert level_from_xp(v) == lv
+        for v in xp[:200].tolist():
+            assert level_from_xp(v) == _loop_level(v)
@@ -0,0 +1,64 @@
+"""
+Aurora Like Engine Tests
+Tests for the atomic like toggle.
+"""
+import pytest
+from unittest.mock import Mock
+
+from app.services import like_service
+from app.services.like_service import PostNotFoundError
+from app.services.xp_ledger import XPLedger
+
+
+def _rpc_client(data):
+    """Build a Supabase mock whose rpc(...).execute() returns `data`."""
+    sb = Mock()
+    sb.rpc.return_value.execute.return_value = Mock(data=data)
+    return sb
+
+
+@pytest.fixture(autouse=True)
+def fresh_ledger(monkeypatch):
+    ledger = XPLedger()
+    monkeypatch.setattr(like_service, "xp_ledger", ledger)
+    return ledger
+
+
+class TestToggleLike:
+    """Tests for the single-RPC toggle."""
+
+    @pytest.mark.asyncio
+    async def test_like_queues_karma_for_author(self, fresh_ledger):
+        sb = _rpc_client([{"is_liked": True, "new_likes_count": 7, "author_id": "author-1"}])
+
+        result = await like_service.toggle_like(sb, "post-1", "user-1")
+
+        assert result == {"liked": True, "likes_count": 7}
+        sb.rpc.assert_called_once_with(
+            "toggle_post_like", {"post_id_param": "post-1", "user_id_param": "user-1"}
+        )
+        assert fresh_ledger.pending == {"author-1": {"xp": 0, "karma": 2}}
+
+    @pytest.mark.asyncio
+    async def test_unlike_does_not_queue_karma(self, fresh_ledger):
+        sb = _rpc_client([{"is_liked": False, "new_likes_count": 6, "author_id": "author-1"}])
+
+        result = await like_service.toggle_like(sb, "post-1", "user-1")
+
+        assert result["liked"] is False
+        assert fresh_ledger.pending == {}
+
+    @pytest.mark.asyncio
+    async def test_self_like_does_not_award_karma(self, fresh_ledger):
+        sb = _rpc_client([{"is_liked": True, "new_likes_count": 1, "author_id": "user-1"}])
+
+        await like_service.toggle_like(sb, "post-1", "user-1")
+
+        assert fresh_ledger.pending == {}
+
+    @pytest.mark.asyncio
+    async def test_missing_post_raises(self):
+        sb = _rpc_client([{"is_liked": True, "new_likes_count": None, "author_id": None}])
+
+        with pytest.raises(PostNotFoundError):
+            await like_service.toggle_like(sb, "missing", "user-1")
@@ -0,0 +1,156 @@
+"""
+Aurora Moderation Pipeline Tests
+Tests for batched LLM verdicts and write-back.
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.moderation_service import ModerationItem, ModerationPipeline
+from app.services.toxicity_classifier import ToxicityClassifier
+
+
+@pytest.fixture(autouse=True)
+def fresh_classifier(monkeypatch):
+    classifier = ToxicityClassifier()
+    monkeypatch.setattr("app.services.moderation_service.toxicity_classifier", classifier)
+    return classifier
+
+
+@pytest.fixture
+def pipeline():
+    p = ModerationPipeline()
+    p._ai = Mock()
+    p._supabase = Mock()
+    p.RETRY_DELAY_SECONDS = 0
+    return p
+
+
+class TestProcessBatch:
+    """Tests for verdict application."""
+
+    @pytest.mark.asyncio
+    async def test_one_llm_call_per_batch(self, pipeline):
+        pipeline._ai.check_toxicity_batch = AsyncMock(return_value=[False, False, False])
+        batch = [ModerationItem("post", f"p{i}", "u1", "nice buds") for i in range(3)]
+
+        await pipeline.process_batch(batch)
+
+        pipeline._ai.check_toxicity_batch.assert_awaited_once_with(["nice buds"] * 3)
+        pipeline._supabase.table.assert_not_called()
+        assert pipeline.metrics()["processed"] == 3
+        assert pipeline.metrics()["avg_batch_size"] == 3
+
+    @pytest.mark.asyncio
+    async def test_provisional_toxic_comment_is_taken_down(self, pipeline):
+        pipeline._ai.check_toxicity_batch = AsyncMock(return_value=[True])
+        item = ModerationItem("comment", "c1", "u1", "bad", post_id="p1")
+
+        with patch("app.services.moderation_service.socket_manager") as sockets:
+            sockets.send_personal_message = AsyncMock()
+            await pipeline.process_batch([item])
+
+        pipeline._supabase.table.assert_called_with("post_comments")
+        pipeline._supabase.table.return_value.update.assert_called_with(
+            {"is_toxic": True, "is_hidden": True}
+        )
+        pipeline._supabase.rpc.assert_called_once_with(
+            "decrement_comments", {"post_id_param": "p1"}
+        )
+        sockets.send_personal_message.assert_awaited_once()
+        message, user_id = sockets.send_personal_message.await_args.args
+        assert user_id == "u1"
+        assert message["type"] == "moderation_takedown"
+
+    @pytest.mark.asyncio
+    async def test_held_clean_comment_is_released(self, pipeline):
+        pipeline._ai.check_toxicity_batch = AsyncMock(return_value=[False])
+        item = ModerationItem("comment", "c1", "u1", "kys lol", held=True, post_id="p1")
+
+        await pipeline.process_batch([item])
+
+        pipeline._supabase.table.return_value.update.assert_called_with({"is_hidden": False})
+        pipeline._supabase.rpc.assert_called_once_with(
+            "increment_comments", {"post_id_param": "p1"}
+        )
+        assert pipeline.metrics()["released"] == 1
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_leaves_content_untouched(self, pipeline):
+        pipeline._ai.check_toxicity_batch = AsyncMock(side_effect=RuntimeError("groq down"))
+
+        await pipeline.process_batch([ModerationItem("post", "p1", "u1", "hello")])
+
+        pipeline._supabase.table.assert_not_called()
+        assert pipeline.metrics()["llm_errors"] == pipeline.MAX_ATTEMPTS
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_is_retried(self, pipeline):
+        pipeline._ai.check_toxicity_batch = AsyncMock(side_effect=[RuntimeError("429"), [False]])
+        item = ModerationItem("comment", "c1", "u1", "kys lol", held=True, post_id="p1")
+
+        await pipeline.process_batch([item])
+
+        assert pipeline._ai.check_toxicity_batch.await_count == 2
+        assert pipeline.metrics()["released"] == 1
+        assert pipeline.metrics()["requeued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_blocklisted_comment_stays_hidden_when_llm_stays_down(self, pipeline, fresh_classifier):
+        verdict = fresh_classifier.classify("kill yourself")
+        assert verdict.label == "toxic" and not verdict.final      # submitted held
+        pipeline._ai.check_toxicity_batch = AsyncMock(side_effect=RuntimeError("groq down"))
+        held = ModerationItem("comment", "c1", "u1", "kill yourself", held=True, post_id="p1")
+        provisional = ModerationItem("post", "p2", "u1", "hello")
+
+        await pipeline.process_batch([held, provisional])
+
+        pipeline._supabase.table.assert_not_called()
+        assert pipeline.metrics()["requeued"] == 1
+        assert pipeline.metrics()["backlog_depth"] == 1
+
+        # the verdict arrives once the LLM is back
+        pipeline._ai.check_toxicity_batch = AsyncMock(return_value=[True])
+        await pipeline.process_batch([pipeline._backlog.popleft()])
+        pipeline._supabase.table.return_value.update.assert_called_with({"is_toxic": True, "is_hidden": True})
+
+    @pytest.mark.asyncio
+    async def test_llm_verdicts_are_cached(self, pipeline, fresh_classifier):
+        pipeline._ai.check_toxicity_batch = AsyncMock(return_value=[False])
+
+        await pipeline.process_batch([ModerationItem("post", "p1", "u1", "is this mold?")])
+
+        verdict = fresh_classifier.classify("Is this   MOLD?")
+        assert verdict.final is True
+        assert verdict.label == "benign"
+        assert verdict.source == "cache"
+
+
+class TestSubmit:
+    """Tests for queue submission."""
+
+    def test_submit_without_worker_is_backlogged(self):
+        pipeline = ModerationPipeline()
+        assert pipeline.submit(ModerationItem("post", "p1", "u1", "hi")) is True
+        assert pipeline.metrics()["backlog_depth"] == 1
+        assert pipeline.metrics()["dropped"] == 0
+
+    def test_full_backlog_drops(self):
+        pipeline = ModerationPipeline()
+        pipeline.BACKLOG_SIZE = 1
+        pipeline.submit(ModerationItem("post", "p1", "u1", "hi"))
+        assert pipeline.submit(ModerationItem("post", "p2", "u1", "hi")) is False
+        assert pipeline.metrics()["dropped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_queue_and_backlog(self, pipeline):
+        pipeline._ai.check_toxicity_batch = AsyncMock(side_effect=lambda texts: [False] * len(texts))
+        pipeline.QUEUE_SIZE = 2
+        pipeline.start(pipeline._ai, pipeline._supabase)
+        pipeline._task.cancel()     # worker never gets to run
+        for i in range(5):
+            pipeline.submit(ModerationItem("post", f"p{i}", "u1", f"post {i}"))
+
+        await pipeline.stop()
+
+        assert pipeline.metrics()["processed"] == 5
+        assert pipeline.metrics()["backlog_depth"] == 0
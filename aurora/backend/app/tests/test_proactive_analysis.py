@@ -0,0 +1,273 @@
+"""
+Aurora Proactive Analysis Tests
+Tests for the batched detection pass, the concurrent, sharded run and
+templated messages.
+"""
+import asyncio
+import random
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.reading_cache import reading_cache
+from app.services import proactive_analysis_service as pas
+from app.services.proactive_analysis_service import ProactiveAnalysisService
+from app.services.proactive_templates import (
+    anomaly_signature, proactive_templates, render, validate_template,
+)
+from app.services.threshold_service import check_many, compile_thresholds, threshold_cache
+
+PLAN = {"phases": [{
+    "phase": "flowering",
+    "environment": {"temperature_day_c": 25, "humidity_percent": 45, "vpd_min": 1.0, "vpd_max": 1.5},
+    "nutrients": {"ph_min": 6.0, "ph_max": 6.5},
+}]}
+
+
+def _grow(i, plan=PLAN, medium="soil"):
+    return {
+        "id": f"g{i:04d}", "user_id": f"u{i:04d}", "name": f"Grow {i}",
+        "current_phase": "flowering", "medium": medium, "ai_plan": plan,
+        "updated_at": "2026-10-01T00:00:00+00:00",
+    }
+
+
+def _reading(i):
+    # every third grow runs humid
+    return {"temperature": 25.0, "humidity": 75.0 if i % 3 == 0 else 45.0, "vpd": 1.2, "ph": 6.2}
+
+
+class FakeDB:
+    """proactive_grows / latest_grow_readings RPCs, the templates table and recording inserts."""
+
+    def __init__(self, grows, readings):
+        self.grows = sorted(grows, key=lambda g: g["id"])
+        self.readings = readings
+        self.rpc_calls = []
+        self.inserts = []
+        self.templates = {}
+
+    def rpc(self, name, params):
+        self.rpc_calls.append(name)
+        if name == "proactive_grows":
+            after, size = params["after_id_param"], params["page_size_param"]
+            shard, shards = params["shard_param"], params["shard_count_param"]
+            rows = [g for g in self.grows
+                    if (after is None or g["id"] > after) and int(g["id"][1:]) % shards == shard][:size]
+        else:
+            rows = [{"grow_id": gid, "reading": self.readings[gid]}
+                    for gid in params["grow_ids_param"] if gid in self.readings]
+        return MagicMock(execute=lambda: MagicMock(data=rows))
+
+    def table(self, name):
+        db, q = self, MagicMock()
+
+        def insert(rows):
+            db.inserts.append((name, len(rows)))
+            return MagicMock(execute=lambda: MagicMock(data=rows))
+
+        def in_(col, sigs):
+            rows = [{"signature": s, "template": db.templates[s]} for s in sigs if s in db.templates]
+            return MagicMock(execute=lambda: MagicMock(data=rows))
+
+        def upsert(rows, **_):
+            for row in rows:
+                db.templates.setdefault(row["signature"], row["template"])
+            return MagicMock(execute=lambda: MagicMock(data=rows))
+
+        def delete_in(col, sigs):
+            for sig in sigs:
+                db.templates.pop(sig, None)
+            return MagicMock(execute=lambda: MagicMock(data=[]))
+
+        q.insert.side_effect = insert
+        q.select.return_value.in_.side_effect = in_
+        q.upsert.side_effect = upsert
+        q.delete.return_value.in_.side_effect = delete_in
+        return q
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    reading_cache.clear()
+    threshold_cache.clear()
+    proactive_templates.clear()
+    yield
+    reading_cache.clear()
+    threshold_cache.clear()
+    proactive_templates.clear()
+
+
+TEMPLATE = "{grow_name}: humidity at {humidity_current}% (aim for {humidity_min}-{humidity_max}%)."
+
+
+class TestCheckMany:
+    """The batched comparison must agree with the per-reading one."""
+
+    def test_matches_per_reading_check(self):
+        rng = random.Random(5)
+        tables = [compile_thresholds(_grow(i)) for i in range(50)]
+        readings = [
+            {"temperature": rng.uniform(10, 40), "humidity": rng.uniform(20, 90),
+             "vpd": rng.uniform(0.2, 2.5), "ph": None if i % 7 == 0 else rng.uniform(5, 7.5)}
+            for i in range(50)
+        ]
+
+        assert check_many(readings, tables) == [t.check(r) for t, r in zip(tables, readings)]
+        assert check_many([], []) == []
+
+
+class TestProactiveRun:
+    """Tests for the staged, concurrent analysis run."""
+
+    def _service(self, db, **kwargs):
+        service = ProactiveAnalysisService(MagicMock(), db, llm_per_minute=0, **kwargs)
+        service._call_groq_with_retry = lambda messages: TEMPLATE
+        return service
+
+    @pytest.mark.asyncio
+    async def test_bulk_reads_and_inserts(self, monkeypatch):
+        monkeypatch.setattr(pas, "PAGE_SIZE", 10)
+        grows = [_grow(i) for i in range(30)] + [_grow(99, plan=None)]
+        db = FakeDB(grows, {g["id"]: _reading(int(g["id"][1:])) for g in grows if g["id"] != "g0029"})
+
+        summary = await self._service(db).run_analysis()
+
+        assert summary["processed"] == 29          # no plan / no reading are skipped
+        assert summary["alerts_sent"] == 10        # g0000, g0003, ... g0027
+        assert summary["llm_calls"] == 1 and summary["errors"] == 0     # one shared pattern
+        assert db.rpc_calls.count("proactive_grows") == 4
+        assert db.rpc_calls.count("latest_grow_readings") == 3
+        assert db.inserts == [("chat_messages", 10), ("notifications", 10)]
+
+    @pytest.mark.asyncio
+    async def test_llm_calls_run_concurrently_under_the_limit(self):
+        grows = [_grow(i * 3, medium=f"mix {i}") for i in range(12)]     # 12 distinct patterns
+        db = FakeDB(grows, {g["id"]: _reading(0) for g in grows})
+        in_flight, peak, lock = 0, 0, threading.Lock()
+
+        def slow_llm(messages):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return TEMPLATE
+
+        service = self._service(db, llm_concurrency=4)
+        service._call_groq_with_retry = slow_llm
+        started = time.monotonic()
+        summary = await service.run_analysis()
+
+        assert summary["alerts_sent"] == 12
+        assert peak == 4
+        assert time.monotonic() - started < 12 * 0.05
+
+    @pytest.mark.asyncio
+    async def test_failed_generation_is_counted_not_saved(self):
+        grows = [_grow(0), _grow(3, medium="coco")]
+        db = FakeDB(grows, {g["id"]: _reading(0) for g in grows})
+        service = self._service(db)
+
+        def flaky(messages):
+            if "coco" in messages[1]["content"]:
+                raise RuntimeError("groq down")
+            return TEMPLATE
+
+        service._call_groq_with_retry = flaky
+        summary = await service.run_analysis()
+
+        assert (summary["alerts_sent"], summary["errors"]) == (1, 1)
+        assert db.inserts == [("chat_messages", 1), ("notifications", 1)]
+
+    @pytest.mark.asyncio
+    async def test_shards_cover_every_grow_once(self):
+        grows = [_grow(i * 3) for i in range(9)]
+        db = FakeDB(grows, {g["id"]: _reading(0) for g in grows})
+
+        summaries = [await self._service(db).run_analysis(shard=s, shards=3) for s in range(3)]
+
+        assert sum(s["processed"] for s in summaries) == 9
+        assert sum(s["alerts_sent"] for s in summaries) == 9
+
+
+class TestTemplates:
+    """Tests for signature-keyed message templates."""
+
+    def _anomalies(self, humidity=75.0):
+        service = ProactiveAnalysisService(MagicMock(), MagicMock())
+        return service._detect_anomalies({"humidity": humidity, "vpd": 0.5}, compile_thresholds(_grow(0)))
+
+    def test_signature_ignores_values_and_order(self):
+        a, b = self._anomalies(75.0), self._anomalies(76.0)
+
+        assert anomaly_signature(_grow(0), a) == anomaly_signature(_grow(1), list(reversed(b)))
+        assert anomaly_signature(_grow(0), a) == "flowering|soil|humidity:high:critical;vpd:low:critical"
+        assert anomaly_signature(_grow(0, medium="Coco"), a) != anomaly_signature(_grow(0), a)
+
+    def test_render_and_validate(self):
+        anomalies = self._anomalies(75.0)
+
+        assert render(TEMPLATE, _grow(7), anomalies) == "Grow 7: humidity at 75% (aim for 30-60%)."
+        assert validate_template(TEMPLATE, anomalies)
+        assert not validate_template("{ph_current} is off", anomalies)
+        assert not validate_template("unbalanced {humidity_current", anomalies)
+        assert not validate_template("  ", anomalies)
+        assert not validate_template("{humidity_current:.1f}% humidity", anomalies)
+        assert not validate_template("{grow_name!r} is humid", anomalies)
+        assert not validate_template("{humidity_current[0]} humid", anomalies)
+
+    @pytest.mark.asyncio
+    async def test_known_signatures_skip_the_llm(self):
+        grows = [_grow(i * 3) for i in range(20)]
+        db = FakeDB(grows, {g["id"]: _reading(0) for g in grows})
+        service = ProactiveAnalysisService(MagicMock(), db, llm_per_minute=0)
+        calls = []
+        service._call_groq_with_retry = lambda messages: calls.append(messages) or TEMPLATE
+
+        first = await service.run_analysis()
+        proactive_templates.clear()         # next run (or another shard) reads them back
+        second = await service.run_analysis()
+
+        assert (first["llm_calls"], first["templates_created"]) == (1, 1)
+        assert (second["llm_calls"], second["template_hits"]) == (0, 20)
+        assert len(calls) == 1 and len(db.templates) == 1
+
+    @pytest.mark.asyncio
+    async def test_unusable_template_falls_back_per_grow(self):
+        grows = [_grow(0), _grow(3)]
+        db = FakeDB(grows, {g["id"]: _reading(0) for g in grows})
+        service = ProactiveAnalysisService(MagicMock(), db, llm_per_minute=0)
+        service._call_groq_with_retry = lambda messages: "Use {nonsense} here."
+
+        summary = await service.run_analysis()
+
+        assert summary["templates_created"] == 0 and not db.templates
+        assert (summary["llm_calls"], summary["alerts_sent"]) == (3, 2)
+
+    @pytest.mark.asyncio
+    async def test_stored_template_that_fails_to_render_is_regenerated(self):
+        grows = [_grow(0), _grow(3)]
+        db = FakeDB(grows, {g["id"]: _reading(0) for g in grows})
+        sig = "flowering|soil|humidity:high:critical"
+        db.templates[sig] = "{grow_name}: humidity {humidity_current:.1f}%"
+        service = ProactiveAnalysisService(MagicMock(), db, llm_per_minute=0)
+        service._call_groq_with_retry = lambda messages: TEMPLATE
+
+        summary = await service.run_analysis()
+
+        assert (summary["alerts_sent"], summary["errors"]) == (2, 0)
+        assert (summary["template_hits"], summary["templates_created"]) == (0, 1)
+        assert db.templates[sig] == TEMPLATE
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_calls():
+    limiter = pas._RateLimiter(per_minute=1200)      # one every 50 ms
+    started = time.monotonic()
+    await asyncio.gather(*(limiter.wait() for _ in range(4)))
+    assert time.monotonic() - started >= 0.14
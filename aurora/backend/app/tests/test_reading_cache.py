@@ -0,0 +1,184 @@
+"""
+Aurora Reading Cache Tests
+Tests for the per-grow ring buffer, lazy warming and its readers.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.reading_cache import Reading, ReadingCache, RingBuffer
+from app.routers.sensors import get_latest_readings
+
+
+def _row(minute=0, grow_id="g1", user_id="u1", id=None, **values):
+    return {
+        "id": id or f"r{minute}",
+        "grow_id": grow_id,
+        "user_id": user_id,
+        "created_at": f"2026-10-19T10:{minute:02d}:00+00:00",
+        **values,
+    }
+
+
+def _supabase(readings=None, snapshots=None):
+    sb = MagicMock()
+    tables = {"sensor_readings": MagicMock(), "grow_snapshots": MagicMock()}
+    for name, data in (("sensor_readings", readings), ("grow_snapshots", snapshots)):
+        chain = tables[name].select.return_value.eq.return_value.order.return_value.limit.return_value
+        chain.execute.return_value = MagicMock(data=data or [])
+    sb.table.side_effect = lambda name: tables[name]
+    return sb, tables
+
+
+class TestRingBuffer:
+    """Tests for RingBuffer ordering and capacity."""
+
+    def test_keeps_last_n_in_time_order(self):
+        buf = RingBuffer(3)
+        for minute in range(5):
+            buf.push(Reading.from_row(_row(minute, temperature=20 + minute)))
+
+        assert len(buf) == 3
+        assert [r.temperature for r in buf.last(3)] == [22.0, 23.0, 24.0]
+        assert buf.latest().temperature == 24.0
+
+    def test_late_reading_is_placed_in_order(self):
+        buf = RingBuffer(3)
+        for minute in (1, 3, 5):
+            buf.push(Reading.from_row(_row(minute)))
+
+        assert buf.push(Reading.from_row(_row(4))) is False
+        assert [r.id for r in buf.last(3)] == ["r3", "r4", "r5"]
+
+    def test_duplicates_are_ignored(self):
+        buf = RingBuffer(3)
+        buf.push(Reading.from_row(_row(1)))
+        buf.push(Reading.from_row(_row(2)))
+        buf.push(Reading.from_row(_row(2)))
+        buf.push(Reading.from_row(_row(1)))
+        assert [r.id for r in buf.last(3)] == ["r1", "r2"]
+
+    def test_records_use_slots(self):
+        reading = Reading.from_row(_row(temperature=21))
+        assert not hasattr(reading, "__dict__")
+        assert reading.to_dict()["temperature"] == 21.0
+
+
+class TestReadingCache:
+    """Tests for ReadingCache population and warming."""
+
+    @pytest.mark.asyncio
+    async def test_ingested_readings_need_no_query(self):
+        cache = ReadingCache()
+        cache.add([_row(1), _row(2)])
+        sb, _ = _supabase()
+
+        latest = await cache.recent(sb, "g1", 1)
+
+        assert latest[0].id == "r2"
+        sb.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_miss_warms_from_database_once(self):
+        cache = ReadingCache()
+        sb, tables = _supabase(readings=[_row(3), _row(2), _row(1)])
+
+        first = await cache.recent(sb, "g1", 3)
+        second = await cache.recent(sb, "g1", 3)
+
+        assert [r.id for r in first] == ["r1", "r2", "r3"]
+        assert [r.id for r in second] == ["r1", "r2", "r3"]
+        assert tables["sensor_readings"].select.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_partial_buffer_is_warmed_and_merged(self):
+        cache = ReadingCache()
+        cache.add([_row(5)])
+        sb, _ = _supabase(readings=[_row(5), _row(4), _row(3)])
+
+        recent = await cache.recent(sb, "g1", 3)
+
+        assert [r.id for r in recent] == ["r3", "r4", "r5"]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_snapshots(self):
+        cache = ReadingCache()
+        snapshot = {"id": "s1", "grow_id": "g1", "recorded_at": "2026-10-19T09:00:00Z", "ph": 6.1}
+        sb, _ = _supabase(snapshots=[snapshot])
+
+        recent = await cache.recent(sb, "g1", 1)
+
+        assert recent[0].ph == 6.1
+        assert recent[0].created_at == "2026-10-19T09:00:00Z"
+
+    @pytest.mark.asyncio
+    async def test_stale_buffer_is_resynced(self):
+        now = [0.0]
+        cache = ReadingCache(ttl=30, timer=lambda: now[0])
+        sb, tables = _supabase(readings=[_row(1)])
+        await cache.recent(sb, "g1", 1)
+
+        # another worker ingested r2
+        tables["sensor_readings"].select.return_value.eq.return_value.order.return_value \
+            .limit.return_value.execute.return_value = MagicMock(data=[_row(2), _row(1)])
+        now[0] = 10.0
+        assert (await cache.recent(sb, "g1", 1))[0].id == "r1"
+        now[0] = 31.0
+        assert (await cache.recent(sb, "g1", 1))[0].id == "r2"
+        assert cache.stats()["stale"] == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_grow_is_not_requeried_every_call(self):
+        cache = ReadingCache()
+        sb, tables = _supabase()
+
+        assert await cache.recent(sb, "g1", 1) == []
+        assert await cache.recent(sb, "g1", 1) == []
+
+        assert tables["sensor_readings"].select.call_count == 1
+
+    def test_lru_bounds_grows(self):
+        cache = ReadingCache(max_grows=2)
+        for grow in ("g1", "g2", "g3"):
+            cache.add([_row(grow_id=grow)])
+        assert cache.latest("g1") is None
+        assert cache.stats()["cached_grows"] == 2
+
+
+class TestReaders:
+    """Tests for the endpoint and chat context reading from the cache."""
+
+    @pytest.mark.asyncio
+    async def test_latest_endpoint_served_from_cache(self, monkeypatch):
+        cache = ReadingCache()
+        cache.add([_row(temperature=26.5)])
+        monkeypatch.setattr("app.routers.sensors.reading_cache", cache)
+
+        with patch("app.routers.sensors.get_supabase_client") as get_client:
+            result = await get_latest_readings("g1", user_id="u1")
+
+        assert result["reading"]["temperature"] == 26.5
+        get_client.return_value.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_latest_endpoint_hides_other_users_grows(self, monkeypatch):
+        cache = ReadingCache()
+        cache.add([_row(user_id="owner")])
+        monkeypatch.setattr("app.routers.sensors.reading_cache", cache)
+
+        with patch("app.routers.sensors.get_supabase_client"):
+            result = await get_latest_readings("g1", user_id="intruder")
+
+        assert result == {"reading": None}
+
+    def test_chat_context_lists_cached_readings(self):
+        from app.services.chat_service import ChatService
+
+        service = ChatService(MagicMock(), MagicMock())
+        readings = [Reading.from_row(_row(m, temperature=24.5, vpd=1.1)) for m in (1, 2)]
+
+        context = service._format_grow_context({"name": "Tent"}, "g1", readings)
+
+        assert "### Recent Sensor Readings" in context
+        assert "Temp: 24.5°C" in context
+        assert "pH: ?" in context
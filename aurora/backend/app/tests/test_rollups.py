@@ -0,0 +1,148 @@
+"""
+Aurora Sensor Rollup Tests
+Tests for incremental deltas and serving history from rollups.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import Mock
+
+from app.services import rollup_service
+from app.utils.downsample import bucket_aggregate
+
+T0 = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def _readings(n, step_s=20):
+    return [
+        {
+            "grow_id": "g1",
+            "created_at": (T0 + timedelta(seconds=i * step_s)).isoformat(),
+            "temperature": 20.0 + (i % 7),
+            "humidity": 50.0 + (i % 3) if i % 4 else None,
+        }
+        for i in range(n)
+    ]
+
+
+def _as_rollup_rows(deltas, granularity):
+    return [d for d in deltas if d["granularity"] == granularity]
+
+
+class TestComputeDeltas:
+    """Tests for in-memory pre-aggregation."""
+
+    def test_one_delta_per_bucket_and_granularity(self):
+        deltas = rollup_service.compute_deltas(_readings(6))  # 2 minutes of data
+
+        temp = [d for d in deltas if d["metric"] == "temperature"]
+        assert sorted(d["granularity"] for d in temp) == ["1d", "1h", "1m", "1m"]
+        minute = next(d for d in temp if d["granularity"] == "1m" and d["bucket_start"] == T0.isoformat())
+        assert minute["count"] == 3
+        assert minute["sum"] == 20.0 + 21.0 + 22.0
+        assert minute["min"] == 20.0 and minute["max"] == 22.0
+        assert minute["last"] == 22.0
+
+    def test_missing_values_and_grow_are_skipped(self):
+        deltas = rollup_service.compute_deltas([
+            {"created_at": T0.isoformat(), "temperature": 20.0},
+            {"grow_id": "g1", "created_at": T0.isoformat(), "ph": None},
+        ])
+        assert deltas == []
+
+
+class TestToBuckets:
+    """Rollup-served buckets must match raw bucket aggregation."""
+
+    def test_minute_rollups_merge_into_five_minute_buckets(self):
+        raw = _readings(60)  # 20 minutes
+        rollups = _as_rollup_rows(rollup_service.compute_deltas(raw), "1m")
+
+        from_rollups = rollup_service.to_buckets(rollups, 300, metrics=("temperature", "humidity"))
+        from_raw = bucket_aggregate(raw, 300, metrics=("temperature", "humidity"))
+
+        assert len(from_rollups) == len(from_raw) == 4
+        for a, b in zip(from_rollups, from_raw):
+            assert a["bucket_start"] == b["bucket_start"]
+            for metric in ("temperature", "humidity"):
+                expected = b[metric]
+                got = {k: v for k, v in a[metric].items() if k != "std"}
+                assert got == pytest.approx(expected)
+
+    def test_source_granularity(self):
+        assert rollup_service.source_granularity(300) == "1m"
+        assert rollup_service.source_granularity(21600) == "1h"
+        assert rollup_service.source_granularity(86400) == "1d"
+        assert rollup_service.source_granularity(30) is None
+
+
+class TestRecord:
+
+    @pytest.mark.asyncio
+    async def test_single_rpc_per_batch(self):
+        sb = Mock()
+
+        touched = await rollup_service.record(sb, _readings(30))
+
+        sb.rpc.assert_called_once()
+        name, params = sb.rpc.call_args.args
+        assert name == "apply_sensor_rollups"
+        assert len(params["deltas"]) == touched
+
+    @pytest.mark.asyncio
+    async def test_failure_is_swallowed(self):
+        sb = Mock()
+        sb.rpc.return_value.execute.side_effect = RuntimeError("db down")
+
+        assert await rollup_service.record(sb, _readings(3)) == 0
+
+
+class TestFetch:
+
+    @pytest.mark.asyncio
+    async def test_pages_past_the_row_cap_for_requested_metrics(self, monkeypatch):
+        monkeypatch.setattr(rollup_service, "PAGE_SIZE", 4)
+        rows = _as_rollup_rows(rollup_service.compute_deltas(_readings(30)), "1m")
+        query = Mock()
+        query.select.return_value = query
+        query.eq.return_value = query
+        query.in_.return_value = query
+        query.gte.return_value = query
+        query.order.return_value = query
+        query.range.side_effect = lambda lo, hi: Mock(execute=lambda: Mock(data=rows[lo:hi + 1]))
+        sb = Mock()
+        sb.table.return_value = query
+
+        fetched = await rollup_service.fetch(sb, "g1", "1m", T0, ("temperature",))
+
+        assert fetched == rows
+        query.in_.assert_called_with("metric", ["temperature"])
+        assert query.range.call_count == len(rows) // 4 + 1
+
+
+class TestRawHistory:
+
+    @pytest.mark.asyncio
+    async def test_raw_fallback_pages_past_the_row_cap(self, monkeypatch):
+        from app.routers import sensors
+
+        monkeypatch.setattr(sensors, "PAGE_SIZE", 4)
+        rows = _readings(10)
+        query = Mock()
+        query.select.return_value = query
+        query.eq.return_value = query
+        query.gte.return_value = query
+        query.order.return_value = query
+        query.range.side_effect = lambda lo, hi: Mock(execute=lambda: Mock(data=rows[lo:hi + 1]))
+        sb = Mock()
+        sb.table.return_value = query
+        monkeypatch.setattr(sensors, "get_supabase_client", lambda: sb)
+
+        result = await sensors.get_sensor_history(
+            "g1", hours=24, resolution="1m", method="lttb", max_points=500,
+            metrics="temperature", user_id="user-1",
+        )
+
+        assert result["source_points"] == 10
+        assert len(result["readings"]) == 10
+        assert query.range.call_count == 3
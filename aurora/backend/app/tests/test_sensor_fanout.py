@@ -0,0 +1,122 @@
+"""
+Aurora Sensor Fan-out Tests
+Tests for coalesced publishing and channel cleanup.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.reading_cache import ReadingCache
+from app.core.socket_manager import SocketManager
+from app.services import sensor_fanout as fanout_module
+from app.services.sensor_fanout import SensorFanout, grow_channel
+
+
+def _row(grow_id="g1", minute=0, temperature=24.0, user_id="u1"):
+    return {
+        "grow_id": grow_id,
+        "user_id": user_id,
+        "temperature": temperature,
+        "created_at": f"2026-10-19T10:{minute:02d}:00+00:00",
+    }
+
+
+@pytest.fixture
+def sockets(monkeypatch):
+    manager = SocketManager()
+    monkeypatch.setattr(fanout_module, "socket_manager", manager)
+    monkeypatch.setattr(fanout_module, "reading_cache", ReadingCache())
+    return manager
+
+
+def _subscriber(manager, grow_id="g1"):
+    ws = MagicMock()
+    ws.send_json = AsyncMock()
+    manager.subscribe(ws, grow_channel(grow_id))
+    return ws
+
+
+class TestPublishing:
+    """Tests for coalesced channel publishing."""
+
+    @pytest.mark.asyncio
+    async def test_no_subscribers_sends_nothing(self, sockets):
+        fanout = SensorFanout()
+        fanout.publish_readings([_row()])
+        await asyncio.sleep(0)
+        assert fanout.stats()["published"] == 0
+        assert fanout_module.reading_cache.latest("g1") is not None
+
+    @pytest.mark.asyncio
+    async def test_fast_sensor_is_coalesced(self, sockets):
+        ws = _subscriber(sockets)
+        fanout = SensorFanout(max_updates_per_second=20)   # 50 ms interval
+
+        for minute in range(5):
+            fanout.publish_readings([_row(minute=minute, temperature=20.0 + minute)])
+        await asyncio.sleep(0.1)
+
+        sent = [c.args[0]["reading"]["temperature"] for c in ws.send_json.await_args_list]
+        assert sent == [20.0, 24.0]     # first immediately, then only the newest
+        assert fanout.stats()["coalesced"] == 3
+
+    @pytest.mark.asyncio
+    async def test_alerts_published_per_grow(self, sockets):
+        ws = _subscriber(sockets)
+        fanout = SensorFanout()
+
+        fanout.publish_alerts([
+            {"grow_id": "g1", "parameter": "temperature"},
+            {"grow_id": "g1", "parameter": "humidity"},
+            {"grow_id": "g2", "parameter": "ph"},
+        ])
+        await asyncio.sleep(0)
+
+        ws.send_json.assert_awaited_once()
+        message = ws.send_json.await_args.args[0]
+        assert message["type"] == "sensor_alerts"
+        assert len(message["alerts"]) == 2
+
+    def test_disconnect_drops_subscriptions(self):
+        manager = SocketManager()
+        ws = MagicMock()
+        manager.active_connections["u1"] = [ws]
+        manager.subscribe(ws, grow_channel("g1"))
+
+        manager.disconnect(ws, "u1")
+
+        assert not manager.has_subscribers(grow_channel("g1"))
+        assert manager.channels == {}
+
+
+class TestSocketAuth:
+    """Tests for authenticating the /ws socket."""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from app import main
+
+        async def verify(token):
+            if token != "good":
+                from fastapi import HTTPException
+                raise HTTPException(401, "Invalid token")
+            return {"sub": "u1"}
+
+        monkeypatch.setattr(main, "verify_jwt", verify)
+        monkeypatch.setattr(main, "socket_manager", SocketManager())
+        return TestClient(main.app)
+
+    @pytest.mark.parametrize("path", ["/ws/u1", "/ws/u1?token=bad", "/ws/u2?token=good"])
+    def test_missing_invalid_or_foreign_token_is_closed(self, client, path):
+        from starlette.websockets import WebSocketDisconnect
+
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(path):
+                pass
+        assert closed.value.code == 1008
+
+    def test_token_owner_connects(self, client):
+        with client.websocket_connect("/ws/u1?token=good") as ws:
+            ws.send_text("ping")
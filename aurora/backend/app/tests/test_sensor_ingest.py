@@ -0,0 +1,141 @@
+"""
+Aurora Batch Sensor Ingestion Tests
+Tests for batch parsing, per-item validation and the single bulk insert.
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+from app.services import sensor_ingest_service
+from app.services.alert_dispatcher import AlertDispatcher
+from app.services.anomaly_detector import AnomalyDetector
+from app.services.sensor_ingest_service import BatchFormatError, parse_batch
+
+G1 = "00000000-0000-4000-8000-000000000001"
+G2 = "00000000-0000-4000-8000-000000000002"
+OTHER = "00000000-0000-4000-8000-0000000000ff"
+
+
+def _client(owned_grows):
+    """Supabase mock: grows lookup returns `owned_grows`, inserts echo their rows."""
+    tables = {}
+
+    def table(name):
+        if name not in tables:
+            t = MagicMock()
+            if name == "grows":
+                t.select.return_value.eq.return_value.in_.return_value.execute.return_value = Mock(
+                    data=[{"id": g} for g in owned_grows]
+                )
+            else:
+                t.insert.side_effect = lambda rows: Mock(
+                    execute=Mock(return_value=Mock(
+                        data=[{**r, "id": f"r{n}"} for n, r in enumerate(rows)]
+                    ))
+                )
+            tables[name] = t
+        return tables[name]
+
+    sb = Mock()
+    sb.table.side_effect = table
+    return sb, tables
+
+
+class TestParseBatch:
+    """Tests for accepted body formats."""
+
+    def test_json_array(self):
+        assert parse_batch(b'[{"grow_id": "g1"}, {"grow_id": "g2"}]') == [
+            {"grow_id": "g1"}, {"grow_id": "g2"},
+        ]
+
+    def test_readings_envelope(self):
+        assert parse_batch(b'{"readings": [{"grow_id": "g1"}]}') == [{"grow_id": "g1"}]
+
+    def test_ndjson(self):
+        body = b'{"grow_id": "g1"}\n\n{"grow_id": "g2"}\n'
+        assert len(parse_batch(body, "application/x-ndjson")) == 2
+
+    def test_ndjson_without_content_type(self):
+        assert len(parse_batch(b'{"grow_id": "g1"}\n{"grow_id": "g2"}')) == 2
+
+    def test_bad_line_is_reported(self):
+        with pytest.raises(BatchFormatError, match="line 2"):
+            parse_batch(b'{"grow_id": "g1"}\n{oops', "application/x-ndjson")
+
+
+class TestIngestBatch:
+    """Tests for validation, enrichment and storage."""
+
+    @pytest.mark.asyncio
+    async def test_one_insert_and_per_item_results(self):
+        sb, tables = _client(owned_grows=[G1, G2])
+        items = [
+            {"grow_id": G1, "temperature": 25.0, "humidity": 50.0},
+            {"grow_id": G2, "ph": 6.2, "recorded_at": "2026-10-19T10:00:00Z"},
+            {"temperature": 22.0},
+            {"grow_id": OTHER, "temperature": 22.0},
+            {"grow_id": "not-a-uuid", "temperature": 22.0},
+        ]
+
+        with patch("app.services.alert_service.get_supabase_client"):
+            result = await sensor_ingest_service.ingest_batch(sb, "user-1", items)
+
+        assert result["accepted"] == 2
+        assert result["rejected"] == 3
+        tables["sensor_readings"].insert.assert_called_once()
+        rows = tables["sensor_readings"].insert.call_args.args[0]
+        assert rows[0]["vpd"] == pytest.approx(1.58, abs=0.01)
+        assert "vpd" not in rows[1]
+        assert rows[1]["created_at"].startswith("2026-10-19T10:00:00")
+
+        ok, ok2, invalid, foreign, malformed = result["results"]
+        assert ok["ok"] and ok["id"] == "r0"
+        assert ok2["ok"] and ok2["index"] == 1
+        assert invalid == {"index": 2, "ok": False, "error": "grow_id: Field required"}
+        assert foreign["error"] == "grow_id: grow not found"
+        assert malformed == {"index": 4, "ok": False, "error": "grow_id: Value error, must be a UUID"}
+        # the malformed id never reaches the ownership query
+        owned_query = tables["grows"].select.return_value.eq.return_value.in_
+        assert "not-a-uuid" not in owned_query.call_args.args[1]
+
+    @pytest.mark.asyncio
+    async def test_alerts_saved_in_one_insert(self, monkeypatch):
+        monkeypatch.setattr("app.services.alert_service.anomaly_detector", AnomalyDetector())
+        monkeypatch.setattr("app.services.alert_service.alert_dispatcher", AlertDispatcher())
+        sb, _ = _client(owned_grows=[G1, G2])
+        items = [
+            {"grow_id": G1, "temperature": 12.0, "recorded_at": "2026-10-19T10:00:00Z"},
+            {"grow_id": G1, "humidity": 95.0, "recorded_at": "2026-10-19T10:00:00Z"},
+            {"grow_id": G2, "ph": 4.0},
+        ]
+        alerts_sb = MagicMock()
+        push = AsyncMock()
+
+        with patch("app.services.alert_service.get_supabase_client", return_value=alerts_sb), \
+                patch.dict("sys.modules", {"app.services.push_service": Mock(send_push_notification=push)}):
+            result = await sensor_ingest_service.ingest_batch(sb, "user-1", items)
+
+        assert result["alerts"] == 3
+        alerts_sb.table.return_value.insert.assert_called_once()
+        assert len(alerts_sb.table.return_value.insert.call_args.args[0]) == 3
+        assert push.await_count == 2  # one summary per grow
+
+
+
+class TestSubmitReading:
+    """Tests for the single-reading endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_foreign_grow_is_rejected(self):
+        from fastapi import HTTPException
+
+        from app.models import SensorReading
+        from app.routers.sensors import submit_reading
+
+        sb, tables = _client(owned_grows=[])
+        with patch("app.routers.sensors.get_supabase_client", return_value=sb):
+            with pytest.raises(HTTPException) as exc:
+                await submit_reading(SensorReading(grow_id=OTHER, temperature=22.0), user_id="user-1")
+
+        assert exc.value.status_code == 404
+        assert "sensor_readings" not in tables
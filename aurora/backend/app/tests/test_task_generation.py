@@ -0,0 +1,168 @@
+"""
+Aurora Daily Task Generation Tests
+Tests for phase templates, skipping users with tasks, bulk paging and
+idempotent completion toggles.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import task_generation_service as tgs
+from app.services.task_generation_service import build_tasks, generate_daily_tasks
+
+TODAY = "2026-10-19"
+
+
+class FakeDB:
+    """Active grows, the users-with-tasks RPC and a recording upsert."""
+
+    def __init__(self, grows, users_with_tasks=()):
+        self.grows = grows
+        self.users_with_tasks = list(users_with_tasks)
+        self.grow_reads = 0
+        self.rpc_calls = 0
+        self.upserts = []
+
+    def table(self, name):
+        db, q = self, MagicMock()
+
+        def range_(start, stop):
+            db.grow_reads += 1
+            page = db.grows[start:stop + 1]
+            return MagicMock(execute=lambda: MagicMock(data=page))
+
+        def upsert(rows, **kwargs):
+            db.upserts.append((rows, kwargs))
+            return MagicMock(execute=lambda: MagicMock(data=rows))
+
+        q.select.return_value = q
+        q.eq.return_value = q
+        q.order.return_value = q
+        q.range.side_effect = range_
+        q.upsert.side_effect = upsert
+        return q
+
+    def rpc(self, name, params):
+        assert name == "users_with_tasks_on" and params == {"task_date_param": TODAY}
+        self.rpc_calls += 1
+        rows = [{"user_id": u} for u in self.users_with_tasks]
+        return MagicMock(range=lambda lo, hi: MagicMock(execute=lambda: MagicMock(data=rows[lo:hi + 1])))
+
+
+class TestTemplates:
+    """Tests for per-phase task lists."""
+
+    @pytest.mark.parametrize("phase,count", [
+        ("vegetative", 5), ("veg", 5), ("flowering", 6), ("bloom", 6),
+        ("drying", 2), ("curing", 2), ("seedling", 4), (None, 4),
+    ])
+    def test_task_count_per_phase(self, phase, count):
+        tasks = build_tasks("u1", "g1", phase, TODAY)
+        assert len(tasks) == count
+        assert all(t["task_date"] == TODAY and not t["is_completed"] for t in tasks)
+
+    def test_flowering_adds_critical_mold_check(self):
+        titles = {t["title"]: t for t in build_tasks("u1", "g1", "flower", TODAY)}
+        assert titles["Inspect for mold"]["is_critical"]
+        assert "Check plant health" in titles
+
+
+class TestBulkGeneration:
+    """Tests for the set-based generation run."""
+
+    @pytest.mark.asyncio
+    async def test_skips_users_with_tasks_and_pages_inserts(self, monkeypatch):
+        monkeypatch.setattr(tgs, "PAGE_SIZE", 10)
+        grows = [{"id": f"g{i}", "user_id": f"u{i % 6}", "current_phase": "vegetative"} for i in range(12)]
+        db = FakeDB(grows, users_with_tasks=["u0"])
+
+        summary = await generate_daily_tasks(db, TODAY)
+
+        # 12 grows, 2 of them belong to u0 → 10 grows × 5 tasks
+        assert summary == {"users": 5, "skipped_users": 1, "grows": 12, "tasks": 50, "pages": 5}
+        assert db.grow_reads == 2 and db.rpc_calls == 1
+        rows = [r for page, _ in db.upserts for r in page]
+        assert all(r["user_id"] != "u0" for r in rows)
+        assert all(kw == {"on_conflict": "grow_id,task_date,title", "ignore_duplicates": True}
+                   for _, kw in db.upserts)
+
+    @pytest.mark.asyncio
+    async def test_users_with_tasks_are_paged(self, monkeypatch):
+        monkeypatch.setattr(tgs, "PAGE_SIZE", 10)
+        grows = [{"id": f"g{i:02d}", "user_id": f"u{i:02d}", "current_phase": "vegetative"} for i in range(25)]
+        db = FakeDB(grows, users_with_tasks=[f"u{i:02d}" for i in range(25)])
+
+        summary = await generate_daily_tasks(db, TODAY)
+
+        assert summary["skipped_users"] == 25 and summary["tasks"] == 0
+        assert db.rpc_calls == 3
+
+    @pytest.mark.asyncio
+    async def test_no_active_grows(self):
+        db = FakeDB([])
+
+        summary = await generate_daily_tasks(db, TODAY)
+
+        assert summary["tasks"] == 0
+        assert db.rpc_calls == 0 and not db.upserts
+
+
+class TestToggle:
+    """Tests for the conditional completion update."""
+
+    def _db(self, task):
+        def table(name):
+            q, filters = MagicMock(), {}
+            for method in ("select", "limit"):
+                getattr(q, method).return_value = q
+
+            def update(values):
+                filters["update"] = values
+                return q
+
+            def eq(col, value):
+                filters[col] = value
+                return q
+
+            def execute():
+                match = task is not None and all(
+                    task.get(c) == v for c, v in filters.items() if c != "update"
+                )
+                if match and "update" in filters:
+                    task.update(filters["update"])
+                return MagicMock(data=[dict(task)] if match else [])
+
+            q.update.side_effect = update
+            q.eq.side_effect = eq
+            q.execute = execute
+            return q
+
+        sb = MagicMock()
+        sb.table.side_effect = table
+        return sb
+
+    @pytest.mark.asyncio
+    async def test_repeated_completion_counts_once(self):
+        from app.routers.tasks import ToggleTaskRequest, toggle_task
+
+        task = {"id": "t1", "user_id": "u1", "is_completed": False}
+        award, check = MagicMock(), AsyncMock()
+        with patch("app.routers.tasks.get_supabase_client", return_value=self._db(task)), \
+                patch("app.services.gamification_service.queue_xp", award), \
+                patch("app.services.gamification_service.check_achievements", check):
+            for _ in range(2):
+                result = await toggle_task("t1", ToggleTaskRequest(is_completed=True), "u1")
+
+        assert result["is_completed"] is True
+        award.assert_called_once_with("u1", 15, "complete_task")
+        assert [c.args[3] for c in check.await_args_list] == [1]
+
+    @pytest.mark.asyncio
+    async def test_unknown_task_is_404(self):
+        from fastapi import HTTPException
+        from app.routers.tasks import ToggleTaskRequest, toggle_task
+
+        with patch("app.routers.tasks.get_supabase_client", return_value=self._db(None)):
+            with pytest.raises(HTTPException) as err:
+                await toggle_task("t1", ToggleTaskRequest(is_completed=True), "u1")
+        assert err.value.status_code == 404
@@ -0,0 +1,137 @@
+"""
+Aurora Threshold Service Tests
+Tests for compiling per-grow thresholds from the AI plan and caching them.
+"""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.services.threshold_service import (
+    DEFAULT_TABLE,
+    METRICS,
+    ThresholdCache,
+    compile_thresholds,
+)
+
+
+PLAN = {
+    "phases": [
+        {
+            "phase": "vegetative",
+            "environment": {
+                "temperature_day_c": 26, "temperature_night_c": 20,
+                "humidity_percent": 65, "vpd_min": 0.8, "vpd_max": 1.2,
+            },
+            "nutrients": {"ph_min": 5.8, "ph_max": 6.3, "ec_min": 1.0, "ec_max": 1.6},
+        },
+        {
+            "phase": "flowering",
+            "environment": {
+                "temperature_day_c": 24, "temperature_night_c": 18,
+                "humidity_percent": 45, "vpd_min": 1.2, "vpd_max": 1.6,
+            },
+            "nutrients": {"ph_min": 6.0, "ph_max": 6.5, "ec_min": 1.4, "ec_max": 2.2},
+        },
+    ]
+}
+
+
+def _grow(phase="vegetative", updated_at="2026-10-19T00:00:00+00:00", plan=PLAN):
+    return {"id": "g1", "current_phase": phase, "ai_plan": plan, "updated_at": updated_at}
+
+
+def _supabase(rows):
+    sb = MagicMock()
+    sb.table.return_value.select.return_value.in_.return_value.execute.return_value = MagicMock(data=rows)
+    return sb
+
+
+class TestCompile:
+    """Tests for compile_thresholds."""
+
+    def test_bounds_follow_current_phase(self):
+        table = compile_thresholds(_grow("flowering"))
+
+        assert table.source == "plan"
+        assert table.limits["vpd"] == {"min": 1.2, "max": 1.6, "unit": "kPa"}
+        assert table.limits["humidity"] == {"min": 30.0, "max": 60.0, "unit": "%"}
+        assert table.limits["ec"]["max"] == 2.2
+
+    def test_temperature_band_spans_night_and_day(self):
+        table = compile_thresholds(_grow())
+        assert table.limits["temperature"]["min"] == 17.0
+        assert table.limits["temperature"]["max"] == 29.0
+
+    def test_missing_plan_or_phase_falls_back_to_defaults(self):
+        assert compile_thresholds(_grow(plan=None)).source == "default"
+        table = compile_thresholds(_grow("drying"))
+        assert table.source == "default"
+        np.testing.assert_array_equal(table.lo, DEFAULT_TABLE.lo)
+        assert "ec" not in table.limits
+
+    def test_check_flags_out_of_range_metrics(self):
+        table = compile_thresholds(_grow())
+        out = table.check({"temperature": 25, "humidity": 95, "ph": 4.0, "ec": None})
+
+        by_metric = {v["metric"]: v for v in out}
+        assert set(by_metric) == {"humidity", "ph"}
+        assert by_metric["humidity"]["direction"] == "high"
+        assert by_metric["humidity"]["severity"] == "warning"
+        assert by_metric["ph"]["direction"] == "low"
+        assert by_metric["ph"]["severity"] == "critical"
+
+    def test_unbounded_metrics_never_flag(self):
+        assert len(DEFAULT_TABLE.lo) == len(METRICS)
+        assert DEFAULT_TABLE.check({"ec": 99.0}) == []
+
+
+class TestCache:
+    """Tests for ThresholdCache."""
+
+    def test_for_grow_reuses_compiled_table(self):
+        cache = ThresholdCache()
+        first = cache.for_grow(_grow())
+        assert cache.for_grow(_grow()) is first
+        assert cache.stats()["compiled"] == 1
+
+    def test_phase_change_recompiles(self):
+        cache = ThresholdCache()
+        cache.for_grow(_grow())
+        table = cache.for_grow(_grow("flowering", updated_at="2026-10-20T00:00:00+00:00"))
+        assert table.phase == "flowering"
+        assert cache.stats()["compiled"] == 2
+
+    def test_validate_drops_stale_entries(self):
+        cache = ThresholdCache()
+        cache.for_grow(_grow())
+        cache.validate([{"id": "g1", "current_phase": "vegetative",
+                         "updated_at": "2026-10-19T00:00:00+00:00"}])
+        assert cache.stats()["cached_grows"] == 1
+
+        cache.validate([{"id": "g1", "current_phase": "flowering",
+                         "updated_at": "2026-10-20T00:00:00+00:00"}])
+        assert cache.stats()["cached_grows"] == 0
+        assert cache.stats()["invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_many_loads_misses_in_one_query(self):
+        cache = ThresholdCache()
+        sb = _supabase([_grow()])
+
+        tables = await cache.get_many(sb, ["g1", "g2", "g1"])
+
+        sb.table.return_value.select.return_value.in_.assert_called_once_with("id", ["g1", "g2"])
+        assert tables["g1"].source == "plan"
+        assert tables["g2"] is DEFAULT_TABLE
+
+        await cache.get_many(sb, ["g1"])
+        assert sb.table.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_load_failure_falls_back_to_defaults(self):
+        cache = ThresholdCache()
+        sb = MagicMock()
+        sb.table.side_effect = RuntimeError("down")
+
+        assert await cache.get(sb, "g1") is DEFAULT_TABLE
@@ -0,0 +1,83 @@
+"""
+Aurora Toxicity Classifier Tests
+Tests for the local fast path, lexicon escalation and verdict cache.
+"""
+import time
+
+import pytest
+
+from app.services.toxicity_classifier import ToxicityClassifier, content_hash
+
+
+@pytest.fixture
+def classifier():
+    return ToxicityClassifier()
+
+
+class TestClassify:
+    """Tests for the three-way local verdict."""
+
+    def test_grow_update_is_cleared_locally(self, classifier):
+        verdict = classifier.classify("Day 21 of flower, trichomes getting cloudy!")
+        assert verdict.label == "benign"
+        assert verdict.final is True
+
+    def test_lexicon_hit_is_held_and_escalated(self, classifier):
+        verdict = classifier.classify("just KYS already")
+        assert verdict.label == "toxic"
+        assert verdict.final is False
+        assert verdict.source == "lexicon"
+
+    def test_insult_is_escalated(self, classifier):
+        verdict = classifier.classify("you idiot, shut up you stupid loser")
+        assert verdict.label == "toxic"
+        assert verdict.final is False
+
+    def test_grow_words_do_not_offset_insults(self, classifier):
+        verdict = classifier.classify(
+            "you are a moron. day 21 flower, vpd ph humidity trichomes coco"
+        )
+        assert verdict.final is False
+        assert verdict.label != "benign"
+        assert verdict.score > 0.5
+
+    def test_unknown_text_is_uncertain(self, classifier):
+        verdict = classifier.classify("what do you think about this")
+        assert verdict.label == "uncertain"
+        assert verdict.final is False
+
+
+class TestCache:
+    """Tests for content-hash caching."""
+
+    def test_hash_ignores_case_and_whitespace(self):
+        assert content_hash("Nice  buds\n") == content_hash("nice buds")
+
+    def test_remembered_verdict_is_final(self, classifier):
+        classifier.remember("what do you think about this", True)
+
+        verdict = classifier.classify("What do you think about this")
+
+        assert verdict.label == "toxic"
+        assert verdict.final is True
+        assert classifier.stats()["cache_hits"] == 1
+
+    def test_escalation_rate(self, classifier):
+        classifier.classify("thanks, looks good!")
+        classifier.classify("what do you think about this")
+
+        assert classifier.stats()["llm_escalation_rate"] == 0.5
+
+
+class TestLatency:
+    """The fast path must stay far below an LLM round trip."""
+
+    def test_classify_is_sub_millisecond(self, classifier):
+        texts = [f"week {i} of veg, ph 6.2 and humidity at 60%" for i in range(2000)]
+
+        start = time.perf_counter()
+        for text in texts:
+            classifier.classify(text)
+        avg = (time.perf_counter() - start) / len(texts)
+
+        assert avg < 0.001
@@ -1,6 +1,12 @@
 import math
 import pytest
-from app.utils.vpd import saturation_vapor_pressure_kpa, actual_vapor_pressure_kpa, vpd_kpa
+from app.utils.vpd import (
+    actual_vapor_pressure_kpa,
+    saturation_vapor_pressure_kpa,
+    vpd_components,
+    vpd_kpa,
+    vpd_kpa_array,
+)
 
 
 def test_saturation_vapor_pressure_known_value():
@@ -22,3 +28,28 @@ def test_actual_vapor_pressure_bounds():
     es = saturation_vapor_pressure_kpa(20.0)
     assert ea_neg == pytest.approx(0.0, abs=1e-6)
     assert ea_high == pytest.approx(es, rel=1e-6)
+
+
+def test_vectorized_matches_scalar():
+    temps = [18.0, 22.5, 25.0, 30.0]
+    hums = [40.0, 55.0, 50.0, 80.0]
+    result = vpd_components(temps, hums)
+    assert result.vpd.tolist() == pytest.approx([vpd_kpa(t, h) for t, h in zip(temps, hums)])
+    assert result.es.tolist() == pytest.approx([saturation_vapor_pressure_kpa(t) for t in temps])
+    assert result.ea.tolist() == pytest.approx(
+        [actual_vapor_pressure_kpa(t, h) for t, h in zip(temps, hums)]
+    )
+
+
+def test_leaf_offset_lowers_vpd():
+    # A leaf 2°C cooler than the air holds less vapour, so leaf VPD is lower
+    air = vpd_kpa(25.0, 50.0)
+    leaf = vpd_kpa(25.0, 50.0, leaf_offset_c=-2.0)
+    assert leaf < air
+    assert vpd_kpa_array([25.0], [50.0], -2.0)[0] == pytest.approx(leaf)
+
+
+def test_vectorized_propagates_nan_and_clamps_rh():
+    result = vpd_kpa_array([25.0, math.nan, 20.0], [50.0, 50.0, 150.0])
+    assert math.isnan(result[1])
+    assert result[2] == pytest.approx(0.0, abs=1e-9)
@@ -0,0 +1,106 @@
+"""
+Aurora VPD Grid Tests
+Tests for the precomputed grid, its inverse index and /climate/optimal-settings.
+"""
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.routers.climate import (
+    _get_vpd_recommendations,
+    _vpd_band_bundle,
+    get_optimal_settings,
+)
+from app.utils.vpd import vpd_kpa
+from app.utils.vpd_grid import get_grid
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return get_grid()
+
+
+async def _optimal(**kwargs):
+    params = dict(stage=None, vpd_min=None, vpd_max=None,
+                  temp_min=10.0, temp_max=40.0, rh_min=5.0, rh_max=95.0)
+    params.update(kwargs)
+    return await get_optimal_settings(**params)
+
+
+class TestGrid:
+    """Tests for forward and inverse lookups."""
+
+    def test_lookup_matches_formula_on_grid_points(self, grid):
+        for temp, rh in [(10.0, 5.0), (25.0, 50.0), (27.3, 61.5), (40.0, 95.0)]:
+            assert grid.lookup(temp, rh) == pytest.approx(vpd_kpa(temp, rh), abs=1e-9)
+
+    def test_inverse_index_returns_exactly_the_band(self, grid):
+        ti, ri = grid.feasible(1.0, 1.3)
+        values = grid.vpd[ti, ri]
+
+        assert values.min() >= 1.0 and values.max() <= 1.3
+        assert len(ti) == int(((grid.vpd >= 1.0) & (grid.vpd <= 1.3)).sum())
+
+    def test_humidity_windows_keep_vpd_in_band(self, grid):
+        setpoint, windows, feasible = grid.optimal(1.0, 1.3, (20, 28), (40, 80))
+
+        assert feasible > 0
+        assert 1.0 <= setpoint.vpd_kpa <= 1.3
+        assert 20 <= setpoint.temperature_c <= 28
+        assert [w.temperature_c for w in windows] == [float(t) for t in range(20, 29)]
+        for w in windows:
+            assert 1.0 <= vpd_kpa(w.temperature_c, w.rh_min) <= 1.3 + 1e-9
+            assert 1.0 - 1e-9 <= vpd_kpa(w.temperature_c, w.rh_max) <= 1.3
+            # Higher RH at the same temperature means lower VPD
+            assert w.rh_min <= w.rh_max
+
+    def test_unreachable_band(self, grid):
+        assert grid.optimal(1.0, 1.3, (10, 12), (90, 95)) == (None, [], 0)
+
+
+class TestOptimalSettingsEndpoint:
+    """Tests for GET /climate/optimal-settings."""
+
+    @pytest.mark.asyncio
+    async def test_stage_band(self):
+        result = await _optimal(stage="Vegetative", temp_min=20, temp_max=28)
+
+        assert (result.vpd_min_kpa, result.vpd_max_kpa) == (1.0, 1.3)
+        assert 1.0 <= result.setpoint.vpd_kpa <= 1.3
+        assert result.humidity_windows
+
+    @pytest.mark.asyncio
+    async def test_explicit_band_overrides_stage(self):
+        result = await _optimal(stage="seedling", vpd_min=0.6, vpd_max=0.7)
+        assert (result.vpd_min_kpa, result.vpd_max_kpa) == (0.6, 0.7)
+
+    @pytest.mark.asyncio
+    async def test_invalid_requests(self):
+        with pytest.raises(HTTPException) as e:
+            await _optimal(stage="harvest")
+        assert e.value.detail["code"] == "CLIMATE_INVALID_STAGE"
+
+        with pytest.raises(HTTPException) as e:
+            await _optimal(vpd_min=1.4, vpd_max=1.0)
+        assert e.value.detail["code"] == "CLIMATE_INVALID_TARGET"
+
+
+class TestRecommendationBundles:
+    """Tests for memoized recommendation bundles."""
+
+    def test_bundles_are_shared_within_a_band(self):
+        _vpd_band_bundle.cache_clear()
+        for vpd in np.linspace(1.21, 1.29, 20):
+            _get_vpd_recommendations(float(vpd), 24.0, 55.0)
+        assert _vpd_band_bundle.cache_info().currsize == 1
+
+    def test_band_edges_match_thresholds(self):
+        assert _get_vpd_recommendations(0.49, 24, 55)[0] == "High Humidity Conditions"
+        assert _get_vpd_recommendations(0.5, 24, 55)[0] == "Seedling / Early Vegetative"
+        assert _get_vpd_recommendations(1.8, 24, 55)[0] == "Late Flowering / Stress"
+        assert _get_vpd_recommendations(0.39, 24, 55)[2][0].startswith("VPD is very low")
+
+    def test_callers_can_extend_the_list_safely(self):
+        _, _, first = _get_vpd_recommendations(1.0, 10.0, 90.0)
+        _, _, second = _get_vpd_recommendations(1.0, 24.0, 55.0)
+        assert len(first) == len(second) + 2
@@ -0,0 +1,176 @@
+"""
+Aurora Weekly XP Job Tests
+Tests for paged bonuses, changed-only level reconciliation and resuming.
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.weekly_xp_job import WeeklyXPJob
+from app.utils.levels import level_from_xp
+from app.utils.weeks import week_start
+
+NOW = datetime(2026, 10, 18, 0, 5, tzinfo=timezone.utc)    # a Sunday
+
+
+class FakeDB:
+    """Just enough of Supabase for the job: job_runs rows and the RPCs."""
+
+    def __init__(self, bonus_users=(), profiles=(), runs=()):
+        self.bonus_users = sorted(bonus_users)
+        self.profiles = sorted(profiles, key=lambda p: (p["xp_changed_at"], p["id"]))
+        self.runs = {(r["job"], r["period"]): dict(r) for r in runs}
+        self.rpc_calls = []
+        self.fail_on_page = None
+
+    # job_runs ------------------------------------------------------
+    def table(self, name):
+        assert name == "job_runs"
+        db, filters, q = self, {}, MagicMock()
+
+        def eq(col, val):
+            filters[col] = val
+            return q
+
+        def execute():
+            if "period" in filters:
+                row = db.runs.get((filters["job"], filters["period"]))
+                return MagicMock(data=[row] if row else [])
+            done = [r for r in db.runs.values() if r.get("finished_at")]
+            done.sort(key=lambda r: r["started_at"], reverse=True)
+            return MagicMock(data=done[:1])
+
+        def upsert(row, **_):
+            db.runs[(row["job"], row["period"])] = dict(row)
+            return MagicMock(execute=lambda: MagicMock(data=[row]))
+
+        q.select.return_value = q
+        q.eq.side_effect = eq
+        q.neq.return_value = q
+        q.not_.is_.return_value = q
+        q.order.return_value = q
+        q.limit.return_value = q
+        q.execute.side_effect = execute
+        q.upsert.side_effect = upsert
+        return q
+
+    # RPCs ----------------------------------------------------------
+    def rpc(self, name, params):
+        self.rpc_calls.append((name, params))
+        if self.fail_on_page is not None and len(self.rpc_calls) == self.fail_on_page:
+            raise RuntimeError("connection reset")
+        return MagicMock(execute=lambda: MagicMock(data=getattr(self, "_" + name)(params)))
+
+    def _stage_weekly_bonus_candidates(self, p):
+        return len(self.bonus_users)
+
+    def _apply_weekly_bonus_page(self, p):
+        after, size = p["after_user_param"], p["page_size_param"]
+        page = [u for u in self.bonus_users if after is None or u > after][:size]
+        return [{"user_id": u, "tasks_completed": 6, "awarded": True} for u in page]
+
+    def _profiles_changed_since(self, p):
+        size = p["page_size_param"]
+        after = (p["after_changed_at_param"], p["after_id_param"])
+        return [
+            dict(r) for r in self.profiles
+            if after[0] is None or (r["xp_changed_at"], r["id"]) > after
+        ][:size]
+
+    def _apply_profile_levels(self, p):
+        by_id = {r["id"]: r for r in self.profiles}
+        for item in p["levels"]:
+            by_id[item["user_id"]]["level"] = item["level"]
+        return None
+
+
+def _profiles(n, drift_every=10):
+    rows = []
+    for i in range(n):
+        xp = i * 137
+        level = level_from_xp(xp) + (1 if i % drift_every == 0 else 0)
+        changed_at = f"2026-10-{10 + i % 7:02d}T12:00:00+00:00"    # not in id order
+        rows.append({"id": f"u{i:04d}", "total_xp": xp, "level": level, "xp_changed_at": changed_at})
+    return rows
+
+
+class TestWeeklyXPJob:
+    """Tests for the set-based weekly job."""
+
+    @pytest.mark.asyncio
+    async def test_pages_and_fixes_only_drifted_levels(self):
+        db = FakeDB(bonus_users=[f"u{i:04d}" for i in range(25)], profiles=_profiles(45))
+        job = WeeklyXPJob(page_size=10)
+
+        progress = await job.run(db, now=NOW)
+
+        assert progress["bonus_candidates"] == progress["bonuses_awarded"] == 25
+        assert [c[0] for c in db.rpc_calls].count("stage_weekly_bonus_candidates") == 1
+        assert progress["profiles_checked"] == 45
+        assert progress["levels_fixed"] == 5
+        assert all(p["level"] == level_from_xp(p["total_xp"]) for p in db.profiles)
+        level_writes = [c for c in db.rpc_calls if c[0] == "apply_profile_levels"]
+        assert sum(len(c[1]["levels"]) for c in level_writes) == 5
+        assert db.runs[("weekly_xp", "2026-10-11")]["finished_at"]
+
+    @pytest.mark.asyncio
+    async def test_finished_period_is_skipped(self):
+        db = FakeDB(bonus_users=["u0001"], profiles=_profiles(5))
+        await WeeklyXPJob().run(db, now=NOW)
+        calls = len(db.rpc_calls)
+
+        await WeeklyXPJob().run(db, now=NOW)
+
+        assert len(db.rpc_calls) == calls
+
+    @pytest.mark.asyncio
+    async def test_late_run_covers_the_same_week(self):
+        monday = NOW + timedelta(days=1, hours=3)     # fired late, within the misfire grace
+        db = FakeDB(bonus_users=["u0001"], profiles=_profiles(5))
+        await WeeklyXPJob().run(db, now=NOW)
+        calls = len(db.rpc_calls)
+
+        await WeeklyXPJob().run(db, now=monday)
+
+        assert WeeklyXPJob.period_for(monday) == WeeklyXPJob.period_for(NOW) == "2026-10-11"
+        assert WeeklyXPJob.period_for(NOW - timedelta(minutes=10)) == "2026-10-04"
+        assert len(db.rpc_calls) == calls
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_saved_cursor(self):
+        db = FakeDB(bonus_users=[f"u{i:04d}" for i in range(30)], profiles=_profiles(5))
+        db.fail_on_page = 4     # staging, then the third bonus page fails
+
+        with pytest.raises(RuntimeError):
+            await WeeklyXPJob(page_size=10).run(db, now=NOW)
+        state = db.runs[("weekly_xp", "2026-10-11")]
+        assert (state["stage"], state["cursor"]) == ("bonuses", "u0019")
+
+        db.fail_on_page = None
+        db.rpc_calls.clear()
+        progress = await WeeklyXPJob(page_size=10).run(db, now=NOW)
+
+        first = db.rpc_calls[0]
+        assert first[0] == "apply_weekly_bonus_page"
+        assert first[1]["after_user_param"] == "u0019"
+        assert progress["bonus_users"] == 30
+
+    @pytest.mark.asyncio
+    async def test_levels_only_visit_changes_since_last_run(self):
+        last = {"job": "weekly_xp", "period": "2026-10-04", "stage": "levels",
+                "started_at": "2026-10-11T00:00:00+00:00",
+                "finished_at": "2026-10-11T00:01:00+00:00"}
+        db = FakeDB(profiles=_profiles(3), runs=[last])
+
+        await WeeklyXPJob().run(db, now=NOW)
+
+        since = [c[1]["since_param"] for c in db.rpc_calls if c[0] == "profiles_changed_since"]
+        assert since == ["2026-10-11T00:00:00+00:00"]
+
+    def test_period_is_the_week_the_leaderboard_just_showed(self):
+        saturday_night = NOW - timedelta(minutes=10)
+
+        assert week_start(saturday_night).date().isoformat() == "2026-10-11"
+        assert WeeklyXPJob.period_for(NOW) == "2026-10-11"
+        assert week_start(NOW) == datetime(2026, 10, 18, tzinfo=timezone.utc)
@@ -0,0 +1,170 @@
+"""
+Aurora XP Ledger Tests
+Tests for per-user coalescing, atomic batch application and level-ups.
+"""
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from app.services import gamification_service
+from app.services.xp_ledger import XPLedger
+
+
+def _ledger_client(profiles):
+    """
+    Supabase mock whose apply_xp_ledger RPC adds each entry to `profiles`
+    ({user_id: {"total_xp", "karma"}}) and returns the new totals.
+    """
+    sb = Mock()
+    calls = []
+
+    def rpc(name, params):
+        calls.append((name, params))
+        if name == "apply_xp_ledger":
+            rows = []
+            for e in params["entries"]:
+                if e["user_id"] not in profiles:
+                    continue
+                p = profiles[e["user_id"]]
+                p["total_xp"] += e["xp"]
+                p["karma"] += e["karma"]
+                rows.append({"user_id": e["user_id"], **p})
+            return Mock(execute=Mock(return_value=Mock(data=rows)))
+        return Mock(execute=Mock(return_value=Mock(data=None)))
+
+    sb.rpc.side_effect = rpc
+    return sb, calls
+
+
+class TestCoalescing:
+    """Tests for queueing and batch application."""
+
+    def test_awards_coalesce_per_user(self):
+        ledger = XPLedger()
+        for _ in range(50):
+            ledger.add("u1", karma=2, reason="receive_like")
+        ledger.add("u1", xp=10, reason="create_post")
+        ledger.add("u2", xp=5, reason="create_comment")
+
+        assert ledger.pending == {
+            "u1": {"xp": 10, "karma": 100},
+            "u2": {"xp": 5, "karma": 0},
+        }
+
+    @pytest.mark.asyncio
+    async def test_flush_is_one_rpc_with_events(self):
+        sb, calls = _ledger_client({"u1": {"total_xp": 0, "karma": 0}, "u2": {"total_xp": 0, "karma": 0}})
+        ledger = XPLedger()
+        ledger.add("u1", xp=10, reason="create_post")
+        ledger.add("u1", xp=5, reason="create_comment")
+        ledger.add("u1", karma=2, reason="receive_like")
+        ledger.add("u2", xp=15, reason="complete_task")
+
+        updated = await ledger.flush(sb)
+
+        assert updated == 2
+        assert [name for name, _ in calls] == ["apply_xp_ledger"]
+        entries = {e["user_id"]: e for e in calls[0][1]["entries"]}
+        assert entries["u1"]["xp"] == 15 and entries["u1"]["karma"] == 2
+        assert [ev["reason"] for ev in entries["u1"]["events"]] == ["create_post", "create_comment"]
+        assert ledger.pending == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_deltas(self):
+        sb = Mock()
+        sb.rpc.return_value.execute.side_effect = RuntimeError("db down")
+        ledger = XPLedger()
+        ledger.add("u1", karma=2)
+
+        with pytest.raises(RuntimeError):
+            await ledger.award("u1", xp=10, supabase=sb)
+
+        assert ledger.pending == {"u1": {"xp": 10, "karma": 2}}
+        assert ledger.metrics()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_resolve_when_the_retry_lands(self):
+        profiles = {"u1": {"total_xp": 100, "karma": 0}}
+        sb, calls = _ledger_client(profiles)
+        apply = sb.rpc.side_effect
+        failures = [RuntimeError("db down")]
+
+        def flaky(name, params):
+            if name == "apply_xp_ledger" and failures:
+                raise failures.pop()
+            return apply(name, params)
+
+        sb.rpc.side_effect = flaky
+        ledger = XPLedger(flush_interval=0.01)
+        ledger.start(sb)
+        try:
+            first = asyncio.create_task(ledger.award("u1", xp=10))
+            await asyncio.sleep(0.03)          # first flush failed, retry pending
+            second = await ledger.award("u1", xp=5)
+            first = await first
+        finally:
+            await ledger.stop()
+
+        assert ledger.metrics()["errors"] == 1
+        assert profiles["u1"]["total_xp"] == 115
+        assert (first["xp_before"], first["xp_after"]) == (100, 110)
+        assert (second["xp_before"], second["xp_after"]) == (110, 115)
+
+
+class TestAward:
+    """Tests for awaited awards and level-ups."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_awards_share_one_batch(self):
+        profiles = {"u1": {"total_xp": 0, "karma": 0}}
+        sb, calls = _ledger_client(profiles)
+        ledger = XPLedger(flush_interval=0.01)
+        ledger.start(sb)
+        try:
+            results = await asyncio.gather(*[
+                ledger.award("u1", xp=10, reason="create_post") for _ in range(20)
+            ])
+        finally:
+            await ledger.stop()
+
+        assert profiles["u1"]["total_xp"] == 200
+        assert len([c for c in calls if c[0] == "apply_xp_ledger"]) == 1
+        # Each award sees the total right after itself; no update is lost
+        assert sorted(r["xp_after"] for r in results) == list(range(10, 201, 10))
+
+    @pytest.mark.asyncio
+    async def test_level_up_from_returned_total(self):
+        sb, calls = _ledger_client({"u1": {"total_xp": 510, "karma": 0}})
+        ledger = XPLedger()
+
+        result = await ledger.award("u1", xp=15, supabase=sb)
+
+        assert (result["level_before"], result["level_after"]) == (2, 3)    # 519 XP for level 3
+        assert result["leveled_up"] is True
+        assert calls[-1] == ("set_profile_levels", {"levels": [{"user_id": "u1", "level": 3}]})
+
+    @pytest.mark.asyncio
+    async def test_award_xp_keeps_its_shape(self, monkeypatch):
+        sb, _ = _ledger_client({"u1": {"total_xp": 100, "karma": 7}})
+        monkeypatch.setattr(gamification_service, "xp_ledger", XPLedger())
+
+        xp = await gamification_service.award_xp(sb, "u1", 10, "create_post")
+        karma = await gamification_service.award_karma(sb, "u1", 3, "helpful_answer")
+
+        assert xp["xp_before"] == 100 and xp["xp_after"] == 110
+        assert xp["xp_to_next"] == gamification_service.xp_for_level(2) - 110
+        assert karma == {"karma_before": 7, "karma_after": 10, "karma_gained": 3}
+
+    def test_queue_xp_does_not_wait_for_a_flush(self, monkeypatch):
+        ledger = XPLedger()
+        monkeypatch.setattr(gamification_service, "xp_ledger", ledger)
+
+        gamification_service.queue_xp("u1", 10, "create_post")
+
+        assert ledger.pending == {"u1": {"xp": 10, "karma": 0}}
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_returns_empty(self):
+        sb, _ = _ledger_client({})
+        assert await XPLedger().award("ghost", xp=10, supabase=sb) == {}
@@ -0,0 +1,195 @@
+"""
+Downsampling utilities for sensor time series.
+
+Two strategies:
+  * fixed time buckets with min/max/mean/last per metric
+  * LTTB (Largest-Triangle-Three-Buckets) for visually faithful decimation
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+METRICS = (
+    "temperature", "humidity", "vpd", "ph", "ec",
+    "co2_ppm", "light_intensity", "soil_moisture",
+)
+
+# Bucket widths clients can ask for, in seconds
+RESOLUTIONS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+    "6h": 21600,
+    "1d": 86400,
+}
+
+
+def auto_resolution(span_seconds: float, max_points: int) -> str:
+    """Smallest standard resolution that keeps the span within max_points buckets."""
+    for name, width in RESOLUTIONS.items():
+        if span_seconds / width <= max_points:
+            return name
+    return "1d"
+
+
+def parse_timestamps(values: list[str]) -> np.ndarray:
+    """ISO-8601 strings → epoch seconds (naive timestamps are taken as UTC)."""
+    out = np.empty(len(values), dtype=np.float64)
+    for i, v in enumerate(values):
+        dt = datetime.fromisoformat(v.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        out[i] = dt.timestamp()
+    return out
+
+
+def _column(rows: list[dict], key: str) -> np.ndarray:
+    return np.array(
+        [np.nan if r.get(key) is None else float(r[key]) for r in rows],
+        dtype=np.float64,
+    )
+
+
+def _clean(x: float) -> Optional[float]:
+    return None if np.isnan(x) else round(float(x), 3)
+
+
+# ── Time Buckets ────────────────────────────────────────────────
+
+def bucket_aggregate(
+    rows: list[dict],
+    bucket_seconds: int,
+    metrics: tuple[str, ...] = METRICS,
+    time_key: str = "created_at",
+) -> list[dict]:
+    """
+    Aggregate time-ordered rows into fixed, epoch-aligned buckets.
+
+    Returns one dict per non-empty bucket:
+      { bucket_start, count, <metric>: {min, max, mean, last} | None }
+    """
+    if not rows:
+        return []
+
+    ts = parse_timestamps([r[time_key] for r in rows])
+    order = np.argsort(ts, kind="stable")
+    ts = ts[order]
+    rows = [rows[i] for i in order]
+
+    idx = np.floor(ts / bucket_seconds).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, np.diff(idx) != 0])
+    counts = np.diff(np.r_[starts, len(ts)])
+    positions = np.arange(len(ts))
+
+    aggregates = {}
+    for m in metrics:
+        values = _column(rows, m)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            continue
+        n = np.add.reduceat(valid.astype(np.int64), starts)
+        total = np.add.reduceat(np.where(valid, values, 0.0), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / n
+        lo = np.fmin.reduceat(values, starts)
+        hi = np.fmax.reduceat(values, starts)
+        last_pos = np.maximum.reduceat(np.where(valid, positions, -1), starts)
+        last = np.where(last_pos >= 0, values[np.maximum(last_pos, 0)], np.nan)
+        aggregates[m] = (n, lo, hi, mean, last)
+
+    buckets = []
+    for b, start in enumerate(starts):
+        bucket = {
+            "bucket_start": datetime.fromtimestamp(
+                idx[start] * bucket_seconds, tz=timezone.utc
+            ).isoformat(),
+            "count": int(counts[b]),
+        }
+        for m in metrics:
+            agg = aggregates.get(m)
+            if agg is None or agg[0][b] == 0:
+                bucket[m] = None
+                continue
+            _, lo, hi, mean, last = agg
+            bucket[m] = {
+                "min": _clean(lo[b]),
+                "max": _clean(hi[b]),
+                "mean": _clean(mean[b]),
+                "last": _clean(last[b]),
+            }
+        buckets.append(bucket)
+    return buckets
+
+
+# ── LTTB ────────────────────────────────────────────────────────
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps when reducing (x, y) to `threshold`
+    points. First and last points are always kept. NaN-free input expected.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        if nxt_hi <= nxt_lo:
+            nxt_hi = nxt_lo + 1
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def lttb_rows(
+    rows: list[dict],
+    max_points: int,
+    metrics: tuple[str, ...] = METRICS,
+    time_key: str = "created_at",
+) -> list[dict]:
+    """
+    Decimate raw rows with LTTB to at most `max_points` rows. The budget is
+    split across the metrics that have data; each picks its own points and
+    the union is returned in time order, so every series keeps its shape.
+    When the share would drop below three points, the first metric with
+    data selects for all of them.
+    """
+    if len(rows) <= max_points:
+        return rows
+
+    ts = parse_timestamps([r[time_key] for r in rows])
+    series = []
+    for m in metrics:
+        values = _column(rows, m)
+        valid = np.flatnonzero(~np.isnan(values))
+        if len(valid):
+            series.append((valid, values[valid]))
+    if not series:
+        return []
+
+    share = max_points // len(series)
+    if share < 3:
+        series, share = series[:1], max_points
+
+    keep: set[int] = set()
+    for valid, values in series:
+        picked = lttb_indices(ts[valid], values, share)
+        keep.update(valid[picked].tolist())
+
+    return [rows[i] for i in sorted(keep, key=lambda i: ts[i])]
@@ -0,0 +1,55 @@
+"""
+Level curve: XP needed per level and its inverse.
+
+`xp_for_level(level) = int(100 * level ** 1.5)` is the total XP needed to
+reach a level. Its inverse is a binary search over a precomputed table of
+those totals (levels 2..TABLE_MAX_LEVEL), so `level_from_xp` costs the
+same at level 3 and level 3000. Beyond the table a closed-form estimate
+is corrected against `xp_for_level` until exact.
+
+`levels_from_xp` does the same over NumPy arrays for bulk reconciliation.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+TABLE_MAX_LEVEL = 10_000        # ~1e8 XP
+
+
+def xp_for_level(level: int) -> int:
+    """XP needed to reach a given level. Quadratic curve."""
+    return int(100 * (level ** 1.5))
+
+
+# _THRESHOLDS[i] = XP needed for level i + 2, built with xp_for_level itself
+# so table lookups match the curve exactly (no NumPy/libm rounding drift).
+_THRESHOLDS: list[int] = [xp_for_level(level) for level in range(2, TABLE_MAX_LEVEL + 1)]
+_THRESHOLDS_ARRAY = np.array(_THRESHOLDS, dtype=np.int64)
+_TABLE_MAX_XP = _THRESHOLDS[-1]
+
+
+def _level_beyond_table(total_xp: int) -> int:
+    """Closed-form inverse of the curve, then an exact correction step."""
+    level = max(1, int((total_xp / 100) ** (2 / 3)))
+    while xp_for_level(level + 1) <= total_xp:
+        level += 1
+    while level > 1 and xp_for_level(level) > total_xp:
+        level -= 1
+    return level
+
+
+def level_from_xp(total_xp: int) -> int:
+    """Calculate current level from total XP."""
+    if total_xp < _TABLE_MAX_XP:
+        return bisect_right(_THRESHOLDS, total_xp) + 1
+    return _level_beyond_table(total_xp)
+
+
+def levels_from_xp(total_xp) -> np.ndarray:
+    """Vectorized `level_from_xp` over an array of XP totals."""
+    xp = np.asarray(total_xp, dtype=np.int64)
+    levels = np.searchsorted(_THRESHOLDS_ARRAY, xp, side="right") + 1
+    beyond = xp >= _TABLE_MAX_XP
+    if beyond.any():
+        levels[beyond] = [_level_beyond_table(int(v)) for v in xp[beyond]]
+    return levels
@@ -1,9 +1,23 @@
 """
 VPD utilities using Tetens formula.
 Functions return values in kPa.
+
+The formula lives in one place (`_tetens`) and is evaluated either with
+`math.exp` for single readings or `numpy.exp` for whole arrays. Every VPD
+in the backend (climate router, alerts, sensor ingestion) goes through here.
 """
 import math
+from typing import NamedTuple
+
+import numpy as np
+
+
+def _tetens(temp_c, exp):
+    """es(T) = 0.6108 * exp(17.27 * T / (T + 237.3)), T in °C, es in kPa."""
+    return 0.6108 * exp((17.27 * temp_c) / (temp_c + 237.3))
+
 
+# ── Scalar ──────────────────────────────────────────────────────
 
 def saturation_vapor_pressure_kpa(temp_c: float) -> float:
     """Calculate saturation vapor pressure (kPa) using Tetens formula.
@@ -11,8 +25,7 @@ def saturation_vapor_pressure_kpa(temp_c: float) -> float:
     es(T) = 0.6108 * exp(17.27 * T / (T + 237.3))
     where T is degrees Celsius and es is in kPa.
     """
-    es = 0.6108 * math.exp((17.27 * temp_c) / (temp_c + 237.3))
-    return es
+    return _tetens(temp_c, math.exp)
 
 
 def actual_vapor_pressure_kpa(temp_c: float, rh_percent: float) -> float:
@@ -24,21 +37,57 @@ def actual_vapor_pressure_kpa(temp_c: float, rh_percent: float) -> float:
     Returns:
         ea in kPa
     """
-    es = saturation_vapor_pressure_kpa(temp_c)
     rh = max(0.0, min(100.0, rh_percent))
-    ea = es * (rh / 100.0)
-    return ea
+    return saturation_vapor_pressure_kpa(temp_c) * (rh / 100.0)
 
 
-def vpd_kpa(temp_c: float, rh_percent: float) -> float:
+def vpd_kpa(temp_c: float, rh_percent: float, leaf_offset_c: float = 0.0) -> float:
     """Calculate Vapor Pressure Deficit in kPa.
 
-    VPD = es(T) - ea
+    VPD = es(T_leaf) - ea, with T_leaf = T + leaf_offset_c.
+    With no offset this is air VPD, es(T) * (1 - RH/100).
     """
-    es = saturation_vapor_pressure_kpa(temp_c)
-    ea = actual_vapor_pressure_kpa(temp_c, rh_percent)
-    vpd = es - ea
-    return vpd
+    es_air = saturation_vapor_pressure_kpa(temp_c)
+    rh = max(0.0, min(100.0, rh_percent))
+    ea = es_air * (rh / 100.0)
+    es_leaf = es_air if leaf_offset_c == 0.0 else saturation_vapor_pressure_kpa(temp_c + leaf_offset_c)
+    return es_leaf - ea
+
+
+# ── Vectorized ──────────────────────────────────────────────────
+
+class VPDComponents(NamedTuple):
+    """VPD and its components, as arrays (kPa). `es` is taken at leaf temperature."""
+    vpd: np.ndarray
+    es: np.ndarray
+    ea: np.ndarray
+
+
+def vpd_components(temp_c, rh_percent, leaf_offset_c=0.0) -> VPDComponents:
+    """Vectorized VPD, es and ea for arrays of temperature and RH in one pass.
+
+    Args:
+        temp_c: air temperature(s) in °C (scalar or array-like)
+        rh_percent: relative humidity in %, clamped to 0-100
+        leaf_offset_c: leaf minus air temperature in °C (scalar or array)
+    NaN inputs propagate to NaN outputs, so missing readings can be
+    passed through as NaN and filtered afterwards.
+    """
+    t = np.asarray(temp_c, dtype=np.float64)
+    rh = np.clip(np.asarray(rh_percent, dtype=np.float64), 0.0, 100.0)
+
+    es_air = _tetens(t, np.exp)
+    ea = es_air * (rh / 100.0)
+    if np.ndim(leaf_offset_c) == 0 and leaf_offset_c == 0.0:
+        es = es_air
+    else:
+        es = _tetens(t + np.asarray(leaf_offset_c, dtype=np.float64), np.exp)
+    return VPDComponents(vpd=es - ea, es=es, ea=ea)
+
+
+def vpd_kpa_array(temp_c, rh_percent, leaf_offset_c=0.0) -> np.ndarray:
+    """Vectorized VPD (kPa); see `vpd_components`."""
+    return vpd_components(temp_c, rh_percent, leaf_offset_c).vpd
 
 
 if __name__ == "__main__":
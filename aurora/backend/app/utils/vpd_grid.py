@@ -0,0 +1,118 @@
+"""
+Precomputed VPD grid over temperature × relative humidity, with an
+inverse index from a target VPD band to the (temp, RH) pairs that hit it.
+
+The grid is built once (NumPy, ~55k points) on first use. Forward lookups
+are index arithmetic; inverse lookups are a binary search over the sorted
+VPD values, so answering "which conditions give 1.0-1.3 kPa?" never
+evaluates exp().
+"""
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from app.utils.vpd import vpd_kpa_array
+
+TEMP_MIN, TEMP_MAX, TEMP_STEP = 10.0, 40.0, 0.1
+RH_MIN, RH_MAX, RH_STEP = 5.0, 95.0, 0.5
+
+
+class Setpoint(NamedTuple):
+    temperature_c: float
+    relative_humidity_percent: float
+    vpd_kpa: float
+
+
+class RHWindow(NamedTuple):
+    """Humidity range that keeps VPD in the band at one temperature."""
+    temperature_c: float
+    rh_min: float
+    rh_max: float
+
+
+class VPDGrid:
+    """Air VPD (kPa) for every grid point, plus the sorted inverse index."""
+
+    def __init__(self):
+        self.temps = np.round(np.arange(TEMP_MIN, TEMP_MAX + TEMP_STEP / 2, TEMP_STEP), 1)
+        self.rhs = np.round(np.arange(RH_MIN, RH_MAX + RH_STEP / 2, RH_STEP), 1)
+        t, rh = np.meshgrid(self.temps, self.rhs, indexing="ij")
+        self.vpd = vpd_kpa_array(t, rh)                 # shape (n_temps, n_rhs)
+
+        flat = self.vpd.ravel()
+        self._order = np.argsort(flat, kind="stable")
+        self._sorted = flat[self._order]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.vpd.shape
+
+    def lookup(self, temp_c: float, rh_percent: float) -> float:
+        """VPD at the nearest grid point."""
+        i = int(round((min(max(temp_c, TEMP_MIN), TEMP_MAX) - TEMP_MIN) / TEMP_STEP))
+        j = int(round((min(max(rh_percent, RH_MIN), RH_MAX) - RH_MIN) / RH_STEP))
+        return float(self.vpd[i, j])
+
+    def feasible(self, vpd_min: float, vpd_max: float) -> tuple[np.ndarray, np.ndarray]:
+        """(temp index, RH index) arrays of every grid point with VPD in [vpd_min, vpd_max]."""
+        lo = np.searchsorted(self._sorted, vpd_min, side="left")
+        hi = np.searchsorted(self._sorted, vpd_max, side="right")
+        return np.divmod(self._order[lo:hi], self.shape[1])
+
+    def optimal(
+        self,
+        vpd_min: float,
+        vpd_max: float,
+        temp_range: tuple[float, float] = (TEMP_MIN, TEMP_MAX),
+        rh_range: tuple[float, float] = (RH_MIN, RH_MAX),
+        preferred_temp: Optional[float] = None,
+        window_step_c: float = 1.0,
+    ) -> tuple[Optional[Setpoint], list[RHWindow], int]:
+        """
+        Best setpoint for a VPD band within the allowed temperature/RH
+        ranges, the RH window at each `window_step_c` of temperature, and
+        the number of feasible grid points.
+
+        The setpoint is the feasible point closest to the band centre,
+        tie-broken towards `preferred_temp` (default: middle of temp_range).
+        """
+        ti, ri = self.feasible(vpd_min, vpd_max)
+        temps, rhs = self.temps[ti], self.rhs[ri]
+        keep = (
+            (temps >= temp_range[0]) & (temps <= temp_range[1])
+            & (rhs >= rh_range[0]) & (rhs <= rh_range[1])
+        )
+        ti, ri = ti[keep], ri[keep]
+        if len(ti) == 0:
+            return None, [], 0
+
+        if preferred_temp is None:
+            preferred_temp = (max(temp_range[0], TEMP_MIN) + min(temp_range[1], TEMP_MAX)) / 2
+        centre = (vpd_min + vpd_max) / 2
+        width = max(vpd_max - vpd_min, 1e-6)
+        values = self.vpd[ti, ri]
+        score = np.abs(values - centre) / width + np.abs(self.temps[ti] - preferred_temp) / 10
+        best = int(np.argmin(score))
+        setpoint = Setpoint(
+            float(self.temps[ti[best]]), float(self.rhs[ri[best]]), round(float(values[best]), 3),
+        )
+
+        n_temps = self.shape[0]
+        rh_lo = np.full(n_temps, len(self.rhs), dtype=np.int64)
+        rh_hi = np.full(n_temps, -1, dtype=np.int64)
+        np.minimum.at(rh_lo, ti, ri)
+        np.maximum.at(rh_hi, ti, ri)
+        stride = max(1, int(round(window_step_c / TEMP_STEP)))
+        windows = [
+            RHWindow(float(self.temps[i]), float(self.rhs[rh_lo[i]]), float(self.rhs[rh_hi[i]]))
+            for i in range(0, n_temps, stride)
+            if rh_hi[i] >= 0
+        ]
+        return setpoint, windows, int(len(ti))
+
+
+@lru_cache(maxsize=1)
+def get_grid() -> VPDGrid:
+    """The process-wide grid, built on first use."""
+    return VPDGrid()
@@ -0,0 +1,21 @@
+"""
+Calendar weeks for weekly gamification.
+
+One definition shared by the weekly leaderboard and the weekly XP job: a
+week runs Sunday 00:00 UTC to the next Sunday, so the week the Sunday
+reconciliation settles is the one the weekly board just showed.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+def week_start(now: Optional[datetime] = None) -> datetime:
+    """Sunday 00:00 UTC of the week containing `now`."""
+    now = now or datetime.now(timezone.utc)
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def previous_week_start(now: Optional[datetime] = None) -> datetime:
+    """Sunday 00:00 UTC of the last complete week before `now`."""
+    return week_start(now) - timedelta(days=7)
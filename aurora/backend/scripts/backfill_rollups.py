@@ -0,0 +1,50 @@
+"""
+Aurora Sensor Rollup Backfill
+Builds 1m/1h/1d sensor rollups from raw readings, one day at a time.
+
+Usage:
+    python -m scripts.backfill_rollups [--days 30]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Ensure backend root is on sys.path
+_backend_root = str(Path(__file__).resolve().parent.parent)
+if _backend_root not in sys.path:
+    sys.path.insert(0, _backend_root)
+
+from app.dependencies import get_supabase_client  # noqa: E402
+from app.services import rollup_service  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("aurora.backfill_rollups")
+
+
+async def main(days: int) -> None:
+    sb = get_supabase_client()
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    total = 0
+
+    # Oldest first; each call recomputes whole day buckets, so reruns are safe
+    for offset in range(days, -1, -1):
+        start = today - timedelta(days=offset)
+        end = start + timedelta(days=1) - timedelta(microseconds=1)
+        rows = await rollup_service.backfill(sb, start, end)
+        total += rows
+        logger.info("%s: %d rollup rows", start.date().isoformat(), rows)
+
+    logger.info("Backfill complete: %d rollup rows over %d days", total, days + 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill sensor rollups")
+    parser.add_argument("--days", type=int, default=rollup_service.RAW_RETENTION_DAYS)
+    args = parser.parse_args()
+    asyncio.run(main(args.days))
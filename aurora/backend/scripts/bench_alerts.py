@@ -0,0 +1,138 @@
+"""
+Aurora Alert Replay Benchmark
+Replays synthetic sensor traffic (stuck sensors, values flapping around a
+threshold, short spikes) through the old per-reading alert path and the
+current detector + dispatcher, and compares alert inserts and pushes.
+
+Usage:
+    python -m scripts.bench_alerts [--grows 200] [--hours 24] [--interval 60]
+"""
+import argparse
+import asyncio
+import sys
+import types
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Ensure backend root is on sys.path
+_backend_root = str(Path(__file__).resolve().parent.parent)
+if _backend_root not in sys.path:
+    sys.path.insert(0, _backend_root)
+
+from app.services.alert_dispatcher import AlertDispatcher  # noqa: E402
+from app.services.anomaly_detector import AnomalyDetector  # noqa: E402
+from app.services.threshold_service import DEFAULT_THRESHOLDS  # noqa: E402
+
+
+class _Counter:
+    """Stands in for the Supabase client and the push service, counting calls."""
+
+    def __init__(self):
+        self.insert_calls = 0
+        self.rows = 0
+        self.pushes = 0
+
+    def table(self, _name):
+        return self
+
+    def insert(self, rows):
+        self.insert_calls += 1
+        self.rows += len(rows)
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(data=[])
+
+    async def send_push_notification(self, **_kwargs):
+        self.pushes += 1
+        return True
+
+
+def _traffic(grows: int, hours: int, interval: int, seed: int = 7):
+    """Yield per-tick lists of readings, one per grow, in time order."""
+    rng = np.random.default_rng(seed)
+    t0 = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    ticks = hours * 3600 // interval
+    # A third of grows have a stuck-hot sensor, a third flap around 70 %RH
+    kind = rng.integers(0, 3, grows)
+    for tick in range(ticks):
+        ts = (t0 + timedelta(seconds=tick * interval)).isoformat()
+        batch = []
+        for g in range(grows):
+            temp = 24.0 + rng.normal(0, 0.4)
+            humidity = 55.0 + rng.normal(0, 1.5)
+            if kind[g] == 0:
+                temp = 31.0 + rng.normal(0, 0.2)
+            elif kind[g] == 1:
+                humidity = 70.0 + rng.normal(0, 1.5)
+            if rng.random() < 0.002:
+                temp += 8.0
+            batch.append({
+                "grow_id": f"g{g}",
+                "created_at": ts,
+                "temperature": round(temp, 2),
+                "humidity": round(humidity, 2),
+            })
+        yield tick * interval, batch
+
+
+def _legacy_alerts(reading: dict) -> list[dict]:
+    """Old behaviour: every out-of-range parameter on every reading is an alert."""
+    out = []
+    for param, limits in DEFAULT_THRESHOLDS.items():
+        value = reading.get(param)
+        if value is None or limits["min"] <= value <= limits["max"]:
+            continue
+        out.append({"grow_id": reading["grow_id"], "user_id": "u", "parameter": param,
+                    "severity": "warning", "message": f"{param} out of range"})
+    return out
+
+
+async def _replay(args) -> None:
+    before = _Counter()
+    after = _Counter()
+    clock = [0.0]
+    detector = AnomalyDetector()
+    dispatcher = AlertDispatcher(timer=lambda: clock[0])
+    sys.modules["app.services.push_service"] = after
+
+    readings = 0
+    for elapsed, batch in _traffic(args.grows, args.hours, args.interval):
+        clock[0] = float(elapsed)
+        readings += len(batch)
+
+        # Old path: one insert per reading with alerts, one push per alert
+        for r in batch:
+            alerts = _legacy_alerts(r)
+            if alerts:
+                before.table("alerts").insert(alerts).execute()
+                before.pushes += len(alerts)
+
+        # Current path: detector, then one dispatch per ingest tick
+        raised = []
+        for r in batch:
+            raised += detector.observe(r["grow_id"], "u", r, DEFAULT_THRESHOLDS)
+        await dispatcher.dispatch(raised, after)
+
+    m = dispatcher.metrics()
+    print(f"Replayed {readings:,} readings ({args.grows} grows, {args.hours} h, every {args.interval} s)")
+    print(f"  {'':14}{'before':>12}{'after':>12}")
+    print(f"  {'insert calls':14}{before.insert_calls:>12,}{after.insert_calls:>12,}")
+    print(f"  {'alert rows':14}{before.rows:>12,}{after.rows:>12,}")
+    print(f"  {'pushes':14}{before.pushes:>12,}{after.pushes:>12,}")
+    print(f"  dispatcher: received={m['received']:,} suppressed={m['suppressed']:,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grows", type=int, default=200)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--interval", type=int, default=60, help="seconds between readings")
+    args = parser.parse_args()
+    asyncio.run(_replay(args))
+
+
+if __name__ == "__main__":
+    main()
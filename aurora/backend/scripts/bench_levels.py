@@ -0,0 +1,67 @@
+"""
+Aurora Level Benchmark
+Compares the original level loop with the table lookup (scalar bisect)
+and the vectorized lookup over synthetic XP totals.
+
+Usage:
+    python -m scripts.bench_levels [--users 100000] [--max-xp 2000000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure backend root is on sys.path
+_backend_root = str(Path(__file__).resolve().parent.parent)
+if _backend_root not in sys.path:
+    sys.path.insert(0, _backend_root)
+
+from app.utils.levels import level_from_xp, levels_from_xp, xp_for_level  # noqa: E402
+
+
+def _loop_level(total_xp: int) -> int:
+    level = 1
+    while xp_for_level(level + 1) <= total_xp:
+        level += 1
+    return level
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--max-xp", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    # Skewed like real profiles: most users low, a long tail of veterans
+    xp = np.minimum(rng.pareto(1.2, args.users) * 500, args.max_xp).astype(np.int64)
+    xp_list = xp.tolist()
+
+    loop = _best_of(args.repeat, lambda: [_loop_level(v) for v in xp_list])
+    table = _best_of(args.repeat, lambda: [level_from_xp(v) for v in xp_list])
+    vector = _best_of(args.repeat, lambda: levels_from_xp(xp))
+
+    assert levels_from_xp(xp).tolist() == [_loop_level(v) for v in xp_list]
+
+    n = args.users
+    print(f"Levels for {n:,} users, XP up to {args.max_xp:,} (best of {args.repeat}):")
+    print(f"  loop       {loop:8.3f} s  ({loop / n * 1e9:8.1f} ns/user)")
+    print(f"  bisect     {table:8.3f} s  ({table / n * 1e9:8.1f} ns/user)")
+    print(f"  vectorized {vector:8.3f} s  ({vector / n * 1e9:8.1f} ns/user)")
+    print(f"  speedup    {loop / table:8.1f}x scalar, {loop / vector:.1f}x vectorized")
+
+
+if __name__ == "__main__":
+    main()
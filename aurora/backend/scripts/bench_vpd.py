@@ -0,0 +1,57 @@
+"""
+Aurora VPD Benchmark
+Compares the scalar VPD path (one call per reading) with the vectorized
+path (one NumPy pass) over synthetic temperature/RH data.
+
+Usage:
+    python -m scripts.bench_vpd [--points 1000000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure backend root is on sys.path
+_backend_root = str(Path(__file__).resolve().parent.parent)
+if _backend_root not in sys.path:
+    sys.path.insert(0, _backend_root)
+
+from app.utils.vpd import vpd_kpa, vpd_kpa_array  # noqa: E402
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    temps = rng.uniform(15.0, 32.0, args.points)
+    hums = rng.uniform(30.0, 85.0, args.points)
+    temps_list, hums_list = temps.tolist(), hums.tolist()
+
+    scalar = _best_of(args.repeat, lambda: [vpd_kpa(t, h) for t, h in zip(temps_list, hums_list)])
+    vector = _best_of(args.repeat, lambda: vpd_kpa_array(temps, hums))
+
+    expected = np.array([vpd_kpa(t, h) for t, h in zip(temps_list[:1000], hums_list[:1000])])
+    assert np.allclose(vpd_kpa_array(temps[:1000], hums[:1000]), expected)
+
+    print(f"VPD over {args.points:,} points (best of {args.repeat}):")
+    print(f"  scalar     {scalar:8.3f} s  ({scalar / args.points * 1e9:7.1f} ns/point)")
+    print(f"  vectorized {vector:8.3f} s  ({vector / args.points * 1e9:7.1f} ns/point)")
+    print(f"  speedup    {scalar / vector:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Aurora XP Ledger Consistency Check
+Compares every profile's total_xp with the sum of its xp_events and
+reports the users that drifted. With --fix, rebuilds their totals (and
+levels) from xp_events.
+
+XP granted before xp_events existed shows up as drift too, so review the
+report before fixing.
+
+Usage:
+    python -m scripts.check_xp_ledger [--limit 1000] [--fix]
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure backend root is on sys.path
+_backend_root = str(Path(__file__).resolve().parent.parent)
+if _backend_root not in sys.path:
+    sys.path.insert(0, _backend_root)
+
+from app.dependencies import get_supabase_client  # noqa: E402
+from app.services.gamification_service import level_from_xp  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("aurora.check_xp_ledger")
+
+
+def main(limit: int, fix: bool) -> int:
+    sb = get_supabase_client()
+    drift = sb.rpc("xp_ledger_drift", {"max_rows": limit}).execute().data or []
+
+    if not drift:
+        logger.info("✅ All profile XP totals match xp_events")
+        return 0
+
+    for row in drift:
+        logger.info(
+            "user=%s profile_xp=%d ledger_xp=%d diff=%+d",
+            row["user_id"][:8], row["profile_xp"], row["ledger_xp"],
+            row["profile_xp"] - row["ledger_xp"],
+        )
+    logger.warning("⚠️  %d profiles drifted from the ledger", len(drift))
+
+    if fix:
+        rebuilt = sb.rpc(
+            "rebuild_xp_totals", {"user_ids": [row["user_id"] for row in drift]}
+        ).execute().data or []
+        for row in rebuilt:
+            sb.table("profiles").update(
+                {"level": level_from_xp(row["total_xp"] or 0)}
+            ).eq("id", row["user_id"]).execute()
+        logger.info("🔧 Rebuilt %d totals from xp_events", len(rebuilt))
+        return 0
+
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check profile XP against xp_events")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--fix", action="store_true", help="rebuild drifted totals")
+    args = parser.parse_args()
+    sys.exit(main(args.limit, args.fix))
@@ -4,11 +4,15 @@ Run every 24 hours to analyze active grows and generate
 proactive Dr. Aurora messages when anomalies are detected.
 
 Usage:
-    python -m scripts.proactive_cron
+    python -m scripts.proactive_cron [--shard 0 --shards 1] [--concurrency 8] [--rpm 60]
 
-Or via system cron / scheduler:
-    0 6 * * * cd /path/to/aurora/backend && python -m scripts.proactive_cron
+Or via system cron / scheduler (here split across two workers):
+    0 6 * * * cd /path/to/aurora/backend && python -m scripts.proactive_cron --shard 0 --shards 2
+    0 6 * * * cd /path/to/aurora/backend && python -m scripts.proactive_cron --shard 1 --shards 2
+
+With several shards, --rpm is per worker: divide the LLM budget among them.
 """
+import argparse
 import asyncio
 import logging
 import sys
@@ -34,17 +38,19 @@ logging.basicConfig(
 logger = logging.getLogger("proactive_cron")
 
 
-async def main() -> None:
-    """Run the proactive analysis pipeline."""
+async def main(shard: int, shards: int, concurrency: int, rpm: float) -> None:
+    """Run the proactive analysis pipeline for one shard."""
     start = datetime.now(timezone.utc)
-    logger.info("🔬 Starting proactive analysis cron job...")
+    logger.info("🔬 Starting proactive analysis cron job (shard %d/%d)...", shard, shards)
 
     try:
         supabase = get_supabase_client()
         groq = get_groq_client()
 
-        service = ProactiveAnalysisService(groq, supabase)
-        summary = await service.run_analysis()
+        service = ProactiveAnalysisService(
+            groq, supabase, llm_concurrency=concurrency, llm_per_minute=rpm,
+        )
+        summary = await service.run_analysis(shard=shard, shards=shards)
 
         elapsed = (datetime.now(timezone.utc) - start).total_seconds()
         logger.info(
@@ -62,4 +68,12 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Proactive Dr. Aurora analysis of active grows")
+    parser.add_argument("--shard", type=int, default=0, help="this worker's shard (0-based)")
+    parser.add_argument("--shards", type=int, default=1, help="total number of shards")
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM calls in flight")
+    parser.add_argument("--rpm", type=float, default=60, help="LLM requests per minute (0 = unlimited)")
+    args = parser.parse_args()
+    if not 0 <= args.shard < args.shards:
+        parser.error("--shard must be in [0, --shards)")
+    asyncio.run(main(args.shard, args.shards, args.concurrency, args.rpm))
@@ -0,0 +1,53 @@
+-- 20261019_achievement_engine.sql
+-- Counters and constraints for the event-driven achievement engine.
+--   * user_stats.sensor_readings: per-user lifetime reading count, so
+--     loading a user's achievement metrics needs no COUNT over
+--     sensor_readings
+--   * user_achievements (user_id, achievement_id) is unique, so concurrent
+--     workers cannot unlock (and reward) the same achievement twice
+
+-- 1. Sensor reading counter, bumped once per statement (batch ingest
+--    inserts many rows in one statement). It only ever grows: retention
+--    purges delete old readings, and those must not take back progress.
+ALTER TABLE user_stats ADD COLUMN IF NOT EXISTS sensor_readings INT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION user_stats_readings_ins_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO user_stats AS s (user_id, sensor_readings)
+  SELECT user_id, COUNT(*) FROM new_rows WHERE user_id IS NOT NULL GROUP BY user_id
+  ON CONFLICT (user_id) DO UPDATE SET
+    sensor_readings = s.sensor_readings + EXCLUDED.sensor_readings,
+    updated_at = now();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_stats_readings_ins ON sensor_readings;
+CREATE TRIGGER trg_user_stats_readings_ins
+AFTER INSERT ON sensor_readings
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION user_stats_readings_ins_trg();
+
+DROP TRIGGER IF EXISTS trg_user_stats_readings_del ON sensor_readings;
+DROP FUNCTION IF EXISTS user_stats_readings_del_trg();
+
+-- Backfill (idempotent; never lowers a counter)
+INSERT INTO user_stats AS s (user_id, sensor_readings)
+SELECT r.user_id, COUNT(*)
+FROM sensor_readings r
+JOIN profiles p ON p.id = r.user_id
+GROUP BY r.user_id
+ON CONFLICT (user_id) DO UPDATE SET
+  sensor_readings = GREATEST(s.sensor_readings, EXCLUDED.sensor_readings),
+  updated_at = now();
+
+-- 2. One unlock per (user, achievement)
+DELETE FROM user_achievements a
+USING user_achievements b
+WHERE a.ctid > b.ctid
+  AND a.user_id = b.user_id
+  AND a.achievement_id = b.achievement_id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS user_achievements_user_achievement_key
+  ON user_achievements (user_id, achievement_id);
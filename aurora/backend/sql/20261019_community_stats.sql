@@ -0,0 +1,182 @@
+-- 20261019_community_stats.sql
+-- Precomputed statistics for GET /social/competitive-analysis.
+--   * user_stats:      per-user counters, maintained incrementally by triggers
+--   * community_stats: single-row community totals + histograms, refreshed
+--                      periodically by refresh_community_stats()
+
+ALTER TABLE grows ADD COLUMN IF NOT EXISTS yield_grams NUMERIC;
+
+-- 1. Per-user counters
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id UUID PRIMARY KEY REFERENCES profiles(id) ON DELETE CASCADE,
+    posts_count INT NOT NULL DEFAULT 0,
+    completed_grows INT NOT NULL DEFAULT 0,
+    yield_grams_total NUMERIC NOT NULL DEFAULT 0,
+    tasks_total INT NOT NULL DEFAULT 0,
+    tasks_completed INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION bump_user_stats(
+  uid UUID,
+  d_posts INT DEFAULT 0,
+  d_grows INT DEFAULT 0,
+  d_yield NUMERIC DEFAULT 0,
+  d_tasks INT DEFAULT 0,
+  d_done INT DEFAULT 0
+)
+RETURNS VOID AS $$
+BEGIN
+  IF uid IS NULL THEN
+    RETURN;
+  END IF;
+  INSERT INTO user_stats AS s (user_id, posts_count, completed_grows, yield_grams_total, tasks_total, tasks_completed)
+  VALUES (uid, GREATEST(d_posts, 0), GREATEST(d_grows, 0), GREATEST(d_yield, 0), GREATEST(d_tasks, 0), GREATEST(d_done, 0))
+  ON CONFLICT (user_id) DO UPDATE SET
+    posts_count = GREATEST(s.posts_count + d_posts, 0),
+    completed_grows = GREATEST(s.completed_grows + d_grows, 0),
+    yield_grams_total = GREATEST(s.yield_grams_total + d_yield, 0),
+    tasks_total = GREATEST(s.tasks_total + d_tasks, 0),
+    tasks_completed = GREATEST(s.tasks_completed + d_done, 0),
+    updated_at = now();
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. Triggers
+CREATE OR REPLACE FUNCTION user_stats_posts_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM bump_user_stats(NEW.user_id, d_posts => 1);
+  ELSE
+    PERFORM bump_user_stats(OLD.user_id, d_posts => -1);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_stats_posts ON posts;
+CREATE TRIGGER trg_user_stats_posts
+AFTER INSERT OR DELETE ON posts
+FOR EACH ROW EXECUTE FUNCTION user_stats_posts_trg();
+
+-- A grow counts while its status is 'completed'; its yield counts with it.
+CREATE OR REPLACE FUNCTION user_stats_grows_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'completed' THEN
+    PERFORM bump_user_stats(OLD.user_id, d_grows => -1, d_yield => -COALESCE(OLD.yield_grams, 0));
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'completed' THEN
+    PERFORM bump_user_stats(NEW.user_id, d_grows => 1, d_yield => COALESCE(NEW.yield_grams, 0));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_stats_grows ON grows;
+CREATE TRIGGER trg_user_stats_grows
+AFTER INSERT OR DELETE OR UPDATE OF status, yield_grams, user_id ON grows
+FOR EACH ROW EXECUTE FUNCTION user_stats_grows_trg();
+
+CREATE OR REPLACE FUNCTION user_stats_tasks_trg()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM bump_user_stats(OLD.user_id, d_tasks => -1, d_done => CASE WHEN OLD.is_completed THEN -1 ELSE 0 END);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM bump_user_stats(NEW.user_id, d_tasks => 1, d_done => CASE WHEN NEW.is_completed THEN 1 ELSE 0 END);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_stats_tasks ON daily_tasks;
+CREATE TRIGGER trg_user_stats_tasks
+AFTER INSERT OR DELETE OR UPDATE OF is_completed, user_id ON daily_tasks
+FOR EACH ROW EXECUTE FUNCTION user_stats_tasks_trg();
+
+-- 3. Backfill (idempotent: recomputes from source tables)
+INSERT INTO user_stats (user_id, posts_count, completed_grows, yield_grams_total, tasks_total, tasks_completed)
+SELECT p.id,
+       COALESCE(po.n, 0),
+       COALESCE(g.n, 0),
+       COALESCE(g.yield_total, 0),
+       COALESCE(t.n, 0),
+       COALESCE(t.done, 0)
+FROM profiles p
+LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM posts GROUP BY user_id) po ON po.user_id = p.id
+LEFT JOIN (
+  SELECT user_id, COUNT(*) AS n, SUM(COALESCE(yield_grams, 0)) AS yield_total
+  FROM grows WHERE status = 'completed' GROUP BY user_id
+) g ON g.user_id = p.id
+LEFT JOIN (
+  SELECT user_id, COUNT(*) AS n, COUNT(*) FILTER (WHERE is_completed) AS done
+  FROM daily_tasks GROUP BY user_id
+) t ON t.user_id = p.id
+ON CONFLICT (user_id) DO UPDATE SET
+  posts_count = EXCLUDED.posts_count,
+  completed_grows = EXCLUDED.completed_grows,
+  yield_grams_total = EXCLUDED.yield_grams_total,
+  tasks_total = EXCLUDED.tasks_total,
+  tasks_completed = EXCLUDED.tasks_completed,
+  updated_at = now();
+
+-- 4. Community aggregates (single row, id = 1)
+CREATE TABLE IF NOT EXISTS community_stats (
+    id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    total_users INT NOT NULL DEFAULT 0,
+    total_posts INT NOT NULL DEFAULT 0,
+    completed_grows INT NOT NULL DEFAULT 0,
+    xp_histogram JSONB NOT NULL DEFAULT '{"edges": [], "counts": []}',
+    posts_histogram JSONB NOT NULL DEFAULT '{"edges": [], "counts": []}',
+    refreshed_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- Bucket counts for `vals` over lower bucket edges; values below the first
+-- edge fall into the first bucket.
+CREATE OR REPLACE FUNCTION histogram_of(vals NUMERIC[], edges NUMERIC[])
+RETURNS JSONB AS $$
+  SELECT jsonb_build_object(
+    'edges', to_jsonb(edges),
+    'counts', to_jsonb(ARRAY(
+      SELECT COUNT(v.val) FILTER (WHERE GREATEST(width_bucket(v.val, edges), 1) = b)
+      FROM generate_series(1, array_length(edges, 1)) AS b
+      LEFT JOIN unnest(vals) AS v(val) ON TRUE
+      GROUP BY b
+      ORDER BY b
+    ))
+  );
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION refresh_community_stats()
+RETURNS VOID AS $$
+DECLARE
+  v_xp NUMERIC[];
+  v_posts NUMERIC[];
+BEGIN
+  SELECT array_agg(COALESCE(total_xp, 0)) INTO v_xp FROM profiles;
+  SELECT array_agg(COALESCE(s.posts_count, 0))
+    INTO v_posts
+    FROM profiles p LEFT JOIN user_stats s ON s.user_id = p.id;
+
+  INSERT INTO community_stats AS c (id, total_users, total_posts, completed_grows, xp_histogram, posts_histogram, refreshed_at)
+  SELECT 1,
+         (SELECT COUNT(*) FROM profiles),
+         COALESCE((SELECT SUM(posts_count) FROM user_stats), 0),
+         COALESCE((SELECT SUM(completed_grows) FROM user_stats), 0),
+         histogram_of(COALESCE(v_xp, '{}'), ARRAY[0, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000]::NUMERIC[]),
+         histogram_of(COALESCE(v_posts, '{}'), ARRAY[0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000]::NUMERIC[]),
+         now()
+  ON CONFLICT (id) DO UPDATE SET
+    total_users = EXCLUDED.total_users,
+    total_posts = EXCLUDED.total_posts,
+    completed_grows = EXCLUDED.completed_grows,
+    xp_histogram = EXCLUDED.xp_histogram,
+    posts_histogram = EXCLUDED.posts_histogram,
+    refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_community_stats();
@@ -0,0 +1,33 @@
+-- 20261019_daily_task_generation.sql
+-- Bulk daily task generation.
+--   * one task per (grow, date, title), so bulk upserts with
+--     ON CONFLICT DO NOTHING make reruns idempotent
+--   * users_with_tasks_on: users that already have tasks on a date
+
+-- Drop duplicates left by earlier per-user runs before adding the key,
+-- keeping a completed copy when there is one
+DELETE FROM daily_tasks d
+USING (
+  SELECT id,
+         ROW_NUMBER() OVER (
+           PARTITION BY grow_id, task_date, title
+           ORDER BY is_completed DESC, id
+         ) AS rn
+  FROM daily_tasks
+) ranked
+WHERE d.id = ranked.id
+  AND ranked.rn > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS daily_tasks_grow_date_title_key
+  ON daily_tasks (grow_id, task_date, title);
+
+CREATE INDEX IF NOT EXISTS idx_daily_tasks_date_user
+  ON daily_tasks (task_date, user_id);
+
+CREATE OR REPLACE FUNCTION users_with_tasks_on(task_date_param DATE)
+RETURNS TABLE (user_id UUID) AS $$
+  SELECT DISTINCT t.user_id
+  FROM daily_tasks t
+  WHERE t.task_date = task_date_param
+  ORDER BY t.user_id;   -- stable order for .range() paging
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,22 @@
+-- 20261019_grow_thresholds.sql
+-- grows.updated_at versions a grow's phase and AI plan. The backend caches
+-- alert thresholds compiled from (current_phase, ai_plan) and recompiles
+-- them when it sees a different (current_phase, updated_at) pair.
+
+ALTER TABLE grows ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+
+CREATE OR REPLACE FUNCTION touch_grow_plan()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at := now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS grows_touch_plan ON grows;
+CREATE TRIGGER grows_touch_plan
+  BEFORE UPDATE OF current_phase, ai_plan ON grows
+  FOR EACH ROW
+  WHEN (OLD.current_phase IS DISTINCT FROM NEW.current_phase
+        OR OLD.ai_plan IS DISTINCT FROM NEW.ai_plan)
+  EXECUTE FUNCTION touch_grow_plan();
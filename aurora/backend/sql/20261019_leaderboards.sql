@@ -0,0 +1,29 @@
+-- 20261019_leaderboards.sql
+-- Support for the in-memory leaderboards.
+--   * weekly_xp_totals:      XP gained per user since a timestamp (weekly board)
+--   * leaderboard_snapshots: each board as published by the scheduler leader
+--                            (top entries, plus every score in `state` so
+--                            other workers can load it without a rebuild)
+
+CREATE INDEX IF NOT EXISTS idx_xp_events_created_at ON xp_events (created_at);
+
+CREATE OR REPLACE FUNCTION weekly_xp_totals(since_param TIMESTAMPTZ)
+RETURNS TABLE (user_id UUID, xp BIGINT) AS $$
+  SELECT x.user_id, SUM(x.amount)
+  FROM xp_events x
+  WHERE x.created_at >= since_param
+  GROUP BY x.user_id
+  HAVING SUM(x.amount) > 0
+  ORDER BY x.user_id;   -- stable order for .range() paging
+$$ LANGUAGE sql STABLE;
+
+CREATE TABLE IF NOT EXISTS leaderboard_snapshots (
+    board TEXT NOT NULL,
+    period TEXT NOT NULL,
+    entries JSONB NOT NULL DEFAULT '[]',
+    state JSONB,
+    taken_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (board, period)
+);
+
+ALTER TABLE leaderboard_snapshots ADD COLUMN IF NOT EXISTS state JSONB;
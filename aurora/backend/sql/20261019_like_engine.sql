@@ -0,0 +1,56 @@
+-- 20261019_like_engine.sql
+-- Atomic like toggle and batched karma application.
+-- Replaces the SELECT → INSERT/DELETE → increment/decrement → SELECT author
+-- sequence in social.toggle_like with a single round trip.
+
+-- 1. Toggle a like, adjust the counter and return the new state + author.
+--    Double taps are safe: the DELETE locks the row, and a concurrent INSERT
+--    that loses the race hits the UNIQUE(post_id, user_id) constraint and is
+--    reported as "liked" without incrementing the counter twice.
+CREATE OR REPLACE FUNCTION toggle_post_like(post_id_param UUID, user_id_param UUID)
+RETURNS TABLE(is_liked BOOLEAN, new_likes_count INT, author_id UUID) AS $$
+DECLARE
+  v_deleted INT;
+  v_inserted INT;
+BEGIN
+  DELETE FROM post_likes
+  WHERE post_id = post_id_param AND user_id = user_id_param;
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+
+  IF v_deleted > 0 THEN
+    is_liked := FALSE;
+    UPDATE posts p
+    SET likes_count = GREATEST(COALESCE(p.likes_count, 0) - 1, 0)
+    WHERE p.id = post_id_param
+    RETURNING p.likes_count, p.user_id INTO new_likes_count, author_id;
+  ELSE
+    INSERT INTO post_likes (post_id, user_id)
+    VALUES (post_id_param, user_id_param)
+    ON CONFLICT (post_id, user_id) DO NOTHING;
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    is_liked := TRUE;
+    IF v_inserted > 0 THEN
+      UPDATE posts p
+      SET likes_count = COALESCE(p.likes_count, 0) + 1
+      WHERE p.id = post_id_param
+      RETURNING p.likes_count, p.user_id INTO new_likes_count, author_id;
+    ELSE
+      SELECT p.likes_count, p.user_id INTO new_likes_count, author_id
+      FROM posts p WHERE p.id = post_id_param;
+    END IF;
+  END IF;
+
+  RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. Apply many karma deltas in one statement.
+--    deltas: [{"user_id": "<uuid>", "amount": 4}, ...]
+CREATE OR REPLACE FUNCTION apply_karma_deltas(deltas JSONB)
+RETURNS VOID AS $$
+  UPDATE profiles p
+  SET karma = COALESCE(p.karma, 0) + d.amount
+  FROM jsonb_to_recordset(deltas) AS d(user_id UUID, amount INT)
+  WHERE p.id = d.user_id;
+$$ LANGUAGE sql;
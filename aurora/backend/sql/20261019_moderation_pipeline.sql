@@ -0,0 +1,18 @@
+-- 20261019_moderation_pipeline.sql
+-- Support for asynchronous moderation (app/services/moderation_service.py).
+-- Comments are counted when published provisionally; a later LLM takedown
+-- needs to undo that increment.
+
+CREATE OR REPLACE FUNCTION decrement_comments(post_id_param UUID)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE posts
+  SET comments_count = GREATEST(COALESCE(comments_count, 0) - 1, 0)
+  WHERE id = post_id_param;
+END;
+$$ LANGUAGE plpgsql;
+
+-- The moderation worker writes verdicts back by primary key in bulk;
+-- feeds and comment lists filter on is_hidden.
+CREATE INDEX IF NOT EXISTS idx_post_comments_post_visible
+    ON post_comments(post_id, created_at) WHERE is_hidden = FALSE;
@@ -0,0 +1,52 @@
+-- 20261019_proactive_analysis.sql
+-- Set-based reads for the proactive analysis cron.
+--   * proactive_grows:      one shard of the active grows, keyset-paged
+--                           (shards split by a hash of the grow id)
+--   * latest_grow_readings: newest reading per grow for many grows at once,
+--                           falling back to grow_snapshots
+
+CREATE INDEX IF NOT EXISTS idx_grows_active_id
+  ON grows (id) WHERE status = 'active';
+
+CREATE INDEX IF NOT EXISTS idx_grow_snapshots_grow_recorded
+  ON grow_snapshots (grow_id, recorded_at DESC);
+
+CREATE OR REPLACE FUNCTION proactive_grows(
+  shard_param INT,
+  shard_count_param INT,
+  after_id_param UUID,
+  page_size_param INT
+)
+RETURNS SETOF grows AS $$
+  SELECT g.*
+  FROM grows g
+  WHERE g.status = 'active'
+    AND (after_id_param IS NULL OR g.id > after_id_param)
+    AND abs(hashtext(g.id::text)::BIGINT) % GREATEST(shard_count_param, 1) = shard_param
+  ORDER BY g.id
+  LIMIT page_size_param;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION latest_grow_readings(grow_ids_param UUID[])
+RETURNS TABLE (grow_id UUID, reading JSONB) AS $$
+  -- One index probe per grow (sensor_readings (grow_id, created_at) and
+  -- grow_snapshots (grow_id, recorded_at DESC)), never a scan of history
+  SELECT ids.grow_id, COALESCE(r.reading, snap.reading)
+  FROM unnest(grow_ids_param) AS ids(grow_id)
+  LEFT JOIN LATERAL (
+    SELECT to_jsonb(s) AS reading
+    FROM sensor_readings s
+    WHERE s.grow_id = ids.grow_id
+    ORDER BY s.created_at DESC
+    LIMIT 1
+  ) r ON true
+  LEFT JOIN LATERAL (
+    SELECT to_jsonb(g) AS reading
+    FROM grow_snapshots g
+    WHERE r.reading IS NULL
+      AND g.grow_id = ids.grow_id
+    ORDER BY g.recorded_at DESC
+    LIMIT 1
+  ) snap ON true
+  WHERE r.reading IS NOT NULL OR snap.reading IS NOT NULL;
+$$ LANGUAGE sql STABLE;
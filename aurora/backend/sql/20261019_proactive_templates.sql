@@ -0,0 +1,12 @@
+-- 20261019_proactive_templates.sql
+-- Proactive Dr. Aurora message templates, one per anomaly signature
+-- ("phase|medium|metric:direction:severity;..."). The LLM writes a
+-- template the first time a signature is seen; later grows with the same
+-- pattern get it rendered with their own numbers.
+
+CREATE TABLE IF NOT EXISTS proactive_message_templates (
+    signature TEXT PRIMARY KEY,
+    template TEXT NOT NULL,
+    model TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,44 @@
+-- 20261019_scheduler_leases.sql
+-- Leader election for the scheduler: one lease row per name with an
+-- expiry. acquire_lease takes a free or expired lease, or renews one the
+-- caller already holds, atomically; it always returns the current holder.
+
+CREATE TABLE IF NOT EXISTS scheduler_leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    acquired_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    meta JSONB NOT NULL DEFAULT '{}'
+);
+
+CREATE OR REPLACE FUNCTION acquire_lease(
+  name_param TEXT,
+  holder_param TEXT,
+  ttl_seconds_param INT,
+  meta_param JSONB DEFAULT '{}'
+)
+RETURNS TABLE (holder TEXT, expires_at TIMESTAMPTZ, meta JSONB) AS $$
+BEGIN
+  INSERT INTO scheduler_leases AS l (name, holder, expires_at, meta)
+  VALUES (name_param, holder_param, now() + make_interval(secs => ttl_seconds_param), meta_param)
+  ON CONFLICT (name) DO UPDATE
+    SET holder = EXCLUDED.holder,
+        expires_at = EXCLUDED.expires_at,
+        acquired_at = CASE WHEN l.holder = EXCLUDED.holder THEN l.acquired_at ELSE now() END,
+        -- followers send an empty meta; keep the leader's last report
+        meta = CASE WHEN EXCLUDED.meta = '{}'::jsonb THEN l.meta ELSE EXCLUDED.meta END
+    WHERE l.holder = EXCLUDED.holder OR l.expires_at < now();
+
+  RETURN QUERY
+  SELECT l.holder, l.expires_at, l.meta
+  FROM scheduler_leases l
+  WHERE l.name = name_param;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION release_lease(name_param TEXT, holder_param TEXT)
+RETURNS VOID AS $$
+  UPDATE scheduler_leases
+  SET expires_at = now()
+  WHERE name = name_param AND holder = holder_param;
+$$ LANGUAGE sql;
@@ -0,0 +1,122 @@
+-- 20261019_sensor_rollups.sql
+-- Continuous per-grow, per-metric rollups of sensor_readings at 1m/1h/1d.
+-- Maintained incrementally on ingest (apply_sensor_rollups), repaired and
+-- backfilled set-based from raw data (backfill_sensor_rollups), and used to
+-- serve long-range history once raw rows are purged (purge_sensor_readings).
+
+CREATE TABLE IF NOT EXISTS sensor_rollups (
+    grow_id UUID NOT NULL REFERENCES grows(id) ON DELETE CASCADE,
+    granularity TEXT NOT NULL CHECK (granularity IN ('1m', '1h', '1d')),
+    metric TEXT NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sum_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    min DOUBLE PRECISION,
+    max DOUBLE PRECISION,
+    last DOUBLE PRECISION,
+    last_at TIMESTAMPTZ,
+    PRIMARY KEY (grow_id, granularity, metric, bucket_start)
+);
+
+-- Raw scans for backfill and retention
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_created
+    ON sensor_readings(created_at);
+CREATE INDEX IF NOT EXISTS idx_sensor_readings_grow_created
+    ON sensor_readings(grow_id, created_at);
+
+-- 1. Merge pre-aggregated deltas (one row per grow/granularity/metric/bucket)
+CREATE OR REPLACE FUNCTION apply_sensor_rollups(deltas JSONB)
+RETURNS VOID AS $$
+BEGIN
+  INSERT INTO sensor_rollups AS r
+    (grow_id, granularity, metric, bucket_start, count, sum, sum_sq, min, max, last, last_at)
+  SELECT d.grow_id, d.granularity, d.metric, d.bucket_start,
+         d.count, d.sum, d.sum_sq, d.min, d.max, d.last, d.last_at
+  FROM jsonb_to_recordset(deltas) AS d(
+    grow_id UUID, granularity TEXT, metric TEXT, bucket_start TIMESTAMPTZ,
+    count INT, sum DOUBLE PRECISION, sum_sq DOUBLE PRECISION,
+    min DOUBLE PRECISION, max DOUBLE PRECISION,
+    last DOUBLE PRECISION, last_at TIMESTAMPTZ
+  )
+  ON CONFLICT (grow_id, granularity, metric, bucket_start) DO UPDATE SET
+    count = r.count + EXCLUDED.count,
+    sum = r.sum + EXCLUDED.sum,
+    sum_sq = r.sum_sq + EXCLUDED.sum_sq,
+    min = LEAST(r.min, EXCLUDED.min),
+    max = GREATEST(r.max, EXCLUDED.max),
+    last = CASE WHEN r.last_at IS NULL OR EXCLUDED.last_at >= r.last_at
+                THEN EXCLUDED.last ELSE r.last END,
+    last_at = GREATEST(r.last_at, EXCLUDED.last_at);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 2. Recompute whole buckets from raw readings. The window is widened to
+--    bucket boundaries per granularity, so re-running it is idempotent.
+CREATE OR REPLACE FUNCTION backfill_sensor_rollups(since TIMESTAMPTZ, until TIMESTAMPTZ)
+RETURNS INT AS $$
+DECLARE
+  v_rows INT := 0;
+  v_n INT;
+  g RECORD;
+BEGIN
+  FOR g IN SELECT * FROM (VALUES ('1m', 'minute'), ('1h', 'hour'), ('1d', 'day')) AS t(name, unit) LOOP
+    INSERT INTO sensor_rollups AS r
+      (grow_id, granularity, metric, bucket_start, count, sum, sum_sq, min, max, last, last_at)
+    SELECT s.grow_id,
+           g.name,
+           m.metric,
+           date_trunc(g.unit, s.created_at) AS bucket,
+           COUNT(*),
+           SUM(m.value),
+           SUM(m.value * m.value),
+           MIN(m.value),
+           MAX(m.value),
+           (array_agg(m.value ORDER BY s.created_at DESC))[1],
+           MAX(s.created_at)
+    FROM sensor_readings s
+    CROSS JOIN LATERAL (VALUES
+      ('temperature', s.temperature::DOUBLE PRECISION),
+      ('humidity', s.humidity::DOUBLE PRECISION),
+      ('vpd', s.vpd::DOUBLE PRECISION),
+      ('ph', s.ph::DOUBLE PRECISION),
+      ('ec', s.ec::DOUBLE PRECISION),
+      ('co2_ppm', s.co2_ppm::DOUBLE PRECISION),
+      ('light_intensity', s.light_intensity::DOUBLE PRECISION),
+      ('soil_moisture', s.soil_moisture::DOUBLE PRECISION)
+    ) AS m(metric, value)
+    WHERE m.value IS NOT NULL
+      AND s.created_at >= date_trunc(g.unit, since)
+      AND s.created_at < date_trunc(g.unit, until) + ('1 ' || g.unit)::INTERVAL
+    GROUP BY s.grow_id, m.metric, bucket
+    ON CONFLICT (grow_id, granularity, metric, bucket_start) DO UPDATE SET
+      count = EXCLUDED.count,
+      sum = EXCLUDED.sum,
+      sum_sq = EXCLUDED.sum_sq,
+      min = EXCLUDED.min,
+      max = EXCLUDED.max,
+      last = EXCLUDED.last,
+      last_at = EXCLUDED.last_at;
+    GET DIAGNOSTICS v_n = ROW_COUNT;
+    v_rows := v_rows + v_n;
+  END LOOP;
+  RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. Retention: drop raw readings (rollups are kept) and fine-grained rollups
+CREATE OR REPLACE FUNCTION purge_sensor_readings(raw_days INT, minute_rollup_days INT DEFAULT 14)
+RETURNS INT AS $$
+DECLARE
+  v_deleted INT;
+BEGIN
+  DELETE FROM sensor_readings WHERE created_at < now() - make_interval(days => raw_days);
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+
+  DELETE FROM sensor_rollups
+  WHERE granularity = '1m'
+    AND bucket_start < now() - make_interval(days => minute_rollup_days);
+
+  RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
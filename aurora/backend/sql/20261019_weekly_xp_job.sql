@@ -0,0 +1,161 @@
+-- 20261019_weekly_xp_job.sql
+-- Set-based weekly XP job: consistency bonuses and level reconciliation.
+--   * job_runs:             resumable progress per (job, period)
+--   * weekly_bonus_candidates: the week's qualifying users, counted once
+--   * weekly_bonus_awards:  one bonus per user per week (idempotent reruns)
+--   * profiles.xp_changed_at: lets reconciliation visit only users whose
+--                           XP moved since the last finished run
+
+-- 1. Job progress
+CREATE TABLE IF NOT EXISTS job_runs (
+    job TEXT NOT NULL,
+    period TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    cursor TEXT,
+    progress JSONB NOT NULL DEFAULT '{}',
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ,
+    PRIMARY KEY (job, period)
+);
+
+-- 2. Weekly consistency bonus. The week's qualifying users are counted
+--    once per run into weekly_bonus_candidates; bonus pages then walk
+--    that set by primary key instead of re-aggregating the week.
+CREATE TABLE IF NOT EXISTS weekly_bonus_awards (
+    user_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    week_start DATE NOT NULL,
+    tasks_completed INT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (user_id, week_start)
+);
+
+CREATE TABLE IF NOT EXISTS weekly_bonus_candidates (
+    week_start DATE NOT NULL,
+    user_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    tasks_completed INT NOT NULL,
+    PRIMARY KEY (week_start, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_daily_tasks_completed_at
+  ON daily_tasks (completed_at, user_id) WHERE is_completed;
+
+-- Count the week's qualifying users (idempotent). Returns how many
+-- candidates the week has.
+CREATE OR REPLACE FUNCTION stage_weekly_bonus_candidates(
+  week_start_param DATE,
+  min_tasks_param INT
+)
+RETURNS BIGINT AS $$
+  DELETE FROM weekly_bonus_candidates WHERE week_start < week_start_param;
+
+  INSERT INTO weekly_bonus_candidates (week_start, user_id, tasks_completed)
+  SELECT week_start_param, t.user_id, COUNT(*)
+  FROM daily_tasks t
+  JOIN profiles p ON p.id = t.user_id
+  WHERE t.is_completed
+    AND t.completed_at >= week_start_param
+    AND t.completed_at < week_start_param + 7
+  GROUP BY t.user_id
+  HAVING COUNT(*) >= min_tasks_param
+  ON CONFLICT DO NOTHING;
+
+  SELECT COUNT(*) FROM weekly_bonus_candidates WHERE week_start = week_start_param;
+$$ LANGUAGE sql;
+
+-- One page of candidates. Returns every candidate in the page (for the
+-- cursor) and whether this call awarded them (false when a previous run
+-- did).
+DROP FUNCTION IF EXISTS apply_weekly_bonus_page(DATE, INT, INT, INT, UUID, INT);
+
+CREATE OR REPLACE FUNCTION apply_weekly_bonus_page(
+  week_start_param DATE,
+  bonus_xp_param INT,
+  bonus_karma_param INT,
+  after_user_param UUID,
+  page_size_param INT
+)
+RETURNS TABLE (user_id UUID, tasks_completed INT, awarded BOOLEAN) AS $$
+  WITH active AS (
+    SELECT c.user_id, c.tasks_completed AS n
+    FROM weekly_bonus_candidates c
+    WHERE c.week_start = week_start_param
+      AND (after_user_param IS NULL OR c.user_id > after_user_param)
+    ORDER BY c.user_id
+    LIMIT page_size_param
+  ),
+  claimed AS (
+    INSERT INTO weekly_bonus_awards (user_id, week_start, tasks_completed)
+    SELECT a.user_id, week_start_param, a.n
+    FROM active a
+    ON CONFLICT DO NOTHING
+    RETURNING weekly_bonus_awards.user_id
+  ),
+  updated AS (
+    UPDATE profiles p
+    SET total_xp = COALESCE(p.total_xp, 0) + bonus_xp_param,
+        karma = COALESCE(p.karma, 0) + bonus_karma_param
+    FROM claimed c
+    WHERE p.id = c.user_id
+    RETURNING p.id, p.total_xp
+  ),
+  logged AS (
+    INSERT INTO xp_events (user_id, amount, reason, total_after)
+    SELECT u.id, bonus_xp_param, 'weekly_consistency_bonus', u.total_xp
+    FROM updated u
+  )
+  SELECT a.user_id, a.n, u.id IS NOT NULL
+  FROM active a
+  LEFT JOIN updated u ON u.id = a.user_id
+  ORDER BY a.user_id;
+$$ LANGUAGE sql;
+
+-- 3. Level reconciliation over users whose XP changed
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS xp_changed_at TIMESTAMPTZ NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS idx_profiles_xp_changed_at ON profiles (xp_changed_at, id);
+
+CREATE OR REPLACE FUNCTION touch_profile_xp()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.xp_changed_at := now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS profiles_touch_xp ON profiles;
+CREATE TRIGGER profiles_touch_xp
+  BEFORE UPDATE OF total_xp ON profiles
+  FOR EACH ROW
+  WHEN (OLD.total_xp IS DISTINCT FROM NEW.total_xp)
+  EXECUTE FUNCTION touch_profile_xp();
+
+-- Keyset page of profiles whose XP changed at or after `since_param`
+-- (all profiles when NULL), walked in (xp_changed_at, id) order so
+-- idx_profiles_xp_changed_at drives both the filter and the page. A
+-- profile whose XP moves mid-run only moves forward past the cursor.
+DROP FUNCTION IF EXISTS profiles_changed_since(TIMESTAMPTZ, UUID, INT);
+
+CREATE OR REPLACE FUNCTION profiles_changed_since(
+  since_param TIMESTAMPTZ,
+  after_changed_at_param TIMESTAMPTZ,
+  after_id_param UUID,
+  page_size_param INT
+)
+RETURNS TABLE (id UUID, total_xp INT, level INT, xp_changed_at TIMESTAMPTZ) AS $$
+  SELECT p.id, COALESCE(p.total_xp, 0), COALESCE(p.level, 1), p.xp_changed_at
+  FROM profiles p
+  WHERE (since_param IS NULL OR p.xp_changed_at >= since_param)
+    AND (after_changed_at_param IS NULL
+         OR (p.xp_changed_at, p.id) > (after_changed_at_param, after_id_param))
+  ORDER BY p.xp_changed_at, p.id
+  LIMIT page_size_param;
+$$ LANGUAGE sql STABLE;
+
+-- levels: [{ "user_id", "level" }], stored exactly (may lower a level)
+CREATE OR REPLACE FUNCTION apply_profile_levels(levels JSONB)
+RETURNS VOID AS $$
+  UPDATE profiles p
+  SET level = l.level
+  FROM jsonb_to_recordset(levels) AS l(user_id UUID, level INT)
+  WHERE p.id = l.user_id;
+$$ LANGUAGE sql;
@@ -0,0 +1,71 @@
+-- 20261019_xp_ledger.sql
+-- Atomic XP / karma application for the backend XP ledger.
+--   * apply_xp_ledger:    one call per flush; increments totals in place,
+--                         appends xp_events and returns the new totals
+--   * set_profile_levels: stores level-ups computed by the backend
+--   * xp_ledger_drift:    profiles whose total_xp differs from SUM(xp_events)
+
+CREATE INDEX IF NOT EXISTS idx_xp_events_user ON xp_events (user_id);
+
+-- entries: [{ "user_id", "xp", "karma", "events": [{ "amount", "reason" }] }]
+CREATE OR REPLACE FUNCTION apply_xp_ledger(entries JSONB)
+RETURNS TABLE (user_id UUID, total_xp INT, karma INT) AS $$
+  WITH batch AS (
+    SELECT e.user_id, e.xp, e.karma, e.events
+    FROM jsonb_to_recordset(entries) AS e(user_id UUID, xp INT, karma INT, events JSONB)
+  ),
+  updated AS (
+    UPDATE profiles p
+    SET total_xp = COALESCE(p.total_xp, 0) + b.xp,
+        karma = COALESCE(p.karma, 0) + b.karma
+    FROM batch b
+    WHERE p.id = b.user_id
+    RETURNING p.id, p.total_xp, p.karma, b.xp AS batch_xp
+  ),
+  logged AS (
+    -- total_after replays the batch in order from the pre-batch total
+    INSERT INTO xp_events (user_id, amount, reason, total_after)
+    SELECT u.id, ev.amount, ev.reason,
+           u.total_xp - u.batch_xp
+             + SUM(ev.amount) OVER (PARTITION BY u.id ORDER BY ev.ord)
+    FROM updated u
+    JOIN batch b ON b.user_id = u.id
+    CROSS JOIN LATERAL ROWS FROM (
+      jsonb_to_recordset(COALESCE(b.events, '[]'::jsonb)) AS (amount INT, reason TEXT)
+    ) WITH ORDINALITY AS ev(amount, reason, ord)
+  )
+  SELECT id, total_xp, karma FROM updated;
+$$ LANGUAGE sql;
+
+-- levels: [{ "user_id", "level" }]. Levels never move down here: a later
+-- batch from another worker may already have stored a higher one.
+CREATE OR REPLACE FUNCTION set_profile_levels(levels JSONB)
+RETURNS VOID AS $$
+  UPDATE profiles p
+  SET level = GREATEST(COALESCE(p.level, 1), l.level)
+  FROM jsonb_to_recordset(levels) AS l(user_id UUID, level INT)
+  WHERE p.id = l.user_id;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION xp_ledger_drift(max_rows INT DEFAULT 1000)
+RETURNS TABLE (user_id UUID, profile_xp INT, ledger_xp BIGINT) AS $$
+  SELECT p.id, COALESCE(p.total_xp, 0), COALESCE(e.total, 0)
+  FROM profiles p
+  LEFT JOIN (
+    SELECT x.user_id, SUM(x.amount) AS total
+    FROM xp_events x
+    GROUP BY x.user_id
+  ) e ON e.user_id = p.id
+  WHERE COALESCE(p.total_xp, 0) <> COALESCE(e.total, 0)
+  ORDER BY ABS(COALESCE(p.total_xp, 0) - COALESCE(e.total, 0)) DESC
+  LIMIT max_rows;
+$$ LANGUAGE sql STABLE;
+
+-- Reset total_xp to SUM(xp_events) for the given users (consistency tool)
+CREATE OR REPLACE FUNCTION rebuild_xp_totals(user_ids UUID[])
+RETURNS TABLE (user_id UUID, total_xp INT) AS $$
+  UPDATE profiles p
+  SET total_xp = COALESCE((SELECT SUM(x.amount) FROM xp_events x WHERE x.user_id = p.id), 0)
+  WHERE p.id = ANY(user_ids)
+  RETURNING p.id, p.total_xp;
+$$ LANGUAGE sql;